@@ -36,10 +36,8 @@ def print_stream_data_from_stream_buffer(wsm):
     while True:
         if wsm.is_manager_stopping():
             exit(0)
-        oldest_stream_data_from_stream_buffer = wsm.pop_stream_data_from_stream_buffer()
-        if oldest_stream_data_from_stream_buffer is None:
-            time.sleep(0.1)
-        else:
+        oldest_stream_data_from_stream_buffer = wsm.pop_stream_data_from_stream_buffer(timeout=1)
+        if oldest_stream_data_from_stream_buffer is not None:
             try:
                 # remove # to activate the print function:
                 # print(oldest_stream_data_from_stream_buffer)
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# File: dev/tools/benchmark_subscribe_to_stream.py
+#
+# Part of ‘UNICORN Bybit WebSocket API’
+# Project website: https://www.lucit.tech/unicorn-bybit-websocket-api.html
+# Github: https://github.com/LUCIT-Systems-and-Development/unicorn-bybit-websocket-api
+# Documentation: https://unicorn-bybit-websocket-api.docs.lucit.tech
+# PyPI: https://pypi.org/project/unicorn-bybit-websocket-api
+# LUCIT Online Shop: https://shop.lucit.services/software
+#
+# License: LSOSL - LUCIT Synergetic Open Source License
+# https://github.com/LUCIT-Systems-and-Development/unicorn-bybit-websocket-api/blob/master/LICENSE
+#
+# Author: LUCIT Systems and Development
+#
+# Copyright (c) 2024-2024, LUCIT Systems and Development (https://www.lucit.tech)
+# All rights reserved.
+
+# Time-to-first-data of `subscribe_to_stream()` for single markets added to a stream with many subscribed markets.
+#
+# Usage:
+#   python benchmark_subscribe_to_stream.py
+#   python benchmark_subscribe_to_stream.py --websocket-base-uri ws://127.0.0.1:8765 --synthetic-markets
+
+from unicorn_bybit_websocket_api import BybitWebSocketApiManager
+
+import argparse
+import requests
+import statistics
+import threading
+import time
+
+
+def get_linear_symbols() -> list:
+    response = requests.get("https://api.bybit.com/v5/market/instruments-info",
+                            params={"category": "linear", "limit": 1000})
+    return [instrument['symbol'] for instrument in response.json()['result']['list']]
+
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--channel", default="tickers")
+parser.add_argument("--markets", type=int, default=1000, help="number of markets subscribed at start")
+parser.add_argument("--additions", type=int, default=20, help="number of markets added one by one")
+parser.add_argument("--websocket-base-uri", default=None)
+parser.add_argument("--synthetic-markets", action="store_true", help="use SYM<n>USDT, only for a test server")
+args = parser.parse_args()
+
+if args.synthetic_markets:
+    symbols = [f"SYM{index}USDT" for index in range(args.markets + args.additions)]
+else:
+    symbols = get_linear_symbols()
+    if len(symbols) < args.markets + args.additions:
+        print(f"Only {len(symbols)} linear symbols available!")
+        args.markets = len(symbols) - args.additions
+markets = symbols[:args.markets]
+additions = symbols[args.markets:args.markets + args.additions]
+
+first_data = {}
+first_data_lock = threading.Lock()
+
+
+def handler(stream_data):
+    with first_data_lock:
+        event = first_data.get(stream_data['topic'])
+    if event is not None:
+        event.set()
+
+
+with BybitWebSocketApiManager(exchange="bybit.com", websocket_base_uri=args.websocket_base_uri) as ubwa:
+    stream_id = ubwa.create_stream(endpoint="public/linear", channels=args.channel, markets=markets)
+    ubwa.register_topic_handler(topic=f"{args.channel}.*", handler=handler, stream_id=stream_id, output="dict")
+    while ubwa.get_stream_info(stream_id=stream_id)['last_received_data_record'] is None:
+        time.sleep(0.1)
+    # let the initial subscriptions settle
+    time.sleep(3)
+    results = []
+    for market in additions:
+        topic = f"{args.channel}.{market}"
+        with first_data_lock:
+            first_data[topic] = threading.Event()
+        transmitted = ubwa.get_stream_info(stream_id=stream_id)['processed_transmitted_total']
+        start_time = time.perf_counter()
+        ubwa.subscribe_to_stream(stream_id=stream_id, markets=market)
+        if first_data[topic].wait(timeout=30) is False:
+            print(f"{topic}: no data within 30 seconds!")
+            continue
+        results.append((time.perf_counter() - start_time) * 1000)
+        print(f"{topic}: {results[-1]:.1f} ms, "
+              f"{ubwa.get_stream_info(stream_id=stream_id)['processed_transmitted_total'] - transmitted} frames sent")
+    if results:
+        print(f"\r\nTime-to-first-data of {len(results)} additions to a stream with {len(markets)} markets: "
+              f"min={min(results):.1f} ms, median={statistics.median(results):.1f} ms, max={max(results):.1f} ms")
@@ -68,6 +68,7 @@ setup(
     install_requires=['colorama', 'requests>=2.31.0', 'websocket-client', 'websockets==11.0.3', 'flask_restful',
                       'cheroot', 'flask', 'lucit-licensing-python>=1.8.2', 'ujson', 'psutil', 'PySocks',
                       'typing_extensions', 'Cython'],
+    extras_require={'kline_store': ['numpy']},
     keywords='bybit, asyncio, async, asynchronous, concurrent, websocket-api, webstream-api, '
              'bybit-websocket, bybit-webstream, webstream, websocket, api',
     project_urls={
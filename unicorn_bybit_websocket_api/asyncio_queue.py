@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# ¯\_(ツ)_/¯
+#
+# File: unicorn_bybit_websocket_api/asyncio_queue.py
+#
+# Part of ‘UNICORN Bybit WebSocket API’
+# Project website: https://www.lucit.tech/unicorn-bybit-websocket-api.html
+# Github: https://github.com/LUCIT-Systems-and-Development/unicorn-bybit-websocket-api
+# Documentation: https://unicorn-bybit-websocket-api.docs.lucit.tech
+# PyPI: https://pypi.org/project/unicorn-bybit-websocket-api
+# LUCIT Online Shop: https://shop.lucit.services/software
+#
+# License: LSOSL - LUCIT Synergetic Open Source License
+# https://github.com/LUCIT-Systems-and-Development/unicorn-bybit-websocket-api/blob/master/LICENSE
+#
+# Author: LUCIT Systems and Development
+#
+# Copyright (c) 2024-2024, LUCIT Systems and Development (https://www.lucit.tech)
+# All rights reserved.
+
+
+from .topic_router import get_record_header, get_record_topic
+from typing import Dict
+try:
+    # python <=3.7 support
+    from typing import Literal
+except ImportError:
+    from typing_extensions import Literal
+
+import asyncio
+import logging
+
+
+__logger__: logging.getLogger = logging.getLogger("unicorn_bybit_websocket_api")
+
+logger = __logger__
+
+OVERFLOW_POLICIES = ("block", "drop_oldest", "drop_newest", "coalesce_by_topic")
+
+
+class BybitWebSocketApiAsyncioQueue(asyncio.Queue):
+    """
+    The `asyncio_queue` of a stream with a max size and an overflow policy.
+
+    The overflow policies of a full queue:
+
+    - `block`: `put()` waits for free space, the receiving of the stream pauses until the consumer catches up
+    - `drop_oldest`: The oldest record gets dropped to make room for the new one
+    - `drop_newest`: The new record gets dropped
+    - `coalesce_by_topic`: The new record replaces the queued record with the same topic, if there is none the oldest
+      record gets dropped. Only records which carry the full state of their topic get coalesced: A record of the
+      `type` "delta" (e.g. `orderbook.*` and the `tickers.*` of linear and inverse) is only a change of the state, so
+      it never replaces a queued record and the oldest record gets dropped like with `drop_oldest`. Records without a
+      `type` (e.g. `kline.*`, `publicTrade.*` and spot `tickers.*`) count as full state.
+
+    With `coalesce_by_topic` each queued record is wrapped into an entry `[record, topic]` and the newest entry of each
+    topic is indexed, so replacing a record is a dict lookup instead of a scan of the queue.
+
+    The queue is used only within the event loop of its stream, so the counters need no lock.
+
+    :param maxsize: Max number of records, `0` is unlimited.
+    :type maxsize: int
+    :param overflow_policy: "block", "drop_oldest", "drop_newest" or "coalesce_by_topic"
+    :type overflow_policy: str
+    """
+    def __init__(self,
+                 maxsize: int = 0,
+                 overflow_policy: Literal['block', 'drop_oldest', 'drop_newest', 'coalesce_by_topic'] = "block"):
+        if overflow_policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Parameter `overflow_policy` must be one of {OVERFLOW_POLICIES}, received: "
+                             f"{overflow_policy}")
+        super().__init__(maxsize=maxsize)
+        self.overflow_policy: str = overflow_policy
+        self.coalesced: int = 0
+        self.dropped: int = 0
+        self.high_water_mark: int = 0
+        self.latest_by_topic: Dict[str, list] = {}
+
+    def _coalesce(self, item) -> bool:
+        """
+        Replace the newest queued record with the topic of `item`, deltas are not coalesced.
+
+        :param item: The new record
+        :return: bool
+        """
+        header = get_record_header(item)
+        if header.topic is None or header.type == "delta":
+            return False
+        topic = header.topic
+        try:
+            self.latest_by_topic[topic][0] = item
+        except KeyError:
+            return False
+        return True
+
+    def _get(self):
+        item = self._queue.popleft()
+        if self.overflow_policy == "coalesce_by_topic":
+            record, topic = item
+            if topic is not None and self.latest_by_topic.get(topic) is item:
+                del self.latest_by_topic[topic]
+            return record
+        return item
+
+    def _put(self, item) -> None:
+        if self.overflow_policy == "coalesce_by_topic":
+            topic = get_record_topic(item)
+            item = [item, topic]
+            if topic is not None:
+                self.latest_by_topic[topic] = item
+        self._queue.append(item)
+        if len(self._queue) > self.high_water_mark:
+            self.high_water_mark = len(self._queue)
+
+    async def put(self, item) -> None:
+        """
+        Put a record into the queue, if the queue is full the `overflow_policy` gets applied.
+
+        :param item: The record
+        :return: None
+        """
+        if self.overflow_policy == "block":
+            await super().put(item)
+        else:
+            self.put_nowait(item)
+
+    def put_nowait(self, item) -> None:
+        """
+        Put a record into the queue without waiting, if the queue is full the `overflow_policy` gets applied.
+
+        With the policy `block` a full queue raises `asyncio.QueueFull`.
+
+        :param item: The record
+        :return: None
+        """
+        if self.overflow_policy == "block" or not self.full():
+            super().put_nowait(item)
+        elif self.overflow_policy == "drop_newest":
+            self.dropped += 1
+        elif self.overflow_policy == "coalesce_by_topic" and self._coalesce(item):
+            self.coalesced += 1
+        else:
+            self.get_nowait()
+            self.task_done()
+            self.dropped += 1
+            super().put_nowait(item)
@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# ¯\_(ツ)_/¯
+#
+# File: unicorn_bybit_websocket_api/conflation_buffer.py
+#
+# Part of ‘UNICORN Bybit WebSocket API’
+# Project website: https://www.lucit.tech/unicorn-bybit-websocket-api.html
+# Github: https://github.com/LUCIT-Systems-and-Development/unicorn-bybit-websocket-api
+# Documentation: https://unicorn-bybit-websocket-api.docs.lucit.tech
+# PyPI: https://pypi.org/project/unicorn-bybit-websocket-api
+# LUCIT Online Shop: https://shop.lucit.services/software
+#
+# License: LSOSL - LUCIT Synergetic Open Source License
+# https://github.com/LUCIT-Systems-and-Development/unicorn-bybit-websocket-api/blob/master/LICENSE
+#
+# Author: LUCIT Systems and Development
+#
+# Copyright (c) 2024-2024, LUCIT Systems and Development (https://www.lucit.tech)
+# All rights reserved.
+
+
+from .order_book import BybitWebSocketApiLocalOrderBook
+from .topic_decoders import decode_typed
+from typing import Callable, Dict, List, Optional
+try:
+    # python <=3.7 support
+    from typing import Literal
+except ImportError:
+    from typing_extensions import Literal
+
+import logging
+import threading
+import time
+import ujson as json
+
+
+__logger__: logging.getLogger = logging.getLogger("unicorn_bybit_websocket_api")
+
+logger = __logger__
+
+
+def _is_mergeable(stream_data=None) -> bool:
+    """
+    Can this record be part of a delta merge?
+
+    :param stream_data: A record
+    :return: bool
+    """
+    return type(stream_data) is str or type(stream_data) is dict
+
+
+def _merge_delta(state=None, delta=None) -> dict:
+    """
+    Merge the `data` of a delta into a copy of the last state of its topic.
+
+    Keys with empty lists in the delta keep the value of the state. If `data` is not a dict on both sides the delta
+    replaces the state.
+
+    :param state: The last state of the topic as string or dict.
+    :param delta: The delta as string or dict.
+    :return: dict
+    """
+    if type(state) is str:
+        state = json.loads(state)
+    if type(delta) is str:
+        delta = json.loads(delta)
+    if type(state.get('data')) is not dict or type(delta.get('data')) is not dict:
+        return delta
+    data = dict(state['data'])
+    for key, value in delta['data'].items():
+        if value != []:
+            data[key] = value
+    merged = dict(delta)
+    merged['data'] = data
+    return merged
+
+
+class BybitWebSocketApiConflationBuffer(object):
+    """
+    Last-value buffer of a stream with one slot per topic.
+
+    A new record overwrites the slot of its topic and marks the topic as dirty, `pop()` returns only dirty topics in
+    the order they became dirty. So the memory and the work of the consumer is bounded by the number of topics and not
+    by the receiving rate.
+
+    Received frames are stored undecoded and get decoded into the `output` format only when they are popped. Deltas
+    with a dict in `data` (e.g. `tickers.*` of linear and inverse) are merged into the last state of the topic, so a
+    popped record always contains all fields. The `b` and `a` of `orderbook.*` deltas are level changes and can not be
+    merged this way, the snapshots and deltas of these topics are applied to a `BybitWebSocketApiLocalOrderBook` and
+    a popped record is a `snapshot` of the book. A book with a gap in its updates is not returned till its next
+    `snapshot`, `on_gap` gets called with the topic to request it.
+
+    :param output: Format of the popped records: "raw_data", "dict" or "typed"
+    :type output: str
+    :param throttle_ms: Return a topic at most once within this number of milliseconds, `None` disables the throttle.
+    :type throttle_ms: int or None
+    :param on_gap: Called with the topic if a book detects a gap in its updates.
+    :type on_gap: function or None
+    """
+    def __init__(self,
+                 output: Literal['dict', 'raw_data', 'typed'] = "raw_data",
+                 throttle_ms: Optional[int] = None,
+                 on_gap: Optional[Callable[[str], None]] = None):
+        self.on_gap = on_gap
+        self.output = output
+        self.throttle: float = throttle_ms / 1000 if throttle_ms else 0.0
+        self.dirty: Dict[str, None] = {}
+        self.last_pop: Dict[str, float] = {}
+        self.lock = threading.Lock()
+        self.order_books: Dict[str, BybitWebSocketApiLocalOrderBook] = {}
+        self.slots: Dict[str, object] = {}
+
+    def __len__(self):
+        return len(self.dirty)
+
+    def _decode(self, stream_data=None):
+        """
+        Convert the content of a slot into the `output` format.
+
+        :param stream_data: The content of a slot.
+        :return: str, dict or BybitWebSocketApiTypedMessage
+        """
+        if type(stream_data) is BybitWebSocketApiLocalOrderBook:
+            stream_data = self._get_order_book_snapshot(stream_data)
+        if type(stream_data) is str:
+            if self.output == "dict":
+                return json.loads(stream_data)
+            elif self.output == "typed":
+                return decode_typed(json.loads(stream_data))
+        elif type(stream_data) is dict:
+            if self.output == "raw_data":
+                return json.dumps(stream_data)
+            elif self.output == "typed":
+                return decode_typed(stream_data)
+        return stream_data
+
+    @staticmethod
+    def _get_order_book_snapshot(order_book: BybitWebSocketApiLocalOrderBook = None) -> dict:
+        """
+        Create a `snapshot` message with the current levels of a local order book.
+
+        :param order_book: The book of the topic.
+        :type order_book: BybitWebSocketApiLocalOrderBook
+        :return: dict
+        """
+        book = order_book.get()
+        return {'topic': book['topic'],
+                'type': "snapshot",
+                'ts': book['ts'],
+                'data': {'s': book['symbol'],
+                         'b': [[str(price), str(size)] for price, size in book['bids']],
+                         'a': [[str(price), str(size)] for price, size in book['asks']],
+                         'u': book['u'],
+                         'seq': book['seq']}}
+
+    def _put_order_book(self, topic: str = None, stream_data=None) -> None:
+        """
+        Apply a record of an `orderbook.*` topic to the book of the topic and mark it as dirty.
+
+        :param topic: The topic of the record.
+        :type topic: str
+        :param stream_data: The received frame as string or the already decoded record.
+        :return: None
+        """
+        if type(stream_data) is str:
+            stream_data = json.loads(stream_data)
+        with self.lock:
+            order_book = self.order_books.get(topic)
+            if order_book is None:
+                if stream_data.get('type') != "snapshot":
+                    return None
+                order_book = BybitWebSocketApiLocalOrderBook(topic=topic)
+                self.order_books[topic] = order_book
+        gaps = order_book.gaps
+        try:
+            if order_book.apply(stream_data) is False:
+                if order_book.is_synced is False:
+                    with self.lock:
+                        self.slots.pop(topic, None)
+                        self.dirty.pop(topic, None)
+                    if order_book.gaps != gaps and self.on_gap is not None:
+                        self.on_gap(topic)
+                return None
+        except (KeyError, TypeError, ValueError) as error_msg:
+            logger.error(f"BybitWebSocketApiConflationBuffer.put() - Can not apply message of topic '{topic}': "
+                         f"{error_msg}")
+            return None
+        with self.lock:
+            self.slots[topic] = order_book
+            self.dirty[topic] = None
+
+    def _pop(self, now: float = None):
+        """
+        Pop the oldest dirty topic which is not throttled. Must be called with `self.lock`.
+
+        :param now: Timestamp of `time.monotonic()`
+        :type now: float
+        :return: The content of the slot or None
+        """
+        for topic in self.dirty:
+            if self.throttle and now - self.last_pop.get(topic, 0.0) < self.throttle:
+                continue
+            del self.dirty[topic]
+            self.last_pop[topic] = now
+            return self.slots[topic]
+        return None
+
+    def pop(self):
+        """
+        Get the latest record of the oldest dirty topic.
+
+        :return: The record or None
+        """
+        with self.lock:
+            stream_data = self._pop(time.monotonic())
+        if stream_data is None:
+            return None
+        return self._decode(stream_data)
+
+    def pop_all(self) -> List:
+        """
+        Get the latest records of all dirty topics.
+
+        :return: list
+        """
+        result = []
+        now = time.monotonic()
+        with self.lock:
+            while True:
+                stream_data = self._pop(now)
+                if stream_data is None:
+                    break
+                result.append(stream_data)
+        return [self._decode(stream_data) for stream_data in result]
+
+    def put(self, topic: str = None, stream_data=None, type: str = None) -> None:
+        """
+        Overwrite the slot of a topic and mark it as dirty.
+
+        :param topic: The topic of the record.
+        :type topic: str
+        :param stream_data: The received frame as string or the already decoded record.
+        :param type: The `type` of the frame, `snapshot` or `delta`.
+        :type type: str
+        :return: None
+        """
+        if topic.startswith("orderbook.") and _is_mergeable(stream_data):
+            return self._put_order_book(topic=topic, stream_data=stream_data)
+        with self.lock:
+            if type == "delta":
+                previous = self.slots.get(topic)
+                if previous is not None and _is_mergeable(previous) and _is_mergeable(stream_data):
+                    stream_data = _merge_delta(previous, stream_data)
+            self.slots[topic] = stream_data
+            self.dirty[topic] = None
+
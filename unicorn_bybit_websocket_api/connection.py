@@ -53,6 +53,7 @@ class BybitWebSocketApiConnection(object):
         self.channels = copy.deepcopy(channels)
         self.endpoint = copy.deepcopy(endpoint)
         self.markets = copy.deepcopy(markets)
+        self.statistics = self.manager.stream_statistics[self.stream_id]
         self.websocket = None
         self.add_timeout = False
         self.timeout_disabled = False
@@ -64,7 +65,11 @@ class BybitWebSocketApiConnection(object):
                                                 self.endpoint,
                                                 self.markets,
                                                 self.stream_id)
-        self.manager.subscribe_to_stream(stream_id=self.stream_id, channels=self.channels, markets=self.markets)
+        self.manager._reset_subscribed_topics(stream_id=self.stream_id)
+        # The stream_list holds the channels and markets of all later subscriptions too
+        self.manager._subscribe_to_connection(stream_id=self.stream_id,
+                                              channels=list(self.manager.stream_list[self.stream_id]['channels']),
+                                              markets=list(self.manager.stream_list[self.stream_id]['markets']))
         if uri is None:
             # cant get a valid URI, so this stream has to crash
             error_msg = "Probably no internet connection?"
@@ -179,16 +184,24 @@ class BybitWebSocketApiConnection(object):
             if self.timeout_disabled is True and self.manager.stream_list[self.stream_id]['subscriptions'] != 0:
                 received_data_json = await self.websocket.recv()
             else:
-                if self.manager.stream_list[self.stream_id]['processed_receives_total'] > 10:
+                if self.statistics.processed_receives_total > 10:
                     self.timeout_disabled = True
                 received_data_json = await asyncio.wait_for(self.websocket.recv(), timeout=1)
-        self.manager.set_heartbeat(self.stream_id)
-        size = sys.getsizeof(str(received_data_json))
-        self.manager.add_total_received_bytes(size)
-        self.manager.increase_received_bytes_per_second(self.stream_id, size)
-        self.manager.increase_processed_receives_statistic(self.stream_id)
+        # Lock-free, the statistics of a stream are only written by its own event loop
+        self.statistics.add_receive(sys.getsizeof(str(received_data_json)))
         return received_data_json
 
+    def has_buffered_data(self) -> bool:
+        """
+        Are there already received frames which can be read with `receive()` without waiting?
+
+        :return: bool
+        """
+        try:
+            return len(self.websocket.messages) > 0
+        except AttributeError:
+            return False
+
     async def send(self, data):
         logger.debug(f"BybitWebSocketApiConnection.send({str(self.stream_id)})")
         self.raise_exceptions()
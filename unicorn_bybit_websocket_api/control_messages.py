@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# ¯\_(ツ)_/¯
+#
+# File: unicorn_bybit_websocket_api/control_messages.py
+#
+# Part of ‘UNICORN Bybit WebSocket API’
+# Project website: https://www.lucit.tech/unicorn-bybit-websocket-api.html
+# Github: https://github.com/LUCIT-Systems-and-Development/unicorn-bybit-websocket-api
+# Documentation: https://unicorn-bybit-websocket-api.docs.lucit.tech
+# PyPI: https://pypi.org/project/unicorn-bybit-websocket-api
+# LUCIT Online Shop: https://shop.lucit.services/software
+#
+# License: LSOSL - LUCIT Synergetic Open Source License
+# https://github.com/LUCIT-Systems-and-Development/unicorn-bybit-websocket-api/blob/master/LICENSE
+#
+# Author: LUCIT Systems and Development
+#
+# Copyright (c) 2024-2024, LUCIT Systems and Development (https://www.lucit.tech)
+# All rights reserved.
+
+from typing import Optional
+
+import logging
+import time
+import ujson as json
+
+
+__logger__: logging.getLogger = logging.getLogger("unicorn_bybit_websocket_api")
+
+logger = __logger__
+
+
+class BybitWebSocketApiControlMessage(object):
+    """
+    A control message of a Bybit endpoint, e.g. the response to `subscribe`, `unsubscribe`, `auth` or `ping`.
+
+    Every received frame without a `topic` is a control message, frames with a `topic` are data.
+
+    :param stream_id: id of the stream which received the message
+    :type stream_id: str
+    :param message: The decoded message
+    :type message: dict
+    """
+    __slots__ = ('stream_id', 'op', 'success', 'ret_msg', 'conn_id', 'req_id', 'message', 'received_at',
+                 'round_trip_time')
+
+    def __init__(self, stream_id: str = None, message: dict = None):
+        self.stream_id: Optional[str] = stream_id
+        self.message: dict = message
+        self.op: Optional[str] = message.get('op')
+        self.success: Optional[bool] = message.get('success')
+        if self.success is None and 'retCode' in message:
+            self.success = message['retCode'] == 0
+        self.ret_msg: Optional[str] = message.get('ret_msg', message.get('retMsg'))
+        self.conn_id: Optional[str] = message.get('conn_id')
+        self.req_id: Optional[str] = message.get('req_id', message.get('reqId'))
+        self.received_at: float = time.time()
+        self.round_trip_time: Optional[float] = None
+
+    def __repr__(self):
+        return f"BybitWebSocketApiControlMessage(stream_id={self.stream_id!r}, op={self.op!r}, " \
+               f"success={self.success!r}, ret_msg={self.ret_msg!r}, req_id={self.req_id!r})"
+
+    def __str__(self):
+        return json.dumps(self.message)
+
+    def is_error(self) -> bool:
+        """
+        Is this message reporting an error?
+
+        :return: bool
+        """
+        return self.success is False
+
+
+def decode_control_message(raw_data: str = None, stream_id: str = None) -> BybitWebSocketApiControlMessage:
+    """
+    Decode a received frame without `topic` into a `BybitWebSocketApiControlMessage`.
+
+    :param raw_data: The received frame as string.
+    :type raw_data: str
+    :param stream_id: id of the stream which received the frame
+    :type stream_id: str
+    :return: BybitWebSocketApiControlMessage
+    """
+    message = json.loads(raw_data)
+    if type(message) is not dict:
+        message = {'data': message}
+    return BybitWebSocketApiControlMessage(stream_id=stream_id, message=message)
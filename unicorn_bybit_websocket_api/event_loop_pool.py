@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# ¯\_(ツ)_/¯
+#
+# File: unicorn_bybit_websocket_api/event_loop_pool.py
+#
+# Part of ‘UNICORN Bybit WebSocket API’
+# Project website: https://www.lucit.tech/unicorn-bybit-websocket-api.html
+# Github: https://github.com/LUCIT-Systems-and-Development/unicorn-bybit-websocket-api
+# Documentation: https://unicorn-bybit-websocket-api.docs.lucit.tech
+# PyPI: https://pypi.org/project/unicorn-bybit-websocket-api
+# LUCIT Online Shop: https://shop.lucit.services/software
+#
+# License: LSOSL - LUCIT Synergetic Open Source License
+# https://github.com/LUCIT-Systems-and-Development/unicorn-bybit-websocket-api/blob/master/LICENSE
+#
+# Author: LUCIT Systems and Development
+#
+# Copyright (c) 2024-2024, LUCIT Systems and Development (https://www.lucit.tech)
+# All rights reserved.
+
+from concurrent.futures import Future
+from typing import Dict, List, Optional
+
+import asyncio
+import logging
+import threading
+import time
+
+
+__logger__: logging.getLogger = logging.getLogger("unicorn_bybit_websocket_api")
+
+logger = __logger__
+
+
+class BybitWebSocketApiEventLoopPool(object):
+    """
+    A fixed number of threads, each running one asyncio event loop forever, which are shared by many streams.
+
+    New streams get assigned to the loop with the fewest streams, loops with the same load are used round-robin.
+
+    :param size: Number of event loop threads.
+    :type size: int
+    :param debug: Enable the debug mode of the event loops.
+    :type debug: bool
+    """
+    def __init__(self, size: int = 1, debug: bool = False):
+        if size is None or int(size) < 1:
+            raise ValueError(f"Parameter `size` of `BybitWebSocketApiEventLoopPool()` must be 1 or higher, "
+                             f"received: {size}")
+        self.size: int = int(size)
+        self.debug: bool = debug
+        self.futures: Dict[str, List[Future]] = {}
+        self.load: List[int] = [0] * self.size
+        self.lock = threading.Lock()
+        self.loops: List[asyncio.AbstractEventLoop] = []
+        self.next_index: int = 0
+        self.stop_request: bool = False
+        self.stream_index: Dict[str, int] = {}
+        self.threads: List[threading.Thread] = []
+        for index in range(0, self.size):
+            loop = asyncio.new_event_loop()
+            if self.debug is True:
+                loop.set_debug(enabled=True)
+            thread = threading.Thread(target=self._run_loop,
+                                      args=(index, loop),
+                                      name=f"BybitWebSocketApiEventLoopPool: index={index}, time={time.time()}")
+            self.loops.append(loop)
+            self.threads.append(thread)
+            thread.start()
+        logger.info(f"BybitWebSocketApiEventLoopPool() - Started {self.size} event loop threads.")
+
+    def _run_loop(self, index: int, loop: asyncio.AbstractEventLoop) -> None:
+        """
+        Target of the pool threads: Run the loop till `stop()` and close it afterwards.
+
+        :param index: Index of the loop in the pool.
+        :type index: int
+        :param loop: The event loop to run.
+        :type loop: asyncio.AbstractEventLoop
+        :return: None
+        """
+        asyncio.set_event_loop(loop)
+        try:
+            loop.run_forever()
+        finally:
+            logger.debug(f"BybitWebSocketApiEventLoopPool._run_loop({index}) - Finally closing the loop!")
+            try:
+                tasks = asyncio.all_tasks(loop)
+                for task in tasks:
+                    task.cancel()
+                if tasks:
+                    loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+                loop.run_until_complete(loop.shutdown_asyncgens())
+            except RuntimeError as error_msg:
+                logger.debug(f"BybitWebSocketApiEventLoopPool._run_loop({index}) - RuntimeError - {error_msg}")
+            finally:
+                loop.close()
+
+    def add_future(self, stream_id: str = None, future: Future = None) -> bool:
+        """
+        Register a future of a coroutine which belongs to a stream. It gets cancelled with `release()`.
+
+        :param stream_id: id of a stream
+        :type stream_id: str
+        :param future: The future returned by `asyncio.run_coroutine_threadsafe()`.
+        :type future: concurrent.futures.Future
+        :return: bool
+        """
+        with self.lock:
+            if stream_id not in self.stream_index:
+                return False
+            self.futures[stream_id].append(future)
+        return True
+
+    def assign(self, stream_id: str = None) -> asyncio.AbstractEventLoop:
+        """
+        Assign a stream to the loop with the lowest load.
+
+        :param stream_id: id of a stream
+        :type stream_id: str
+        :return: asyncio.AbstractEventLoop
+        """
+        with self.lock:
+            if stream_id in self.stream_index:
+                return self.loops[self.stream_index[stream_id]]
+            index = min(range(0, self.size), key=lambda i: (self.load[i], (i - self.next_index) % self.size))
+            self.next_index = (index + 1) % self.size
+            self.load[index] += 1
+            self.stream_index[stream_id] = index
+            self.futures[stream_id] = []
+        logger.debug(f"BybitWebSocketApiEventLoopPool.assign({stream_id}) - Assigned to loop {index}.")
+        return self.loops[index]
+
+    def get_load(self) -> List[int]:
+        """
+        Get the number of assigned streams per loop.
+
+        :return: list
+        """
+        with self.lock:
+            return list(self.load)
+
+    def get_loop(self, stream_id: str = None) -> Optional[asyncio.AbstractEventLoop]:
+        """
+        Get the loop of a stream.
+
+        :param stream_id: id of a stream
+        :type stream_id: str
+        :return: asyncio.AbstractEventLoop or None
+        """
+        try:
+            return self.loops[self.stream_index[stream_id]]
+        except KeyError:
+            return None
+
+    def release(self, stream_id: str = None) -> bool:
+        """
+        Remove a stream from its loop and cancel its registered futures.
+
+        :param stream_id: id of a stream
+        :type stream_id: str
+        :return: bool
+        """
+        with self.lock:
+            try:
+                index = self.stream_index.pop(stream_id)
+            except KeyError:
+                return False
+            self.load[index] -= 1
+            futures = self.futures.pop(stream_id, [])
+        for future in futures:
+            future.cancel()
+        logger.debug(f"BybitWebSocketApiEventLoopPool.release({stream_id}) - Released from loop {index}.")
+        return True
+
+    def stop(self, timeout: float = 10.0) -> bool:
+        """
+        Stop all loops and wait for their threads.
+
+        Streams which are still assigned get up to `timeout` seconds to finish, remaining tasks get cancelled.
+
+        :param timeout: Seconds to wait for the assigned streams.
+        :type timeout: float
+        :return: bool
+        """
+        if self.stop_request is True:
+            return False
+        self.stop_request = True
+        logger.info(f"BybitWebSocketApiEventLoopPool.stop() - Stopping {self.size} event loop threads ...")
+        stop_time = time.time() + timeout
+        while sum(self.get_load()) > 0 and time.time() < stop_time:
+            time.sleep(0.1)
+        for loop in self.loops:
+            try:
+                loop.call_soon_threadsafe(loop.stop)
+            except RuntimeError as error_msg:
+                logger.debug(f"BybitWebSocketApiEventLoopPool.stop() - RuntimeError - {error_msg}")
+        for thread in self.threads:
+            if thread is not threading.current_thread():
+                thread.join(timeout=timeout)
+        return True
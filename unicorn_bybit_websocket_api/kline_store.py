@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# ¯\_(ツ)_/¯
+#
+# File: unicorn_bybit_websocket_api/kline_store.py
+#
+# Part of ‘UNICORN Bybit WebSocket API’
+# Project website: https://www.lucit.tech/unicorn-bybit-websocket-api.html
+# Github: https://github.com/LUCIT-Systems-and-Development/unicorn-bybit-websocket-api
+# Documentation: https://unicorn-bybit-websocket-api.docs.lucit.tech
+# PyPI: https://pypi.org/project/unicorn-bybit-websocket-api
+# LUCIT Online Shop: https://shop.lucit.services/software
+#
+# License: LSOSL - LUCIT Synergetic Open Source License
+# https://github.com/LUCIT-Systems-and-Development/unicorn-bybit-websocket-api/blob/master/LICENSE
+#
+# Author: LUCIT Systems and Development
+#
+# Copyright (c) 2024-2024, LUCIT Systems and Development (https://www.lucit.tech)
+# All rights reserved.
+
+
+from .topic_engines import BybitWebSocketApiTopicEngines
+from typing import Callable, Dict, Optional, Tuple
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+import logging
+import threading
+
+
+__logger__: logging.getLogger = logging.getLogger("unicorn_bybit_websocket_api")
+
+logger = __logger__
+
+KLINE_COLUMNS = ('start', 'open', 'high', 'low', 'close', 'volume', 'turnover')
+KLINE_STORE_MAXLEN = 1000
+
+
+class BybitWebSocketApiKlineStore(object):
+    """
+    The last `maxlen` candles of a `kline.{interval}.{symbol}` topic in a preallocated NumPy ring buffer.
+
+    The candles are kept in one `float64` array with a row per candle and the columns of `KLINE_COLUMNS`. An update
+    of the open candle overwrites its row in place, a candle with a new `start` gets written to the next row and
+    overwrites the oldest candle as soon as the buffer is full. Updates of older candles are ignored. The read methods
+    return copies in chronological order, so the arrays can be used without holding a lock.
+
+    :param interval: The interval of the topic, e.g. `1`, `60` or `D`
+    :type interval: str
+    :param symbol: The symbol, e.g. `BTCUSDT`
+    :type symbol: str
+    :param maxlen: Number of candles to keep.
+    :type maxlen: int
+    """
+    __slots__ = ('interval', 'symbol', 'maxlen', 'candles', 'position', 'length', 'is_confirmed', 'lock')
+
+    def __init__(self, interval: str = None, symbol: str = None, maxlen: int = KLINE_STORE_MAXLEN):
+        if numpy is None:
+            raise ImportError("The kline store requires NumPy, please install it with "
+                              "`pip install unicorn-bybit-websocket-api[kline_store]`!")
+        if maxlen < 1:
+            raise ValueError(f"Parameter `maxlen` must be greater than 0, received: {maxlen}")
+        self.interval: str = interval
+        self.symbol: str = symbol
+        self.maxlen: int = maxlen
+        self.candles = numpy.zeros((maxlen, len(KLINE_COLUMNS)), dtype=numpy.float64)
+        # the row of the latest candle and the number of stored candles
+        self.position: int = -1
+        self.length: int = 0
+        self.is_confirmed: bool = False
+        self.lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __repr__(self):
+        return f"BybitWebSocketApiKlineStore(interval={self.interval!r}, symbol={self.symbol!r}, " \
+               f"candles={self.length}, maxlen={self.maxlen})"
+
+    def _get_rows(self, limit: Optional[int] = None, include_open: bool = True):
+        """
+        Get the rows of the latest candles in chronological order. Must be called with `self.lock`.
+        """
+        length = self.length
+        end = self.position + 1
+        if include_open is False and self.is_confirmed is False and length > 0:
+            length -= 1
+            end -= 1
+        if limit is not None:
+            length = min(max(limit, 0), length)
+        return numpy.arange(end - length, end) % self.maxlen
+
+    def get(self, limit: Optional[int] = None, include_open: bool = True) -> Dict[str, "numpy.ndarray"]:
+        """
+        Get the latest candles as one array per column.
+
+        :param limit: Number of candles, `None` for all.
+        :type limit: int
+        :param include_open: Set to `False` to get only confirmed candles.
+        :type include_open: bool
+        :return: dict - `{'start': array, 'open': array, 'high': ..., 'low', 'close', 'volume', 'turnover'}`
+        """
+        candles = self.get_array(limit=limit, include_open=include_open)
+        return {column: candles[:, index] for index, column in enumerate(KLINE_COLUMNS)}
+
+    def get_array(self, limit: Optional[int] = None, include_open: bool = True) -> "numpy.ndarray":
+        """
+        Get the latest candles as an array with a row per candle and the columns of `KLINE_COLUMNS`.
+
+        :param limit: Number of candles, `None` for all.
+        :type limit: int
+        :param include_open: Set to `False` to get only confirmed candles.
+        :type include_open: bool
+        :return: numpy.ndarray
+        """
+        with self.lock:
+            return self.candles[self._get_rows(limit=limit, include_open=include_open)]
+
+    def get_column(self, column: str = "close", limit: Optional[int] = None, include_open: bool = True):
+        """
+        Get a single column of the latest candles, e.g. the close prices.
+
+        :param column: One of `KLINE_COLUMNS`
+        :type column: str
+        :param limit: Number of candles, `None` for all.
+        :type limit: int
+        :param include_open: Set to `False` to get only confirmed candles.
+        :type include_open: bool
+        :return: numpy.ndarray
+        """
+        index = KLINE_COLUMNS.index(column)
+        with self.lock:
+            return self.candles[self._get_rows(limit=limit, include_open=include_open), index]
+
+    def update(self, candle: dict = None) -> bool:
+        """
+        Apply a candle of a received `kline` message.
+
+        :param candle: A candle of the `data` list.
+        :type candle: dict
+        :return: bool - `False` if the candle is older than the latest candle and was ignored
+        """
+        start = int(candle['start'])
+        row = (start, float(candle['open']), float(candle['high']), float(candle['low']), float(candle['close']),
+               float(candle['volume']), float(candle['turnover']))
+        with self.lock:
+            if self.length == 0 or start > self.candles[self.position, 0]:
+                self.position = (self.position + 1) % self.maxlen
+                self.length = min(self.length + 1, self.maxlen)
+            elif start < self.candles[self.position, 0]:
+                return False
+            self.candles[self.position] = row
+            self.is_confirmed = bool(candle.get('confirm', False))
+        return True
+
+
+class BybitWebSocketApiKlineStores(BybitWebSocketApiTopicEngines):
+    """
+    The kline stores of the `kline.*` topics of a stream, one per `(interval, symbol)`.
+
+    :param maxlen: Number of candles to keep per store.
+    :type maxlen: int
+    :param is_subscribed: Function which gets called with the topic before a store gets created, see
+                          `BybitWebSocketApiTopicEngines`.
+    :type is_subscribed: function
+    """
+    prefix = "kline."
+
+    def __init__(self, maxlen: Optional[int] = None, is_subscribed: Optional[Callable] = None):
+        if numpy is None:
+            raise ImportError("The kline store requires NumPy, please install it with "
+                              "`pip install unicorn-bybit-websocket-api[kline_store]`!")
+        super().__init__(is_subscribed=is_subscribed)
+        self.maxlen: int = maxlen or KLINE_STORE_MAXLEN
+
+    def _apply(self, topic: str = None, engine: BybitWebSocketApiKlineStore = None, message: dict = None) -> bool:
+        result = False
+        for candle in message['data']:
+            result = engine.update(candle) or result
+        return result
+
+    def _create(self, topic: str = None, key: Tuple[str, str] = None, message: dict = None) -> \
+            BybitWebSocketApiKlineStore:
+        interval, symbol = key
+        return BybitWebSocketApiKlineStore(interval=interval, symbol=symbol, maxlen=self.maxlen)
+
+    @staticmethod
+    def _get_key(topic: str = None) -> Tuple[str, str]:
+        _, interval, symbol = topic.split(".", 2)
+        return interval, symbol
+
+    def get(self, interval: str = None, symbol: str = None) -> Optional[BybitWebSocketApiKlineStore]:
+        """
+        Get the store of an interval and symbol.
+
+        :param interval: The interval, e.g. `1`
+        :type interval: str
+        :param symbol: The symbol, e.g. `BTCUSDT`
+        :type symbol: str
+        :return: BybitWebSocketApiKlineStore or None
+        """
+        return self.engines.get((str(interval), symbol))
@@ -20,14 +20,28 @@
 # All rights reserved.
 
 from .licensing_manager import LucitLicensingManager, NoValidatedLucitLicense
+from .asyncio_queue import BybitWebSocketApiAsyncioQueue, OVERFLOW_POLICIES
+from .conflation_buffer import BybitWebSocketApiConflationBuffer
 from .connection_settings import CONNECTION_SETTINGS
+from .control_messages import BybitWebSocketApiControlMessage
+from .event_loop_pool import BybitWebSocketApiEventLoopPool
 from .exceptions import *
+from .kline_store import BybitWebSocketApiKlineStore, BybitWebSocketApiKlineStores
+from .order_book import BybitWebSocketApiLocalOrderBook, BybitWebSocketApiLocalOrderBooks
+from .process_pool import BybitWebSocketApiProcessPool
+from .request_index import BybitWebSocketApiRequestIndex
 from .restclient import BybitWebSocketApiRestclient
 from .sockets import BybitWebSocketApiSocket
+from .stream_statistics import BybitWebSocketApiStreamStatistics
+from .subscription_index import BybitWebSocketApiSubscriptionIndex, get_rejected_topics, TOPIC_ACTIVE, \
+    TOPIC_PENDING, TOPIC_REJECTED
+from .ticker_cache import BybitWebSocketApiTickerCache
+from .topic_router import BybitWebSocketApiTopicRouter
+from .trade_tape import BybitWebSocketApiTradeTape, BybitWebSocketApiTradeTapes
 from collections import deque
 from datetime import datetime, timezone
 from operator import itemgetter
-from typing import Optional, Union, Callable, List, Set
+from typing import Optional, Union, Callable, Dict, List, Set, Tuple
 try:
     # python <=3.7 support
     from typing import Literal
@@ -107,8 +121,10 @@ class BybitWebSocketApiManager(threading.Thread):
     :type show_secrets_in_logs: bool
     :param output_default: set to "dict" to convert the received raw data to a python dict
                            - otherwise with the default setting "raw_data" the output remains unchanged and gets
-                           delivered as received from the endpoints. Change this for a specific stream with the `output`
-                           parameter of `create_stream()` and `replace_stream()`
+                           delivered as received from the endpoints. Set it to "typed" to decode the topics
+                           `kline.*`, `publicTrade.*`, `orderbook.*`, `tickers.*` and `liquidation.*` into
+                           `BybitWebSocketApiTypedMessage` objects with converted numeric fields. Change this for a
+                           specific stream with the `output` parameter of `create_stream()` and `replace_stream()`
     :type output_default: str
     :param enable_stream_signal_buffer: set to True to enable the
                                         `stream_signal_buffer <https://github.com/LUCIT-Systems-and-Development/unicorn-bybit-websocket-api/wiki/%60stream_signal_buffer%60>`__
@@ -152,6 +168,44 @@ class BybitWebSocketApiManager(threading.Thread):
     :type ping_timeout_default: int
     :param high_performance: Set to True makes `create_stream()` a non-blocking function
     :type high_performance:  bool
+    :param event_loop_pool_size: Run the streams on a fixed number of shared event loop threads instead of starting a
+                                 new thread with its own event loop for each stream. New streams are assigned to the
+                                 loop with the fewest streams. Example: `os.cpu_count()`. Default is `None` (one
+                                 thread per stream).
+    :type event_loop_pool_size:  int or None
+    :param process_pool_size: Run the streams within a fixed number of worker processes to use more than one CPU core.
+                              Each worker process runs its own `BybitWebSocketApiManager` with a shard of the streams,
+                              decodes the received data and sends it in batches to this instance. The data is
+                              delivered to the `stream_buffer` or the `process_stream_data` callbacks, `asyncio`
+                              callbacks are not supported in this mode. The worker processes get started with the
+                              `spawn` method and validate the LUCIT license on their own. Default is `None` (no worker
+                              processes).
+    :type process_pool_size:  int or None
+    :param process_stream_data_batch: Provide a function/method to process the received webstream data in batches
+                                      (callback). After receiving a record, all records which are already received by
+                                      the websocket get drained (see `stream_data_batch_max_size` and
+                                      `stream_data_batch_max_time_us`) and are delivered with one call like
+                                      `process_stream_data_batch(list_of_stream_data)`. The function will be called
+                                      instead of `add_to_stream_buffer()`.
+    :type process_stream_data_batch: Optional[Callable]
+    :param process_stream_data_batch_async: Provide an asyncio function/method to process the received webstream data
+                                            in batches (callback), like `process_stream_data_batch`.
+    :type process_stream_data_batch_async: Optional[Callable]
+    :param stream_data_batch_max_size: Max number of records per batch of `process_stream_data_batch`. Default is 1000.
+    :type stream_data_batch_max_size: int
+    :param stream_data_batch_max_time_us: Max time in microseconds to drain the websocket for a batch of
+                                          `process_stream_data_batch`. Default is 1000.
+    :type stream_data_batch_max_time_us: int
+    :param asyncio_queue_maxsize: Max number of records in the `asyncio_queue` of a stream, `0` is unlimited. Default
+                                  is 10000.
+    :type asyncio_queue_maxsize: int
+    :param asyncio_queue_overflow_policy: What happens if the `asyncio_queue` of a stream is full: "block" pauses the
+                                          receiving of the stream until the consumer catches up, "drop_oldest" drops
+                                          the oldest queued record, "drop_newest" drops the new record and
+                                          "coalesce_by_topic" replaces the queued record with the same topic by the
+                                          new one. The dropped and coalesced records and the high-water mark of the
+                                          queue are shown by `get_stream_info()`. Default is "block".
+    :type asyncio_queue_overflow_policy: str
     :param debug: If True the lib adds additional information to logging outputs
     :type debug:  bool
     :param restful_base_uri: Override `restful_base_uri`. Example: `https://127.0.0.1`
@@ -189,7 +243,7 @@ class BybitWebSocketApiManager(threading.Thread):
                  warn_on_update: bool = True,
                  restart_timeout: int = 6,
                  show_secrets_in_logs: bool = False,
-                 output_default: Optional[Literal['dict', 'raw_data']] = "raw_data",
+                 output_default: Optional[Literal['dict', 'raw_data', 'typed']] = "raw_data",
                  enable_stream_signal_buffer: bool = False,
                  disable_colorama: bool = False,
                  stream_buffer_maxlen: Optional[int] = None,
@@ -210,11 +264,29 @@ class BybitWebSocketApiManager(threading.Thread):
                  socks5_proxy_pass: str = None,
                  socks5_proxy_ssl_verification: bool = True,
                  auto_data_cleanup_stopped_streams: bool = False,
+                 event_loop_pool_size: Optional[int] = None,
+                 process_pool_size: Optional[int] = None,
+                 process_stream_data_batch: Optional[Callable] = None,
+                 process_stream_data_batch_async: Optional[Callable] = None,
+                 stream_data_batch_max_size: int = 1000,
+                 stream_data_batch_max_time_us: int = 1000,
+                 asyncio_queue_maxsize: int = 10000,
+                 asyncio_queue_overflow_policy: Literal['block', 'drop_oldest', 'drop_newest',
+                                                        'coalesce_by_topic'] = "block",
                  lucit_api_secret: str = None,
                  lucit_license_ini: str = None,
                  lucit_license_profile: str = None,
                  lucit_license_token: str = None):
         threading.Thread.__init__(self)
+        if process_pool_size and (process_asyncio_queue is not None
+                                  or process_stream_data_async is not None
+                                  or process_stream_data_batch_async is not None):
+            raise ValueError("The parameters `process_asyncio_queue`, `process_stream_data_async` and "
+                             "`process_stream_data_batch_async` can not be used in combination with "
+                             "`process_pool_size`!")
+        if asyncio_queue_overflow_policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Parameter `asyncio_queue_overflow_policy` must be one of {OVERFLOW_POLICIES}, "
+                             f"received: {asyncio_queue_overflow_policy}")
         self.name = __app_name__
         self.version = __version__
         self.stop_manager_request = False
@@ -248,9 +320,17 @@ class BybitWebSocketApiManager(threading.Thread):
         self.specific_process_asyncio_queue = {}
         self.specific_process_stream_data = {}
         self.specific_process_stream_data_async = {}
+        self.specific_process_stream_data_batch = {}
+        self.specific_process_stream_data_batch_async = {}
         self.process_asyncio_queue: Optional[Callable] = None
         self.process_stream_data: Optional[Callable] = None
         self.process_stream_data_async: Optional[Callable] = None
+        self.process_stream_data_batch: Optional[Callable] = None
+        self.process_stream_data_batch_async: Optional[Callable] = None
+        self.stream_data_batch_max_size: int = stream_data_batch_max_size
+        self.stream_data_batch_max_time_us: int = stream_data_batch_max_time_us
+        self.asyncio_queue_maxsize: int = asyncio_queue_maxsize
+        self.asyncio_queue_overflow_policy: str = asyncio_queue_overflow_policy
         if process_asyncio_queue is not None:
             logger.info(f"Using `asyncio_queue` ...")
             self.process_asyncio_queue: Optional[Callable] = process_asyncio_queue
@@ -260,6 +340,12 @@ class BybitWebSocketApiManager(threading.Thread):
         elif process_stream_data_async is not None:
             logger.info(f"Using `process_stream_data_async` ...")
             self.process_stream_data_async: Optional[Callable] = process_stream_data_async
+        elif process_stream_data_batch is not None:
+            logger.info(f"Using `process_stream_data_batch` ...")
+            self.process_stream_data_batch: Optional[Callable] = process_stream_data_batch
+        elif process_stream_data_batch_async is not None:
+            logger.info(f"Using `process_stream_data_batch_async` ...")
+            self.process_stream_data_batch_async: Optional[Callable] = process_stream_data_batch_async
         else:
             logger.info(f"Using `stream_buffer` ...")
         if process_stream_signals is None:
@@ -313,11 +399,23 @@ class BybitWebSocketApiManager(threading.Thread):
             self.websocket_ssl_context = websocket_ssl_context
 
         self.asyncio_queue = {}
+        self.conflation_buffers = {}
+        self.order_books = {}
+        self.kline_stores = {}
+        self.trade_tapes = {}
+        self.ticker_caches = {}
+        self.topic_engines = {}
         self.all_subscriptions_number = 0
         self.bybit_api_status = {'weight': None,
                                  'timestamp': 0,
                                  'status_code': None}
         self.event_loops = {}
+        if event_loop_pool_size:
+            self.event_loop_pool: Optional[BybitWebSocketApiEventLoopPool] = \
+                BybitWebSocketApiEventLoopPool(size=event_loop_pool_size, debug=self.debug)
+            logger.info(f"Using `event_loop_pool` with {event_loop_pool_size} event loop threads ...")
+        else:
+            self.event_loop_pool: Optional[BybitWebSocketApiEventLoopPool] = None
         self.frequent_checks_list = {}
         self.frequent_checks_list_lock = threading.Lock()
         self.receiving_speed_average = 0
@@ -331,13 +429,14 @@ class BybitWebSocketApiManager(threading.Thread):
         self.last_update_check_github = {'timestamp': time.time(), 'status': {'tag_name': None}}
         self.last_update_check_github_check_command = {'timestamp': time.time(), 'status': {'tag_name': None}}
         self.listen_key_refresh_interval = 15*60
-        self.max_send_messages_per_second = 5
+        self.max_send_messages_burst = 10
+        self.max_send_messages_per_second = 10
         self.max_send_messages_per_second_reserve = 2
         self.most_receives_per_second = 0
         self.monitoring_api_server = None
         self.monitoring_total_received_bytes = 0
         self.monitoring_total_receives = 0
-        self.output_default: Optional[Literal['dict', 'raw_data']] = output_default
+        self.output_default: Optional[Literal['dict', 'raw_data', 'typed']] = output_default
         self.process_response = {}
         self.process_response_lock = threading.Lock()
         self.reconnects = 0
@@ -347,22 +446,27 @@ class BybitWebSocketApiManager(threading.Thread):
         self.restart_timeout = restart_timeout
         self.return_response = {}
         self.return_response_lock = threading.Lock()
-        self.ringbuffer_error = []
         self.ringbuffer_error_max_size = 500
-        self.ringbuffer_result = []
+        self.ringbuffer_error = deque(maxlen=self.ringbuffer_error_max_size)
         self.ringbuffer_result_max_size = 500
+        self.ringbuffer_result = deque(maxlen=self.ringbuffer_result_max_size)
+        self.request_index = BybitWebSocketApiRequestIndex(max_size=self.ringbuffer_result_max_size)
         self.show_secrets_in_logs = show_secrets_in_logs
         self.start_time = time.time()
         self.stream_buffer_maxlen = stream_buffer_maxlen
         self.stream_buffer = deque(maxlen=self.stream_buffer_maxlen)
-        self.stream_buffer_lock = threading.Lock()
+        self.stream_buffer_lock = threading.Condition()
         self.stream_buffer_locks = {}
         self.stream_buffers = {}
+        self.stream_shards = {}
         self.stream_signal_buffer = deque()
+        self.subscription_index = BybitWebSocketApiSubscriptionIndex()
         self.stream_signal_buffer_lock = threading.Lock()
         self.socket_is_ready = {}
         self.sockets = {}
+        self.stream_statistics = {}
         self.stream_threads = {}
+        self.topic_router = BybitWebSocketApiTopicRouter()
         self.total_received_bytes = 0
         self.total_received_bytes_lock = threading.Lock()
         self.total_receives = 0
@@ -392,6 +496,40 @@ class BybitWebSocketApiManager(threading.Thread):
                                                       socks5_proxy_pass=self.socks5_proxy_pass,
                                                       stream_list=self.stream_list,
                                                       warn_on_update=self.warn_on_update)
+        if process_pool_size:
+            process_pool_manager_kwargs = {'exchange': exchange,
+                                           'warn_on_update': False,
+                                           'restart_timeout': restart_timeout,
+                                           'show_secrets_in_logs': show_secrets_in_logs,
+                                           'output_default': output_default,
+                                           'disable_colorama': True,
+                                           'close_timeout_default': close_timeout_default,
+                                           'ping_interval_default': ping_interval_default,
+                                           'ping_timeout_default': ping_timeout_default,
+                                           'high_performance': True,
+                                           'debug': debug,
+                                           'restful_base_uri': restful_base_uri,
+                                           'websocket_base_uri': websocket_base_uri,
+                                           'max_subscriptions_per_stream_spot': max_subscriptions_per_stream_spot,
+                                           'max_subscriptions_per_stream_linear': max_subscriptions_per_stream_linear,
+                                           'max_subscriptions_per_stream_inverse': max_subscriptions_per_stream_inverse,
+                                           'max_subscriptions_per_stream_option': max_subscriptions_per_stream_option,
+                                           'socks5_proxy_server': socks5_proxy_server,
+                                           'socks5_proxy_user': socks5_proxy_user,
+                                           'socks5_proxy_pass': socks5_proxy_pass,
+                                           'socks5_proxy_ssl_verification': socks5_proxy_ssl_verification,
+                                           'event_loop_pool_size': event_loop_pool_size,
+                                           'lucit_api_secret': lucit_api_secret,
+                                           'lucit_license_ini': lucit_license_ini,
+                                           'lucit_license_profile': lucit_license_profile,
+                                           'lucit_license_token': lucit_license_token}
+            self.process_pool: Optional[BybitWebSocketApiProcessPool] = \
+                BybitWebSocketApiProcessPool(manager=self,
+                                             size=process_pool_size,
+                                             manager_kwargs=process_pool_manager_kwargs)
+            logger.info(f"Using `process_pool` with {process_pool_size} worker processes ...")
+        else:
+            self.process_pool: Optional[BybitWebSocketApiProcessPool] = None
         self.start()
 
     def __enter__(self):
@@ -590,6 +728,161 @@ class BybitWebSocketApiManager(threading.Thread):
             logger.debug(f"BybitWebSocketApiManager.send_stream_signal() - Leaving `stream_list_lock`!")
         return True
 
+    def _add_req_id(self, stream_id: str = None, payload: dict = None) -> Tuple[dict, str]:
+        """
+        Get a copy of the payload with a unique `req_id`, if it has none. The `trade` endpoint uses `reqId`.
+
+        :param stream_id: id of the stream to be used for sending.
+        :type stream_id: str
+        :param payload: The request.
+        :type payload: dict
+        :return: tuple - (payload, req_id)
+        """
+        payload = dict(payload)
+        req_id = payload.get('req_id', payload.get('reqId'))
+        if req_id is None:
+            req_id = str(self.get_request_id())
+            if self.stream_list[stream_id]['endpoint'] == "trade":
+                payload['reqId'] = req_id
+            else:
+                payload['req_id'] = req_id
+        return payload, str(req_id)
+
+    def _wait_till_socket_is_ready(self, stream_id: str = None, timeout: float = 5.0) -> bool:
+        """
+        Wait till the socket of a stream is ready to send.
+
+        :param stream_id: id of the stream
+        :type stream_id: str
+        :param timeout: Timeout to wait for a ready stream.
+        :type timeout: float
+        :return: bool
+        """
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+        if running_loop is self.get_event_loop_by_stream_id(stream_id=stream_id) \
+                and self.is_socket_ready(stream_id=stream_id) is False:
+            # Waiting within the loop of the stream would block the loop and all streams sharing it
+            logger.debug(f"BybitWebSocketApiManager._wait_till_socket_is_ready({stream_id} - Socket is not ready and "
+                         f"we are running within its loop, not waiting!")
+            return False
+        timeout_time = time.time() + timeout
+        while self.is_socket_ready(stream_id=stream_id) is False:
+            if self.is_stop_request(stream_id=stream_id) is True \
+                    or self.is_crash_request(stream_id=stream_id) is True \
+                    or self.stream_list[stream_id]['status'].startswith("crashed") is True:
+                logger.error(f"BybitWebSocketApiManager._wait_till_socket_is_ready({stream_id} - Socket is stopping!")
+                return False
+            if time.time() > timeout_time:
+                logger.error(f"BybitWebSocketApiManager._wait_till_socket_is_ready({stream_id} - Timeout exceeded!")
+                return False
+            time.sleep(0.05)
+        return True
+
+    def send_and_wait(self,
+                      stream_id: str = None,
+                      payload: dict = None,
+                      timeout: float = 10.0) -> Optional[BybitWebSocketApiControlMessage]:
+        """
+        Send a request with a specific stream and wait for the response of the endpoint.
+
+        If the payload has no `req_id` (`reqId` on the `trade` endpoint) a unique one gets added. The round trip time
+        is set as `round_trip_time` of the response and collected by `get_request_round_trip_times()`.
+
+        This method blocks till the response arrives and must not be called within the event loop of the stream, e.g.
+        in a `process_stream_data` callback, because the loop is needed to send the request and to receive the
+        response. Use `await send_and_wait_async()` there.
+
+        :param stream_id: id of the stream to be used for sending.
+        :type stream_id: str
+        :param payload: The request, e.g. `{"op": "ping"}`
+        :type payload: dict
+        :param timeout: Max seconds to wait for a ready stream and for the response.
+        :type timeout: float
+
+        :return: `BybitWebSocketApiControlMessage` or None
+        """
+        if self.process_pool is not None:
+            logger.error(f"BybitWebSocketApiManager.send_and_wait({stream_id}) - Not supported in combination with "
+                         f"`process_pool_size`!")
+            return None
+        try:
+            payload, req_id = self._add_req_id(stream_id=stream_id, payload=payload)
+        except KeyError:
+            logger.error(f"BybitWebSocketApiManager.send_and_wait({stream_id}) - Unknown stream_id!")
+            return None
+        loop = self.get_event_loop_by_stream_id(stream_id=stream_id)
+        if loop is None:
+            return None
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+        if running_loop is loop:
+            logger.error(f"BybitWebSocketApiManager.send_and_wait({stream_id}) - Can not wait for the response within "
+                         f"the event loop of the stream, use `await send_and_wait_async()`!")
+            return None
+        if self._wait_till_socket_is_ready(stream_id=stream_id, timeout=timeout) is False:
+            return None
+        try:
+            loop.call_soon_threadsafe(self.sockets[stream_id].send_request, payload)
+        except (AttributeError, KeyError, RuntimeError) as error_msg:
+            logger.error(f"BybitWebSocketApiManager.send_and_wait({stream_id}) - {type(error_msg).__name__}: "
+                         f"{error_msg}")
+            return None
+        logger.debug(f"BybitWebSocketApiManager.send_and_wait({stream_id}) - Sent payload: {payload}")
+        return self.request_index.wait(req_id=req_id, timeout=timeout)
+
+    async def send_and_wait_async(self,
+                                  stream_id: str = None,
+                                  payload: dict = None,
+                                  timeout: float = 10.0) -> Optional[BybitWebSocketApiControlMessage]:
+        """
+        Send a request with a specific stream and await the response of the endpoint, like `send_and_wait()`.
+
+        Can be awaited within the event loop of the stream or any other event loop.
+
+        :param stream_id: id of the stream to be used for sending.
+        :type stream_id: str
+        :param payload: The request, e.g. `{"op": "ping"}`
+        :type payload: dict
+        :param timeout: Max seconds to wait for a ready stream and for the response.
+        :type timeout: float
+
+        :return: `BybitWebSocketApiControlMessage` or None
+        """
+        if self.process_pool is not None:
+            logger.error(f"BybitWebSocketApiManager.send_and_wait_async({stream_id}) - Not supported in combination "
+                         f"with `process_pool_size`!")
+            return None
+        try:
+            payload, req_id = self._add_req_id(stream_id=stream_id, payload=payload)
+        except KeyError:
+            logger.error(f"BybitWebSocketApiManager.send_and_wait_async({stream_id}) - Unknown stream_id!")
+            return None
+        loop = self.get_event_loop_by_stream_id(stream_id=stream_id)
+        if loop is None:
+            return None
+        timeout_time = time.time() + timeout
+        while self.is_socket_ready(stream_id=stream_id) is False:
+            if time.time() > timeout_time or self.is_stop_request(stream_id=stream_id) is True:
+                logger.error(f"BybitWebSocketApiManager.send_and_wait_async({stream_id}) - Socket is not ready!")
+                return None
+            await asyncio.sleep(0.05)
+        try:
+            if loop is asyncio.get_running_loop():
+                self.sockets[stream_id].send_request(payload)
+            else:
+                loop.call_soon_threadsafe(self.sockets[stream_id].send_request, payload)
+        except (AttributeError, KeyError, RuntimeError) as error_msg:
+            logger.error(f"BybitWebSocketApiManager.send_and_wait_async({stream_id}) - {type(error_msg).__name__}: "
+                         f"{error_msg}")
+            return None
+        logger.debug(f"BybitWebSocketApiManager.send_and_wait_async({stream_id}) - Sent payload: {payload}")
+        return await self.request_index.wait_async(req_id=req_id, timeout=max(timeout_time - time.time(), 0.0))
+
     def send_with_stream(self, stream_id: str = None, payload: Union[dict, str] = None, timeout: float = 5.0) -> bool:
         """
         Send a payload with a specific stream.
@@ -603,29 +896,16 @@ class BybitWebSocketApiManager(threading.Thread):
 
         :return: bool
         """
-        if type(payload) is dict:
-            payload = json.dumps(payload,
-                                 ensure_ascii=False)
         if type(timeout) is int:
             timeout = float(timeout)
 
-        if self.get_event_loop_by_stream_id(stream_id=stream_id) is not None:
-            start_time = time.time()
-            timeout_time = start_time + timeout
-            while self.is_socket_ready(stream_id=stream_id) is False:
-                if self.is_stop_request(stream_id=stream_id) is True \
-                        or self.is_crash_request(stream_id=stream_id) is True \
-                        or self.stream_list[stream_id]['status'].startswith("crashed") is True:
-                    logger.error(f"BybitWebSocketApiManager.send_with_stream({stream_id} - Socket is stopping!")
-                    return False
-                if time.time() > timeout_time:
-                    logger.error(f"BybitWebSocketApiManager.send_with_stream({stream_id} - Timeout exceeded!")
-                    return False
-                time.sleep(0.05)
+        loop = self.get_event_loop_by_stream_id(stream_id=stream_id)
+        if loop is not None:
+            if self._wait_till_socket_is_ready(stream_id=stream_id, timeout=timeout) is False:
+                return False
             try:
-                asyncio.run_coroutine_threadsafe(self.sockets[stream_id].websocket.send(payload),
-                                                 self.get_event_loop_by_stream_id(stream_id=stream_id))
-                logger.debug(f"BybitWebSocketApiManager.send_with_stream({stream_id} - Sent payload: {payload}")
+                loop.call_soon_threadsafe(self.sockets[stream_id].send_request, payload)
+                logger.debug(f"BybitWebSocketApiManager.send_with_stream({stream_id} - Queued payload: {payload}")
                 return True
             except KeyError as error_msg:
                 logger.error(f"BybitWebSocketApiManager.send_with_stream({stream_id} - KeyError: {error_msg}")
@@ -633,6 +913,9 @@ class BybitWebSocketApiManager(threading.Thread):
             except AttributeError as error_msg:
                 logger.error(f"BybitWebSocketApiManager.send_with_stream({stream_id} - AttributeError: {error_msg}")
                 return False
+            except RuntimeError as error_msg:
+                logger.error(f"BybitWebSocketApiManager.send_with_stream({stream_id} - RuntimeError: {error_msg}")
+                return False
         else:
             logger.error(f"BybitWebSocketApiManager.send_with_stream({stream_id} - No valid asyncio loop!")
             return False
@@ -646,14 +929,27 @@ class BybitWebSocketApiManager(threading.Thread):
                                    stream_buffer_name: Union[Literal[False], str] = False,
                                    api_key=None,
                                    api_secret=None,
-                                   output: Optional[Literal['dict', 'raw_data']] = None,
+                                   output: Optional[Literal['dict', 'raw_data', 'typed']] = None,
                                    ping_interval=None,
                                    ping_timeout=None,
                                    close_timeout=None,
                                    stream_buffer_maxlen=None,
                                    process_stream_data: Optional[Callable] = None,
                                    process_stream_data_async: Optional[Callable] = None,
-                                   process_asyncio_queue: Optional[Callable] = None):
+                                   process_asyncio_queue: Optional[Callable] = None,
+                                   process_stream_data_batch: Optional[Callable] = None,
+                                   process_stream_data_batch_async: Optional[Callable] = None,
+                                   asyncio_queue_maxsize: Optional[int] = None,
+                                   asyncio_queue_overflow_policy: Optional[str] = None,
+                                   conflate: bool = False,
+                                   conflate_throttle_ms: Optional[int] = None,
+                                   order_book: bool = False,
+                                   kline_store: bool = False,
+                                   kline_store_maxlen: Optional[int] = None,
+                                   trade_tape: bool = False,
+                                   trade_tape_maxlen: Optional[int] = None,
+                                   trade_tape_windows: Optional[List[int]] = None,
+                                   ticker_cache: bool = False):
         """
         Create a list entry for new streams
 
@@ -681,7 +977,7 @@ class BybitWebSocketApiManager(threading.Thread):
                        of BybitWebSocketApiManager`. To overrule the `output_default` value for this specific stream,
                        set `output` to "dict" to convert the received raw data to a python dict -
                        otherwise with the default setting "raw_data" the output remains unchanged and gets delivered as
-                       received from the endpoints
+                       received from the endpoints. Set it to "typed" to receive `BybitWebSocketApiTypedMessage` objects
         :type output: str
         :param ping_interval: Once the connection is open, a `Ping frame` is sent every
                               `ping_interval` seconds. This serves as a keepalive. It helps keeping
@@ -728,14 +1024,90 @@ class BybitWebSocketApiManager(threading.Thread):
                                       processing of the data in the correct receiving sequence.
                                       https://unicorn-bybit-websocket-api.docs.lucit.tech/readme.html#or-await-the-webstream-data-in-an-asyncio-coroutine
         :type process_asyncio_queue: Optional[Callable]
+        :param process_stream_data_batch: Provide a function/method to process the received webstream data in batches
+                                          like `process_stream_data_batch(list_of_stream_data)`.
+        :type process_stream_data_batch: Optional[Callable]
+        :param process_stream_data_batch_async: Provide an asynchronous function/method to process the received
+                                                webstream data in batches.
+        :type process_stream_data_batch_async: Optional[Callable]
+        :param asyncio_queue_maxsize: Max number of records in the `asyncio_queue` of the stream.
+        :type asyncio_queue_maxsize: int or None
+        :param asyncio_queue_overflow_policy: Overflow policy of the `asyncio_queue` of the stream.
+        :type asyncio_queue_overflow_policy: str or None
+        :param conflate: Deliver the records to a `BybitWebSocketApiConflationBuffer` with one slot per topic.
+        :type conflate: bool
+        :param conflate_throttle_ms: Return a topic of the conflation buffer at most once within this number of
+                                     milliseconds.
+        :type conflate_throttle_ms: int or None
+        :param order_book: Keep local order books of the `orderbook.*` topics of the stream.
+        :type order_book: bool
+        :param kline_store: Keep the latest candles of the `kline.*` topics of the stream in NumPy arrays.
+        :type kline_store: bool
+        :param kline_store_maxlen: Number of candles to keep per interval and symbol.
+        :type kline_store_maxlen: int or None
+        :param trade_tape: Keep the latest trades of the `publicTrade.*` topics of the stream in columnar ring buffers.
+        :type trade_tape: bool
+        :param trade_tape_maxlen: Number of trades to keep per symbol.
+        :type trade_tape_maxlen: int or None
+        :param trade_tape_windows: The windows of the rolling aggregates in milliseconds.
+        :type trade_tape_windows: list or None
+        :param ticker_cache: Keep the current state of the `tickers.*` topics of the stream.
+        :type ticker_cache: bool
         """
         output = output or self.output_default
+        if asyncio_queue_maxsize is None:
+            asyncio_queue_maxsize = self.asyncio_queue_maxsize
+        asyncio_queue_overflow_policy = asyncio_queue_overflow_policy or self.asyncio_queue_overflow_policy
         close_timeout = close_timeout or self.close_timeout_default
         ping_interval = ping_interval or self.ping_interval_default
         ping_timeout = ping_timeout or self.ping_timeout_default
         self.specific_process_asyncio_queue[stream_id] = process_asyncio_queue
         self.specific_process_stream_data[stream_id] = process_stream_data
         self.specific_process_stream_data_async[stream_id] = process_stream_data_async
+        self.specific_process_stream_data_batch[stream_id] = process_stream_data_batch
+        self.specific_process_stream_data_batch_async[stream_id] = process_stream_data_batch_async
+        if conflate is True:
+            if order_book is True:
+                # the local order books of the stream already resync a topic with a gap
+                on_gap = None
+            else:
+                on_gap = lambda topic: self._schedule_resync_topic(stream_id=stream_id, topic=topic,
+                                                                   reason="Gap in the updates")
+            self.conflation_buffers[stream_id] = BybitWebSocketApiConflationBuffer(output=output,
+                                                                                  throttle_ms=conflate_throttle_ms,
+                                                                                  on_gap=on_gap)
+        if order_book is True:
+            self.order_books[stream_id] = BybitWebSocketApiLocalOrderBooks(
+                on_gap=lambda topic: self._schedule_resync_topic(stream_id=stream_id, topic=topic,
+                                                                 reason="Gap in the updates"),
+                is_subscribed=lambda topic: self.subscription_index.has_topic(topic=topic, stream_id=stream_id)
+            )
+        if kline_store is True:
+            self.kline_stores[stream_id] = BybitWebSocketApiKlineStores(
+                maxlen=kline_store_maxlen,
+                is_subscribed=lambda topic: self.subscription_index.has_topic(topic=topic, stream_id=stream_id)
+            )
+        if trade_tape is True:
+            self.trade_tapes[stream_id] = BybitWebSocketApiTradeTapes(
+                maxlen=trade_tape_maxlen,
+                windows=trade_tape_windows,
+                is_subscribed=lambda topic: self.subscription_index.has_topic(topic=topic, stream_id=stream_id)
+            )
+        if ticker_cache is True:
+            self.ticker_caches[stream_id] = BybitWebSocketApiTickerCache(
+                is_subscribed=lambda topic: self.subscription_index.has_topic(topic=topic, stream_id=stream_id)
+            )
+        # The engines of the stream by topic prefix, `process_received_data()` applies each record to its engine
+        topic_engines = {engines.prefix: engines for engines in (self.order_books.get(stream_id),
+                                                                 self.kline_stores.get(stream_id),
+                                                                 self.trade_tapes.get(stream_id),
+                                                                 self.ticker_caches.get(stream_id))
+                         if engines is not None}
+        if topic_engines:
+            self.topic_engines[stream_id] = topic_engines
+        self.stream_statistics[stream_id] = BybitWebSocketApiStreamStatistics(
+            keep_max_entries=self.keep_max_received_last_second_entries
+        )
         with self.stream_list_lock:
             logger.debug(f"BybitWebSocketApiManager._add_stream_to_stream_list() - `stream_list_lock` was entered!")
             self.stream_list[stream_id] = {'exchange': self.exchange,
@@ -747,8 +1119,25 @@ class BybitWebSocketApiManager(threading.Thread):
                                            'stream_label': copy.deepcopy(stream_label),
                                            'stream_buffer_name': copy.deepcopy(stream_buffer_name),
                                            'stream_buffer_maxlen': copy.deepcopy(stream_buffer_maxlen),
+                                           'asyncio_queue_maxsize': asyncio_queue_maxsize,
+                                           'asyncio_queue_overflow_policy': asyncio_queue_overflow_policy,
+                                           'asyncio_queue_size': 0,
+                                           'asyncio_queue_high_water_mark': 0,
+                                           'asyncio_queue_dropped': 0,
+                                           'asyncio_queue_coalesced': 0,
+                                           'conflate': conflate,
+                                           'conflate_throttle_ms': conflate_throttle_ms,
+                                           'order_book': order_book,
+                                           'kline_store': kline_store,
+                                           'kline_store_maxlen': kline_store_maxlen,
+                                           'trade_tape': trade_tape,
+                                           'trade_tape_maxlen': trade_tape_maxlen,
+                                           'trade_tape_windows': trade_tape_windows,
+                                           'ticker_cache': ticker_cache,
                                            'output': copy.deepcopy(output),
                                            'subscriptions': 0,
+                                           'subscription_requests': {},
+                                           'shard_of': None,
                                            'payload': [],
                                            'api_key': copy.deepcopy(api_key),
                                            'api_secret': copy.deepcopy(api_secret),
@@ -785,6 +1174,84 @@ class BybitWebSocketApiManager(threading.Thread):
                     str(stream_id) + ", " + str(channels) + ", " + str(markets) + ", " + str(stream_label) + ", "
                     + str(stream_buffer_name) + ", " + str(stream_buffer_maxlen) + ")")
 
+    async def _create_stream_coroutine(self,
+                                       stream_id,
+                                       channels,
+                                       endpoint,
+                                       markets,
+                                       stream_buffer_name: Union[Literal[False], str] = False,
+                                       stream_buffer_maxlen=None) -> None:
+        """
+        Co function of self.create_stream to run the socket as a task within a loop of the `event_loop_pool`
+
+        Counterpart of `_create_stream_thread()` if the `BybitWebSocketApiManager` got an `event_loop_pool_size`.
+
+        :param stream_id: provide a stream_id - only needed for userData Streams (acquiring a listenKey)
+        :type stream_id: str
+        :param channels: provide the channels to create the URI
+        :type channels: str, list, set
+        :param endpoint: provide the endpoint to create the URI
+        :type endpoint: str
+        :param markets: provide the markets to create the URI
+        :type markets: str, list, set
+        :param stream_buffer_name: If `False` the data is going to get written to the default stream_buffer,
+                           set to `True` to read the data via `pop_stream_data_from_stream_buffer(stream_id)` or
+                           provide a string to create and use a shared stream_buffer and read it via
+                           `pop_stream_data_from_stream_buffer('string')`.
+        :type stream_buffer_name: False or str
+        :param stream_buffer_maxlen: Set a max len for the `stream_buffer`. Only used in combination with a non-generic
+                                     `stream_buffer`. The generic `stream_buffer` uses always the value of
+                                     `BybitWebSocketApiManager()`.
+        :type stream_buffer_maxlen: int or None
+        :return: None
+        """
+        self._init_stream_buffer(stream_buffer_name=stream_buffer_name, stream_buffer_maxlen=stream_buffer_maxlen)
+        try:
+            # Created within the coroutine to bind the queue to the loop of the pool
+            self.asyncio_queue[stream_id] = BybitWebSocketApiAsyncioQueue(
+                maxsize=self.stream_list[stream_id]['asyncio_queue_maxsize'],
+                overflow_policy=self.stream_list[stream_id]['asyncio_queue_overflow_policy'])
+            logger.debug(f"BybitWebSocketApiManager._create_stream_coroutine({stream_id} - "
+                         f"Running `_run_socket({stream_id})` within the `event_loop_pool` ...")
+            await self._run_socket(stream_id=stream_id, channels=channels, endpoint=endpoint, markets=markets)
+        except asyncio.CancelledError:
+            logger.debug(f"BybitWebSocketApiManager._create_stream_coroutine({str(stream_id)} - Cancelled!")
+            self._stream_is_stopping(stream_id=stream_id)
+        except OSError as error_msg:
+            logger.critical(f"BybitWebSocketApiManager._create_stream_coroutine({str(stream_id)} - OSError - can not "
+                            f"create stream - error_msg: {str(error_msg)}")
+        except Exception as error_msg:
+            self._crash_stream_by_exception(stream_id=stream_id, error_msg=error_msg)
+        finally:
+            logger.debug(f"Finally releasing the stream_id={str(stream_id)} from the `event_loop_pool`")
+            self.event_loop_pool.release(stream_id=stream_id)
+            self.set_socket_is_ready(stream_id)
+
+    def _crash_stream_by_exception(self, stream_id=None, error_msg: Exception = None) -> None:
+        """
+        Report an unhandled exception within the coroutine of a stream and crash the stream.
+
+        :param stream_id: id of a stream
+        :type stream_id: str
+        :param error_msg: The caught exception
+        :type error_msg: Exception
+        :return: None
+        """
+        stream_label = self.get_stream_label(stream_id=stream_id)
+        if stream_label is None:
+            stream_label = ""
+        else:
+            stream_label = f" ({stream_label})"
+        error_msg_wrapper = (f"Exception within a coroutine of stream '{stream_id}'{stream_label}: "
+                             f"\033[1m\033[31m{type(error_msg).__name__} - {error_msg}\033[0m\r\n"
+                             f"{traceback.format_exc()}")
+        print(f"\r\n{error_msg_wrapper}")
+        error_msg_wrapper = (f"Exception within a coroutine of stream '{stream_id}'{stream_label}: "
+                             f"{type(error_msg).__name__} - {error_msg}\r\n"
+                             f"{traceback.format_exc()}")
+        logger.critical(error_msg_wrapper)
+        self._crash_stream(stream_id=stream_id, error_msg=error_msg_wrapper)
+
     def _create_stream_thread(self,
                               stream_id,
                               channels,
@@ -814,15 +1281,7 @@ class BybitWebSocketApiManager(threading.Thread):
         :type stream_buffer_maxlen: int or None
         :return:
         """
-        if stream_buffer_name is not False:
-            self.stream_buffer_locks[stream_buffer_name] = threading.Lock()
-            try:
-                # Not resetting the stream_buffer during a restart:
-                if self.stream_buffers[stream_buffer_name]:
-                    pass
-            except KeyError:
-                # Resetting
-                self.stream_buffers[stream_buffer_name] = deque(maxlen=stream_buffer_maxlen)
+        self._init_stream_buffer(stream_buffer_name=stream_buffer_name, stream_buffer_maxlen=stream_buffer_maxlen)
         loop = None
         try:
             loop = asyncio.new_event_loop()
@@ -830,7 +1289,9 @@ class BybitWebSocketApiManager(threading.Thread):
             if self.debug is True:
                 loop.set_debug(enabled=True)
             self.event_loops[stream_id] = loop
-            self.asyncio_queue[stream_id] = asyncio.Queue()
+            self.asyncio_queue[stream_id] = BybitWebSocketApiAsyncioQueue(
+                maxsize=self.stream_list[stream_id]['asyncio_queue_maxsize'],
+                overflow_policy=self.stream_list[stream_id]['asyncio_queue_overflow_policy'])
             # Todo: Task für ping starten
             # loop.create_task(self._ping_listen_key(stream_id=stream_id))
             logger.debug(f"BybitWebSocketApiManager._create_stream_thread({stream_id} - "
@@ -846,20 +1307,7 @@ class BybitWebSocketApiManager(threading.Thread):
             logger.debug(f"BybitWebSocketApiManager._create_stream_thread() stream_id={str(stream_id)} "
                          f" - RuntimeError `error: 12` - error_msg: {str(error_msg)}")
         except Exception as error_msg:
-            stream_label = self.get_stream_label(stream_id=stream_id)
-            if stream_label is None:
-                stream_label = ""
-            else:
-                stream_label = f" ({stream_label})"
-            error_msg_wrapper = (f"Exception within a coroutine of stream '{stream_id}'{stream_label}: "
-                                 f"\033[1m\033[31m{type(error_msg).__name__} - {error_msg}\033[0m\r\n"
-                                 f"{traceback.format_exc()}")
-            print(f"\r\n{error_msg_wrapper}")
-            error_msg_wrapper = (f"Exception within a coroutine of stream '{stream_id}'{stream_label}: "
-                                 f"{type(error_msg).__name__} - {error_msg}\r\n"
-                                 f"{traceback.format_exc()}")
-            logger.critical(error_msg_wrapper)
-            self._crash_stream(stream_id=stream_id, error_msg=error_msg_wrapper)
+            self._crash_stream_by_exception(stream_id=stream_id, error_msg=error_msg)
         finally:
             logger.debug(f"Finally closing the loop stream_id={str(stream_id)}")
             try:
@@ -903,6 +1351,154 @@ class BybitWebSocketApiManager(threading.Thread):
                              f"KeyError `error: 15` - {error_msg}")
             self.set_socket_is_ready(stream_id)
 
+    def _get_max_args_per_request(self, stream_id: str = None) -> Optional[int]:
+        """
+        Get the max number of args of a `subscribe` request for the endpoint of a stream.
+
+        :param stream_id: id of a stream
+        :type stream_id: str
+        :return: int or None
+        """
+        endpoint = self.stream_list[stream_id]['endpoint']
+        if endpoint.endswith("spot"):
+            return self.max_subscriptions_per_stream_spot
+        elif endpoint.endswith("linear"):
+            return self.max_subscriptions_per_stream_linear
+        elif endpoint.endswith("inverse"):
+            return self.max_subscriptions_per_stream_inverse
+        elif endpoint.endswith("option"):
+            return self.max_subscriptions_per_stream_option
+        return None
+
+    def _get_kline_store(self,
+                         symbol: str = None,
+                         interval: str = None,
+                         stream_id: str = None) -> Optional[BybitWebSocketApiKlineStore]:
+        """
+        Get the kline store of a symbol and interval.
+
+        :param symbol: The symbol, e.g. `BTCUSDT`
+        :type symbol: str
+        :param interval: The interval, e.g. `1`
+        :type interval: str
+        :param stream_id: id of a stream or `None` for any stream.
+        :type stream_id: str
+        :return: BybitWebSocketApiKlineStore or None
+        """
+        symbol = str(symbol).upper()
+        if stream_id is None:
+            stream_ids = list(self.kline_stores)
+        else:
+            stream_ids = self.get_stream_shards(stream_id=stream_id)
+        for shard_id in stream_ids:
+            try:
+                kline_store = self.kline_stores[shard_id].get(interval=interval, symbol=symbol)
+            except KeyError:
+                continue
+            if kline_store is not None:
+                return kline_store
+        return None
+
+    def _get_order_book(self, symbol: str = None, stream_id: str = None) -> Optional[BybitWebSocketApiLocalOrderBook]:
+        """
+        Get the local order book of a symbol.
+
+        :param symbol: The symbol, e.g. `BTCUSDT`
+        :type symbol: str
+        :param stream_id: id of a stream or `None` for any stream.
+        :type stream_id: str
+        :return: BybitWebSocketApiLocalOrderBook or None
+        """
+        symbol = str(symbol).upper()
+        if stream_id is None:
+            stream_ids = list(self.order_books)
+        else:
+            stream_ids = self.get_stream_shards(stream_id=stream_id)
+        for shard_id in stream_ids:
+            try:
+                order_book = self.order_books[shard_id].get(symbol=symbol)
+            except KeyError:
+                continue
+            if order_book is not None:
+                return order_book
+        return None
+
+    def _get_trade_tape(self, symbol: str = None, stream_id: str = None) -> Optional[BybitWebSocketApiTradeTape]:
+        """
+        Get the trade tape of a symbol.
+
+        :param symbol: The symbol, e.g. `BTCUSDT`
+        :type symbol: str
+        :param stream_id: id of a stream or `None` for any stream.
+        :type stream_id: str
+        :return: BybitWebSocketApiTradeTape or None
+        """
+        symbol = str(symbol).upper()
+        if stream_id is None:
+            stream_ids = list(self.trade_tapes)
+        else:
+            stream_ids = self.get_stream_shards(stream_id=stream_id)
+        for shard_id in stream_ids:
+            try:
+                trade_tape = self.trade_tapes[shard_id].get(symbol=symbol)
+            except KeyError:
+                continue
+            if trade_tape is not None:
+                return trade_tape
+        return None
+
+    def _get_process_stream_data_batch(self, stream_id: str = None) -> Optional[Tuple[Callable, bool]]:
+        """
+        Get the `process_stream_data_batch` callback which is used for a stream.
+
+        The specific settings of `create_stream()` overrule the global settings of the manager like in
+        `BybitWebSocketApiSocket.deliver_stream_data()`.
+
+        :param stream_id: id of a stream
+        :type stream_id: str
+        :return: tuple `(callback, is_async)` or None
+        """
+        try:
+            if self.stream_list[stream_id]['stream_buffer_name'] is not False:
+                return None
+            if self.specific_process_asyncio_queue[stream_id] is not None \
+                    or self.specific_process_stream_data[stream_id] is not None \
+                    or self.specific_process_stream_data_async[stream_id] is not None:
+                return None
+            if self.specific_process_stream_data_batch[stream_id] is not None:
+                return self.specific_process_stream_data_batch[stream_id], False
+            if self.specific_process_stream_data_batch_async[stream_id] is not None:
+                return self.specific_process_stream_data_batch_async[stream_id], True
+        except KeyError:
+            return None
+        if self.process_asyncio_queue is not None \
+                or self.process_stream_data is not None \
+                or self.process_stream_data_async is not None:
+            return None
+        if self.process_stream_data_batch is not None:
+            return self.process_stream_data_batch, False
+        if self.process_stream_data_batch_async is not None:
+            return self.process_stream_data_batch_async, True
+        return None
+
+    def _init_stream_buffer(self,
+                            stream_buffer_name: Union[Literal[False], str] = False,
+                            stream_buffer_maxlen=None) -> None:
+        """
+        Create the specific `stream_buffer` of a new stream if it does not exist yet.
+
+        :param stream_buffer_name: Name of the `stream_buffer` or `False` for the generic `stream_buffer`.
+        :type stream_buffer_name: False or str
+        :param stream_buffer_maxlen: Set a max len for the `stream_buffer`.
+        :type stream_buffer_maxlen: int or None
+        :return: None
+        """
+        if stream_buffer_name is not False:
+            # Not replacing the lock and the stream_buffer during a restart or if a shared stream_buffer is already
+            # used by another stream, `setdefault()` is atomic:
+            self.stream_buffer_locks.setdefault(stream_buffer_name, threading.Condition())
+            self.stream_buffers.setdefault(stream_buffer_name, deque(maxlen=stream_buffer_maxlen))
+
     def generate_signature(self, api_secret=None, data=None):
         """
         Signe the request.
@@ -1008,87 +1604,16 @@ class BybitWebSocketApiManager(threading.Thread):
                     cpu_usage_time = False
             else:
                 cpu_usage_time = False
-            # count most_receives_per_second total last second
+            # aggregate the stream statistics and count most_receives_per_second total last second
             if active_stream_list:
                 for stream_id in active_stream_list:
-                    # set the streams `most_receives_per_second` value
-                    try:
-                        if self.stream_list[stream_id]['receives_statistic_last_second']['entries'][last_timestamp] > \
-                                self.stream_list[stream_id]['receives_statistic_last_second']['most_receives_per_second']:
-                            with self.stream_list_lock:
-                                logger.debug(f"BybitWebSocketApiManager._frequent_checks() - `stream_list_lock` was "
-                                             f"entered!")
-                                self.stream_list[stream_id]['receives_statistic_last_second']['most_receives_per_second'] = \
-                                    self.stream_list[stream_id]['receives_statistic_last_second']['entries'][last_timestamp]
-                                logger.debug(f"BybitWebSocketApiManager._frequent_checks() - Leaving "
-                                             f"`stream_list_lock`!")
-                    except KeyError:
-                        pass
+                    self._sync_stream_statistics(stream_id=stream_id)
                     try:
-                        total_most_stream_receives_last_timestamp += self.stream_list[stream_id]['receives_statistic_last_second']['entries'][last_timestamp]
+                        receives_per_second = self.stream_statistics[stream_id].receives_per_second
                     except KeyError:
-                        pass
-                    try:
-                        total_most_stream_receives_next_to_last_timestamp += self.stream_list[stream_id]['receives_statistic_last_second']['entries'][next_to_last_timestamp]
-                    except KeyError:
-                        pass
-                    # delete list entries older than `keep_max_received_last_second_entries`
-                    # receives_statistic_last_second
-                    delete_index = []
-                    if len(self.stream_list[stream_id]['receives_statistic_last_second']['entries']) > \
-                            self.keep_max_received_last_second_entries:
-                        with self.stream_list_lock:
-                            logger.debug(f"BybitWebSocketApiManager._frequent_checks() - `stream_list_lock` was "
-                                         f"entered!")
-                            temp_entries = copy.deepcopy(self.stream_list[stream_id]['receives_statistic_last_second']['entries'])
-                            logger.debug(f"BybitWebSocketApiManager._frequent_checks() - Leaving "
-                                         f"`stream_list_lock`!")
-                        for timestamp_key in temp_entries:
-                            try:
-                                if timestamp_key < current_timestamp - self.keep_max_received_last_second_entries:
-                                    delete_index.append(timestamp_key)
-                            except ValueError as error_msg:
-                                logger.error("BybitWebSocketApiManager._frequent_checks() timestamp_key=" +
-                                             str(timestamp_key) + " current_timestamp=" + str(current_timestamp) +
-                                             " keep_max_received_last_second_entries=" +
-                                             str(self.keep_max_received_last_second_entries) + " error_msg=" +
-                                             str(error_msg))
-                    for timestamp_key in delete_index:
-                        with self.stream_list_lock:
-                            logger.debug(f"BybitWebSocketApiManager._frequent_checks() - `stream_list_lock` was "
-                                         f"entered!")
-                            self.stream_list[stream_id]['receives_statistic_last_second']['entries'].pop(timestamp_key,
-                                                                                                         None)
-                            logger.debug(f"BybitWebSocketApiManager._frequent_checks() - Leaving "
-                                         f"`stream_list_lock`!")
-                    # transfer_rate_per_second
-                    delete_index = []
-                    if len(self.stream_list[stream_id]['transfer_rate_per_second']['bytes']) > \
-                            self.keep_max_received_last_second_entries:
-                        try:
-                            temp_bytes = self.stream_list[stream_id]['transfer_rate_per_second']['bytes']
-                            for timestamp_key in temp_bytes:
-                                try:
-                                    if timestamp_key < current_timestamp - self.keep_max_received_last_second_entries:
-                                        delete_index.append(timestamp_key)
-                                except ValueError as error_msg:
-                                    logger.error(
-                                        "BybitWebSocketApiManager._frequent_checks() timestamp_key="
-                                        + str(timestamp_key) +
-                                        " current_timestamp=" + str(current_timestamp) +
-                                        " keep_max_received_last_second_"
-                                        "entries=" + str(self.keep_max_received_last_second_entries) + " error_msg=" +
-                                        str(error_msg))
-                        except RuntimeError as error_msg:
-                            logger.info("BybitWebSocketApiManager._frequent_checks() - "
-                                        "Caught RuntimeError: " + str(error_msg))
-                    for timestamp_key in delete_index:
-                        with self.stream_list_lock:
-                            logger.debug(f"BybitWebSocketApiManager._frequent_checks() - `stream_list_lock` was "
-                                         f"entered!")
-                            self.stream_list[stream_id]['transfer_rate_per_second']['bytes'].pop(timestamp_key, None)
-                            logger.debug(f"BybitWebSocketApiManager._frequent_checks() - Leaving "
-                                         f"`stream_list_lock`!")
+                        continue
+                    total_most_stream_receives_last_timestamp += receives_per_second.get(last_timestamp, 0)
+                    total_most_stream_receives_next_to_last_timestamp += receives_per_second.get(next_to_last_timestamp, 0)
             # set most_receives_per_second
             try:
                 if int(self.most_receives_per_second) < int(total_most_stream_receives_last_timestamp):
@@ -1113,6 +1638,346 @@ class BybitWebSocketApiManager(threading.Thread):
                 pass
         logger.debug(f"BybitWebSocketApiManager._frequent_checks() - Leaving thread ...")
 
+    @staticmethod
+    def _normalize_topic(topic: str = None) -> str:
+        """
+        Convert the market of a topic to upper case like the markets of the subscriptions.
+
+        :param topic: The topic, e.g. `orderbook.50.btcusdt`
+        :type topic: str
+        :return: str
+        """
+        channel, separator, market = str(topic).rpartition(".")
+        return f"{channel}{separator}{market.upper()}"
+
+    def _process_subscription_response(self, control_message: BybitWebSocketApiControlMessage = None) -> bool:
+        """
+        Update the `subscriptions` of a stream and the state of the topics with the response to a `subscribe` or
+        `unsubscribe` request.
+
+        The acknowledged topics of a `subscribe` request become `active`. If Bybit rejects the request, the topics named
+        in the `ret_msg` of the response become `rejected` and the others `active`, if it names none of them, all are
+        `rejected`. Each rejected topic is logged and reported with a `TOPIC_REJECTED` stream signal, it can be
+        subscribed again. The time from `subscribe_to_stream()` to the response is added to the subscribe-to-ack
+        latency histogram.
+
+        :param control_message: The response of the endpoint.
+        :type control_message: BybitWebSocketApiControlMessage
+        :return: bool
+        """
+        if control_message.op not in ("subscribe", "unsubscribe") or control_message.req_id is None:
+            return False
+        stream_id = control_message.stream_id
+        rejected_topics = []
+        with self.stream_list_lock:
+            logger.debug(f"BybitWebSocketApiManager._process_subscription_response() - `stream_list_lock` was "
+                         f"entered!")
+            try:
+                stream = self.stream_list[stream_id]
+                op, args, registered_at = stream['subscription_requests'].pop(control_message.req_id)
+            except KeyError:
+                return False
+            if op == "subscribe":
+                self.subscription_index.add_ack_latency(time.perf_counter() - registered_at)
+                if control_message.success is not True:
+                    rejected_topics = self.subscription_index.set_state(
+                        stream_id=stream_id,
+                        topics=get_rejected_topics(topics=args, ret_msg=control_message.ret_msg),
+                        state=TOPIC_REJECTED,
+                        reason=control_message.ret_msg,
+                        expected_state=TOPIC_PENDING)
+                self.subscription_index.set_state(stream_id=stream_id,
+                                                  topics=args,
+                                                  state=TOPIC_ACTIVE,
+                                                  expected_state=TOPIC_PENDING)
+                stream['subscriptions'] += len(args) - len(rejected_topics)
+            elif control_message.success is True:
+                stream['subscriptions'] = max(stream['subscriptions'] - len(args), 0)
+            logger.debug(f"BybitWebSocketApiManager._process_subscription_response() - Leaving `stream_list_lock`!")
+        for topic in rejected_topics:
+            logger.error(f"BybitWebSocketApiManager._process_subscription_response({stream_id}) - Subscription of "
+                         f"topic '{topic}' was rejected: {control_message.ret_msg}")
+            self.send_stream_signal(signal_type="TOPIC_REJECTED",
+                                    stream_id=stream_id,
+                                    data_record=topic,
+                                    error_msg=control_message.ret_msg)
+        return True
+
+    def _reset_subscribed_topics(self, stream_id: str = None) -> bool:
+        """
+        Mark the subscribed topics of a stream as `stale`, its local order books as not synchronized and drop its queued
+        `subscribe` and `unsubscribe` requests, the new connection of the stream has to subscribe all its topics again.
+
+        :param stream_id: id of a stream
+        :type stream_id: str
+        :return: bool
+        """
+        with self.stream_list_lock:
+            logger.debug(f"BybitWebSocketApiManager._reset_subscribed_topics() - `stream_list_lock` was entered!")
+            try:
+                self.stream_list[stream_id]['subscription_requests'] = {}
+                self.stream_list[stream_id]['subscriptions'] = 0
+                self.stream_list[stream_id]['payload'] = [payload for payload in self.stream_list[stream_id]['payload']
+                                                          if type(payload) is not dict
+                                                          or payload.get('op') not in ("subscribe", "unsubscribe")]
+            except KeyError:
+                return False
+            self.subscription_index.mark_stale(stream_id=stream_id)
+            logger.debug(f"BybitWebSocketApiManager._reset_subscribed_topics() - Leaving `stream_list_lock`!")
+        if stream_id in self.order_books:
+            # the updates of the new connection start with a new `snapshot` of each book
+            self.order_books[stream_id].invalidate()
+        return True
+
+    def _send_subscription_payload(self, stream_id: str = None, payload: List[dict] = None) -> bool:
+        """
+        Send `subscribe` or `unsubscribe` requests and remember their args and the time till the endpoint
+        acknowledges them.
+
+        :param stream_id: id of a stream
+        :type stream_id: str
+        :param payload: The requests created by `split_payload()`.
+        :type payload: list
+        :return: bool
+        """
+        with self.stream_list_lock:
+            logger.debug(f"BybitWebSocketApiManager._send_subscription_payload() - `stream_list_lock` was entered!")
+            for item in payload:
+                self.stream_list[stream_id]['subscription_requests'][item['req_id']] = (item['op'], item['args'],
+                                                                                         time.perf_counter())
+            logger.debug(f"BybitWebSocketApiManager._send_subscription_payload() - Leaving `stream_list_lock`!")
+        for item in payload:
+            if self.send_with_stream(stream_id=stream_id, payload=item) is False:
+                self.add_payload_to_stream(stream_id=stream_id, payload=item)
+        return True
+
+    def _create_stream_shard(self, stream_id: str = None, channels: list = None, markets: list = None) -> str:
+        """
+        Open a new shard with the settings of a stream and add it to the shards of the stream.
+
+        :param stream_id: id of the stream, the first shard
+        :type stream_id: str
+        :param channels: The channels of the stream.
+        :type channels: list
+        :param markets: The markets of the new shard.
+        :type markets: list
+        :return: stream_id of the new shard
+        """
+        with self.stream_list_lock:
+            logger.debug(f"BybitWebSocketApiManager._create_stream_shard() - `stream_list_lock` was entered!")
+            stream = dict(self.stream_list[stream_id])
+            logger.debug(f"BybitWebSocketApiManager._create_stream_shard() - Leaving `stream_list_lock`!")
+        shard_id = self.create_stream(channels=channels,
+                                      endpoint=stream['endpoint'],
+                                      markets=markets,
+                                      stream_label=stream['stream_label'],
+                                      stream_buffer_name=stream['stream_buffer_name'],
+                                      api_key=stream['api_key'],
+                                      api_secret=stream['api_secret'],
+                                      output=stream['output'],
+                                      ping_interval=stream['ping_interval'],
+                                      ping_timeout=stream['ping_timeout'],
+                                      close_timeout=stream['close_timeout'],
+                                      stream_buffer_maxlen=stream['stream_buffer_maxlen'],
+                                      process_stream_data=self.specific_process_stream_data.get(stream_id),
+                                      process_stream_data_async=self.specific_process_stream_data_async.get(stream_id),
+                                      process_asyncio_queue=self.specific_process_asyncio_queue.get(stream_id),
+                                      process_stream_data_batch=self.specific_process_stream_data_batch.get(stream_id),
+                                      process_stream_data_batch_async=self.specific_process_stream_data_batch_async.get(
+                                          stream_id),
+                                      asyncio_queue_maxsize=stream['asyncio_queue_maxsize'],
+                                      asyncio_queue_overflow_policy=stream['asyncio_queue_overflow_policy'],
+                                      conflate=stream['conflate'],
+                                      conflate_throttle_ms=stream['conflate_throttle_ms'],
+                                      order_book=stream['order_book'],
+                                      kline_store=stream['kline_store'],
+                                      kline_store_maxlen=stream['kline_store_maxlen'],
+                                      trade_tape=stream['trade_tape'],
+                                      trade_tape_maxlen=stream['trade_tape_maxlen'],
+                                      trade_tape_windows=stream['trade_tape_windows'],
+                                      ticker_cache=stream['ticker_cache'])
+        with self.stream_list_lock:
+            logger.debug(f"BybitWebSocketApiManager._create_stream_shard() - `stream_list_lock` was entered!")
+            self.stream_list[shard_id]['shard_of'] = stream_id
+            logger.debug(f"BybitWebSocketApiManager._create_stream_shard() - Leaving `stream_list_lock`!")
+        self.stream_shards[stream_id] = self.get_stream_shards(stream_id=stream_id) + [shard_id]
+        return shard_id
+
+    def _split_markets_into_shards(self, channels: list = None, markets: list = None) -> List[list]:
+        """
+        Split the markets of a stream into groups whose topics fit into the `args_limit` of one connection, all channels
+        of a market are subscribed by the same connection.
+
+        :param channels: The channels of the stream.
+        :type channels: list
+        :param markets: The markets of the stream.
+        :type markets: list
+        :return: list of lists
+        """
+        shards = [[]]
+        chars = 2
+        for market in dict.fromkeys(markets):
+            # "channel.MARKET" plus a comma for each channel
+            market_chars = sum(len(f"{channel}.{str(market).upper()}") + 3 for channel in channels)
+            if shards[-1] and chars + market_chars - 1 > self.args_limit:
+                shards.append([])
+                chars = 2
+            shards[-1].append(market)
+            chars += market_chars
+        return shards
+
+    def _subscribe_to_stream_shards(self, stream_id: str = None, channels=None, markets=None) -> bool:
+        """
+        Subscribe channels and/or markets to a stream and keep the topics of each shard within the `args_limit`.
+
+        New channels get added to all shards, the last markets of a shard which would exceed the `args_limit` with
+        the new channels get moved. New and moved markets get added to the first shard with enough space left, the
+        remaining markets to new shards.
+
+        :param stream_id: id of a stream
+        :type stream_id: str
+        :param channels: provide the channels you wish to subscribe
+        :type channels: str, list, set
+        :param markets: provide the markets you wish to subscribe
+        :type markets: str, list, set
+        :return: bool
+        """
+        if channels is None:
+            channels = []
+        elif type(channels) is str:
+            channels = [channels]
+        if markets is None:
+            markets = []
+        elif type(markets) is str:
+            markets = [markets]
+        shard_ids = self.get_stream_shards(stream_id=stream_id)
+        with self.stream_list_lock:
+            logger.debug(f"BybitWebSocketApiManager._subscribe_to_stream_shards() - `stream_list_lock` was entered!")
+            stream_channels = self.stream_list[stream_id]['channels']
+            all_channels = list(dict.fromkeys(([stream_channels] if type(stream_channels) is str
+                                               else list(stream_channels)) + list(channels)))
+            shard_markets = {}
+            for shard_id in shard_ids:
+                stream_markets = self.stream_list[shard_id]['markets']
+                shard_markets[shard_id] = [str(market).upper() for market in ([stream_markets]
+                                                                              if type(stream_markets) is str
+                                                                              else stream_markets)]
+            logger.debug(f"BybitWebSocketApiManager._subscribe_to_stream_shards() - Leaving `stream_list_lock`!")
+        market_shards = {market: shard_id for shard_id in shard_ids for market in shard_markets[shard_id]}
+        pending_markets = []
+        moved_markets = {shard_id: [] for shard_id in shard_ids}
+        shard_chars = {}
+        for shard_id in shard_ids:
+            shard_chars[shard_id] = 2
+            for market in shard_markets[shard_id]:
+                market_chars = sum(len(f"{channel}.{market}") + 3 for channel in all_channels)
+                if moved_markets[shard_id] or \
+                        (shard_chars[shard_id] > 2 and shard_chars[shard_id] + market_chars - 1 > self.args_limit):
+                    moved_markets[shard_id].append(market)
+                    pending_markets.append(market)
+                else:
+                    shard_chars[shard_id] += market_chars
+        new_markets = {shard_id: [] for shard_id in shard_ids}
+        for market in dict.fromkeys(str(market).upper() for market in markets):
+            if market not in market_shards:
+                pending_markets.append(market)
+            elif market not in moved_markets[market_shards[market]]:
+                # Already known markets stay on their shard, only their missing topics get sent
+                new_markets[market_shards[market]].append(market)
+        overflow_markets = []
+        for market in pending_markets:
+            market_chars = sum(len(f"{channel}.{market}") + 3 for channel in all_channels)
+            for shard_id in shard_ids:
+                if shard_chars[shard_id] + market_chars - 1 <= self.args_limit:
+                    new_markets[shard_id].append(market)
+                    shard_chars[shard_id] += market_chars
+                    break
+            else:
+                overflow_markets.append(market)
+        results = []
+        for shard_id in shard_ids:
+            if moved_markets[shard_id]:
+                logger.info(f"BybitWebSocketApiManager._subscribe_to_stream_shards({stream_id}) - Moving "
+                            f"{len(moved_markets[shard_id])} markets of shard {shard_id} to stay within the "
+                            f"`args_limit` ...")
+                results.append(self._unsubscribe_from_connection(stream_id=shard_id, markets=moved_markets[shard_id]))
+        for shard_id in shard_ids:
+            results.append(self._subscribe_to_connection(stream_id=shard_id, channels=channels,
+                                                         markets=new_markets[shard_id]))
+        if overflow_markets:
+            new_shards = self._split_markets_into_shards(channels=all_channels, markets=overflow_markets)
+            logger.info(f"BybitWebSocketApiManager._subscribe_to_stream_shards({stream_id}) - The `args_limit` of all "
+                        f"shards is reached, opening {len(new_shards)} new shards for {len(overflow_markets)} "
+                        f"markets ...")
+            for shard_markets in new_shards:
+                self._create_stream_shard(stream_id=stream_id, channels=all_channels, markets=shard_markets)
+        return all(results)
+
+    def _sync_stream_statistics(self, stream_id: str = None) -> bool:
+        """
+        Aggregate the lock-free `BybitWebSocketApiStreamStatistics` and the counters of the `asyncio_queue` of a stream
+        into its `stream_list` entry and add the news since the last run to the global totals.
+
+        The receive hot path does not touch the `stream_list_lock`, this method is called by `_frequent_checks()`,
+        `get_stream_info()` and the statistic getters instead.
+
+        :param stream_id: id of a stream, if `None` all streams get synchronized.
+        :type stream_id: str
+        :return: bool
+        """
+        if stream_id is None:
+            for stream_id in list(self.stream_statistics):
+                self._sync_stream_statistics(stream_id=stream_id)
+            return True
+        try:
+            statistics = self.stream_statistics[stream_id]
+        except KeyError:
+            return False
+        last_timestamp = int(time.time()) - 1
+        receives_per_second = statistics.get_receives_per_second()
+        bytes_per_second = statistics.get_bytes_per_second()
+        receives_total = statistics.processed_receives_total
+        received_bytes_total = statistics.received_bytes_total
+        transmitted_total = statistics.processed_transmitted_total
+        asyncio_queue = self.asyncio_queue.get(stream_id)
+        with self.stream_list_lock:
+            logger.debug(f"BybitWebSocketApiManager._sync_stream_statistics() - `stream_list_lock` was entered!")
+            try:
+                stream = self.stream_list[stream_id]
+                if statistics.last_heartbeat is not None:
+                    stream['last_heartbeat'] = statistics.last_heartbeat
+                stream['processed_receives_total'] = receives_total
+                stream['processed_transmitted_total'] = transmitted_total
+                stream['receives_statistic_last_second']['entries'] = receives_per_second
+                if receives_per_second.get(last_timestamp, 0) > \
+                        stream['receives_statistic_last_second']['most_receives_per_second']:
+                    stream['receives_statistic_last_second']['most_receives_per_second'] = \
+                        receives_per_second[last_timestamp]
+                stream['transfer_rate_per_second']['bytes'] = bytes_per_second
+                if asyncio_queue is not None:
+                    stream['asyncio_queue_size'] = asyncio_queue.qsize()
+                    stream['asyncio_queue_high_water_mark'] = asyncio_queue.high_water_mark
+                    stream['asyncio_queue_dropped'] = asyncio_queue.dropped
+                    stream['asyncio_queue_coalesced'] = asyncio_queue.coalesced
+            except KeyError:
+                pass
+            new_receives = receives_total - statistics.synced_receives_total
+            new_received_bytes = received_bytes_total - statistics.synced_received_bytes_total
+            new_transmitted = transmitted_total - statistics.synced_transmitted_total
+            statistics.synced_receives_total = receives_total
+            statistics.synced_received_bytes_total = received_bytes_total
+            statistics.synced_transmitted_total = transmitted_total
+            logger.debug(f"BybitWebSocketApiManager._sync_stream_statistics() - Leaving `stream_list_lock`!")
+        if new_receives:
+            with self.total_receives_lock:
+                self.total_receives += new_receives
+        if new_received_bytes:
+            self.add_total_received_bytes(new_received_bytes)
+        if new_transmitted:
+            with self.total_transmitted_lock:
+                self.total_transmitted += new_transmitted
+        return True
+
     @staticmethod
     def _handle_task_result(task: asyncio.Task) -> None:
         """
@@ -1152,6 +2017,12 @@ class BybitWebSocketApiManager(threading.Thread):
                     logger.debug(f"BybitWebSocketApiManager.add_payload_to_stream() - Leaving `stream_list_lock`!")
             except KeyError:
                 return False
+            try:
+                # wake up the sender of a connected stream
+                self.get_event_loop_by_stream_id(stream_id=stream_id).call_soon_threadsafe(
+                    self.sockets[stream_id].send_event.set)
+            except (AttributeError, KeyError, RuntimeError):
+                pass
             return True
 
     def add_to_ringbuffer_error(self, error):
@@ -1159,12 +2030,12 @@ class BybitWebSocketApiManager(threading.Thread):
         Add received error messages from websocket endpoints to the error ringbuffer
 
         :param error: The data to add.
-        :type error: string
+        :type error: BybitWebSocketApiControlMessage or string
         :return: bool
         """
-        while len(self.ringbuffer_error) >= self.get_ringbuffer_error_max_size():
-            self.ringbuffer_error.pop(0)
-        self.ringbuffer_error.append(str(error))
+        if not isinstance(error, BybitWebSocketApiControlMessage):
+            error = str(error)
+        self.ringbuffer_error.append(error)
         return True
 
     def add_to_ringbuffer_result(self, result):
@@ -1172,12 +2043,12 @@ class BybitWebSocketApiManager(threading.Thread):
         Add received result messages from websocket endpoints to the result ringbuffer
 
         :param result: The data to add.
-        :type result: string
+        :type result: BybitWebSocketApiControlMessage or string
         :return: bool
         """
-        while len(self.ringbuffer_result) >= self.get_ringbuffer_result_max_size():
-            self.ringbuffer_result.pop(0)
-        self.ringbuffer_result.append(str(result))
+        if not isinstance(result, BybitWebSocketApiControlMessage):
+            result = str(result)
+        self.ringbuffer_result.append(result)
         return True
 
     def add_to_stream_buffer(self, stream_data, stream_buffer_name: Union[Literal[False], str] = False):
@@ -1203,9 +2074,11 @@ class BybitWebSocketApiManager(threading.Thread):
         if stream_buffer_name is False:
             with self.stream_buffer_lock:
                 self.stream_buffer.append(stream_data)
+                self.stream_buffer_lock.notify()
         else:
             with self.stream_buffer_locks[stream_buffer_name]:
                 self.stream_buffers[stream_buffer_name].append(stream_data)
+                self.stream_buffer_locks[stream_buffer_name].notify()
         self.last_entry_added_to_stream_buffer = time.time()
         return True
 
@@ -1214,13 +2087,14 @@ class BybitWebSocketApiManager(threading.Thread):
         Add signals about a stream to the
         `stream_signal_buffer <https://github.com/LUCIT-Systems-and-Development/unicorn-bybit-websocket-api/wiki/%60stream_signal_buffer%60>`__
 
-        :param signal_type: "CONNECT", "DISCONNECT", "FIRST_RECEIVED_DATA" or "STREAM_UNREPAIRABLE"
+        :param signal_type: "CONNECT", "DISCONNECT", "FIRST_RECEIVED_DATA", "STREAM_UNREPAIRABLE", "TOPIC_REJECTED" or
+                            "TOPIC_RESYNC"
         :type signal_type: str
         :param stream_id: id of a stream
         :type stream_id: str
-        :param data_record: The last or first received data record
+        :param data_record: The last or first received data record or the rejected or resynchronized topic
         :type data_record: str or dict
-        :param error_msg: The message of the error.
+        :param error_msg: The message of the error or the reason of the resynchronization.
         :type error_msg: str or dict
         :return: bool
         """
@@ -1245,6 +2119,12 @@ class BybitWebSocketApiManager(threading.Thread):
                 stream_signal['first_received_data_record'] = data_record
             elif signal_type == "STREAM_UNREPAIRABLE":
                 stream_signal['error'] = str(error_msg)
+            elif signal_type == "TOPIC_REJECTED":
+                stream_signal['topic'] = data_record
+                stream_signal['error'] = str(error_msg)
+            elif signal_type == "TOPIC_RESYNC":
+                stream_signal['topic'] = data_record
+                stream_signal['reason'] = str(error_msg)
             else:
                 logger.error(f"BybitWebSocketApiManager.add_to_stream_signal_buffer({signal_type}) - "
                              f"Received invalid `signal_type`!")
@@ -1341,16 +2221,18 @@ class BybitWebSocketApiManager(threading.Thread):
         if markets is not None:
             if type(markets) is str:
                 markets = [markets]
-        payload = []
         if method == "subscribe":
-            for channel in channels:
-                params = {
-                    "op": "subscribe",
-                    "args": [f"{channel}.{symbol.upper()}" for symbol in markets]
-                }
-                payload.append(params)
+            payload = self.split_payload(params=[f"{channel}.{symbol.upper()}" for channel in channels
+                                                 for symbol in markets],
+                                         method="subscribe",
+                                         max_items_per_request=self._get_max_args_per_request(stream_id),
+                                         max_chars_per_request=self.args_limit)
         elif method == "unsubscribe":
-            raise NotImplemented(f"Feature 'unsubscribe' is currently not available!")
+            payload = self.split_payload(params=[f"{channel}.{symbol.upper()}" for channel in channels
+                                                 for symbol in markets],
+                                         method="unsubscribe",
+                                         max_items_per_request=self._get_max_args_per_request(stream_id),
+                                         max_chars_per_request=self.args_limit)
         else:
             logger.critical(f"BybitWebSocketApiManager.create_payload(" + str(stream_id) + ", "
                             + str(channels) + ", " + str(markets) + ") - Allowed values for `method`: `subscribe` "
@@ -1370,14 +2252,28 @@ class BybitWebSocketApiManager(threading.Thread):
                       stream_buffer_name: Union[Literal[False], str] = False,
                       api_key: str = None,
                       api_secret: str = None,
-                      output: Optional[Literal['dict', 'raw_data']] = None,
+                      output: Optional[Literal['dict', 'raw_data', 'typed']] = None,
                       ping_interval: int = None,
                       ping_timeout: int = None,
                       close_timeout: int = None,
                       stream_buffer_maxlen: int = None,
                       process_stream_data: Optional[Callable] = None,
                       process_stream_data_async: Optional[Callable] = None,
-                      process_asyncio_queue: Optional[Callable] = None):
+                      process_asyncio_queue: Optional[Callable] = None,
+                      process_stream_data_batch: Optional[Callable] = None,
+                      process_stream_data_batch_async: Optional[Callable] = None,
+                      asyncio_queue_maxsize: Optional[int] = None,
+                      asyncio_queue_overflow_policy: Optional[Literal['block', 'drop_oldest', 'drop_newest',
+                                                                      'coalesce_by_topic']] = None,
+                      conflate: bool = False,
+                      conflate_throttle_ms: Optional[int] = None,
+                      order_book: bool = False,
+                      kline_store: bool = False,
+                      kline_store_maxlen: Optional[int] = None,
+                      trade_tape: bool = False,
+                      trade_tape_maxlen: Optional[int] = None,
+                      trade_tape_windows: Optional[List[int]] = None,
+                      ticker_cache: bool = False):
         """
         Create a websocket stream
 
@@ -1394,6 +2290,11 @@ class BybitWebSocketApiManager(threading.Thread):
         `There is a subscriptions limit per stream!
         <https://github.com/LUCIT-Systems-and-Development/unicorn-bybit-websocket-api/wiki/Bybit-websocket-endpoint-configuration-overview>`__
 
+        If the topics exceed the `args_limit` of one connection, the markets get split across as many connections
+        (shards) as needed. The shards deliver to the same `stream_buffer`, callbacks and conflation buffer and are
+        controlled with the returned `stream_id`, see `get_stream_shards()`. With `process_asyncio_queue` every shard
+        runs its own consumer task.
+
         :param channels: provide the channels you wish to stream
         :type channels: str, list, set
         :param endpoint: provide the endpoint
@@ -1416,7 +2317,7 @@ class BybitWebSocketApiManager(threading.Thread):
                        of BybitWebSocketApiManager`. To overrule the `output_default` value for this specific stream,
                        set `output` to "dict" to convert the received raw data to a python dict -  otherwise with
                        the default setting "raw_data" the output remains unchanged and gets delivered as received from
-                       the endpoints
+                       the endpoints. Set it to "typed" to receive `BybitWebSocketApiTypedMessage` objects
         :type output: str
         :param ping_interval: Once the connection is open, a `Ping frame` is sent every
                               `ping_interval` seconds. This serves as a keepalive. It helps keeping
@@ -1465,11 +2366,77 @@ class BybitWebSocketApiManager(threading.Thread):
                                       the data in the correct receiving sequence.
                                       https://unicorn-bybit-websocket-api.docs.lucit.tech/readme.html#or-await-the-webstream-data-in-an-asyncio-coroutine
         :type process_asyncio_queue: Optional[Callable]
+        :param process_stream_data_batch: Provide a function/method to process the received webstream data in batches
+                                          (callback). All records which are already received by the websocket get
+                                          drained and delivered with one call like
+                                          `process_stream_data_batch(list_of_stream_data)`. The size of a batch is
+                                          limited by `stream_data_batch_max_size` and `stream_data_batch_max_time_us`
+                                          of `BybitWebSocketApiManager()`.
+        :type process_stream_data_batch: Optional[Callable]
+        :param process_stream_data_batch_async: Provide an asynchronous function/method to process the received
+                                                webstream data in batches (callback).
+        :type process_stream_data_batch_async: Optional[Callable]
+        :param asyncio_queue_maxsize: Override the `asyncio_queue_maxsize` of `BybitWebSocketApiManager()` for this
+                                      stream, `0` is unlimited.
+        :type asyncio_queue_maxsize: int or None
+        :param asyncio_queue_overflow_policy: Override the `asyncio_queue_overflow_policy` of
+                                              `BybitWebSocketApiManager()` for this stream: "block", "drop_oldest",
+                                              "drop_newest" or "coalesce_by_topic".
+        :type asyncio_queue_overflow_policy: str or None
+        :param conflate: Set to `True` to keep only the latest record of each topic instead of delivering every
+                         record. A new record overwrites the slot of its topic and
+                         `pop_stream_data_from_conflation_buffer(stream_id)` returns only topics with a new record
+                         since the last pop. Useful for `tickers.*` and `orderbook.1.*` if only the latest state is
+                         needed. The records are decoded into the `output` format when they are popped.
+        :type conflate: bool
+        :param conflate_throttle_ms: Return a topic of the conflation buffer at most once within this number of
+                                     milliseconds, e.g. `50`. Default is `None` (no throttle).
+        :type conflate_throttle_ms: int or None
+        :param order_book: Set to `True` to keep a local order book of each `orderbook.*` topic of the stream. The
+                           snapshots and deltas get applied as they are received and the books can be read with
+                           `get_order_book()` and `get_order_book_best_bid_ask()`. The records are delivered as
+                           usual.
+        :type order_book: bool
+        :param kline_store: Set to `True` to keep the latest candles of each `kline.*` topic of the stream in
+                            preallocated NumPy arrays, the open candle gets updated in place and the store rolls
+                            forward with each new candle. The candles can be read with `get_klines()`. Requires
+                            NumPy, `pip install unicorn-bybit-websocket-api[kline_store]`. The records are
+                            delivered as usual.
+        :type kline_store: bool
+        :param kline_store_maxlen: Number of candles to keep per interval and symbol. Default is `1000`.
+        :type kline_store_maxlen: int or None
+        :param trade_tape: Set to `True` to keep the latest trades of each `publicTrade.*` topic of the stream in a
+                           columnar ring buffer with the rolling VWAP, volume and number of trades of each window
+                           in `trade_tape_windows`. The trades can be read with `get_trades()` and the aggregates
+                           with `get_trade_stats()`. The records are delivered as usual.
+        :type trade_tape: bool
+        :param trade_tape_maxlen: Number of trades to keep per symbol. Default is `10000`.
+        :type trade_tape_maxlen: int or None
+        :param trade_tape_windows: The windows of the rolling aggregates in milliseconds. Default is
+                                   `(1000, 10000, 60000)`.
+        :type trade_tape_windows: list or None
+        :param ticker_cache: Set to `True` to keep the current state of each `tickers.*` topic of the stream. The
+                             deltas get merged in place into the fields of the last snapshot and the state can be read
+                             with `get_ticker()` and `get_tickers()`. The records are delivered as usual.
+        :type ticker_cache: bool
 
         :return: stream_id or 'None'
         """
         if endpoint is None:
             raise ValueError("Parameter 'endpoint' must not be `None`!")
+        if self.process_pool is not None and (process_asyncio_queue is not None
+                                              or process_stream_data_async is not None
+                                              or process_stream_data_batch_async is not None):
+            raise ValueError("The parameters `process_asyncio_queue`, `process_stream_data_async` and "
+                             "`process_stream_data_batch_async` can not be used in combination with "
+                             "`process_pool_size`!")
+        if asyncio_queue_overflow_policy is not None and asyncio_queue_overflow_policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Parameter `asyncio_queue_overflow_policy` must be one of {OVERFLOW_POLICIES}, "
+                             f"received: {asyncio_queue_overflow_policy}")
+        if self.process_pool is not None and (order_book is True or kline_store is True or trade_tape is True
+                                              or ticker_cache is True):
+            raise ValueError("The parameters `order_book`, `kline_store`, `trade_tape` and `ticker_cache` can not be "
+                             "used in combination with `process_pool_size`!")
         if channels is None:
             channels = []
         if markets is None:
@@ -1478,6 +2445,48 @@ class BybitWebSocketApiManager(threading.Thread):
             channels = [channels]
         if type(markets) is str:
             markets = [markets]
+        shards = self._split_markets_into_shards(channels=channels, markets=markets)
+        if len(shards) > 1:
+            # The topics exceed the args limit of one connection -> one stream per shard, the first is the stream
+            logger.info(f"BybitWebSocketApiManager.create_stream({str(channels)}, {str(endpoint)}, ...) - Splitting "
+                        f"{len(markets)} markets into {len(shards)} shards ...")
+            shard_ids = []
+            for shard_markets in shards:
+                shard_ids.append(self.create_stream(channels=channels,
+                                                    endpoint=endpoint,
+                                                    markets=shard_markets,
+                                                    stream_label=stream_label,
+                                                    stream_buffer_name=stream_buffer_name,
+                                                    api_key=api_key,
+                                                    api_secret=api_secret,
+                                                    output=output,
+                                                    ping_interval=ping_interval,
+                                                    ping_timeout=ping_timeout,
+                                                    close_timeout=close_timeout,
+                                                    stream_buffer_maxlen=stream_buffer_maxlen,
+                                                    process_stream_data=process_stream_data,
+                                                    process_stream_data_async=process_stream_data_async,
+                                                    process_asyncio_queue=process_asyncio_queue,
+                                                    process_stream_data_batch=process_stream_data_batch,
+                                                    process_stream_data_batch_async=process_stream_data_batch_async,
+                                                    asyncio_queue_maxsize=asyncio_queue_maxsize,
+                                                    asyncio_queue_overflow_policy=asyncio_queue_overflow_policy,
+                                                    conflate=conflate,
+                                                    conflate_throttle_ms=conflate_throttle_ms,
+                                                    order_book=order_book,
+                                                    kline_store=kline_store,
+                                                    kline_store_maxlen=kline_store_maxlen,
+                                                    trade_tape=trade_tape,
+                                                    trade_tape_maxlen=trade_tape_maxlen,
+                                                    trade_tape_windows=trade_tape_windows,
+                                                    ticker_cache=ticker_cache))
+            with self.stream_list_lock:
+                logger.debug(f"BybitWebSocketApiManager.create_stream() - `stream_list_lock` was entered!")
+                for shard_id in shard_ids[1:]:
+                    self.stream_list[shard_id]['shard_of'] = shard_ids[0]
+                logger.debug(f"BybitWebSocketApiManager.create_stream() - Leaving `stream_list_lock`!")
+            self.stream_shards[shard_ids[0]] = shard_ids
+            return shard_ids[0]
         output = output or self.output_default
         close_timeout = close_timeout or self.close_timeout_default
         ping_interval = ping_interval or self.ping_interval_default
@@ -1502,19 +2511,58 @@ class BybitWebSocketApiManager(threading.Thread):
                                         stream_buffer_maxlen=stream_buffer_maxlen,
                                         process_stream_data=process_stream_data,
                                         process_stream_data_async=process_stream_data_async,
-                                        process_asyncio_queue=process_asyncio_queue)
+                                        process_asyncio_queue=process_asyncio_queue,
+                                        process_stream_data_batch=process_stream_data_batch,
+                                        process_stream_data_batch_async=process_stream_data_batch_async,
+                                        asyncio_queue_maxsize=asyncio_queue_maxsize,
+                                        asyncio_queue_overflow_policy=asyncio_queue_overflow_policy,
+                                        conflate=conflate,
+                                        conflate_throttle_ms=conflate_throttle_ms,
+                                        order_book=order_book,
+                                        kline_store=kline_store,
+                                        kline_store_maxlen=kline_store_maxlen,
+                                        trade_tape=trade_tape,
+                                        trade_tape_maxlen=trade_tape_maxlen,
+                                        trade_tape_windows=trade_tape_windows,
+                                        ticker_cache=ticker_cache)
         self.set_socket_is_not_ready(stream_id)
-        self.event_loops[stream_id] = None
-        thread = threading.Thread(target=self._create_stream_thread,
-                                  args=(stream_id,
-                                        channels,
-                                        endpoint,
-                                        markets,
-                                        stream_buffer_name,
-                                        stream_buffer_maxlen),
-                                  name=f"_create_stream_thread:  stream_id={stream_id}, time={time.time()}")
-        thread.start()
-        self.stream_threads[stream_id] = thread
+        if self.process_pool is not None:
+            self.event_loops[stream_id] = None
+            # The records of the workers get delivered to the `stream_buffer` by this process
+            self._init_stream_buffer(stream_buffer_name=stream_buffer_name, stream_buffer_maxlen=stream_buffer_maxlen)
+            self.process_pool.create_stream(stream_id=stream_id,
+                                            channels=channels,
+                                            endpoint=endpoint,
+                                            markets=markets,
+                                            stream_label=stream_label,
+                                            api_key=api_key,
+                                            api_secret=api_secret,
+                                            output=output,
+                                            ping_interval=ping_interval,
+                                            ping_timeout=ping_timeout,
+                                            close_timeout=close_timeout)
+        elif self.event_loop_pool is not None:
+            loop = self.event_loop_pool.assign(stream_id=stream_id)
+            self.event_loops[stream_id] = loop
+            asyncio.run_coroutine_threadsafe(self._create_stream_coroutine(stream_id,
+                                                                           channels,
+                                                                           endpoint,
+                                                                           markets,
+                                                                           stream_buffer_name,
+                                                                           stream_buffer_maxlen),
+                                             loop)
+        else:
+            self.event_loops[stream_id] = None
+            thread = threading.Thread(target=self._create_stream_thread,
+                                      args=(stream_id,
+                                            channels,
+                                            endpoint,
+                                            markets,
+                                            stream_buffer_name,
+                                            stream_buffer_maxlen),
+                                      name=f"_create_stream_thread:  stream_id={stream_id}, time={time.time()}")
+            thread.start()
+            self.stream_threads[stream_id] = thread
         while self.is_socket_ready(stream_id=stream_id) is False:
             if self.is_stop_request(stream_id=stream_id) is True \
                     or self.is_crash_request(stream_id=stream_id) is True \
@@ -1526,25 +2574,33 @@ class BybitWebSocketApiManager(threading.Thread):
         if self.event_loops[stream_id] is not None:
             if self.event_loops[stream_id].is_closed():
                 return stream_id
+        if self.process_pool is not None:
+            return stream_id
         if self.specific_process_asyncio_queue[stream_id] is not None:
             logger.debug(f"BybitWebSocketApiManager.create_stream({stream_id} - Adding "
                          f"`specific_process_asyncio_queue[{stream_id}]()` to asyncio loop ...")
             if self.get_event_loop_by_stream_id(stream_id=stream_id) is not None:
-                asyncio.run_coroutine_threadsafe(self._run_process_asyncio_queue(scope="specific",
-                                                                                 stream_id=stream_id),
-                                                 self.get_event_loop_by_stream_id(stream_id=stream_id))
+                future = asyncio.run_coroutine_threadsafe(self._run_process_asyncio_queue(scope="specific",
+                                                                                          stream_id=stream_id),
+                                                          self.get_event_loop_by_stream_id(stream_id=stream_id))
+                if self.event_loop_pool is not None:
+                    self.event_loop_pool.add_future(stream_id=stream_id, future=future)
             else:
                 logger.error(f"BybitWebSocketApiManager.create_stream({stream_id} - No valid asyncio loop!")
         elif self.process_asyncio_queue is not None:
             # The global process_asyncio_queue can be overwritten by specific process stream (async) functions
             if self.specific_process_stream_data[stream_id] is None \
-                    and self.specific_process_stream_data_async[stream_id] is None:
+                    and self.specific_process_stream_data_async[stream_id] is None \
+                    and self.specific_process_stream_data_batch[stream_id] is None \
+                    and self.specific_process_stream_data_batch_async[stream_id] is None:
                 logger.debug(f"BybitWebSocketApiManager.create_stream({stream_id} - "
                              f"Adding `process_asyncio_queue()` to asyncio loop ...")
                 if self.get_event_loop_by_stream_id(stream_id=stream_id) is not None:
-                    asyncio.run_coroutine_threadsafe(self._run_process_asyncio_queue(scope="global",
-                                                                                     stream_id=stream_id),
-                                                     self.get_event_loop_by_stream_id(stream_id=stream_id))
+                    future = asyncio.run_coroutine_threadsafe(self._run_process_asyncio_queue(scope="global",
+                                                                                              stream_id=stream_id),
+                                                              self.get_event_loop_by_stream_id(stream_id=stream_id))
+                    if self.event_loop_pool is not None:
+                        self.event_loop_pool.add_future(stream_id=stream_id, future=future)
                 else:
                     logger.error(f"BybitWebSocketApiManager.create_stream({stream_id} - No valid asyncio loop!")
         return stream_id
@@ -1611,6 +2667,8 @@ class BybitWebSocketApiManager(threading.Thread):
         logger.warning("`BybitWebSocketApiManager.delete_stream_from_stream_list()` is deprecated, use "
                        "`BybitWebSocketApiManager.remove_all_data_of_stream_id()` instead!")
         if self.wait_till_stream_has_stopped(stream_id=stream_id, timeout=timeout) is True:
+            self._sync_stream_statistics(stream_id=stream_id)
+            self.stream_statistics.pop(stream_id, None)
             with self.stream_list_lock:
                 logger.debug(f"BybitWebSocketApiManager.delete_stream_from_stream_list() - `stream_list_lock` "
                              f"was entered!")
@@ -1641,7 +2699,13 @@ class BybitWebSocketApiManager(threading.Thread):
         :return: bool
         """
         logger.debug(f"BybitWebSocketApiManager.remove_all_data_of_stream_id({stream_id}) started ...")
+        for shard_id in self.stream_shards.get(stream_id, [])[1:]:
+            if self.remove_all_data_of_stream_id(stream_id=shard_id, timeout=timeout) is False:
+                return False
         if self.wait_till_stream_has_stopped(stream_id=stream_id, timeout=timeout) is True:
+            self.stream_shards.pop(stream_id, None)
+            self.subscription_index.remove_stream(stream_id=stream_id)
+            self._sync_stream_statistics(stream_id=stream_id)
             with self.stream_list_lock:
                 logger.debug(f"BybitWebSocketApiManager.remove_all_data_of_stream_id() - `stream_list_lock` "
                              f"was entered!")
@@ -1663,10 +2727,47 @@ class BybitWebSocketApiManager(threading.Thread):
                 del self.specific_process_stream_data_async[stream_id]
             except KeyError:
                 pass
+            try:
+                del self.specific_process_stream_data_batch[stream_id]
+            except KeyError:
+                pass
+            try:
+                del self.specific_process_stream_data_batch_async[stream_id]
+            except KeyError:
+                pass
+            try:
+                del self.conflation_buffers[stream_id]
+            except KeyError:
+                pass
+            try:
+                del self.order_books[stream_id]
+            except KeyError:
+                pass
+            try:
+                del self.kline_stores[stream_id]
+            except KeyError:
+                pass
+            try:
+                del self.trade_tapes[stream_id]
+            except KeyError:
+                pass
+            try:
+                del self.ticker_caches[stream_id]
+            except KeyError:
+                pass
+            try:
+                del self.topic_engines[stream_id]
+            except KeyError:
+                pass
+            self.topic_router.remove_stream(stream_id=stream_id)
             try:
                 del self.socket_is_ready[stream_id]
             except KeyError:
                 pass
+            try:
+                del self.stream_statistics[stream_id]
+            except KeyError:
+                pass
             try:
                 del self.stream_threads[stream_id]
             except KeyError:
@@ -1773,17 +2874,11 @@ class BybitWebSocketApiManager(threading.Thread):
         :return: int
         """
         all_receives_last_second = 0
-        last_second_timestamp = int(time.time()) - 1
-        with self.stream_list_lock:
-            logger.debug(f"BybitWebSocketApiManager.get_all_receives_last_second() - `stream_list_lock` "
-                         f"was entered!")
-            for stream_id in self.stream_list:
-                try:
-                    all_receives_last_second += self.stream_list[stream_id]['receives_statistic_last_second']['entries'][
-                        last_second_timestamp]
-                except KeyError:
-                    pass
-            logger.debug(f"BybitWebSocketApiManager.get_all_receives_last_second() - Leaving `stream_list_lock`!")
+        for stream_id in list(self.stream_statistics):
+            try:
+                all_receives_last_second += self.stream_statistics[stream_id].get_receives_last_second()
+            except KeyError:
+                pass
         return all_receives_last_second
 
     def get_bybit_api_status(self):
@@ -1809,6 +2904,56 @@ class BybitWebSocketApiManager(threading.Thread):
             debug_msg = ""
         return debug_msg
 
+    def get_ticker(self, symbol: str = None, stream_id: str = None) -> Optional[dict]:
+        """
+        Get the current state of the ticker of a symbol, the stream has to be created with
+        `create_stream(ticker_cache=True)`.
+
+        The state holds the fields of the last `snapshot` merged with all following deltas, fields which Bybit did not
+        send are `None`.
+
+        :param symbol: The symbol, e.g. `BTCUSDT`
+        :type symbol: str
+        :param stream_id: id of a stream, if `None` the first stream with a ticker of the symbol is used.
+        :type stream_id: str
+        :return: dict - `{'symbol', 'ts', 'cs', 'last_price', 'bid1_price', 'ask1_price', ...}` or `None`
+        """
+        symbol = str(symbol).upper()
+        if stream_id is None:
+            stream_ids = list(self.ticker_caches)
+        else:
+            stream_ids = self.get_stream_shards(stream_id=stream_id)
+        for shard_id in stream_ids:
+            try:
+                ticker = self.ticker_caches[shard_id].get(symbol=symbol)
+            except KeyError:
+                continue
+            if ticker is not None:
+                return ticker.get()
+        return None
+
+    def get_tickers(self, stream_id: str = None) -> Dict[str, dict]:
+        """
+        Get the current state of all cached tickers.
+
+        :param stream_id: id of a stream, if `None` the tickers of all streams are returned.
+        :type stream_id: str
+        :return: dict - `{symbol: {'symbol', 'ts', 'cs', 'last_price', ...}, ...}`
+        """
+        if stream_id is None:
+            stream_ids = list(self.ticker_caches)
+        else:
+            stream_ids = self.get_stream_shards(stream_id=stream_id)
+        tickers = {}
+        for shard_id in stream_ids:
+            try:
+                ticker_cache = self.ticker_caches[shard_id]
+            except KeyError:
+                continue
+            for symbol, ticker in ticker_cache.get_all().items():
+                tickers.setdefault(symbol, ticker)
+        return tickers
+
     @staticmethod
     def get_timestamp() -> int:
         """
@@ -1841,26 +2986,14 @@ class BybitWebSocketApiManager(threading.Thread):
 
         :return: int
         """
-        current_timestamp = int(time.time())
-        last_timestamp = current_timestamp - 1
         try:
-            if self.stream_list[stream_id]['transfer_rate_per_second']['bytes'][last_timestamp] > 0:
-                with self.stream_list_lock:
-                    logger.debug(f"BybitWebSocketApiManager.get_current_receiving_speed() - `stream_list_lock` "
-                                 f"was entered!")
-                    self.stream_list[stream_id]['transfer_rate_per_second']['speed'] = \
-                        self.stream_list[stream_id]['transfer_rate_per_second']['bytes'][last_timestamp]
-                    logger.debug(f"BybitWebSocketApiManager.get_current_receiving_speed() - Leaving "
-                                 f"`stream_list_lock`!")
-        except TypeError:
-            return 0
+            statistics = self.stream_statistics[stream_id]
         except KeyError:
             return 0
-        try:
-            current_receiving_speed = self.stream_list[stream_id]['transfer_rate_per_second']['speed']
-        except KeyError:
-            current_receiving_speed = 0
-        return current_receiving_speed
+        received_bytes_last_second = statistics.get_received_bytes_last_second()
+        if received_bytes_last_second > 0:
+            statistics.speed = received_bytes_last_second
+        return statistics.speed
 
     def get_current_receiving_speed_global(self):
         """
@@ -1869,22 +3002,7 @@ class BybitWebSocketApiManager(threading.Thread):
         :return: int
         """
         current_receiving_speed = 0
-        try:
-            with self.stream_list_lock:
-                logger.debug(f"BybitWebSocketApiManager.get_current_receiving_speed_global() - `stream_list_lock` "
-                             f"was entered!")
-                temp_stream_list = copy.deepcopy(self.stream_list)
-                logger.debug(f"BybitWebSocketApiManager.get_current_receiving_speed_global() - Leaving "
-                             f"`stream_list_lock`!")
-        except RuntimeError as error_msg:
-            logger.debug(f"BybitWebSocketApiManager.get_current_receiving_speed_global() - RuntimeError: "
-                         f"{str(error_msg)}")
-            return 0
-        except TypeError as error_msg:
-            logger.debug(f"BybitWebSocketApiManager.get_current_receiving_speed_global() - RuntimeError: "
-                         f"{str(error_msg)}")
-            return 0
-        for stream_id in temp_stream_list:
+        for stream_id in list(self.stream_statistics):
             current_receiving_speed += self.get_current_receiving_speed(stream_id)
         return current_receiving_speed
 
@@ -1906,7 +3024,7 @@ class BybitWebSocketApiManager(threading.Thread):
 
         :return: list
         """
-        return self.ringbuffer_error
+        return list(self.ringbuffer_error)
 
     def get_event_loop_by_stream_id(self, stream_id: Optional[Union[str, bool]] = False) -> Optional[asyncio.AbstractEventLoop]:
         """
@@ -2101,38 +3219,12 @@ class BybitWebSocketApiManager(threading.Thread):
 
     def get_number_of_subscriptions(self, stream_id):
         """
-        Get the number of subscriptions of a specific stream
+        Get the number of subscribed topics of a specific stream, the topics of all shards are counted.
 
         :return: int
         """
-        count_subscriptions = 0
-        with self.stream_list_lock:
-            logger.debug(f"BybitWebSocketApiManager.get_number_of_subscriptions() - `stream_list_lock` "
-                         f"was entered!")
-            for channel in self.stream_list[stream_id]['channels']:
-                if "!" in channel \
-                        or channel == "orders" \
-                        or channel == "accounts" \
-                        or channel == "transfers" \
-                        or channel == "allTickers" \
-                        or channel == "allMiniTickers" \
-                        or channel == "blockheight":
-                    count_subscriptions += 1
-                    continue
-                else:
-                    for market in self.stream_list[stream_id]['markets']:
-                        if "!" in market \
-                                or market == "orders" \
-                                or market == "accounts" \
-                                or market == "transfers" \
-                                or market == "allTickers" \
-                                or market == "allMiniTickers" \
-                                or market == "blockheight":
-                            count_subscriptions += 1
-                        else:
-                            count_subscriptions += 1
-            logger.debug(f"BybitWebSocketApiManager.get_number_of_subscriptions() - Leaving `stream_list_lock`!")
-        return count_subscriptions
+        return sum(self.subscription_index.get_number_of_topics(stream_id=shard_id)
+                   for shard_id in self.get_stream_shards(stream_id=stream_id))
 
     def get_keep_max_received_last_second_entries(self):
         """
@@ -2155,6 +3247,70 @@ class BybitWebSocketApiManager(threading.Thread):
                  f"{new_id_hash[24:32]}"
         return str(new_id)
 
+    def get_klines(self,
+                   symbol: str = None,
+                   interval: str = None,
+                   limit: Optional[int] = None,
+                   include_open: bool = True,
+                   stream_id: str = None) -> Optional[dict]:
+        """
+        Get the latest candles of a symbol and interval as NumPy arrays, the stream has to be created with
+        `create_stream(kline_store=True)`.
+
+        The arrays are copies in chronological order, e.g. `get_klines("BTCUSDT", "1", limit=20)['close'].mean()`.
+
+        :param symbol: The symbol, e.g. `BTCUSDT`
+        :type symbol: str
+        :param interval: The interval, e.g. `1`
+        :type interval: str
+        :param limit: Number of candles, `None` for all.
+        :type limit: int
+        :param include_open: Set to `False` to get only confirmed candles.
+        :type include_open: bool
+        :param stream_id: id of a stream, if `None` the first stream with a store of the symbol and interval is used.
+        :type stream_id: str
+        :return: dict - `{'start': array, 'open': array, 'high', 'low', 'close', 'volume', 'turnover'}` or `None`
+        """
+        kline_store = self._get_kline_store(symbol=symbol, interval=interval, stream_id=stream_id)
+        if kline_store is None:
+            return None
+        return kline_store.get(limit=limit, include_open=include_open)
+
+    def get_order_book(self, symbol: str = None, depth: Optional[int] = None, stream_id: str = None) -> Optional[dict]:
+        """
+        Get the local order book of a symbol, the stream has to be created with `create_stream(order_book=True)`.
+
+        If a stream subscribes several depths of the symbol, the book with the most levels is used.
+
+        :param symbol: The symbol, e.g. `BTCUSDT`
+        :type symbol: str
+        :param depth: Number of levels per side, `None` for all.
+        :type depth: int
+        :param stream_id: id of a stream, if `None` the first stream with a book of the symbol is used.
+        :type stream_id: str
+        :return: dict - `{'topic', 'symbol', 'u', 'seq', 'ts', 'is_synced', 'bids': [[price, size], ...], 'asks': ...}`
+                 or `None`
+        """
+        order_book = self._get_order_book(symbol=symbol, stream_id=stream_id)
+        if order_book is None:
+            return None
+        return order_book.get(depth=depth)
+
+    def get_order_book_best_bid_ask(self, symbol: str = None, stream_id: str = None) -> Optional[dict]:
+        """
+        Get the best bid and ask of the local order book of a symbol.
+
+        :param symbol: The symbol, e.g. `BTCUSDT`
+        :type symbol: str
+        :param stream_id: id of a stream, if `None` the first stream with a book of the symbol is used.
+        :type stream_id: str
+        :return: dict - `{'bid': (price, size), 'ask': (price, size), 'is_synced': bool}` or `None`
+        """
+        order_book = self._get_order_book(symbol=symbol, stream_id=stream_id)
+        if order_book is None:
+            return None
+        return {'bid': order_book.get_best_bid(), 'ask': order_book.get_best_ask(), 'is_synced': order_book.is_synced}
+
     def get_process_usage_memory(self):
         """
         Get the used memory of this process
@@ -2197,6 +3353,20 @@ class BybitWebSocketApiManager(threading.Thread):
         """
         return self.reconnects
 
+    def get_rejected_topics(self, stream_id: str = None) -> dict:
+        """
+        Get the rejected topics of a specific stream with the `ret_msg` of the rejection, the topics of all shards are
+        included.
+
+        :param stream_id: id of a stream
+        :type stream_id: str
+        :return: dict - `{topic: ret_msg}`
+        """
+        rejected_topics = {}
+        for shard_id in self.get_stream_shards(stream_id=stream_id):
+            rejected_topics.update(self.subscription_index.get_rejected_topics(stream_id=shard_id))
+        return rejected_topics
+
     def get_request_id(self):
         """
         Get a unique `request_id`
@@ -2209,27 +3379,44 @@ class BybitWebSocketApiManager(threading.Thread):
             self.request_id += 1
             return self.request_id
 
-    def get_result_by_request_id(self, request_id=None, timeout=10):
+    def get_result_by_request_id(self, request_id=None, timeout=10):
+        """
+        Get the result related to the provided `request_id`
+
+        :param request_id: if you run `get_stream_subscriptions()
+                           <https://unicorn-bybit-websocket-api.docs.lucit.tech/unicorn_bybit_websocket_api.html#unicorn_bybit_websocket_api.manager.BybitWebSocketApiManager.get_stream_subscriptions>`__
+                           it returns a unique `request_id` - provide it to this method to receive the result.
+        :type request_id: stream_id (uuid)
+        :param timeout: seconds to wait to receive the result. If not there it returns 'None'
+        :type timeout: int
+        :return: `BybitWebSocketApiControlMessage` or None
+        """
+        if request_id is None:
+            return None
+        return self.request_index.wait(req_id=request_id, timeout=timeout)
+
+    def get_request_round_trip_times(self) -> dict:
         """
-        Get the result related to the provided `request_id`
+        Get the statistic of the measured round trip times of requests with `req_id` in milliseconds per `op`, e.g.
+        `subscribe` or the requests of `send_and_wait()`.
 
-        :param request_id: if you run `get_stream_subscriptions()
-                           <https://unicorn-bybit-websocket-api.docs.lucit.tech/unicorn_bybit_websocket_api.html#unicorn_bybit_websocket_api.manager.BybitWebSocketApiManager.get_stream_subscriptions>`__
-                           it returns a unique `request_id` - provide it to this method to receive the result.
-        :type request_id: stream_id (uuid)
-        :param timeout: seconds to wait to receive the result. If not there it returns 'False'
+        :return: dict - `{op: {'count': int, 'last': float, 'min': float, 'avg': float, 'max': float}}`
+        """
+        return self.request_index.get_round_trip_times()
+
+    async def get_result_by_request_id_async(self, request_id=None, timeout=10):
+        """
+        Await the result related to the provided `request_id`, like `get_result_by_request_id()`.
+
+        :param request_id: The `req_id` of the request.
+        :type request_id: int or str
+        :param timeout: seconds to wait to receive the result. If not there it returns 'None'
         :type timeout: int
-        :return: `result` or None
+        :return: `BybitWebSocketApiControlMessage` or None
         """
         if request_id is None:
             return None
-        wait_till_timestamp = time.time() + timeout
-        while wait_till_timestamp >= time.time():
-            for result in self.ringbuffer_result:
-                result_dict = json.loads(result)
-                if result_dict['id'] == request_id:
-                    return result
-        return None
+        return await self.request_index.wait_async(req_id=request_id, timeout=timeout)
 
     def get_results_from_endpoints(self):
         """
@@ -2237,7 +3424,7 @@ class BybitWebSocketApiManager(threading.Thread):
 
         :return: list
         """
-        return self.ringbuffer_result
+        return list(self.ringbuffer_result)
 
     def get_ringbuffer_error_max_size(self):
         """
@@ -2325,6 +3512,25 @@ class BybitWebSocketApiManager(threading.Thread):
         else:
             return None
 
+    def get_stream_ids_by_topic(self, topic: str = None) -> List[str]:
+        """
+        Get the ids of the streams which subscribed a specific topic, e.g. `orderbook.50.BTCUSDT`. A shard is reported
+        by the stream_id of its stream.
+
+        :param topic: The topic, the market gets converted to upper case.
+        :type topic: str
+        :return: list
+        """
+        stream_ids = []
+        for stream_id in self.subscription_index.get_stream_ids(topic=self._normalize_topic(topic)):
+            try:
+                stream_id = self.stream_list[stream_id]['shard_of'] or stream_id
+            except KeyError:
+                pass
+            if stream_id not in stream_ids:
+                stream_ids.append(stream_id)
+        return stream_ids
+
     def get_stream_info(self, stream_id):
         """
         Get all infos about a specific stream
@@ -2334,6 +3540,7 @@ class BybitWebSocketApiManager(threading.Thread):
         :return: set
         """
         current_timestamp = time.time()
+        self._sync_stream_statistics(stream_id=stream_id)
         try:
             with self.stream_list_lock:
                 logger.debug(f"BybitWebSocketApiManager.get_stream_info() - `stream_list_lock` was entered!")
@@ -2363,6 +3570,19 @@ class BybitWebSocketApiManager(threading.Thread):
             logger.debug(f"BybitWebSocketApiManager.get_stream_info() - `stream_list_lock` was entered!")
             self.stream_list[stream_id]['transfer_rate_per_second']['speed'] = current_receiving_speed
             logger.debug(f"BybitWebSocketApiManager.get_stream_info() - Leaving `stream_list_lock`!")
+        if stream_id in self.stream_shards:
+            # Aggregate the shards of the stream
+            temp_stream_list['shards'] = self.get_stream_shards(stream_id=stream_id)
+            for shard_id in temp_stream_list['shards'][1:]:
+                shard_info = self.get_stream_info(stream_id=shard_id)
+                if shard_info is False:
+                    continue
+                temp_stream_list['markets'] = list(temp_stream_list['markets']) + list(shard_info['markets'])
+                for key in ('processed_receives_total', 'processed_transmitted_total', 'subscriptions', 'reconnects',
+                            'asyncio_queue_size', 'asyncio_queue_dropped', 'asyncio_queue_coalesced'):
+                    temp_stream_list[key] += shard_info[key]
+                temp_stream_list['transfer_rate_per_second']['speed'] += \
+                    shard_info['transfer_rate_per_second']['speed']
         return temp_stream_list
 
     def get_stream_label(self, stream_id=None):
@@ -2384,8 +3604,8 @@ class BybitWebSocketApiManager(threading.Thread):
 
     def get_stream_subscriptions(self, stream_id, request_id=None):
         """
-        Get a list of subscriptions of a specific stream from Bybit endpoints - the result can be received via
-        the `stream_buffer` and is also added to the results ringbuffer - `get_results_from_endpoints()
+        Get a list of subscriptions of a specific stream from Bybit endpoints - the result is added to the results
+        ringbuffer - `get_results_from_endpoints()
         <https://unicorn-bybit-websocket-api.docs.lucit.tech/unicorn_bybit_websocket_api.html#unicorn_bybit_websocket_api.manager.BybitWebSocketApiManager.get_results_from_endpoints>`__
         to get all results or use `get_result_by_request_id(request_id)
         <https://unicorn-bybit-websocket-api.docs.lucit.tech/unicorn_bybit_websocket_api.html#unicorn_bybit_websocket_api.manager.BybitWebSocketApiManager.get_result_by_request_id>`__
@@ -2412,6 +3632,30 @@ class BybitWebSocketApiManager(threading.Thread):
         else:
             return None
 
+    def get_subscribed_topics(self, stream_id: str = None) -> Set[str]:
+        """
+        Get the subscribed topics of a specific stream, these are the topics in the state `pending`, `active` or
+        `stale`. The topics of all shards are included.
+
+        :param stream_id: id of a stream
+        :type stream_id: str
+        :return: set
+        """
+        topics = set()
+        for shard_id in self.get_stream_shards(stream_id=stream_id):
+            topics.update(self.subscription_index.get_topics(stream_id=shard_id))
+        return topics
+
+    def get_subscribe_ack_latency_histogram(self) -> dict:
+        """
+        Get the histogram of the time from `subscribe_to_stream()` to the response of Bybit in milliseconds. The
+        `buckets` hold the number of responses per bucket, the key is the upper bound of the bucket, `+Inf` counts the
+        slower responses.
+
+        :return: dict - `{'count': int, 'min': float, 'avg': float, 'max': float, 'buckets': {str: int}}`
+        """
+        return self.subscription_index.get_ack_latency_histogram()
+
     def get_stream_list(self):
         """
         Get a list of all streams
@@ -2458,12 +3702,22 @@ class BybitWebSocketApiManager(threading.Thread):
         :type stream_id: str
         :return: int
         """
-        last_second_timestamp = int(time.time()) - 1
         try:
-            return self.stream_list[stream_id]['receives_statistic_last_second']['entries'][last_second_timestamp]
+            return self.stream_statistics[stream_id].get_receives_last_second()
         except KeyError:
             return 0
 
+    def get_stream_shards(self, stream_id: str = None) -> List[str]:
+        """
+        Get the stream_ids of the connections of a stream, `create_stream()` splits the markets across several
+        connections if the topics exceed the `args_limit` of one connection. The first shard is the stream itself.
+
+        :param stream_id: id of a stream
+        :type stream_id: str
+        :return: list
+        """
+        return list(self.stream_shards.get(stream_id, [stream_id]))
+
     def get_stream_statistic(self, stream_id):
         """
         Get the statistic of a specific stream
@@ -2490,7 +3744,8 @@ class BybitWebSocketApiManager(threading.Thread):
             else:
                 stream_statistic['uptime'] = time.time() - self.stream_list[stream_id]['start_time']
             try:
-                stream_receives_per_second = self.stream_list[stream_id]['processed_receives_total'] / stream_statistic['uptime']
+                stream_receives_per_second = self.stream_statistics[stream_id].processed_receives_total / \
+                                             stream_statistic['uptime']
             except ZeroDivisionError:
                 stream_receives_per_second = 0
             stream_statistic['stream_receives_per_second'] = stream_receives_per_second
@@ -2535,6 +3790,41 @@ class BybitWebSocketApiManager(threading.Thread):
                          f"- `found_entries` = {found_entries}")
             return None
 
+    def get_topic_state(self, topic: str = None, stream_id: str = None) -> Optional[str]:
+        """
+        Get the subscription state of a topic of a specific stream.
+
+        - `pending`: The `subscribe` request is queued or sent and not acknowledged yet.
+        - `active`: Bybit acknowledged the subscription.
+        - `rejected`: Bybit rejected the subscription, see `get_rejected_topics()`.
+        - `stale`: The topic was subscribed by a previous connection of the stream and is not subscribed again yet.
+
+        :param topic: The topic, e.g. `orderbook.50.BTCUSDT`, the market gets converted to upper case.
+        :type topic: str
+        :param stream_id: id of a stream
+        :type stream_id: str
+        :return: "pending", "active", "rejected", "stale" or `None` if the topic is not part of the stream
+        """
+        topic = self._normalize_topic(topic)
+        for shard_id in self.get_stream_shards(stream_id=stream_id):
+            state = self.subscription_index.get_state(topic=topic, stream_id=shard_id)
+            if state is not None:
+                return state
+        return None
+
+    def get_topic_states(self, stream_id: str = None) -> dict:
+        """
+        Get the subscription states of all topics of a specific stream, the topics of all shards are included.
+
+        :param stream_id: id of a stream
+        :type stream_id: str
+        :return: dict - `{topic: state}`
+        """
+        topic_states = {}
+        for shard_id in self.get_stream_shards(stream_id=stream_id):
+            topic_states.update(self.subscription_index.get_states(stream_id=shard_id))
+        return topic_states
+
     def get_total_received_bytes(self):
         """
         Get number of total received bytes
@@ -2542,6 +3832,7 @@ class BybitWebSocketApiManager(threading.Thread):
         :return: int
         """
         # how many bytes did we receive till now?
+        self._sync_stream_statistics()
         return self.total_received_bytes
 
     def get_total_receives(self):
@@ -2550,8 +3841,44 @@ class BybitWebSocketApiManager(threading.Thread):
 
         :return: int
         """
+        self._sync_stream_statistics()
         return self.total_receives
 
+    def get_trade_stats(self, symbol: str = None, stream_id: str = None) -> Optional[dict]:
+        """
+        Get the rolling VWAP, volume and number of trades of a symbol for each window of the trade tape, the stream has
+        to be created with `create_stream(trade_tape=True)`.
+
+        :param symbol: The symbol, e.g. `BTCUSDT`
+        :type symbol: str
+        :param stream_id: id of a stream, if `None` the first stream with a tape of the symbol is used.
+        :type stream_id: str
+        :return: dict - `{window_ms: {'vwap': float or None, 'volume': float, 'count': int}, ...}` or `None`
+        """
+        trade_tape = self._get_trade_tape(symbol=symbol, stream_id=stream_id)
+        if trade_tape is None:
+            return None
+        return trade_tape.get_stats()
+
+    def get_trades(self, symbol: str = None, limit: Optional[int] = None, stream_id: str = None) -> Optional[dict]:
+        """
+        Get the latest trades of a symbol from the trade tape as one column per field in chronological order, the
+        stream has to be created with `create_stream(trade_tape=True)`.
+
+        :param symbol: The symbol, e.g. `BTCUSDT`
+        :type symbol: str
+        :param limit: Number of trades, `None` for all.
+        :type limit: int
+        :param stream_id: id of a stream, if `None` the first stream with a tape of the symbol is used.
+        :type stream_id: str
+        :return: dict - `{'timestamp': array, 'price': array, 'size': array, 'side': array, 'trade_id': list}` or
+                 `None`, the side is `1` for buy and `-1` for sell.
+        """
+        trade_tape = self._get_trade_tape(symbol=symbol, stream_id=stream_id)
+        if trade_tape is None:
+            return None
+        return trade_tape.get_trades(limit=limit)
+
     def get_user_agent(self):
         """
         Get the user_agent string "lib name + lib version + python version"
@@ -2585,22 +3912,8 @@ class BybitWebSocketApiManager(threading.Thread):
         :param size: amount of bytes to add
         :type size: int
         """
-        current_timestamp = int(time.time())
         try:
-            if self.stream_list[stream_id]['transfer_rate_per_second']['bytes'][current_timestamp]:
-                pass
-        except KeyError:
-            with self.stream_list_lock:
-                logger.debug(f"BybitWebSocketApiManager.increase_received_bytes_per_second() - `stream_list_lock` "
-                             f"was entered!")
-                self.stream_list[stream_id]['transfer_rate_per_second']['bytes'][current_timestamp] = 0
-                logger.debug(f"BybitWebSocketApiManager.increase_received_bytes_per_second() - Leaving `stream_list_lock`!")
-        try:
-            with self.stream_list_lock:
-                logger.debug(f"BybitWebSocketApiManager.increase_received_bytes_per_second() - `stream_list_lock` "
-                             f"was entered!")
-                self.stream_list[stream_id]['transfer_rate_per_second']['bytes'][current_timestamp] += size
-                logger.debug(f"BybitWebSocketApiManager.increase_received_bytes_per_second() - Leaving `stream_list_lock`!")
+            self.stream_statistics[stream_id].add_received_bytes(size)
         except KeyError:
             pass
 
@@ -2611,32 +3924,10 @@ class BybitWebSocketApiManager(threading.Thread):
         :param stream_id: id of a stream
         :type stream_id: str
         """
-        current_timestamp = int(time.time())
         try:
-            with self.stream_list_lock:
-                logger.debug(f"BybitWebSocketApiManager.increase_processed_receives_statistic() - `stream_list_lock` "
-                             f"was entered!")
-                self.stream_list[stream_id]['processed_receives_total'] += 1
-                logger.debug(f"BybitWebSocketApiManager.increase_processed_receives_statistic() - Leaving "
-                             f"`stream_list_lock`!")
+            self.stream_statistics[stream_id].add_processed_receive()
         except KeyError:
             return False
-        try:
-            with self.stream_list_lock:
-                logger.debug(f"BybitWebSocketApiManager.increase_processed_receives_statistic() - `stream_list_lock` "
-                             f"was entered!")
-                self.stream_list[stream_id]['receives_statistic_last_second']['entries'][current_timestamp] += 1
-                logger.debug(f"BybitWebSocketApiManager.increase_processed_receives_statistic() - Leaving "
-                             f"`stream_list_lock`!")
-        except KeyError:
-            with self.stream_list_lock:
-                logger.debug(f"BybitWebSocketApiManager.increase_processed_receives_statistic() - `stream_list_lock` "
-                             f"was entered!")
-                self.stream_list[stream_id]['receives_statistic_last_second']['entries'][current_timestamp] = 1
-                logger.debug(f"BybitWebSocketApiManager.increase_processed_receives_statistic() - Leaving "
-                             f"`stream_list_lock`!")
-        with self.total_receives_lock:
-            self.total_receives += 1
 
     def increase_reconnect_counter(self, stream_id=None):
         """
@@ -2659,14 +3950,10 @@ class BybitWebSocketApiManager(threading.Thread):
         :param stream_id: id of a stream
         :type stream_id: str
         """
-        with self.stream_list_lock:
-            logger.debug(f"BybitWebSocketApiManager.increase_transmitted_counter() - `stream_list_lock` was entered!")
-            self.stream_list[stream_id]['processed_transmitted_total'] += 1
-            logger.debug(f"BybitWebSocketApiManager.increase_transmitted_counter() - Leaving `stream_list_lock`!")
-        with self.total_transmitted_lock:
-            logger.debug(f"BybitWebSocketApiManager.increase_transmitted_counter() - `stream_list_lock` was entered!")
-            self.total_transmitted += 1
-            logger.debug(f"BybitWebSocketApiManager.increase_transmitted_counter() - Leaving `stream_list_lock`!")
+        try:
+            self.stream_statistics[stream_id].add_transmit()
+        except KeyError:
+            pass
 
     def is_manager_stopping(self):
         """
@@ -2723,6 +4010,22 @@ class BybitWebSocketApiManager(threading.Thread):
         """
         return self.enable_stream_signal_buffer
 
+    def is_topic_subscribed(self, topic: str = None, stream_id: Optional[str] = None) -> bool:
+        """
+        Is a specific topic subscribed by a stream or by any stream?
+
+        :param topic: The topic, e.g. `orderbook.50.BTCUSDT`, the market gets converted to upper case.
+        :type topic: str
+        :param stream_id: id of a stream or `None` for any stream.
+        :type stream_id: str
+        :return: bool
+        """
+        topic = self._normalize_topic(topic)
+        if stream_id is None:
+            return self.subscription_index.has_topic(topic=topic)
+        return any(self.subscription_index.has_topic(topic=topic, stream_id=shard_id)
+                   for shard_id in self.get_stream_shards(stream_id=stream_id))
+
     def is_update_available(self):
         """
         Is a new release of this package available?
@@ -2756,45 +4059,114 @@ class BybitWebSocketApiManager(threading.Thread):
         else:
             return True
 
-    def pop_stream_data_from_stream_buffer(self, stream_buffer_name: Union[Literal[False], str] = None, mode="FIFO"):
+    def pop_all_stream_data_from_conflation_buffer(self, stream_id: str = None) -> list:
         """
-        Get oldest or latest entry from
+        Get the latest records of all topics with a new record since the last pop from the conflation buffer of a
+        stream created with `create_stream(conflate=True)`.
+
+        :param stream_id: id of a stream
+        :type stream_id: str
+        :return: list
+        """
+        stream_data = []
+        for shard_id in self.get_stream_shards(stream_id=stream_id):
+            try:
+                stream_data += self.conflation_buffers[shard_id].pop_all()
+            except KeyError:
+                pass
+        return stream_data
+
+    def pop_many_stream_data_from_stream_buffer(self,
+                                                stream_buffer_name: Union[Literal[False], str] = None,
+                                                max_items: int = 1000,
+                                                mode="FIFO",
+                                                timeout: Optional[float] = 0.0) -> list:
+        """
+        Get up to `max_items` of the oldest or latest entries from
         `stream_buffer <https://github.com/LUCIT-Systems-and-Development/unicorn-bybit-websocket-api/wiki/%60stream_buffer%60>`__
-        and remove from FIFO/LIFO stack.
+        with one lock acquisition and remove them from the FIFO/LIFO stack.
 
         :param stream_buffer_name: `False` to read from generic stream_buffer, the stream_id if you used True in
                                    create_stream() or the string name of a shared stream_buffer.
         :type stream_buffer_name: False or str
+        :param max_items: Max number of entries to return.
+        :type max_items: int
         :param mode: How to read from the `stream_buffer` - "FIFO" (default) or "LIFO".
         :type mode: str
-        :return: stream_data - str, dict or None
+        :param timeout: Max seconds to wait for data if the `stream_buffer` is empty. `0.0` (default) does not wait,
+                        `None` waits until data is available.
+        :type timeout: float or None
+        :return: list
         """
-        if stream_buffer_name is None:
-            try:
-                with self.stream_buffer_lock:
-                    if mode.upper() == "FIFO":
-                        stream_data = self.stream_buffer.popleft()
-                    elif mode.upper() == "LIFO":
-                        stream_data = self.stream_buffer.pop()
-                    else:
-                        return None
-                return stream_data
-            except IndexError:
-                return None
+        if mode.upper() == "FIFO":
+            fifo = True
+        elif mode.upper() == "LIFO":
+            fifo = False
+        else:
+            return []
+        if stream_buffer_name is None or stream_buffer_name is False:
+            stream_buffer = self.stream_buffer
+            stream_buffer_lock = self.stream_buffer_lock
         else:
             try:
-                with self.stream_buffer_locks[stream_buffer_name]:
-                    if mode.upper() == "FIFO":
-                        stream_data = self.stream_buffers[stream_buffer_name].popleft()
-                    elif mode.upper() == "LIFO":
-                        stream_data = self.stream_buffers[stream_buffer_name].pop()
-                    else:
-                        return None
-                return stream_data
-            except IndexError:
-                return None
+                stream_buffer = self.stream_buffers[stream_buffer_name]
+                stream_buffer_lock = self.stream_buffer_locks[stream_buffer_name]
             except KeyError:
-                return None
+                return []
+        with stream_buffer_lock:
+            if not stream_buffer and timeout != 0.0:
+                stream_buffer_lock.wait_for(lambda: len(stream_buffer) > 0, timeout=timeout)
+            items = min(max_items, len(stream_buffer))
+            if fifo is True:
+                return [stream_buffer.popleft() for _ in range(items)]
+            else:
+                return [stream_buffer.pop() for _ in range(items)]
+
+    def pop_stream_data_from_conflation_buffer(self, stream_id: str = None):
+        """
+        Get the latest record of the oldest topic with a new record since the last pop from the conflation buffer of a
+        stream created with `create_stream(conflate=True)`.
+
+        :param stream_id: id of a stream
+        :type stream_id: str
+        :return: stream_data - str, dict, BybitWebSocketApiTypedMessage or None
+        """
+        for shard_id in self.get_stream_shards(stream_id=stream_id):
+            try:
+                stream_data = self.conflation_buffers[shard_id].pop()
+            except KeyError:
+                continue
+            if stream_data is not None:
+                return stream_data
+        return None
+
+    def pop_stream_data_from_stream_buffer(self,
+                                           stream_buffer_name: Union[Literal[False], str] = None,
+                                           mode="FIFO",
+                                           timeout: Optional[float] = 0.0):
+        """
+        Get oldest or latest entry from
+        `stream_buffer <https://github.com/LUCIT-Systems-and-Development/unicorn-bybit-websocket-api/wiki/%60stream_buffer%60>`__
+        and remove from FIFO/LIFO stack.
+
+        :param stream_buffer_name: `False` to read from generic stream_buffer, the stream_id if you used True in
+                                   create_stream() or the string name of a shared stream_buffer.
+        :type stream_buffer_name: False or str
+        :param mode: How to read from the `stream_buffer` - "FIFO" (default) or "LIFO".
+        :type mode: str
+        :param timeout: Max seconds to wait for data if the `stream_buffer` is empty. `0.0` (default) does not wait,
+                        `None` waits until data is available. The waiting thread wakes up as soon as data is added, so
+                        there is no need to poll with `time.sleep()`.
+        :type timeout: float or None
+        :return: stream_data - str, dict or None
+        """
+        stream_data = self.pop_many_stream_data_from_stream_buffer(stream_buffer_name=stream_buffer_name,
+                                                                   max_items=1,
+                                                                   mode=mode,
+                                                                   timeout=timeout)
+        if stream_data:
+            return stream_data[0]
+        return None
 
     def pop_stream_signal_from_stream_signal_buffer(self):
         """
@@ -2811,6 +4183,32 @@ class BybitWebSocketApiManager(threading.Thread):
         except IndexError:
             return False
 
+    def process_control_message(self, control_message: BybitWebSocketApiControlMessage = None) -> bool:
+        """
+        Handle a received control message of an endpoint (a frame without `topic`, e.g. the response to `subscribe`).
+
+        Control messages are not delivered to the `stream_buffer`, the callbacks or the `asyncio_queue` of the stream.
+        Errors (`success` is `False`) are added to the error ringbuffer - `get_errors_from_endpoints()`, all other
+        control messages to the result ringbuffer - `get_results_from_endpoints()`. Messages with a `req_id` are indexed
+        for `get_result_by_request_id()`, the responses to `subscribe` and `unsubscribe` update the `subscriptions` of
+        the stream.
+
+        :param control_message: The received control message.
+        :type control_message: BybitWebSocketApiControlMessage
+        :return: bool
+        """
+        if control_message is None:
+            return False
+        self.request_index.add(control_message)
+        self._process_subscription_response(control_message)
+        if control_message.is_error():
+            logger.error(f"BybitWebSocketApiManager.process_control_message() - stream_id={control_message.stream_id} "
+                         f"- Received error message: {control_message}")
+            return self.add_to_ringbuffer_error(control_message)
+        logger.debug(f"BybitWebSocketApiManager.process_control_message() - stream_id={control_message.stream_id} - "
+                     f"Received result message: {control_message}")
+        return self.add_to_ringbuffer_result(control_message)
+
     def print_stream_info(self, stream_id: str = None, add_string: str = None, footer: str = None, title: str = None):
         """
         Print all infos about a specific stream, helps debugging :)
@@ -2980,6 +4378,7 @@ class BybitWebSocketApiManager(threading.Thread):
         :param title: set a title (first row) for print_summary output
         :type title: str
         """
+        self._sync_stream_statistics()
         streams = len(self.stream_list)
         active_streams = 0
         crashed_streams = 0
@@ -3219,6 +4618,45 @@ class BybitWebSocketApiManager(threading.Thread):
                   '"$(date)" ' + print_summary_export_path + 'print_summary.png')
         return True
 
+    def register_topic_handler(self,
+                               topic: str = None,
+                               handler: Callable = None,
+                               stream_id: str = None,
+                               output: Optional[Literal['dict', 'raw_data', 'typed']] = None) -> bool:
+        """
+        Register a function or coroutine function as handler for a topic or a topic pattern.
+
+        Patterns can contain `*` wildcards, e.g. `orderbook.50.*` or `kline.1.*`. They are compiled once and the
+        matching handlers of a topic get cached, so the dispatch of a frame stays a single dict lookup. This way one
+        stream per endpoint can serve many consumers.
+
+        Received frames are pre-parsed with `parse_frame_header()`, which only extracts `topic`, `op` and `type`. If
+        there is a handler for the topic, the frame gets decoded once per `output` format of the handlers and is
+        delivered to all of them instead of the `stream_buffer`, the callbacks or the `asyncio_queue` of the stream.
+        Frames without a handler take the usual way and get decoded in the `output` format of the stream, so a stream
+        with `output="raw_data"` only decodes the topics someone has registered a handler for.
+
+        With `process_pool_size` the frames are already decoded in the `output` format of the stream and get routed by
+        the parent process in this format, coroutine functions are not supported in this mode.
+
+        :param topic: The topic, e.g. `orderbook.50.BTCUSDT`, or a pattern, e.g. `orderbook.50.*`
+        :type topic: str
+        :param handler: Function or coroutine function which gets called with the received record.
+        :type handler: function
+        :param stream_id: id of a stream, if `None` the handler is used for all streams.
+        :type stream_id: str
+        :param output: Format of the record: "raw_data", "dict" or "typed". Default is `output_default` of the manager.
+        :type output: str
+        :return: bool
+        """
+        if self.process_pool is not None and asyncio.iscoroutinefunction(handler):
+            raise ValueError(f"Coroutine functions can not be used as topic handler in combination with "
+                             f"`process_pool_size`!")
+        return self.topic_router.register(topic=topic,
+                                          callback=handler,
+                                          stream_id=stream_id,
+                                          output=output or self.output_default)
+
     @staticmethod
     def remove_ansi_escape_codes(text):
         """
@@ -3246,7 +4684,7 @@ class BybitWebSocketApiManager(threading.Thread):
                        new_api_key=None,
                        new_api_secret=None,
                        new_symbols=None,
-                       new_output: Optional[Literal['dict', 'raw_data']] = None,
+                       new_output: Optional[Literal['dict', 'raw_data', 'typed']] = None,
                        new_ping_interval=20,
                        new_ping_timeout=20,
                        new_close_timeout=10,
@@ -3278,8 +4716,9 @@ class BybitWebSocketApiManager(threading.Thread):
         :param new_symbols: provide the symbols for isolated_margin user_data streams
         :type new_symbols: str
         :return: new stream_id
-        :param new_output: set to "dict" to convert the received raw data to a python dict - otherwise
-                           the output remains unchanged and gets delivered as received from the endpoints
+        :param new_output: set to "dict" to convert the received raw data to a python dict, set to "typed" to
+                           receive `BybitWebSocketApiTypedMessage` objects - otherwise the output remains unchanged and
+                           gets delivered as received from the endpoints
         :type new_output: str
         :param new_ping_interval: Once the connection is open, a `Ping frame` is sent every
                                   `ping_interval` seconds. This serves as a keepalive. It helps keeping
@@ -3324,6 +4763,70 @@ class BybitWebSocketApiManager(threading.Thread):
             self.stop_stream(stream_id=stream_id, delete_listen_key=False)
         return new_stream_id
 
+    def _schedule_resync_topic(self, stream_id: str = None, topic: str = None, reason: Optional[str] = None) -> bool:
+        """
+        Schedule `resync_topic()` in the event loop of the stream and return at once. The local order books detect gaps
+        while the socket processes a received record, the resynchronization runs after the record is delivered.
+
+        :param stream_id: id of a stream or a shard
+        :type stream_id: str
+        :param topic: The topic, e.g. `orderbook.50.BTCUSDT`
+        :type topic: str
+        :param reason: The reason of the resynchronization, added to the stream signal.
+        :type reason: str
+        :return: bool
+        """
+        loop = self.get_event_loop_by_stream_id(stream_id=stream_id)
+        if loop is None:
+            logger.error(f"BybitWebSocketApiManager._schedule_resync_topic({stream_id}) - No valid asyncio loop!")
+            return False
+        try:
+            loop.call_soon_threadsafe(self.resync_topic, stream_id, topic, reason)
+        except RuntimeError as error_msg:
+            logger.error(f"BybitWebSocketApiManager._schedule_resync_topic({stream_id}) - RuntimeError: {error_msg}")
+            return False
+        return True
+
+    def resync_topic(self, stream_id: str = None, topic: str = None, reason: Optional[str] = None) -> bool:
+        """
+        Unsubscribe and subscribe a single topic again to receive a new `snapshot` of it, e.g. after a gap in the
+        updates of an order book. All other topics of the connection keep streaming.
+
+        Streams created with `create_stream(order_book=True)` or `create_stream(conflate=True)` resynchronize their
+        local order books automatically, the deltas of a book are dropped till its new `snapshot` arrives. Each
+        resynchronization is reported with a `TOPIC_RESYNC` stream signal.
+
+        :param stream_id: id of a stream or a shard
+        :type stream_id: str
+        :param topic: The topic, e.g. `orderbook.50.BTCUSDT`
+        :type topic: str
+        :param reason: The reason of the resynchronization, added to the stream signal.
+        :type reason: str
+        :return: bool
+        """
+        topic = self._normalize_topic(topic)
+        for shard_id in self.get_stream_shards(stream_id=stream_id):
+            if self.subscription_index.get_state(topic=topic, stream_id=shard_id) in (TOPIC_ACTIVE, TOPIC_PENDING):
+                stream_id = shard_id
+                break
+        else:
+            logger.error(f"BybitWebSocketApiManager.resync_topic({stream_id}) - Topic '{topic}' is not subscribed!")
+            return False
+        if self.process_pool is not None and self.process_pool.has_stream(stream_id=stream_id):
+            logger.error(f"BybitWebSocketApiManager.resync_topic({stream_id}) - Not available for streams of the "
+                         f"process pool!")
+            return False
+        with self.stream_list_lock:
+            logger.debug(f"BybitWebSocketApiManager.resync_topic() - `stream_list_lock` was entered!")
+            self.subscription_index.set_state(stream_id=stream_id, topics=[topic], state=TOPIC_PENDING)
+            logger.debug(f"BybitWebSocketApiManager.resync_topic() - Leaving `stream_list_lock`!")
+        logger.warning(f"BybitWebSocketApiManager.resync_topic({stream_id}) - Resubscribing topic '{topic}': {reason}")
+        self._send_subscription_payload(stream_id=stream_id,
+                                        payload=self.split_payload(params=[topic], method="unsubscribe") +
+                                        self.split_payload(params=[topic], method="subscribe"))
+        self.send_stream_signal(signal_type="TOPIC_RESYNC", stream_id=stream_id, data_record=topic, error_msg=reason)
+        return True
+
     def run(self):
         """
         This method overloads `threading.run()` and starts management functions
@@ -3363,6 +4866,10 @@ class BybitWebSocketApiManager(threading.Thread):
                         logger.debug(f"BybitWebSocketApiManager.run() finally - error_msg: {error_msg}")
                 if not loop.is_closed():
                     loop.close()
+            if self.event_loop_pool is not None:
+                self.event_loop_pool.stop(timeout=10.0)
+            if self.process_pool is not None:
+                self.process_pool.stop(timeout=10.0)
 
     def set_heartbeat(self, stream_id) -> None:
         """
@@ -3372,10 +4879,7 @@ class BybitWebSocketApiManager(threading.Thread):
         """
         logger.debug("BybitWebSocketApiManager.set_heartbeat(" + str(stream_id) + ")")
         try:
-            with self.stream_list_lock:
-                logger.debug(f"BybitWebSocketApiManager.set_heartbeat() - `stream_list_lock` was entered!")
-                self.stream_list[stream_id]['last_heartbeat'] = time.time()
-                logger.debug(f"BybitWebSocketApiManager.set_heartbeat() - Leaving `stream_list_lock`!")
+            self.stream_statistics[stream_id].set_heartbeat()
         except KeyError:
             pass
         return None
@@ -3406,6 +4910,8 @@ class BybitWebSocketApiManager(threading.Thread):
         :return: bool
         """
         self.ringbuffer_error_max_size = int(max_size)
+        self.ringbuffer_error = deque(self.ringbuffer_error, maxlen=self.ringbuffer_error_max_size)
+        return True
 
     def set_ringbuffer_result_max_size(self, max_size):
         """
@@ -3416,6 +4922,9 @@ class BybitWebSocketApiManager(threading.Thread):
         :return: bool
         """
         self.ringbuffer_result_max_size = int(max_size)
+        self.ringbuffer_result = deque(self.ringbuffer_result, maxlen=self.ringbuffer_result_max_size)
+        self.request_index.max_size = self.ringbuffer_result_max_size
+        return True
 
     def is_socket_ready(self, stream_id: str = None) -> bool:
         """
@@ -3481,37 +4990,51 @@ class BybitWebSocketApiManager(threading.Thread):
         :type number_of_max_entries: int
         """
         self.keep_max_received_last_second_entries = number_of_max_entries
+        for stream_id in list(self.stream_statistics):
+            try:
+                self.stream_statistics[stream_id].keep_max_entries = number_of_max_entries
+            except KeyError:
+                pass
 
-    def split_payload(self, params, method, max_items_per_request=350):
+    def split_payload(self,
+                      params: List[str] = None,
+                      method: str = None,
+                      max_items_per_request: Optional[int] = None,
+                      max_chars_per_request: Optional[int] = None) -> Optional[List[dict]]:
         """
-        Sending more than 8000 chars via websocket.send() leads to a connection loss, 350 list elements is a good limit
-        to keep the payload length under 8000 chars and avoid reconnects
+        Pack the topics into the minimum number of requests within the args limits of Bybit.
+
+        The topics are packed in order, a request is closed as soon as the next topic would exceed
+        `max_items_per_request` args or `max_chars_per_request` characters of the JSON encoded `args` array. Duplicate
+        topics are removed.
+
+        `Args limits <https://bybit-exchange.github.io/docs/v5/ws/connect#public-channel---args-limits>`__
 
-        :param params: params of subscribe payload
+        :param params: The topics, e.g. `["kline.1.BTCUSDT", "kline.1.ETHUSDT"]`
         :type params: list
-        :param method: SUBSCRIBE or UNSUBSCRIBE
+        :param method: `subscribe` or `unsubscribe`
         :type method: str
-        :param max_items_per_request: max size for params, if more it gets split
-        :return: list or False
+        :param max_items_per_request: Max number of args of a request, `None` or `0` for no limit.
+        :type max_items_per_request: int
+        :param max_chars_per_request: Max length of the JSON encoded `args` array, `None` for no limit.
+        :type max_chars_per_request: int
+        :return: list or None
         """
-        count_items = 0
-        add_params = []
         payload = []
-        for param in params:
-            add_params.append(param)
-            count_items += 1
-            if count_items > max_items_per_request:
-                add_payload = {"method": method,
-                               "params": add_params,
-                               "id": self.get_request_id()}
-                payload.append(add_payload)
-                count_items = 0
+        add_params = []
+        chars = 2
+        for param in dict.fromkeys(params):
+            # "topic" plus a comma
+            param_chars = len(param) + 3
+            if add_params and ((max_items_per_request and len(add_params) >= max_items_per_request)
+                               or (max_chars_per_request and chars + param_chars - 1 > max_chars_per_request)):
+                payload.append({"req_id": str(self.get_request_id()), "op": method, "args": add_params})
                 add_params = []
+                chars = 2
+            add_params.append(param)
+            chars += param_chars
         if len(add_params) > 0:
-            add_payload = {"method": method,
-                           "params": add_params,
-                           "id": self.get_request_id()}
-            payload.append(add_payload)
+            payload.append({"req_id": str(self.get_request_id()), "op": method, "args": add_params})
             return payload
         else:
             logger.error(f"BybitWebSocketApiManager.split_payload() result is None!")
@@ -3596,6 +5119,10 @@ class BybitWebSocketApiManager(threading.Thread):
                 logger.debug(f"BybitWebSocketApiManager.stop_stream() - Leaving `stream_list_lock`!")
         except KeyError:
             return False
+        if self.process_pool is not None:
+            self.process_pool.stop_stream(stream_id=stream_id)
+        for shard_id in self.stream_shards.get(stream_id, [])[1:]:
+            self.stop_stream(stream_id=shard_id, delete_listen_key=delete_listen_key)
         if delete_listen_key:
             try:
                 self.delete_listen_key_by_stream_id(stream_id)
@@ -3703,6 +5230,9 @@ class BybitWebSocketApiManager(threading.Thread):
         If you provide one channel and one market, then every subscribed market is going to get added to the new channel
         and all subscribed channels are going to get added to the new market!
 
+        If the topics of a connection would exceed the `args_limit`, markets get moved to other shards of the stream or
+        new shards get opened, see `get_stream_shards()`.
+
         `How are the parameter `channels` and `markets` used with
         `subscriptions <https://unicorn-bybit-websocket-api.docs.lucit.tech/unicorn_bybit_websocket_api.html#unicorn_bybit_websocket_api.manager.BybitWebSocketApiManager.create_stream>`__
 
@@ -3719,6 +5249,25 @@ class BybitWebSocketApiManager(threading.Thread):
         if stream_id is None:
             logger.critical(f"BybitWebSocketApiManager.subscribe_to_stream() - error_msg: `stream_id` is missing!")
             return False
+        if stream_id not in self.stream_shards and self.process_pool is not None \
+                and self.process_pool.has_stream(stream_id=stream_id):
+            return self._subscribe_to_connection(stream_id=stream_id, channels=channels, markets=markets)
+        return self._subscribe_to_stream_shards(stream_id=stream_id, channels=channels, markets=markets)
+
+    def _subscribe_to_connection(self, stream_id: str = None, channels=None, markets=None) -> bool:
+        """
+        Subscribe channels and/or markets to a single connection, a stream without shards or one shard of a stream.
+
+        :param stream_id: id of a stream or a shard
+        :type stream_id: str
+        :param channels: provide the channels you wish to subscribe
+        :type channels: str, list, set
+        :param markets: provide the markets you wish to subscribe
+        :type markets: str, list, set
+        :return: bool
+        """
+        if self.process_pool is not None and self.process_pool.has_stream(stream_id=stream_id):
+            return self.process_pool.subscribe_to_stream(stream_id=stream_id, channels=channels, markets=markets)
         if channels is None:
             channels = []
         else:
@@ -3753,41 +5302,54 @@ class BybitWebSocketApiManager(threading.Thread):
                 logger.debug(f"BybitWebSocketApiManager.subscribe_to_stream() - `stream_list_lock` was entered!")
                 self.stream_list[stream_id]['markets'] = list(self.stream_list[stream_id]['markets'])
                 logger.debug(f"BybitWebSocketApiManager.subscribe_to_stream() - Leaving `stream_list_lock`!")
+        markets = [str(market).upper() for market in markets]
         with self.stream_list_lock:
             logger.debug(f"BybitWebSocketApiManager.subscribe_to_stream() - `stream_list_lock` was entered!")
-            self.stream_list[stream_id]['channels'] = list(set(self.stream_list[stream_id]['channels'] + channels))
-            logger.debug(f"BybitWebSocketApiManager.subscribe_to_stream() - Leaving `stream_list_lock`!")
-        markets_new = []
-        for market in markets:
-            markets_new.append(str(market).upper())
-        with self.stream_list_lock:
-            logger.debug(f"BybitWebSocketApiManager.subscribe_to_stream() - `stream_list_lock` was entered!")
-            self.stream_list[stream_id]['markets'] = list(set(self.stream_list[stream_id]['markets'] + markets_new))
-            logger.debug(f"BybitWebSocketApiManager.subscribe_to_stream() - Leaving `stream_list_lock`!")
-        payload = self.create_payload(stream_id, "subscribe",
-                                      channels=self.stream_list[stream_id]['channels'],
-                                      markets=self.stream_list[stream_id]['markets'])
-        subscriptions = self.get_number_of_subscriptions(stream_id)
-        with self.stream_list_lock:
-            logger.debug(f"BybitWebSocketApiManager.subscribe_to_stream() - `stream_list_lock` was entered!")
-            self.stream_list[stream_id]['subscriptions'] = subscriptions
+            self.stream_list[stream_id]['channels'] = list(dict.fromkeys(self.stream_list[stream_id]['channels'] +
+                                                                         channels))
+            self.stream_list[stream_id]['markets'] = list(dict.fromkeys([str(market).upper() for market in
+                                                                         self.stream_list[stream_id]['markets']] +
+                                                                        markets))
+            # Only the topics of the given channels and markets which are not subscribed yet get sent
+            topics = self.subscription_index.add(
+                stream_id=stream_id,
+                topics=dict.fromkeys([f"{channel}.{market}"
+                                      for channel in channels
+                                      for market in self.stream_list[stream_id]['markets']] +
+                                     [f"{channel}.{market}"
+                                      for channel in self.stream_list[stream_id]['channels']
+                                      for market in markets]))
             logger.debug(f"BybitWebSocketApiManager.subscribe_to_stream() - Leaving `stream_list_lock`!")
-        # Todo: control subscription limit!
+        if not topics:
+            logger.info(f"BybitWebSocketApiManager.subscribe_to_stream({str(stream_id)}, {str(channels)}, "
+                        f"{str(markets)}) - All topics are already subscribed!")
+            return True
+        payload = self.split_payload(params=topics,
+                                     method="subscribe",
+                                     max_items_per_request=self._get_max_args_per_request(stream_id),
+                                     max_chars_per_request=self.args_limit)
         if payload is None:
             logger.error(f"BybitWebSocketApiManager.subscribe_to_stream({str(stream_id)}) - error_msg: Payload is "
                          f"None!")
             return False
-        try:
-            for item in payload:
-                if self.send_with_stream(stream_id=stream_id, payload=item) is False:
-                    self.add_payload_to_stream(stream_id=stream_id, payload=item)
-            logger.info(f"BybitWebSocketApiManager.subscribe_to_stream({str(stream_id)}, {str(channels)}, "
-                        f"{str(markets)}) finished ...")
-            return True
-        except TypeError as error_msg:
-            logger.error(f"BybitWebSocketApiManager.subscribe_to_stream({str(stream_id)}) - TypeError - "
-                         f"{str(error_msg)}")
-            return False
+        self._send_subscription_payload(stream_id=stream_id, payload=payload)
+        logger.info(f"BybitWebSocketApiManager.subscribe_to_stream({str(stream_id)}, {str(channels)}, "
+                    f"{str(markets)}) finished ...")
+        return True
+
+    def unregister_topic_handler(self, topic: str = None, handler: Callable = None, stream_id: str = None) -> bool:
+        """
+        Remove a handler registered with `register_topic_handler()`.
+
+        :param topic: The topic or pattern used with `register_topic_handler()`.
+        :type topic: str
+        :param handler: Remove only this handler, if `None` all handlers of the topic get removed.
+        :type handler: function
+        :param stream_id: id of a stream or `None` for the global handlers.
+        :type stream_id: str
+        :return: bool
+        """
+        return self.topic_router.unregister(topic=topic, callback=handler, stream_id=stream_id)
 
     def unsubscribe_from_stream(self, stream_id: str = None, channels=None, markets=None) -> bool:
         """
@@ -3812,6 +5374,26 @@ class BybitWebSocketApiManager(threading.Thread):
         if stream_id is None:
             logger.critical(f"BybitWebSocketApiManager.unsubscribe_from_stream() - error_msg: `stream_id` is missing!")
             return False
+        if stream_id in self.stream_shards:
+            return all([self._unsubscribe_from_connection(stream_id=shard_id, channels=channels, markets=markets)
+                        for shard_id in self.stream_shards[stream_id]])
+        return self._unsubscribe_from_connection(stream_id=stream_id, channels=channels, markets=markets)
+
+    def _unsubscribe_from_connection(self, stream_id: str = None, channels=None, markets=None) -> bool:
+        """
+        Unsubscribe channels and/or markets from a single connection, a stream without shards or one shard of a
+        stream.
+
+        :param stream_id: id of a stream or a shard
+        :type stream_id: str
+        :param channels: provide the channels you wish to unsubscribe
+        :type channels: str, list, set
+        :param markets: provide the markets you wish to unsubscribe
+        :type markets: str, list, set
+        :return: bool
+        """
+        if self.process_pool is not None and self.process_pool.has_stream(stream_id=stream_id):
+            return self.process_pool.unsubscribe_from_stream(stream_id=stream_id, channels=channels, markets=markets)
         if markets is None:
             markets = []
         if channels is None:
@@ -3830,49 +5412,46 @@ class BybitWebSocketApiManager(threading.Thread):
                 logger.debug(f"BybitWebSocketApiManager.unsubscribe_from_stream() - `stream_list_lock` was entered!")
                 self.stream_list[stream_id]['markets'] = [self.stream_list[stream_id]['markets']]
                 logger.debug(f"BybitWebSocketApiManager.unsubscribe_from_stream() - Leaving `stream_list_lock`!")
-        for channel in channels:
-            try:
-                with self.stream_list_lock:
-                    logger.debug(f"BybitWebSocketApiManager.unsubscribe_from_stream() - `stream_list_lock` was "
-                                 f"entered!")
-                    self.stream_list[stream_id]['channels'].remove(channel)
-                    logger.debug(f"BybitWebSocketApiManager.unsubscribe_from_stream() - Leaving `stream_list_lock`!")
-            except ValueError:
-                pass
-        for i in range(len(markets)):
-            markets[i] = markets[i].lower()
-        for market in markets:
-            if re.match(r'[a-zA-Z0-9]{41,43}', market) is None:
-                try:
-                    with self.stream_list_lock:
-                        logger.debug(f"BybitWebSocketApiManager.unsubscribe_from_stream() - `stream_list_lock` was "
-                                     f"entered!")
-                        self.stream_list[stream_id]['markets'].remove(market)
-                        logger.debug(f"BybitWebSocketApiManager.unsubscribe_from_stream() - Leaving "
-                                     f"`stream_list_lock`!")
-                except ValueError:
-                    pass
-        payload = self.create_payload(stream_id, "unsubscribe", channels=channels, markets=markets)
+        markets = [str(market).upper() for market in markets]
+        with self.stream_list_lock:
+            logger.debug(f"BybitWebSocketApiManager.unsubscribe_from_stream() - `stream_list_lock` was entered!")
+            # Only the subscribed topics of the given channels and markets get sent
+            topics = self.subscription_index.remove(
+                stream_id=stream_id,
+                topics=dict.fromkeys([f"{channel}.{str(market).upper()}"
+                                      for channel in channels
+                                      for market in self.stream_list[stream_id]['markets']] +
+                                     [f"{channel}.{market}"
+                                      for channel in self.stream_list[stream_id]['channels']
+                                      for market in markets]))
+            channels = set(channels)
+            markets = set(markets)
+            self.stream_list[stream_id]['channels'] = [channel for channel in self.stream_list[stream_id]['channels']
+                                                       if channel not in channels]
+            self.stream_list[stream_id]['markets'] = [market for market in self.stream_list[stream_id]['markets']
+                                                      if str(market).upper() not in markets]
+            logger.debug(f"BybitWebSocketApiManager.unsubscribe_from_stream() - Leaving `stream_list_lock`!")
+        topic_engines = self.topic_engines.get(stream_id)
+        if topic_engines is not None:
+            for topic in topics:
+                engines = topic_engines.get(topic.split(".", 1)[0] + ".")
+                if engines is not None:
+                    engines.remove(topic=topic)
+        if not topics:
+            logger.info(f"BybitWebSocketApiManager.unsubscribe_from_stream({str(stream_id)}, {str(channels)}, "
+                        f"{str(markets)}) - No subscribed topic to remove!")
+            return True
+        payload = self.split_payload(params=topics,
+                                     method="unsubscribe",
+                                     max_items_per_request=self._get_max_args_per_request(stream_id),
+                                     max_chars_per_request=self.args_limit)
         if payload is None:
             logger.error(f"BybitWebSocketApiManager.unsubscribe_from_stream({str(stream_id)}) - error_msg: Payload "
                          f"is None!")
             return False
-        try:
-            for item in payload:
-                if self.send_with_stream(stream_id=stream_id, payload=item) is False:
-                    self.add_payload_to_stream(stream_id=stream_id, payload=item)
-            subscriptions = self.get_number_of_subscriptions(stream_id)
-            with self.stream_list_lock:
-                logger.debug(f"BybitWebSocketApiManager.unsubscribe_from_stream() - `stream_list_lock` was "
-                             f"entered!")
-                self.stream_list[stream_id]['subscriptions'] = subscriptions
-                logger.debug(f"BybitWebSocketApiManager.unsubscribe_from_stream() - Leaving `stream_list_lock`!")
-            logger.info(f"BybitWebSocketApiManager.unsubscribe_from_stream({str(stream_id)}, {str(channels)}, "
-                        f"{str(markets)}) finished ...")
-        except TypeError as error_msg:
-            logger.error(f"BybitWebSocketApiManager.unsubscribe_from_stream({str(stream_id)}) - TypeError - "
-                         f"{str(error_msg)}")
-            return False
+        self._send_subscription_payload(stream_id=stream_id, payload=payload)
+        logger.info(f"BybitWebSocketApiManager.unsubscribe_from_stream({str(stream_id)}, {str(channels)}, "
+                    f"{str(markets)}) finished ...")
         return True
 
     def wait_till_stream_has_started(self, stream_id, timeout: float = 0.0) -> bool:
@@ -3892,7 +5471,7 @@ class BybitWebSocketApiManager(threading.Thread):
         logger.debug(f"BybitWebSocketApiManager.wait_till_stream_has_started({stream_id}) with timeout {timeout} "
                      f"started!")
         try:
-            while self.stream_list[stream_id]['last_heartbeat'] is None:
+            while self.stream_statistics[stream_id].last_heartbeat is None:
                 if self.get_timestamp_unix() > timeout != 0.0:
                     logger.debug(
                         f"BybitWebSocketApiManager.wait_till_stream_has_started({stream_id}) finished with `False`!")
@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# ¯\_(ツ)_/¯
+#
+# File: unicorn_bybit_websocket_api/order_book.py
+#
+# Part of ‘UNICORN Bybit WebSocket API’
+# Project website: https://www.lucit.tech/unicorn-bybit-websocket-api.html
+# Github: https://github.com/LUCIT-Systems-and-Development/unicorn-bybit-websocket-api
+# Documentation: https://unicorn-bybit-websocket-api.docs.lucit.tech
+# PyPI: https://pypi.org/project/unicorn-bybit-websocket-api
+# LUCIT Online Shop: https://shop.lucit.services/software
+#
+# License: LSOSL - LUCIT Synergetic Open Source License
+# https://github.com/LUCIT-Systems-and-Development/unicorn-bybit-websocket-api/blob/master/LICENSE
+#
+# Author: LUCIT Systems and Development
+#
+# Copyright (c) 2024-2024, LUCIT Systems and Development (https://www.lucit.tech)
+# All rights reserved.
+
+from .topic_engines import BybitWebSocketApiTopicEngines
+from array import array
+from bisect import bisect_left
+from typing import Callable, Dict, List, Optional, Tuple
+
+import logging
+import threading
+
+
+__logger__: logging.getLogger = logging.getLogger("unicorn_bybit_websocket_api")
+
+logger = __logger__
+
+
+class BybitWebSocketApiLocalOrderBook(object):
+    """
+    Local order book of an `orderbook.{depth}.{symbol}` topic.
+
+    The price levels of each side are kept in two sorted `array('d')`, one for the prices and one for the sizes. Both
+    sides are sorted ascending, so the best bid is the last and the best ask the first level. A level gets found with
+    a binary search and updated in place, so `get_best_bid()` and `get_best_ask()` are O(1) and `get_bids(k)` and
+    `get_asks(k)` are O(k).
+
+    A `snapshot` replaces the book. A `delta` gets applied only if its update id `u` follows the update id of the book,
+    older updates are ignored and a gap marks the book as not synchronized. The deltas of a book which is not
+    synchronized are dropped till the next `snapshot`.
+
+    :param topic: The topic, e.g. `orderbook.50.BTCUSDT`
+    :type topic: str
+    """
+    __slots__ = ('topic', 'symbol', 'depth', 'bid_prices', 'bid_sizes', 'ask_prices', 'ask_sizes', 'update_id',
+                 'seq', 'timestamp', 'is_synced', 'gaps', 'lock')
+
+    def __init__(self, topic: str = None):
+        self.topic: str = topic
+        _, depth, self.symbol = topic.split(".", 2)
+        self.depth: int = int(depth)
+        self.bid_prices: array = array('d')
+        self.bid_sizes: array = array('d')
+        self.ask_prices: array = array('d')
+        self.ask_sizes: array = array('d')
+        self.update_id: Optional[int] = None
+        self.seq: Optional[int] = None
+        self.timestamp: Optional[int] = None
+        self.is_synced: bool = False
+        self.gaps: int = 0
+        self.lock = threading.Lock()
+
+    def __repr__(self):
+        return f"BybitWebSocketApiLocalOrderBook(topic={self.topic!r}, u={self.update_id!r}, " \
+               f"is_synced={self.is_synced!r}, bids={len(self.bid_prices)}, asks={len(self.ask_prices)})"
+
+    @staticmethod
+    def _update_side(prices: array = None, sizes: array = None, levels: list = None) -> None:
+        """
+        Apply the levels of a delta to one side, a size of `0` removes the level.
+
+        :param prices: The sorted prices of the side.
+        :type prices: array
+        :param sizes: The sizes of the side.
+        :type sizes: array
+        :param levels: The levels `[[price, size], ...]` of the delta.
+        :type levels: list
+        :return: None
+        """
+        for price, size in levels:
+            price = float(price)
+            size = float(size)
+            index = bisect_left(prices, price)
+            if index < len(prices) and prices[index] == price:
+                if size == 0.0:
+                    del prices[index]
+                    del sizes[index]
+                else:
+                    sizes[index] = size
+            elif size != 0.0:
+                prices.insert(index, price)
+                sizes.insert(index, size)
+
+    def apply(self, message: dict = None) -> bool:
+        """
+        Apply a received `snapshot` or `delta` message.
+
+        :param message: The decoded message.
+        :type message: dict
+        :return: bool - `False` if the message was ignored
+        """
+        data = message['data']
+        update_id = int(data['u'])
+        with self.lock:
+            if message.get('type') == "snapshot":
+                bids = sorted((float(price), float(size)) for price, size in data['b'])
+                asks = sorted((float(price), float(size)) for price, size in data['a'])
+                self.bid_prices = array('d', [price for price, _ in bids])
+                self.bid_sizes = array('d', [size for _, size in bids])
+                self.ask_prices = array('d', [price for price, _ in asks])
+                self.ask_sizes = array('d', [size for _, size in asks])
+                self.is_synced = True
+            else:
+                if self.is_synced is False or update_id <= self.update_id:
+                    return False
+                if update_id != self.update_id + 1:
+                    logger.warning(f"BybitWebSocketApiLocalOrderBook.apply() - Gap in the updates of topic '{self.topic}':"
+                                   f" u={update_id} follows u={self.update_id}!")
+                    self.is_synced = False
+                    self.gaps += 1
+                    return False
+                self._update_side(self.bid_prices, self.bid_sizes, data['b'])
+                self._update_side(self.ask_prices, self.ask_sizes, data['a'])
+                # Bybit keeps the book within its depth, levels pushed out of it are not always deleted
+                if len(self.bid_prices) > self.depth:
+                    del self.bid_prices[:len(self.bid_prices) - self.depth]
+                    del self.bid_sizes[:len(self.bid_sizes) - self.depth]
+                if len(self.ask_prices) > self.depth:
+                    del self.ask_prices[self.depth:]
+                    del self.ask_sizes[self.depth:]
+            self.update_id = update_id
+            self.seq = data.get('seq', self.seq)
+            self.timestamp = message.get('ts', self.timestamp)
+        return True
+
+    def invalidate(self) -> None:
+        """
+        Mark the book as not synchronized, e.g. after a reconnect, its deltas are dropped till the next `snapshot`.
+
+        :return: None
+        """
+        with self.lock:
+            self.is_synced = False
+
+    def get(self, depth: Optional[int] = None) -> dict:
+        """
+        Get the book with the best `depth` levels per side.
+
+        :param depth: Number of levels per side, `None` for all.
+        :type depth: int
+        :return: dict - `{'topic', 'symbol', 'u', 'seq', 'ts', 'is_synced', 'bids': [[price, size], ...], 'asks': ...}`
+        """
+        with self.lock:
+            return {'topic': self.topic,
+                    'symbol': self.symbol,
+                    'u': self.update_id,
+                    'seq': self.seq,
+                    'ts': self.timestamp,
+                    'is_synced': self.is_synced,
+                    'bids': self._get_bids(depth),
+                    'asks': self._get_asks(depth)}
+
+    def _get_asks(self, depth: Optional[int] = None) -> List[List[float]]:
+        """
+        Get the best asks, lowest price first. Must be called with `self.lock`.
+        """
+        end = len(self.ask_prices) if depth is None else min(depth, len(self.ask_prices))
+        return [[self.ask_prices[index], self.ask_sizes[index]] for index in range(end)]
+
+    def _get_bids(self, depth: Optional[int] = None) -> List[List[float]]:
+        """
+        Get the best bids, highest price first. Must be called with `self.lock`.
+        """
+        end = 0 if depth is None else max(len(self.bid_prices) - depth, 0)
+        return [[self.bid_prices[index], self.bid_sizes[index]]
+                for index in range(len(self.bid_prices) - 1, end - 1, -1)]
+
+    def get_asks(self, depth: Optional[int] = None) -> List[List[float]]:
+        """
+        Get the best `depth` asks, lowest price first.
+
+        :param depth: Number of levels, `None` for all.
+        :type depth: int
+        :return: list - `[[price, size], ...]`
+        """
+        with self.lock:
+            return self._get_asks(depth)
+
+    def get_best_ask(self) -> Optional[Tuple[float, float]]:
+        """
+        Get the best ask.
+
+        :return: tuple - `(price, size)` or `None`
+        """
+        with self.lock:
+            if not self.ask_prices:
+                return None
+            return self.ask_prices[0], self.ask_sizes[0]
+
+    def get_best_bid(self) -> Optional[Tuple[float, float]]:
+        """
+        Get the best bid.
+
+        :return: tuple - `(price, size)` or `None`
+        """
+        with self.lock:
+            if not self.bid_prices:
+                return None
+            return self.bid_prices[-1], self.bid_sizes[-1]
+
+    def get_bids(self, depth: Optional[int] = None) -> List[List[float]]:
+        """
+        Get the best `depth` bids, highest price first.
+
+        :param depth: Number of levels, `None` for all.
+        :type depth: int
+        :return: list - `[[price, size], ...]`
+        """
+        with self.lock:
+            return self._get_bids(depth)
+
+
+class BybitWebSocketApiLocalOrderBooks(BybitWebSocketApiTopicEngines):
+    """
+    The local order books of the `orderbook.*` topics of a stream, the books get created with the first `snapshot` of
+    their topic.
+
+    If a stream subscribes several depths of a symbol, `get()` returns the book with the most levels.
+
+    :param on_gap: Function which gets called with the topic of a book as soon as a gap in its updates is detected,
+                   e.g. to request a new `snapshot`.
+    :type on_gap: function
+    :param is_subscribed: Function which gets called with the topic before a book gets created, see
+                          `BybitWebSocketApiTopicEngines`.
+    :type is_subscribed: function
+    """
+    prefix = "orderbook."
+
+    def __init__(self, on_gap: Optional[Callable] = None, is_subscribed: Optional[Callable] = None):
+        super().__init__(is_subscribed=is_subscribed)
+        self.symbols: Dict[str, BybitWebSocketApiLocalOrderBook] = {}
+        self.on_gap: Optional[Callable] = on_gap
+
+    def _add(self, key: str = None, engine: BybitWebSocketApiLocalOrderBook = None) -> None:
+        super()._add(key=key, engine=engine)
+        current = self.symbols.get(engine.symbol)
+        if current is None or current.depth < engine.depth:
+            symbols = dict(self.symbols)
+            symbols[engine.symbol] = engine
+            self.symbols = symbols
+
+    def _apply(self, topic: str = None, engine: BybitWebSocketApiLocalOrderBook = None, message: dict = None) -> bool:
+        gaps = engine.gaps
+        if engine.apply(message) is True:
+            return True
+        if engine.gaps != gaps and self.on_gap is not None:
+            self.on_gap(topic)
+        return False
+
+    def _create(self, topic: str = None, key: str = None, message: dict = None) -> \
+            Optional[BybitWebSocketApiLocalOrderBook]:
+        if message.get('type') != "snapshot":
+            return None
+        return BybitWebSocketApiLocalOrderBook(topic=topic)
+
+    @staticmethod
+    def _get_key(topic: str = None) -> str:
+        return topic
+
+    def _remove(self, key: str = None) -> Optional[BybitWebSocketApiLocalOrderBook]:
+        order_book = super()._remove(key=key)
+        if order_book is None or self.symbols.get(order_book.symbol) is not order_book:
+            return order_book
+        symbols = dict(self.symbols)
+        del symbols[order_book.symbol]
+        for other in self.engines.values():
+            if other.symbol == order_book.symbol and (other.symbol not in symbols
+                                                      or symbols[other.symbol].depth < other.depth):
+                symbols[other.symbol] = other
+        self.symbols = symbols
+        return order_book
+
+    def get(self, symbol: str = None) -> Optional[BybitWebSocketApiLocalOrderBook]:
+        """
+        Get the book of a symbol.
+
+        :param symbol: The symbol, e.g. `BTCUSDT`
+        :type symbol: str
+        :return: BybitWebSocketApiLocalOrderBook or None
+        """
+        return self.symbols.get(symbol)
+
+    def invalidate(self) -> int:
+        """
+        Mark all books as not synchronized, e.g. after a reconnect of the stream.
+
+        :return: int - the number of books
+        """
+        order_books = self.engines
+        for order_book in order_books.values():
+            order_book.invalidate()
+        return len(order_books)
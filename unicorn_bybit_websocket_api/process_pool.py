@@ -0,0 +1,695 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# ¯\_(ツ)_/¯
+#
+# File: unicorn_bybit_websocket_api/process_pool.py
+#
+# Part of ‘UNICORN Bybit WebSocket API’
+# Project website: https://www.lucit.tech/unicorn-bybit-websocket-api.html
+# Github: https://github.com/LUCIT-Systems-and-Development/unicorn-bybit-websocket-api
+# Documentation: https://unicorn-bybit-websocket-api.docs.lucit.tech
+# PyPI: https://pypi.org/project/unicorn-bybit-websocket-api
+# LUCIT Online Shop: https://shop.lucit.services/software
+#
+# License: LSOSL - LUCIT Synergetic Open Source License
+# https://github.com/LUCIT-Systems-and-Development/unicorn-bybit-websocket-api/blob/master/LICENSE
+#
+# Author: LUCIT Systems and Development
+#
+# Copyright (c) 2024-2024, LUCIT Systems and Development (https://www.lucit.tech)
+# All rights reserved.
+
+from .control_messages import BybitWebSocketApiControlMessage
+from .topic_router import get_record_topic, parse_frame_header
+from collections import deque
+from typing import Dict, List, Optional
+
+import functools
+import logging
+import multiprocessing
+import queue
+import threading
+import time
+
+
+__logger__: logging.getLogger = logging.getLogger("unicorn_bybit_websocket_api")
+
+logger = __logger__
+
+
+def _run_process_pool_worker(worker_index: int,
+                             manager_kwargs: dict,
+                             command_connection,
+                             data_queue,
+                             batch_max_size: int,
+                             status_interval: float) -> None:
+    """
+    Target of the worker processes of `BybitWebSocketApiProcessPool`.
+    """
+    worker = BybitWebSocketApiProcessPoolWorker(worker_index=worker_index,
+                                                manager_kwargs=manager_kwargs,
+                                                command_connection=command_connection,
+                                                data_queue=data_queue,
+                                                batch_max_size=batch_max_size,
+                                                status_interval=status_interval)
+    worker.run()
+
+
+class BybitWebSocketApiProcessPool(object):
+    """
+    Run the streams of a `BybitWebSocketApiManager` within a fixed number of worker processes.
+
+    Each worker process runs its own `BybitWebSocketApiManager` with a shard of the streams. The received data is
+    decoded within the worker (`output="dict"`) and sent in batches through a `multiprocessing.Queue` to the parent,
+    where it gets delivered to the `stream_buffer` or the `process_stream_data` and `process_stream_data_batch`
+    callbacks. The status of the streams is mirrored frequently into the `stream_list` of the parent.
+
+    The worker processes are started with the `spawn` method, so the main module of the program must be guarded with
+    `if __name__ == '__main__':`. Each worker validates the LUCIT license on its own.
+
+    :param manager: The parent `BybitWebSocketApiManager` instance.
+    :type manager: BybitWebSocketApiManager
+    :param size: Number of worker processes.
+    :type size: int
+    :param manager_kwargs: Parameters for the `BybitWebSocketApiManager` instances of the workers.
+    :type manager_kwargs: dict
+    :param batch_max_size: Max number of records per batch sent from a worker to the parent.
+    :type batch_max_size: int
+    :param status_interval: Interval in seconds of the status updates sent from the workers to the parent.
+    :type status_interval: float
+    """
+    def __init__(self,
+                 manager=None,
+                 size: int = 1,
+                 manager_kwargs: dict = None,
+                 batch_max_size: int = 1000,
+                 status_interval: float = 0.2):
+        if size is None or int(size) < 1:
+            raise ValueError(f"Parameter `size` of `BybitWebSocketApiProcessPool()` must be 1 or higher, "
+                             f"received: {size}")
+        self.manager = manager
+        self.size: int = int(size)
+        self.manager_kwargs: dict = manager_kwargs or {}
+        self.batch_max_size: int = batch_max_size
+        self.status_interval: float = status_interval
+        self.command_connections: List = []
+        self.command_connections_lock = threading.Lock()
+        self.load: List[int] = [0] * self.size
+        self.lock = threading.Lock()
+        self.processes: List = []
+        self.stop_request: bool = False
+        self.stopped_workers: set = set()
+        self.stream_index: Dict[str, int] = {}
+        self.worker_errors: Dict[int, str] = {}
+        context = multiprocessing.get_context("spawn")
+        self.data_queue = context.Queue()
+        for index in range(0, self.size):
+            parent_connection, child_connection = context.Pipe()
+            process = context.Process(target=_run_process_pool_worker,
+                                      args=(index,
+                                            self.manager_kwargs,
+                                            child_connection,
+                                            self.data_queue,
+                                            self.batch_max_size,
+                                            self.status_interval),
+                                      name=f"BybitWebSocketApiProcessPool: index={index}",
+                                      daemon=True)
+            process.start()
+            self.command_connections.append(parent_connection)
+            self.processes.append(process)
+        self.receiver_thread = threading.Thread(target=self._receive,
+                                                name=f"BybitWebSocketApiProcessPool: receiver, time={time.time()}")
+        self.receiver_thread.start()
+        logger.info(f"BybitWebSocketApiProcessPool() - Started {self.size} worker processes.")
+
+    def _deliver(self, stream_id: str = None, stream_data=None, stream_data_batch: list = None) -> None:
+        """
+        Deliver a received record like `BybitWebSocketApiSocket.process_received_data()` does it.
+
+        :param stream_id: id of a stream
+        :type stream_id: str
+        :param stream_data: The received record
+        :param stream_data_batch: If provided, the record gets appended to this list instead of being delivered.
+        :type stream_data_batch: list
+        :return: None
+        """
+        if self.manager.topic_router.has_handlers(stream_id):
+            topic_handlers = self.manager.topic_router.get_handlers(stream_id, get_record_topic(stream_data))
+            if topic_handlers:
+                for topic_handler in topic_handlers:
+                    topic_handler.callback(stream_data)
+                return None
+        conflation_buffer = self.manager.conflation_buffers.get(stream_id)
+        if conflation_buffer is not None:
+            if type(stream_data) is dict:
+                conflation_buffer.put(stream_data.get('topic'), stream_data, type=stream_data.get('type'))
+            else:
+                header = parse_frame_header(stream_data) if type(stream_data) is str else stream_data
+                conflation_buffer.put(header.topic, stream_data, type=getattr(header, 'type', None))
+            return None
+        if stream_data_batch is not None:
+            stream_data_batch.append(stream_data)
+            return None
+        try:
+            stream_buffer_name = self.manager.stream_list[stream_id]['stream_buffer_name']
+        except KeyError:
+            stream_buffer_name = False
+        if stream_buffer_name is not False:
+            self.manager.add_to_stream_buffer(stream_data, stream_buffer_name=stream_buffer_name)
+        elif self.manager.specific_process_stream_data.get(stream_id) is not None:
+            self.manager.specific_process_stream_data[stream_id](stream_data)
+        elif self.manager.process_stream_data is not None:
+            self.manager.process_stream_data(stream_data)
+        else:
+            self.manager.add_to_stream_buffer(stream_data)
+
+    def _process_batch(self, batch: list = None, received_bytes: dict = None) -> None:
+        """
+        Deliver a batch of records and signals of a worker and update the statistics.
+
+        Data records are tuples `(stream_id, stream_data)`, control messages are tuples
+        `(stream_id, "control_message", message)` and signals are tuples
+        `(stream_id, signal_type, (data_record, error_msg))`.
+
+        :param batch: The records and signals.
+        :type batch: list
+        :param received_bytes: Received bytes per stream since the last batch.
+        :type received_bytes: dict
+        :return: None
+        """
+        receives = {}
+        last_records = {}
+        batch_callbacks = {}
+        stream_data_batches = {}
+        for item in batch:
+            stream_id = item[0]
+            if len(item) == 2:
+                receives[stream_id] = receives.get(stream_id, 0) + 1
+                last_records[stream_id] = item[1]
+                if stream_id not in batch_callbacks:
+                    batch_callbacks[stream_id] = self.manager._get_process_stream_data_batch(stream_id)
+                    if batch_callbacks[stream_id] is not None:
+                        stream_data_batches[stream_id] = []
+                try:
+                    self._deliver(stream_id=stream_id,
+                                  stream_data=item[1],
+                                  stream_data_batch=stream_data_batches.get(stream_id))
+                except Exception as error_msg:
+                    self.manager._crash_stream_by_exception(stream_id=stream_id, error_msg=error_msg)
+                    self.stop_stream(stream_id=stream_id)
+            elif item[1] == "control_message":
+                self.manager.process_control_message(BybitWebSocketApiControlMessage(stream_id=stream_id,
+                                                                                     message=item[2]))
+            else:
+                try:
+                    self.manager.send_stream_signal(signal_type=item[1],
+                                                    stream_id=stream_id,
+                                                    data_record=item[2][0],
+                                                    error_msg=item[2][1])
+                except KeyError:
+                    pass
+        for stream_id in stream_data_batches:
+            if stream_data_batches[stream_id]:
+                try:
+                    batch_callbacks[stream_id][0](stream_data_batches[stream_id])
+                except Exception as error_msg:
+                    self.manager._crash_stream_by_exception(stream_id=stream_id, error_msg=error_msg)
+                    self.stop_stream(stream_id=stream_id)
+        for stream_id in set(receives) | set(received_bytes):
+            try:
+                self.manager.stream_statistics[stream_id].add_receives(receives.get(stream_id, 0),
+                                                                       received_bytes.get(stream_id, 0))
+            except KeyError:
+                pass
+        for stream_id in last_records:
+            try:
+                self.manager.stream_list[stream_id]['last_received_data_record'] = last_records[stream_id]
+            except KeyError:
+                pass
+
+    def _process_status(self, status: dict = None) -> None:
+        """
+        Mirror the status of the streams of a worker into the parent.
+
+        :param status: Status per stream.
+        :type status: dict
+        :return: None
+        """
+        for stream_id in status:
+            stream_status = status[stream_id]
+            try:
+                statistics = self.manager.stream_statistics[stream_id]
+            except KeyError:
+                continue
+            if stream_status['last_heartbeat'] is not None:
+                statistics.last_heartbeat = stream_status['last_heartbeat']
+            statistics.processed_transmitted_total = stream_status['processed_transmitted_total']
+            with self.manager.stream_list_lock:
+                logger.debug(f"BybitWebSocketApiProcessPool._process_status() - `stream_list_lock` was entered!")
+                try:
+                    for key in ('status', 'has_stopped', 'reconnects', 'logged_reconnects', 'subscriptions',
+                                'channels', 'markets', 'websocket_uri', 'crash_request_reason'):
+                        self.manager.stream_list[stream_id][key] = stream_status[key]
+                except KeyError:
+                    pass
+                logger.debug(f"BybitWebSocketApiProcessPool._process_status() - Leaving `stream_list_lock`!")
+            if 'topic_states' in stream_status:
+                self.manager.subscription_index.set_states(stream_id=stream_id,
+                                                           states=stream_status['topic_states'],
+                                                           reasons=stream_status['rejected_topics'])
+            if stream_status['status'] == "stopped" or stream_status['status'].startswith("crashed"):
+                self.manager.set_socket_is_ready(stream_id)
+                self.release(stream_id=stream_id)
+            elif stream_status['socket_is_ready'] is True:
+                self.manager.set_socket_is_ready(stream_id)
+
+    def _process_worker_error(self, worker_index: int = None, error_msg: str = None) -> None:
+        """
+        A worker was not able to start, crash all its streams.
+
+        :param worker_index: Index of the worker
+        :type worker_index: int
+        :param error_msg: The reason
+        :type error_msg: str
+        :return: None
+        """
+        logger.critical(f"BybitWebSocketApiProcessPool() - Worker {worker_index} failed: {error_msg}")
+        with self.lock:
+            self.worker_errors[worker_index] = error_msg
+            stream_ids = [stream_id for stream_id in self.stream_index if self.stream_index[stream_id] == worker_index]
+        for stream_id in stream_ids:
+            self.release(stream_id=stream_id)
+            self.manager._stream_is_crashing(stream_id=stream_id, error_msg=error_msg)
+
+    def _receive(self) -> None:
+        """
+        Target of the receiver thread: Read the messages of all workers.
+
+        This thread is the only writer of the `BybitWebSocketApiStreamStatistics` of the streams within the pool.
+
+        :return: None
+        """
+        while True:
+            try:
+                message = self.data_queue.get(timeout=0.5)
+            except queue.Empty:
+                if self.stop_request is True and len(self.stopped_workers) >= self.size:
+                    break
+                if self.stop_request is True and not any(process.is_alive() for process in self.processes):
+                    break
+                continue
+            except (EOFError, OSError) as error_msg:
+                logger.debug(f"BybitWebSocketApiProcessPool._receive() - {type(error_msg).__name__} - {error_msg}")
+                break
+            if message[0] == "batch":
+                self._process_batch(batch=message[2], received_bytes=message[3])
+            elif message[0] == "status":
+                self._process_status(status=message[2])
+            elif message[0] == "error":
+                self._process_worker_error(worker_index=message[1], error_msg=message[2])
+            elif message[0] == "stopped":
+                self.stopped_workers.add(message[1])
+        logger.debug(f"BybitWebSocketApiProcessPool._receive() - Leaving thread ...")
+
+    def _send_command(self, worker_index: int = None, command: tuple = None) -> bool:
+        """
+        Send a command to a worker.
+
+        :param worker_index: Index of the worker
+        :type worker_index: int
+        :param command: The command
+        :type command: tuple
+        :return: bool
+        """
+        try:
+            with self.command_connections_lock:
+                self.command_connections[worker_index].send(command)
+            return True
+        except (BrokenPipeError, EOFError, OSError) as error_msg:
+            logger.error(f"BybitWebSocketApiProcessPool._send_command({worker_index}, {command[0]}) - "
+                         f"{type(error_msg).__name__} - {error_msg}")
+            return False
+
+    def create_stream(self, stream_id: str = None, **kwargs) -> bool:
+        """
+        Create a stream within the worker with the lowest load.
+
+        :param stream_id: id of the stream within the parent
+        :type stream_id: str
+        :param kwargs: Parameters for `create_stream()` of the worker
+        :return: bool
+        """
+        with self.lock:
+            worker_indexes = [index for index in range(0, self.size) if index not in self.worker_errors]
+            if not worker_indexes:
+                error_msg = "No worker process of the `process_pool` is available!"
+            else:
+                error_msg = None
+                worker_index = min(worker_indexes, key=lambda i: self.load[i])
+                self.load[worker_index] += 1
+                self.stream_index[stream_id] = worker_index
+        if error_msg is not None:
+            self.manager._stream_is_crashing(stream_id=stream_id, error_msg=error_msg)
+            return False
+        logger.debug(f"BybitWebSocketApiProcessPool.create_stream({stream_id}) - Assigned to worker "
+                     f"{worker_index}.")
+        return self._send_command(worker_index=worker_index, command=("create_stream", stream_id, kwargs))
+
+    def get_load(self) -> List[int]:
+        """
+        Get the number of assigned streams per worker.
+
+        :return: list
+        """
+        with self.lock:
+            return list(self.load)
+
+    def has_stream(self, stream_id: str = None) -> bool:
+        """
+        Is the stream running within the pool?
+
+        :param stream_id: id of a stream
+        :type stream_id: str
+        :return: bool
+        """
+        return stream_id in self.stream_index
+
+    def release(self, stream_id: str = None) -> bool:
+        """
+        Remove a stopped stream from the load of its worker.
+
+        :param stream_id: id of a stream
+        :type stream_id: str
+        :return: bool
+        """
+        with self.lock:
+            try:
+                worker_index = self.stream_index.pop(stream_id)
+            except KeyError:
+                return False
+            self.load[worker_index] -= 1
+        return True
+
+    def stop(self, timeout: float = 10.0) -> bool:
+        """
+        Stop all worker processes.
+
+        :param timeout: Seconds to wait for each worker before it gets terminated.
+        :type timeout: float
+        :return: bool
+        """
+        if self.stop_request is True:
+            return False
+        self.stop_request = True
+        logger.info(f"BybitWebSocketApiProcessPool.stop() - Stopping {self.size} worker processes ...")
+        for worker_index in range(0, self.size):
+            self._send_command(worker_index=worker_index, command=("stop",))
+        for process in self.processes:
+            process.join(timeout=timeout)
+            if process.is_alive():
+                logger.error(f"BybitWebSocketApiProcessPool.stop() - Terminating {process.name}!")
+                process.terminate()
+        self.receiver_thread.join(timeout=timeout)
+        return True
+
+    def stop_stream(self, stream_id: str = None) -> bool:
+        """
+        Stop a stream within its worker.
+
+        :param stream_id: id of a stream
+        :type stream_id: str
+        :return: bool
+        """
+        try:
+            worker_index = self.stream_index[stream_id]
+        except KeyError:
+            return False
+        return self._send_command(worker_index=worker_index, command=("stop_stream", stream_id))
+
+    def subscribe_to_stream(self, stream_id: str = None, channels=None, markets=None) -> bool:
+        """
+        Subscribe channels and/or markets to a stream within its worker.
+
+        :param stream_id: id of a stream
+        :type stream_id: str
+        :param channels: provide the channels you wish to subscribe
+        :type channels: str, list, set
+        :param markets: provide the markets you wish to subscribe
+        :type markets: str, list, set
+        :return: bool
+        """
+        try:
+            worker_index = self.stream_index[stream_id]
+        except KeyError:
+            return False
+        return self._send_command(worker_index=worker_index,
+                                  command=("subscribe_to_stream", stream_id, channels, markets))
+
+    def unsubscribe_from_stream(self, stream_id: str = None, channels=None, markets=None) -> bool:
+        """
+        Unsubscribe channels and/or markets from a stream within its worker.
+
+        :param stream_id: id of a stream
+        :type stream_id: str
+        :param channels: provide the channels you wish to unsubscribe
+        :type channels: str, list, set
+        :param markets: provide the markets you wish to unsubscribe
+        :type markets: str, list, set
+        :return: bool
+        """
+        try:
+            worker_index = self.stream_index[stream_id]
+        except KeyError:
+            return False
+        return self._send_command(worker_index=worker_index,
+                                  command=("unsubscribe_from_stream", stream_id, channels, markets))
+
+
+class BybitWebSocketApiProcessPoolWorker(object):
+    """
+    The part of `BybitWebSocketApiProcessPool` running within a worker process.
+
+    :param worker_index: Index of the worker
+    :type worker_index: int
+    :param manager_kwargs: Parameters for the `BybitWebSocketApiManager` instance of the worker.
+    :type manager_kwargs: dict
+    :param command_connection: Receiving end of the command pipe.
+    :type command_connection: multiprocessing.connection.Connection
+    :param data_queue: Queue to send data, signals and status to the parent.
+    :type data_queue: multiprocessing.Queue
+    :param batch_max_size: Max number of records per batch.
+    :type batch_max_size: int
+    :param status_interval: Interval in seconds of the status updates.
+    :type status_interval: float
+    """
+    def __init__(self,
+                 worker_index: int = None,
+                 manager_kwargs: dict = None,
+                 command_connection=None,
+                 data_queue=None,
+                 batch_max_size: int = 1000,
+                 status_interval: float = 0.2):
+        self.worker_index = worker_index
+        self.manager_kwargs = manager_kwargs
+        self.command_connection = command_connection
+        self.data_queue = data_queue
+        self.batch_max_size = batch_max_size
+        self.status_interval = status_interval
+        self.manager = None
+        self.outbox = deque()
+        self.outbox_condition = threading.Condition()
+        self.parent_stream_ids: Dict[str, str] = {}
+        self.worker_stream_ids: Dict[str, str] = {}
+        self.synced_received_bytes: Dict[str, int] = {}
+        self.stop_request: bool = False
+
+    def _add_to_outbox(self, item: tuple = None) -> None:
+        """
+        Collect a record or signal for the next batch and wake up the flusher thread.
+
+        :param item: The record or signal.
+        :type item: tuple
+        :return: None
+        """
+        with self.outbox_condition:
+            self.outbox.append(item)
+            self.outbox_condition.notify()
+
+    def _flush(self) -> bool:
+        """
+        Send the collected records and signals as one batch to the parent.
+
+        :return: bool
+        """
+        if not self.outbox:
+            return False
+        batch = []
+        while self.outbox and len(batch) < self.batch_max_size:
+            batch.append(self.outbox.popleft())
+        received_bytes = {}
+        for parent_stream_id in set(item[0] for item in batch):
+            try:
+                received_bytes_total = \
+                    self.manager.stream_statistics[self.worker_stream_ids[parent_stream_id]].received_bytes_total
+            except KeyError:
+                continue
+            received_bytes[parent_stream_id] = \
+                received_bytes_total - self.synced_received_bytes.get(parent_stream_id, 0)
+            self.synced_received_bytes[parent_stream_id] = received_bytes_total
+        self.data_queue.put(("batch", self.worker_index, batch, received_bytes))
+        return True
+
+    def _run_flusher(self) -> None:
+        """
+        Target of the flusher thread: Wait for collected records and send them in batches to the parent till the worker
+        stops and the outbox is empty.
+
+        :return: None
+        """
+        while True:
+            with self.outbox_condition:
+                while not self.outbox and self.stop_request is False:
+                    self.outbox_condition.wait()
+                if not self.outbox:
+                    return None
+            self._flush()
+
+    def _send_status(self) -> None:
+        """
+        Send the status of all streams of this worker to the parent.
+
+        :return: None
+        """
+        status = {}
+        for parent_stream_id, stream_id in list(self.worker_stream_ids.items()):
+            try:
+                stream = self.manager.stream_list[stream_id]
+                statistics = self.manager.stream_statistics[stream_id]
+                status[parent_stream_id] = {'status': stream['status'],
+                                            'has_stopped': stream['has_stopped'],
+                                            'reconnects': stream['reconnects'],
+                                            'logged_reconnects': list(stream['logged_reconnects']),
+                                            'subscriptions': stream['subscriptions'],
+                                            'channels': list(stream['channels']),
+                                            'markets': list(stream['markets']),
+                                            'topic_states': self.manager.subscription_index.get_states(stream_id),
+                                            'rejected_topics':
+                                                self.manager.subscription_index.get_rejected_topics(stream_id),
+                                            'websocket_uri': stream['websocket_uri'],
+                                            'crash_request_reason': stream['crash_request_reason'],
+                                            'last_heartbeat': statistics.last_heartbeat,
+                                            'processed_transmitted_total': statistics.processed_transmitted_total,
+                                            'socket_is_ready': self.manager.is_socket_ready(stream_id=stream_id)}
+            except KeyError:
+                continue
+        if status:
+            self.data_queue.put(("status", self.worker_index, status))
+
+    def process_command(self, command: tuple = None) -> bool:
+        """
+        Execute a command of the parent.
+
+        :param command: The command
+        :type command: tuple
+        :return: bool - `False` if the worker has to stop
+        """
+        logger.debug(f"BybitWebSocketApiProcessPoolWorker.process_command({command[0]})")
+        if command[0] == "create_stream":
+            parent_stream_id = command[1]
+            stream_id = self.manager.create_stream(
+                process_stream_data=functools.partial(self.process_stream_data, parent_stream_id),
+                **command[2]
+            )
+            self.parent_stream_ids[stream_id] = parent_stream_id
+            self.worker_stream_ids[parent_stream_id] = stream_id
+        elif command[0] == "stop_stream":
+            try:
+                self.manager.stop_stream(stream_id=self.worker_stream_ids[command[1]])
+            except KeyError:
+                pass
+        elif command[0] == "subscribe_to_stream":
+            try:
+                self.manager.subscribe_to_stream(stream_id=self.worker_stream_ids[command[1]],
+                                                 channels=command[2],
+                                                 markets=command[3])
+            except KeyError:
+                pass
+        elif command[0] == "unsubscribe_from_stream":
+            try:
+                self.manager.unsubscribe_from_stream(stream_id=self.worker_stream_ids[command[1]],
+                                                     channels=command[2],
+                                                     markets=command[3])
+            except KeyError:
+                pass
+        elif command[0] == "stop":
+            return False
+        return True
+
+    def process_control_message(self, control_message: BybitWebSocketApiControlMessage = None) -> bool:
+        """
+        Replaces `process_control_message()` of the `BybitWebSocketApiManager` within the worker, the control messages
+        get handled by the parent. The responses to `subscribe` and `unsubscribe` update the `subscriptions` of the
+        stream within the worker first.
+        """
+        self.manager._process_subscription_response(control_message)
+        parent_stream_id: Optional[str] = self.parent_stream_ids.get(control_message.stream_id)
+        if parent_stream_id is None:
+            return False
+        self._add_to_outbox((parent_stream_id, "control_message", control_message.message))
+        return True
+
+    def process_stream_data(self, parent_stream_id: str = None, stream_data=None) -> None:
+        """
+        Callback of the streams within the worker.
+        """
+        self._add_to_outbox((parent_stream_id, stream_data))
+
+    def process_stream_signals(self, signal_type=None, stream_id=None, data_record=None, error_msg=None) -> None:
+        """
+        Stream signal callback of the `BybitWebSocketApiManager` within the worker.
+        """
+        parent_stream_id: Optional[str] = self.parent_stream_ids.get(stream_id)
+        if parent_stream_id is not None:
+            self._add_to_outbox((parent_stream_id, signal_type, (data_record, error_msg)))
+
+    def run(self) -> None:
+        """
+        Start the `BybitWebSocketApiManager` of the worker and process the commands of the parent till it sends
+        `stop`.
+
+        :return: None
+        """
+        # Imported here, the manager module imports this module
+        from .manager import BybitWebSocketApiManager
+        try:
+            self.manager = BybitWebSocketApiManager(process_stream_signals=self.process_stream_signals,
+                                                    **self.manager_kwargs)
+            self.manager.process_control_message = self.process_control_message
+        except Exception as error_msg:
+            self.data_queue.put(("error", self.worker_index, f"{type(error_msg).__name__} - {error_msg}"))
+            self.data_queue.put(("stopped", self.worker_index))
+            return None
+        flusher_thread = threading.Thread(target=self._run_flusher,
+                                          name=f"BybitWebSocketApiProcessPoolWorker: flusher, time={time.time()}")
+        flusher_thread.start()
+        next_status_time = 0.0
+        try:
+            while True:
+                if self.command_connection.poll(self.status_interval / 4):
+                    if self.process_command(self.command_connection.recv()) is False:
+                        break
+                if time.time() >= next_status_time:
+                    self._send_status()
+                    next_status_time = time.time() + self.status_interval
+        except (EOFError, OSError) as error_msg:
+            logger.debug(f"BybitWebSocketApiProcessPoolWorker.run() - {type(error_msg).__name__} - {error_msg}")
+        finally:
+            self.manager.stop_manager()
+            for stream_id in list(self.parent_stream_ids):
+                self.manager.wait_till_stream_has_stopped(stream_id=stream_id, timeout=5.0)
+            with self.outbox_condition:
+                self.stop_request = True
+                self.outbox_condition.notify()
+            flusher_thread.join()
+            self._send_status()
+            self.data_queue.put(("stopped", self.worker_index))
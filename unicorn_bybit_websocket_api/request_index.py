@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# ¯\_(ツ)_/¯
+#
+# File: unicorn_bybit_websocket_api/request_index.py
+#
+# Part of ‘UNICORN Bybit WebSocket API’
+# Project website: https://www.lucit.tech/unicorn-bybit-websocket-api.html
+# Github: https://github.com/LUCIT-Systems-and-Development/unicorn-bybit-websocket-api
+# Documentation: https://unicorn-bybit-websocket-api.docs.lucit.tech
+# PyPI: https://pypi.org/project/unicorn-bybit-websocket-api
+# LUCIT Online Shop: https://shop.lucit.services/software
+#
+# License: LSOSL - LUCIT Synergetic Open Source License
+# https://github.com/LUCIT-Systems-and-Development/unicorn-bybit-websocket-api/blob/master/LICENSE
+#
+# Author: LUCIT Systems and Development
+#
+# Copyright (c) 2024-2024, LUCIT Systems and Development (https://www.lucit.tech)
+# All rights reserved.
+
+
+from .control_messages import BybitWebSocketApiControlMessage
+from collections import deque, OrderedDict
+from typing import Deque, Dict, List, Optional, Tuple, Union
+
+import asyncio
+import logging
+import threading
+import time
+
+
+__logger__: logging.getLogger = logging.getLogger("unicorn_bybit_websocket_api")
+
+logger = __logger__
+
+
+def _set_future_result(future: asyncio.Future = None, result: BybitWebSocketApiControlMessage = None) -> None:
+    """
+    Resolve a future within its event loop if nobody else did it before.
+    """
+    if not future.done():
+        future.set_result(result)
+
+
+class BybitWebSocketApiRequestIndex(object):
+    """
+    Index of the received control messages by `req_id`.
+
+    The control messages get added when they are received, waiting threads (`wait()`) and coroutines (`wait_async()`)
+    are woken up immediately. The lookup is a dict access, the index keeps the newest `max_size` responses.
+
+    Requests which are registered with `register()` before sending get their round trip time measured, it is set as
+    `round_trip_time` of the response and collected per `op` for `get_round_trip_times()`.
+
+    :param max_size: Max number of stored responses.
+    :type max_size: int
+    :param round_trip_times_max_size: Max number of stored round trip times per `op`.
+    :type round_trip_times_max_size: int
+    """
+    def __init__(self, max_size: int = 500, round_trip_times_max_size: int = 100):
+        self.lock = threading.Lock()
+        self.max_size: int = max_size
+        self.results: OrderedDict[str, BybitWebSocketApiControlMessage] = OrderedDict()
+        self.round_trip_times: Dict[str, Deque[float]] = {}
+        self.round_trip_times_max_size: int = round_trip_times_max_size
+        self.sent: OrderedDict[str, Tuple[float, Optional[str]]] = OrderedDict()
+        self.waiters: Dict[str, List[Union[threading.Event, asyncio.Future]]] = {}
+
+    def _remove_waiter(self, req_id: str = None, waiter: Union[threading.Event, asyncio.Future] = None) -> None:
+        """
+        Remove a waiter which gave up. Must be called with `self.lock`.
+
+        :param req_id: The `req_id` of the request.
+        :type req_id: str
+        :param waiter: The event or future of the waiter.
+        :return: None
+        """
+        try:
+            self.waiters[req_id].remove(waiter)
+            if not self.waiters[req_id]:
+                del self.waiters[req_id]
+        except (KeyError, ValueError):
+            pass
+
+    def add(self, control_message: BybitWebSocketApiControlMessage = None) -> bool:
+        """
+        Add a received control message and wake up the waiters of its `req_id`.
+
+        :param control_message: The received control message.
+        :type control_message: BybitWebSocketApiControlMessage
+        :return: bool
+        """
+        if control_message is None or not control_message.req_id:
+            return False
+        req_id = str(control_message.req_id)
+        received_at = time.perf_counter()
+        with self.lock:
+            try:
+                sent_at, op = self.sent.pop(req_id)
+                control_message.round_trip_time = received_at - sent_at
+                op = op or control_message.op
+                if op not in self.round_trip_times:
+                    self.round_trip_times[op] = deque(maxlen=self.round_trip_times_max_size)
+                self.round_trip_times[op].append(control_message.round_trip_time)
+            except KeyError:
+                pass
+            self.results[req_id] = control_message
+            self.results.move_to_end(req_id)
+            while len(self.results) > self.max_size:
+                self.results.popitem(last=False)
+            waiters = self.waiters.pop(req_id, [])
+        for waiter in waiters:
+            if isinstance(waiter, threading.Event):
+                waiter.set()
+            else:
+                try:
+                    waiter.get_loop().call_soon_threadsafe(_set_future_result, waiter, control_message)
+                except RuntimeError as error_msg:
+                    logger.debug(f"BybitWebSocketApiRequestIndex.add() - Can not resolve the future of req_id="
+                                 f"{req_id}: {error_msg}")
+        return True
+
+    def get(self, req_id: Union[int, str] = None) -> Optional[BybitWebSocketApiControlMessage]:
+        """
+        Get the response of a request without waiting.
+
+        :param req_id: The `req_id` of the request.
+        :type req_id: int or str
+        :return: BybitWebSocketApiControlMessage or None
+        """
+        with self.lock:
+            return self.results.get(str(req_id))
+
+    def get_round_trip_times(self) -> Dict[str, dict]:
+        """
+        Get the statistic of the measured round trip times in milliseconds per `op`.
+
+        :return: dict - `{op: {'count': int, 'last': float, 'min': float, 'avg': float, 'max': float}}`
+        """
+        with self.lock:
+            round_trip_times = {op: list(times) for op, times in self.round_trip_times.items()}
+        return {op: {'count': len(times),
+                     'last': times[-1] * 1000,
+                     'min': min(times) * 1000,
+                     'avg': sum(times) / len(times) * 1000,
+                     'max': max(times) * 1000}
+                for op, times in round_trip_times.items() if times}
+
+    def register(self, req_id: Union[int, str] = None, op: str = None) -> bool:
+        """
+        Register a request right before it gets sent to measure its round trip time.
+
+        :param req_id: The `req_id` of the request.
+        :type req_id: int or str
+        :param op: The `op` of the request, e.g. `subscribe`.
+        :type op: str
+        :return: bool
+        """
+        if not req_id:
+            return False
+        req_id = str(req_id)
+        with self.lock:
+            self.sent[req_id] = (time.perf_counter(), op)
+            self.sent.move_to_end(req_id)
+            while len(self.sent) > self.max_size:
+                self.sent.popitem(last=False)
+        return True
+
+    def wait(self, req_id: Union[int, str] = None, timeout: float = 10.0) -> Optional[BybitWebSocketApiControlMessage]:
+        """
+        Wait for the response of a request.
+
+        :param req_id: The `req_id` of the request.
+        :type req_id: int or str
+        :param timeout: Max seconds to wait.
+        :type timeout: float
+        :return: BybitWebSocketApiControlMessage or None
+        """
+        req_id = str(req_id)
+        with self.lock:
+            result = self.results.get(req_id)
+            if result is not None:
+                return result
+            event = threading.Event()
+            self.waiters.setdefault(req_id, []).append(event)
+        event.wait(timeout)
+        with self.lock:
+            self._remove_waiter(req_id, event)
+            return self.results.get(req_id)
+
+    async def wait_async(self,
+                         req_id: Union[int, str] = None,
+                         timeout: float = 10.0) -> Optional[BybitWebSocketApiControlMessage]:
+        """
+        Await the response of a request.
+
+        :param req_id: The `req_id` of the request.
+        :type req_id: int or str
+        :param timeout: Max seconds to wait.
+        :type timeout: float
+        :return: BybitWebSocketApiControlMessage or None
+        """
+        req_id = str(req_id)
+        future = asyncio.get_running_loop().create_future()
+        with self.lock:
+            result = self.results.get(req_id)
+            if result is not None:
+                return result
+            self.waiters.setdefault(req_id, []).append(future)
+        try:
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            return None
+        finally:
+            with self.lock:
+                self._remove_waiter(req_id, future)
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# ¯\_(ツ)_/¯
+#
+# File: unicorn_bybit_websocket_api/send_scheduler.py
+#
+# Part of ‘UNICORN Bybit WebSocket API’
+# Project website: https://www.lucit.tech/unicorn-bybit-websocket-api.html
+# Github: https://github.com/LUCIT-Systems-and-Development/unicorn-bybit-websocket-api
+# Documentation: https://unicorn-bybit-websocket-api.docs.lucit.tech
+# PyPI: https://pypi.org/project/unicorn-bybit-websocket-api
+# LUCIT Online Shop: https://shop.lucit.services/software
+#
+# License: LSOSL - LUCIT Synergetic Open Source License
+# https://github.com/LUCIT-Systems-and-Development/unicorn-bybit-websocket-api/blob/master/LICENSE
+#
+# Author: LUCIT Systems and Development
+#
+# Copyright (c) 2024-2024, LUCIT Systems and Development (https://www.lucit.tech)
+# All rights reserved.
+
+
+from .topic_router import parse_frame_header
+from collections import deque
+from typing import Optional, Union
+
+import logging
+import time
+
+
+__logger__: logging.getLogger = logging.getLogger("unicorn_bybit_websocket_api")
+
+logger = __logger__
+
+# Requests of these ops and all `order.*` ops of the `trade` endpoint are sent in the priority lane
+PRIORITY_OPS = ("auth", "ping")
+
+
+def is_priority_payload(payload: Union[dict, str] = None) -> bool:
+    """
+    Has this request to be sent in the priority lane?
+
+    :param payload: The request as dict or JSON string.
+    :type payload: dict or str
+    :return: bool
+    """
+    if type(payload) is dict:
+        op = payload.get('op')
+    else:
+        op = parse_frame_header(payload).op
+    if op is None:
+        return False
+    return op in PRIORITY_OPS or op.startswith("order.")
+
+
+class BybitWebSocketApiSendScheduler(object):
+    """
+    Token bucket for the outgoing requests of a connection with a priority and a bulk lane.
+
+    The bucket holds up to `burst` tokens and gets refilled with `rate` tokens per second, each request consumes one
+    token. Requests of the priority lane (pings, `auth` and trade ops) are sent first and can use all tokens, requests
+    of the bulk lane (subscriptions) leave `reserve` tokens for the priority lane. So a large set of subscriptions goes
+    out with the full rate but never delays a ping or an order.
+
+    The scheduler is used only within the event loop of its connection and needs no lock.
+
+    :param rate: Tokens per second.
+    :type rate: float
+    :param burst: Max number of tokens.
+    :type burst: int
+    :param reserve: Tokens which the bulk lane leaves for the priority lane.
+    :type reserve: int
+    """
+    def __init__(self, rate: float = 10.0, burst: int = 10, reserve: int = 2):
+        self.rate: float = float(rate)
+        self.burst: float = float(burst)
+        self.reserve: float = float(min(reserve, burst - 1))
+        self.tokens: float = float(burst)
+        self.last_refill: float = time.monotonic()
+        self.bulk: deque = deque()
+        self.priority: deque = deque()
+
+    def __len__(self):
+        return len(self.priority) + len(self.bulk)
+
+    def _refill(self, now: float = None) -> None:
+        """
+        Add the tokens since the last refill.
+
+        :param now: Timestamp of `time.monotonic()`
+        :type now: float
+        :return: None
+        """
+        self.tokens = min(self.burst, self.tokens + (now - self.last_refill) * self.rate)
+        self.last_refill = now
+
+    def get_delay(self) -> Optional[float]:
+        """
+        Seconds till the next request can be sent.
+
+        :return: float - `0.0` if a request can be sent now or `None` if there is no request
+        """
+        if self.priority:
+            needed = 1.0
+        elif self.bulk:
+            needed = 1.0 + self.reserve
+        else:
+            return None
+        self._refill(time.monotonic())
+        if self.tokens >= needed:
+            return 0.0
+        return (needed - self.tokens) / self.rate
+
+    def pop(self) -> Union[dict, str, None]:
+        """
+        Get the next request if it can be sent now and consume a token.
+
+        :return: dict, str or None
+        """
+        if self.get_delay() != 0.0:
+            return None
+        self.tokens -= 1.0
+        if self.priority:
+            return self.priority.popleft()
+        return self.bulk.popleft()
+
+    def put(self, payload: Union[dict, str] = None, priority: Optional[bool] = None) -> None:
+        """
+        Add a request.
+
+        :param payload: The request as dict or JSON string.
+        :type payload: dict or str
+        :param priority: Use the priority lane, if `None` it is chosen by the `op` of the request.
+        :type priority: bool or None
+        :return: None
+        """
+        if priority is None:
+            priority = is_priority_payload(payload)
+        if priority is True:
+            self.priority.append(payload)
+        else:
+            self.bulk.append(payload)
@@ -20,11 +20,19 @@
 # All rights reserved.
 
 from .connection import BybitWebSocketApiConnection
+from .control_messages import decode_control_message
 from .exceptions import *
+from .send_scheduler import BybitWebSocketApiSendScheduler
+from .topic_decoders import decode_typed
+from .topic_router import parse_frame_header
+
+from typing import Callable, Optional, Tuple, Union
 
 import asyncio
 import ujson as json
 import logging
+import time
+import websockets
 
 
 __logger__: logging.getLogger = logging.getLogger("unicorn_bybit_websocket_api")
@@ -43,6 +51,12 @@ class BybitWebSocketApiSocket(object):
         self.unicorn_fy = None
         self.exchange = manager.get_exchange()
         self.websocket = None
+        self.send_event = asyncio.Event()
+        self.send_scheduler = BybitWebSocketApiSendScheduler(rate=self.manager.max_send_messages_per_second,
+                                                             burst=self.manager.max_send_messages_burst,
+                                                             reserve=self.manager.max_send_messages_per_second_reserve)
+        self.sender_task = None
+        self.sender_error: Optional[BaseException] = None
 
     async def __aenter__(self):
         logger.debug(f"Entering asynchronous with-context of BybitWebSocketApiSocket() ...")
@@ -78,104 +92,24 @@ class BybitWebSocketApiSocket(object):
                 self.manager.set_socket_is_ready(stream_id=self.stream_id)
                 self.manager.send_stream_signal(signal_type="CONNECT", stream_id=self.stream_id)
                 self.manager.stream_list[self.stream_id]['last_stream_signal'] = "CONNECT"
+                self.sender_task = asyncio.create_task(self.run_sender())
+                self.sender_task.add_done_callback(self.handle_sender_result)
                 while self.manager.is_stop_request(self.stream_id) is False \
                         and self.manager.is_crash_request(self.stream_id) is False:
+                    if self.sender_error is not None:
+                        # without a sender no request of this connection would be sent anymore
+                        raise StreamIsRestarting(stream_id=self.stream_id,
+                                                 reason=f"sender stopped by {type(self.sender_error).__name__}: "
+                                                        f"{self.sender_error}")
                     self.manager.set_heartbeat(self.stream_id)
                     try:
-                        while self.manager.stream_list[self.stream_id]['payload']:
-                            logger.info(f"BybitWebSocketApiSocket.start_socket({str(self.stream_id)}, "
-                                        f"{str(self.channels)}, {str(self.markets)} - Sending payload started ...")
-                            payload = []
-                            try:
-                                payload = self.manager.stream_list[self.stream_id]['payload'].pop(0)
-                            except IndexError as error_msg:
-                                logger.debug(f"BybitWebSocketApiSocket.start_socket() IndexError: {error_msg}")
-                            logger.info(f"BybitWebSocketApiSocket.start_socket({str(self.stream_id)}, "
-                                        f"{str(self.channels)}, {str(self.markets)} - Sending payload: {str(payload)}")
-                            try:
-                                await self.websocket.send(json.dumps(payload, ensure_ascii=False))
-                            except AttributeError as error_msg:
-                                logger.debug(f"BybitWebSocketApiManager._create_stream_thread() "
-                                             f"stream_id={str(self.stream_id)}  - AttributeError `error: 18` - "
-                                             f"error_msg: {str(error_msg)}")
-                            # Todo: rewrite for bybit!
-                            # To avoid a ban we respect the limits of Bybit:
-                            # Limit: max 5 messages per second inclusive pings/pong
-                            # Websocket API does not seem to have this restriction!
-                            max_subscriptions_per_second = self.manager.max_send_messages_per_second - \
-                                                           self.manager.max_send_messages_per_second_reserve
-                            idle_time = 1/max_subscriptions_per_second
-                            await asyncio.sleep(idle_time)
-
                         received_stream_data_json = await self.websocket.receive()
                         if received_stream_data_json is not None:
-                            if self.output == "dict":
-                                received_stream_data = json.loads(received_stream_data_json)
-                            else:
-                                received_stream_data = received_stream_data_json
-                            try:
-                                stream_buffer_name = self.manager.stream_list[self.stream_id]['stream_buffer_name']
-                            except KeyError:
-                                stream_buffer_name = False
-                            if stream_buffer_name is not False:
-                                # if create_stream() got a stram_buffer_name -> use it
-                                self.manager.add_to_stream_buffer(received_stream_data,
-                                                                  stream_buffer_name=stream_buffer_name)
-                            elif self.manager.specific_process_asyncio_queue[self.stream_id] is not None:
-                                # if create_stream() got a asyncio consumer task for the asyncio queue -> use it
-                                logger.debug(f"BybitWebSocketApiSocket.start_socket() - Received data set from "
-                                             f"stream_id={self.stream_id} transferred to `asyncio_queue`!")
-                                await self.manager.asyncio_queue[self.stream_id].put(received_stream_data)
-                            elif self.manager.specific_process_stream_data[self.stream_id] is not None:
-                                # if create_stream() got a callback function -> use it
-                                logger.debug(f"BybitWebSocketApiSocket.start_socket() - Received data set from "
-                                             f"stream_id={self.stream_id} transferred to `process_stream_data`!")
-                                self.manager.specific_process_stream_data[self.stream_id](received_stream_data)
-                            elif self.manager.specific_process_stream_data_async[self.stream_id] is not None:
-                                # if create_stream() got an asynchronous callback function -> use it
-                                logger.debug(f"BybitWebSocketApiSocket.start_socket() - Received data set from "
-                                             f"stream_id={self.stream_id} transferred to "
-                                             f"`process_stream_data_async`!")
-                                await self.manager.specific_process_stream_data_async[self.stream_id](received_stream_data)
+                            batch_callback = self.manager._get_process_stream_data_batch(self.stream_id)
+                            if batch_callback is None:
+                                await self.process_received_data(received_stream_data_json)
                             else:
-                                if self.manager.process_asyncio_queue is not None:
-                                    # if global asyncio consumer task for the asyncio queue -> use it
-                                    logger.debug(f"BybitWebSocketApiSocket.start_socket() - Received data set from "
-                                                 f"stream_id={self.stream_id} transferred to `asyncio_queue`!")
-                                    await self.manager.asyncio_queue[self.stream_id].put(received_stream_data)
-                                elif self.manager.process_stream_data is not None:
-                                    # if global callback function -> use it
-                                    logger.debug(f"BybitWebSocketApiSocket.start_socket() - Received data set from "
-                                                 f"stream_id={self.stream_id} transferred to `process_stream_data`!")
-                                    self.manager.process_stream_data(received_stream_data)
-                                elif self.manager.process_stream_data_async is not None:
-                                    # if global async callback function -> use it
-                                    logger.debug(f"BybitWebSocketApiSocket.start_socket() - Received data set from "
-                                                 f"stream_id={self.stream_id} transferred to "
-                                                 f"`process_stream_data_async`!")
-                                    await self.manager.process_stream_data_async(received_stream_data)
-                                else:
-                                    # If nothing else is used, write to global stream_buffer
-                                    logger.debug(f"BybitWebSocketApiSocket.start_socket() - Received data set from "
-                                                 f"stream_id={self.stream_id} transferred to `stream_buffer`!")
-                                    self.manager.add_to_stream_buffer(received_stream_data)
-
-                            if "error" in received_stream_data_json:
-                                logger.error("BybitWebSocketApiSocket.start_socket(" +
-                                             str(self.stream_id) + ") "
-                                             "- Received error message: " + str(received_stream_data_json))
-                                self.manager.add_to_ringbuffer_error(received_stream_data_json)
-                            elif "result" in received_stream_data_json:
-                                logger.debug("BybitWebSocketApiSocket.start_socket(" +
-                                             str(self.stream_id) + ") "
-                                             "- Received result message: " + str(received_stream_data_json))
-                                self.manager.add_to_ringbuffer_result(received_stream_data_json)
-                            else:
-                                if self.manager.stream_list[self.stream_id]['last_received_data_record'] is None:
-                                    self.manager.send_stream_signal(signal_type="FIRST_RECEIVED_DATA",
-                                                                    stream_id=self.stream_id,
-                                                                    data_record=received_stream_data)
-                                self.manager.stream_list[self.stream_id]['last_received_data_record'] = received_stream_data
+                                await self.process_received_data_batch(received_stream_data_json, batch_callback)
                     except asyncio.TimeoutError:
                         # Timeout from `asyncio.wait_for()` which we use to keep the loop running even if we don't
                         # receive new records via websocket.
@@ -184,6 +118,9 @@ class BybitWebSocketApiSocket(object):
                                      f"asyncio.TimeoutError (This is no ERROR, its exactly what we want!)")
                         continue
         finally:
+            if self.sender_task is not None:
+                self.sender_task.cancel()
+                self.sender_task = None
             try:
                 if self.manager.stream_list[self.stream_id]['last_stream_signal'] == "FIRST_RECEIVED_DATA" \
                         or self.manager.stream_list[self.stream_id]['last_stream_signal'] == "CONNECT":
@@ -196,8 +133,267 @@ class BybitWebSocketApiSocket(object):
                 except AttributeError as error_msg:
                     logger.debug(f"BybitWebSocketApiSocket.__aexit__() - error_msg: {error_msg}")
 
+    async def deliver_stream_data(self, received_stream_data=None) -> None:
+        """
+        Deliver a received and decoded record to the `stream_buffer`, the callbacks or the `asyncio_queue`.
+
+        :param received_stream_data: The received record
+        :return: None
+        """
+        try:
+            stream_buffer_name = self.manager.stream_list[self.stream_id]['stream_buffer_name']
+        except KeyError:
+            stream_buffer_name = False
+        if stream_buffer_name is not False:
+            # if create_stream() got a stram_buffer_name -> use it
+            self.manager.add_to_stream_buffer(received_stream_data, stream_buffer_name=stream_buffer_name)
+        elif self.manager.specific_process_asyncio_queue[self.stream_id] is not None:
+            # if create_stream() got a asyncio consumer task for the asyncio queue -> use it
+            logger.debug(f"BybitWebSocketApiSocket.deliver_stream_data() - Received data set from "
+                         f"stream_id={self.stream_id} transferred to `asyncio_queue`!")
+            await self.manager.asyncio_queue[self.stream_id].put(received_stream_data)
+        elif self.manager.specific_process_stream_data[self.stream_id] is not None:
+            # if create_stream() got a callback function -> use it
+            logger.debug(f"BybitWebSocketApiSocket.deliver_stream_data() - Received data set from "
+                         f"stream_id={self.stream_id} transferred to `process_stream_data`!")
+            self.manager.specific_process_stream_data[self.stream_id](received_stream_data)
+        elif self.manager.specific_process_stream_data_async[self.stream_id] is not None:
+            # if create_stream() got an asynchronous callback function -> use it
+            logger.debug(f"BybitWebSocketApiSocket.deliver_stream_data() - Received data set from "
+                         f"stream_id={self.stream_id} transferred to "
+                         f"`process_stream_data_async`!")
+            await self.manager.specific_process_stream_data_async[self.stream_id](received_stream_data)
+        else:
+            if self.manager.process_asyncio_queue is not None:
+                # if global asyncio consumer task for the asyncio queue -> use it
+                logger.debug(f"BybitWebSocketApiSocket.deliver_stream_data() - Received data set from "
+                             f"stream_id={self.stream_id} transferred to `asyncio_queue`!")
+                await self.manager.asyncio_queue[self.stream_id].put(received_stream_data)
+            elif self.manager.process_stream_data is not None:
+                # if global callback function -> use it
+                logger.debug(f"BybitWebSocketApiSocket.deliver_stream_data() - Received data set "
+                             f"from stream_id={self.stream_id} transferred to "
+                             f"`process_stream_data`!")
+                self.manager.process_stream_data(received_stream_data)
+            elif self.manager.process_stream_data_async is not None:
+                # if global async callback function -> use it
+                logger.debug(f"BybitWebSocketApiSocket.deliver_stream_data() - Received data set from "
+                             f"stream_id={self.stream_id} transferred to "
+                             f"`process_stream_data_async`!")
+                await self.manager.process_stream_data_async(received_stream_data)
+            else:
+                # If nothing else is used, write to global stream_buffer
+                logger.debug(f"BybitWebSocketApiSocket.deliver_stream_data() - Received data set from "
+                             f"stream_id={self.stream_id} transferred to `stream_buffer`!")
+                self.manager.add_to_stream_buffer(received_stream_data)
+
+    async def process_received_data(self, received_stream_data_json: str = None, batch: list = None):
+        """
+        Classify, decode and deliver a received frame.
+
+        :param received_stream_data_json: The received frame.
+        :type received_stream_data_json: str
+        :param batch: If provided, the decoded record gets appended to this list instead of being delivered.
+        :type batch: list
+        :return: The received record or None for control messages
+        """
+        header = parse_frame_header(received_stream_data_json)
+        if header.topic is None:
+            # Frames without topic are control messages -> result or error path, not data
+            self.manager.process_control_message(decode_control_message(received_stream_data_json,
+                                                                        stream_id=self.stream_id))
+            return None
+        record = None
+        topic_engines = self.manager.topic_engines.get(self.stream_id)
+        if topic_engines is not None:
+            engines = topic_engines.get(header.topic.split(".", 1)[0] + ".")
+            if engines is not None:
+                # the stream keeps an engine for the topic (e.g. local order books) -> apply before delivering it
+                record = json.loads(received_stream_data_json)
+                engines.apply(header.topic, record)
+        topic_handlers = None
+        if self.manager.topic_router.has_handlers(self.stream_id):
+            topic_handlers = self.manager.topic_router.get_handlers(self.stream_id, header.topic)
+        conflation_buffer = self.manager.conflation_buffers.get(self.stream_id)
+        if topic_handlers:
+            # if handlers are registered for the topic -> decode only for them
+            logger.debug(f"BybitWebSocketApiSocket.process_received_data() - Received data set from "
+                         f"stream_id={self.stream_id} transferred to the topic handlers!")
+            received_stream_data = await self.process_topic_handlers(topic_handlers,
+                                                                     received_stream_data_json)
+        elif conflation_buffer is not None:
+            # the stream conflates by topic -> store undecoded, decoding happens on pop
+            received_stream_data = received_stream_data_json
+            conflation_buffer.put(header.topic, received_stream_data, type=header.type)
+        else:
+            if self.output == "dict":
+                received_stream_data = record or json.loads(received_stream_data_json)
+            elif self.output == "typed":
+                received_stream_data = decode_typed(record or json.loads(received_stream_data_json))
+            else:
+                received_stream_data = received_stream_data_json
+            if batch is not None:
+                # the stream delivers in batches -> collect
+                batch.append(received_stream_data)
+            else:
+                await self.deliver_stream_data(received_stream_data)
+        if self.manager.stream_list[self.stream_id]['last_received_data_record'] is None:
+            self.manager.send_stream_signal(signal_type="FIRST_RECEIVED_DATA",
+                                            stream_id=self.stream_id,
+                                            data_record=received_stream_data)
+        self.manager.stream_list[self.stream_id]['last_received_data_record'] = received_stream_data
+        return received_stream_data
+
+    async def process_received_data_batch(self,
+                                          received_stream_data_json: str = None,
+                                          batch_callback: Tuple[Callable, bool] = None) -> None:
+        """
+        Drain all frames which are already received by the websocket, up to `stream_data_batch_max_size` frames or
+        `stream_data_batch_max_time_us` microseconds, and deliver them with one call of the batch callback.
+
+        :param received_stream_data_json: The first received frame.
+        :type received_stream_data_json: str
+        :param batch_callback: The callback returned by `BybitWebSocketApiManager._get_process_stream_data_batch()`.
+        :type batch_callback: tuple
+        :return: None
+        """
+        batch = []
+        await self.process_received_data(received_stream_data_json, batch=batch)
+        max_size = self.manager.stream_data_batch_max_size
+        deadline = time.perf_counter() + self.manager.stream_data_batch_max_time_us / 1000000
+        try:
+            while len(batch) < max_size \
+                    and self.websocket.has_buffered_data() \
+                    and time.perf_counter() < deadline:
+                received_stream_data_json = await self.websocket.receive()
+                if received_stream_data_json is None:
+                    break
+                await self.process_received_data(received_stream_data_json, batch=batch)
+        finally:
+            if batch:
+                logger.debug(f"BybitWebSocketApiSocket.process_received_data_batch() - Batch with {len(batch)} "
+                             f"data sets from stream_id={self.stream_id} transferred to "
+                             f"`process_stream_data_batch`!")
+                callback, is_async = batch_callback
+                if is_async is True:
+                    await callback(batch)
+                else:
+                    callback(batch)
+
+    async def process_topic_handlers(self, topic_handlers: list = None, received_stream_data_json: str = None):
+        """
+        Deliver a received frame to the handlers of its topic, it gets decoded only once per `output` format.
+
+        :param topic_handlers: The handlers returned by `BybitWebSocketApiTopicRouter.get_handlers()`.
+        :type topic_handlers: list
+        :param received_stream_data_json: The received frame.
+        :type received_stream_data_json: str
+        :return: The record delivered to the last handler
+        """
+        decoded = {}
+        received_stream_data = None
+        for topic_handler in topic_handlers:
+            try:
+                received_stream_data = decoded[topic_handler.output]
+            except KeyError:
+                received_stream_data = self.manager.topic_router.decode(received_stream_data_json,
+                                                                        output=topic_handler.output)
+                decoded[topic_handler.output] = received_stream_data
+            if topic_handler.is_async is True:
+                await topic_handler.callback(received_stream_data)
+            else:
+                topic_handler.callback(received_stream_data)
+        return received_stream_data
+
     def raise_exceptions(self):
         if self.manager.is_stop_request(self.stream_id):
             raise StreamIsStopping(stream_id=self.stream_id, reason="stop request")
         if self.manager.is_crash_request(self.stream_id):
             raise StreamIsCrashing(stream_id=self.stream_id, reason="crash request")
+
+    def handle_sender_result(self, task: asyncio.Task = None) -> None:
+        """
+        Done callback of the sender task. If the sender ended with an exception, the connection gets closed and the
+        stream restarts instead of receiving on without sending the requests of `send_with_stream()` and
+        `subscribe_to_stream()`.
+
+        :param task: The sender task.
+        :type task: asyncio.Task
+        :return: None
+        """
+        if task.cancelled() or task.exception() is None:
+            return None
+        self.sender_error = task.exception()
+        logger.critical(f"BybitWebSocketApiSocket.run_sender({str(self.stream_id)}) - Sending stopped by "
+                        f"{type(self.sender_error).__name__}: {self.sender_error} - Restarting the stream ...")
+        if self.websocket is not None:
+            close_task = asyncio.ensure_future(self.websocket.close())
+            close_task.add_done_callback(self.manager._handle_task_result)
+
+    async def run_sender(self) -> None:
+        """
+        Send the queued requests of this connection within the limits of its `send_scheduler`.
+
+        The payloads added with `BybitWebSocketApiManager.add_payload_to_stream()` are moved into the bulk lane, the
+        requests of `send_request()` are queued by their `op`. The task sleeps till the next token is available or a
+        new request gets queued, so sending does not depend on receiving.
+
+        :return: None
+        """
+        while True:
+            self.send_event.clear()
+            try:
+                payloads = self.manager.stream_list[self.stream_id]['payload']
+            except KeyError:
+                logger.debug(f"BybitWebSocketApiSocket.run_sender({str(self.stream_id)}) - Sending stopped: The "
+                             f"stream was removed!")
+                return None
+            while payloads:
+                try:
+                    self.send_scheduler.put(payloads.pop(0), priority=False)
+                except IndexError:
+                    break
+            delay = self.send_scheduler.get_delay()
+            if delay == 0.0:
+                payload = self.send_scheduler.pop()
+                logger.info(f"BybitWebSocketApiSocket.run_sender({str(self.stream_id)}, {str(self.channels)}, "
+                            f"{str(self.markets)} - Sending payload: {str(payload)}")
+                if type(payload) is dict:
+                    try:
+                        data = json.dumps(payload, ensure_ascii=False)
+                    except (OverflowError, TypeError, ValueError) as error_msg:
+                        # a bad request gets dropped, the following requests are sent
+                        logger.error(f"BybitWebSocketApiSocket.run_sender({str(self.stream_id)}) - Can not send "
+                                     f"payload {str(payload)}: {type(error_msg).__name__} - {error_msg}")
+                        continue
+                    self.manager.request_index.register(req_id=payload.get('req_id', payload.get('reqId')),
+                                                        op=payload.get('op'))
+                    payload = data
+                try:
+                    await self.websocket.send(payload)
+                except (AttributeError, StreamIsCrashing, StreamIsStopping, websockets.exceptions.ConnectionClosed) \
+                        as error_msg:
+                    logger.debug(f"BybitWebSocketApiSocket.run_sender({str(self.stream_id)}) - Sending stopped: "
+                                 f"{type(error_msg).__name__} - {error_msg}")
+                    return None
+                continue
+            try:
+                await asyncio.wait_for(self.send_event.wait(), timeout=delay if delay is not None else 1.0)
+            except asyncio.TimeoutError:
+                pass
+
+    def send_request(self, payload: Union[dict, str] = None, priority: Optional[bool] = None) -> None:
+        """
+        Queue a request for sending, must be called within the event loop of the stream.
+
+        Pings, `auth` and `order.*` requests are sent in the priority lane, all other requests share the rate limit
+        with the subscriptions. The `req_id` of a dict gets registered to measure the round trip time.
+
+        :param payload: The request, e.g. `{"req_id": "1", "op": "subscribe", "args": [...]}`
+        :type payload: dict or str(JSON)
+        :param priority: Use the priority lane, if `None` it is chosen by the `op` of the request.
+        :type priority: bool or None
+        :return: None
+        """
+        self.send_scheduler.put(payload, priority=priority)
+        self.send_event.set()
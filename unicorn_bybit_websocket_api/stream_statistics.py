@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# ¯\_(ツ)_/¯
+#
+# File: unicorn_bybit_websocket_api/stream_statistics.py
+#
+# Part of ‘UNICORN Bybit WebSocket API’
+# Project website: https://www.lucit.tech/unicorn-bybit-websocket-api.html
+# Github: https://github.com/LUCIT-Systems-and-Development/unicorn-bybit-websocket-api
+# Documentation: https://unicorn-bybit-websocket-api.docs.lucit.tech
+# PyPI: https://pypi.org/project/unicorn-bybit-websocket-api
+# LUCIT Online Shop: https://shop.lucit.services/software
+#
+# License: LSOSL - LUCIT Synergetic Open Source License
+# https://github.com/LUCIT-Systems-and-Development/unicorn-bybit-websocket-api/blob/master/LICENSE
+#
+# Author: LUCIT Systems and Development
+#
+# Copyright (c) 2024-2024, LUCIT Systems and Development (https://www.lucit.tech)
+# All rights reserved.
+
+from typing import Optional
+import logging
+import time
+
+
+__logger__: logging.getLogger = logging.getLogger("unicorn_bybit_websocket_api")
+
+logger = __logger__
+
+
+class BybitWebSocketApiStreamStatistics(object):
+    """
+    Receive and transmit statistics of a single stream.
+
+    The object is owned by the event loop of the stream and gets updated without any lock. Only the owning loop is
+    writing the counters, all other threads are reading them. Reading a single attribute or a single dict entry is
+    atomic, the per-second dicts are only copied with `dict()` (see `get_receives_per_second()` and
+    `get_bytes_per_second()`) and never iterated directly by foreign threads.
+
+    The `BybitWebSocketApiManager` aggregates these values frequently into the `stream_list` and the global totals.
+
+    :param keep_max_entries: How many per-second entries should be kept.
+    :type keep_max_entries: int
+    """
+    __slots__ = ('keep_max_entries',
+                 'last_heartbeat',
+                 'processed_receives_total',
+                 'processed_transmitted_total',
+                 'received_bytes_total',
+                 'receives_per_second',
+                 'bytes_per_second',
+                 'current_second',
+                 'speed',
+                 'synced_receives_total',
+                 'synced_received_bytes_total',
+                 'synced_transmitted_total')
+
+    def __init__(self, keep_max_entries: int = 5):
+        self.keep_max_entries: int = keep_max_entries
+        self.last_heartbeat: Optional[float] = None
+        self.processed_receives_total: int = 0
+        self.processed_transmitted_total: int = 0
+        self.received_bytes_total: int = 0
+        self.receives_per_second: dict = {}
+        self.bytes_per_second: dict = {}
+        self.current_second: int = 0
+        self.speed: int = 0
+        self.synced_receives_total: int = 0
+        self.synced_received_bytes_total: int = 0
+        self.synced_transmitted_total: int = 0
+
+    def _rollover(self, second: int) -> None:
+        """
+        Open the buckets of a new second and drop entries older than `keep_max_entries`.
+
+        :param second: The new second as unix timestamp.
+        :type second: int
+        :return: None
+        """
+        self.current_second = second
+        self.receives_per_second[second] = 0
+        self.bytes_per_second[second] = 0
+        oldest_second = second - self.keep_max_entries
+        for timestamp_key in [key for key in self.receives_per_second if key < oldest_second]:
+            self.receives_per_second.pop(timestamp_key, None)
+        for timestamp_key in [key for key in self.bytes_per_second if key < oldest_second]:
+            self.bytes_per_second.pop(timestamp_key, None)
+
+    def add_receive(self, size: int) -> None:
+        """
+        Count a received frame with its size and set the heartbeat.
+
+        :param size: Size of the received frame in bytes.
+        :type size: int
+        :return: None
+        """
+        now = time.time()
+        second = int(now)
+        if second != self.current_second:
+            self._rollover(second)
+        self.last_heartbeat = now
+        self.processed_receives_total += 1
+        self.received_bytes_total += size
+        self.receives_per_second[second] += 1
+        self.bytes_per_second[second] += size
+
+    def add_receives(self, count: int, size: int) -> None:
+        """
+        Count a batch of received frames with their total size and set the heartbeat.
+
+        :param count: Number of received frames.
+        :type count: int
+        :param size: Total size of the received frames in bytes.
+        :type size: int
+        :return: None
+        """
+        now = time.time()
+        second = int(now)
+        if second != self.current_second:
+            self._rollover(second)
+        self.last_heartbeat = now
+        self.processed_receives_total += count
+        self.received_bytes_total += size
+        self.receives_per_second[second] += count
+        self.bytes_per_second[second] += size
+
+    def add_received_bytes(self, size: int) -> None:
+        """
+        Add received bytes to the bucket of the current second without counting a received frame.
+
+        :param size: Amount of bytes.
+        :type size: int
+        :return: None
+        """
+        second = int(time.time())
+        if second != self.current_second:
+            self._rollover(second)
+        self.bytes_per_second[second] += size
+
+    def add_processed_receive(self) -> None:
+        """
+        Count a received frame without adding its size.
+
+        :return: None
+        """
+        second = int(time.time())
+        if second != self.current_second:
+            self._rollover(second)
+        self.processed_receives_total += 1
+        self.receives_per_second[second] += 1
+
+    def add_transmit(self) -> None:
+        """
+        Count a transmitted payload.
+
+        :return: None
+        """
+        self.processed_transmitted_total += 1
+
+    def get_bytes_per_second(self) -> dict:
+        """
+        Get a copy of the received bytes per second.
+
+        :return: dict
+        """
+        return dict(self.bytes_per_second)
+
+    def get_receives_last_second(self) -> int:
+        """
+        Get the number of receives of the last completed second.
+
+        :return: int
+        """
+        return self.receives_per_second.get(int(time.time()) - 1, 0)
+
+    def get_received_bytes_last_second(self) -> int:
+        """
+        Get the received bytes of the last completed second.
+
+        :return: int
+        """
+        return self.bytes_per_second.get(int(time.time()) - 1, 0)
+
+    def get_receives_per_second(self) -> dict:
+        """
+        Get a copy of the receives per second.
+
+        :return: dict
+        """
+        return dict(self.receives_per_second)
+
+    def set_heartbeat(self) -> None:
+        """
+        Set the heartbeat to now.
+
+        :return: None
+        """
+        self.last_heartbeat = time.time()
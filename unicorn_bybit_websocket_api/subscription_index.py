@@ -0,0 +1,412 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# ¯\_(ツ)_/¯
+#
+# File: unicorn_bybit_websocket_api/subscription_index.py
+#
+# Part of ‘UNICORN Bybit WebSocket API’
+# Project website: https://www.lucit.tech/unicorn-bybit-websocket-api.html
+# Github: https://github.com/LUCIT-Systems-and-Development/unicorn-bybit-websocket-api
+# Documentation: https://unicorn-bybit-websocket-api.docs.lucit.tech
+# PyPI: https://pypi.org/project/unicorn-bybit-websocket-api
+# LUCIT Online Shop: https://shop.lucit.services/software
+#
+# License: LSOSL - LUCIT Synergetic Open Source License
+# https://github.com/LUCIT-Systems-and-Development/unicorn-bybit-websocket-api/blob/master/LICENSE
+#
+# Author: LUCIT Systems and Development
+#
+# Copyright (c) 2024-2024, LUCIT Systems and Development (https://www.lucit.tech)
+# All rights reserved.
+
+from typing import Dict, Iterable, List, Optional, Set
+
+import logging
+import re
+import threading
+
+
+__logger__: logging.getLogger = logging.getLogger("unicorn_bybit_websocket_api")
+
+logger = __logger__
+
+TOPIC_PENDING = "pending"
+TOPIC_ACTIVE = "active"
+TOPIC_REJECTED = "rejected"
+TOPIC_STALE = "stale"
+TOPIC_STATES = (TOPIC_PENDING, TOPIC_ACTIVE, TOPIC_REJECTED, TOPIC_STALE)
+# Topics in these states are subscribed or get subscribed by the connection of the stream
+SUBSCRIBED_TOPIC_STATES = (TOPIC_PENDING, TOPIC_ACTIVE, TOPIC_STALE)
+
+# Upper bounds of the buckets of the subscribe-to-ack latency histogram in milliseconds
+ACK_LATENCY_BUCKETS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+TOPIC_TOKEN = re.compile(r'[\w.\-]+')
+
+
+def get_rejected_topics(topics: Iterable[str] = None, ret_msg: Optional[str] = None) -> List[str]:
+    """
+    Get the topics of a rejected `subscribe` request which are named in the `ret_msg` of the response, e.g.
+    `Invalid symbol :[kline.1.FOOUSDT]`. If the `ret_msg` names none of the topics, all topics are rejected.
+
+    :param topics: The args of the request.
+    :type topics: list
+    :param ret_msg: The `ret_msg` of the response.
+    :type ret_msg: str
+    :return: list
+    """
+    topics = list(topics)
+    named = set(TOPIC_TOKEN.findall(str(ret_msg or "")))
+    rejected = [topic for topic in topics if topic in named]
+    return rejected or topics
+
+
+class BybitWebSocketApiSubscriptionIndex(object):
+    """
+    Index of the subscribed topics of all streams and their subscription state.
+
+    Every topic of a stream has one of the states:
+
+    - `pending`: The `subscribe` request is queued or sent and not acknowledged yet.
+    - `active`: Bybit acknowledged the subscription.
+    - `rejected`: Bybit rejected the subscription, the `ret_msg` of the response is kept as reason.
+    - `stale`: The topic was subscribed by a previous connection of the stream and is not subscribed again yet.
+
+    Every topic knows the streams which subscribed it and the number of topics per state is counted, so membership
+    checks, counts and the lookup of the streams of a topic are O(1). `add()` and `remove()` return only the topics
+    which really changed, which are the topics to send with a `subscribe` or `unsubscribe` request. Rejected topics
+    are not subscribed.
+
+    The index collects a histogram of the time from `subscribe_to_stream()` to the response of Bybit.
+    """
+    def __init__(self):
+        self.ack_latency_buckets: List[int] = [0] * (len(ACK_LATENCY_BUCKETS) + 1)
+        self.ack_latency_count: int = 0
+        self.ack_latency_max: Optional[float] = None
+        self.ack_latency_min: Optional[float] = None
+        self.ack_latency_total: float = 0.0
+        self.counts: Dict[Optional[str], Dict[str, int]] = {None: dict.fromkeys(TOPIC_STATES, 0)}
+        self.lock = threading.Lock()
+        self.reasons: Dict[str, Dict[str, str]] = {}
+        self.states: Dict[str, Dict[str, str]] = {}
+        self.stream_ids: Dict[str, Set[str]] = {}
+
+    def __contains__(self, topic: str) -> bool:
+        return topic in self.stream_ids
+
+    def __len__(self) -> int:
+        return self.get_number_of_topics()
+
+    def _set_state(self, stream_id: str = None, topic: str = None, state: Optional[str] = None,
+                   reason: Optional[str] = None) -> Optional[str]:
+        """
+        Change the state of a topic, `None` removes the topic. Must be called with `self.lock`.
+
+        :param stream_id: id of a stream
+        :type stream_id: str
+        :param topic: The topic.
+        :type topic: str
+        :param state: The new state or `None`.
+        :type state: str
+        :param reason: The reason of a rejection.
+        :type reason: str
+        :return: The previous state or `None`
+        """
+        stream_states = self.states.setdefault(stream_id, {})
+        previous_state = stream_states.get(topic)
+        if state == TOPIC_REJECTED:
+            self.reasons.setdefault(stream_id, {})[topic] = reason
+        elif previous_state == TOPIC_REJECTED:
+            del self.reasons[stream_id][topic]
+        if previous_state == state:
+            return previous_state
+        stream_counts = self.counts.setdefault(stream_id, dict.fromkeys(TOPIC_STATES, 0))
+        if previous_state is not None:
+            stream_counts[previous_state] -= 1
+            self.counts[None][previous_state] -= 1
+        if state is None:
+            del stream_states[topic]
+        else:
+            stream_states[topic] = state
+            stream_counts[state] += 1
+            self.counts[None][state] += 1
+        was_subscribed = previous_state in SUBSCRIBED_TOPIC_STATES
+        is_subscribed = state in SUBSCRIBED_TOPIC_STATES
+        if is_subscribed and not was_subscribed:
+            self.stream_ids.setdefault(topic, set()).add(stream_id)
+        elif was_subscribed and not is_subscribed:
+            stream_ids = self.stream_ids[topic]
+            stream_ids.discard(stream_id)
+            if not stream_ids:
+                del self.stream_ids[topic]
+        return previous_state
+
+    def add(self, stream_id: str = None, topics: Iterable[str] = None) -> List[str]:
+        """
+        Add topics to a stream, they get the state `pending`.
+
+        :param stream_id: id of a stream
+        :type stream_id: str
+        :param topics: The topics to add.
+        :type topics: list, set
+        :return: list of the added topics which were not subscribed by the stream before or were `rejected` or
+                 `stale`, in the given order
+        """
+        with self.lock:
+            stream_states = self.states.setdefault(stream_id, {})
+            added = []
+            for topic in topics:
+                if stream_states.get(topic) in (TOPIC_PENDING, TOPIC_ACTIVE):
+                    continue
+                self._set_state(stream_id=stream_id, topic=topic, state=TOPIC_PENDING)
+                added.append(topic)
+        return added
+
+    def add_ack_latency(self, latency: float = None) -> None:
+        """
+        Add the time between a `subscribe_to_stream()` call and the response of Bybit to the histogram.
+
+        :param latency: Latency in seconds
+        :type latency: float
+        :return: None
+        """
+        latency = latency * 1000
+        index = 0
+        for index, upper_bound in enumerate(ACK_LATENCY_BUCKETS):
+            if latency <= upper_bound:
+                break
+        else:
+            index = len(ACK_LATENCY_BUCKETS)
+        with self.lock:
+            self.ack_latency_buckets[index] += 1
+            self.ack_latency_count += 1
+            self.ack_latency_total += latency
+            if self.ack_latency_min is None or latency < self.ack_latency_min:
+                self.ack_latency_min = latency
+            if self.ack_latency_max is None or latency > self.ack_latency_max:
+                self.ack_latency_max = latency
+
+    def get_ack_latency_histogram(self) -> dict:
+        """
+        Get the histogram of the subscribe-to-ack latency in milliseconds.
+
+        The `buckets` hold the number of responses per bucket, the key is the upper bound of the bucket in
+        milliseconds, `+Inf` is the bucket of all slower responses.
+
+        :return: dict - `{'count': int, 'min': float, 'avg': float, 'max': float, 'buckets': {str: int}}`
+        """
+        with self.lock:
+            buckets = {str(upper_bound): self.ack_latency_buckets[index]
+                       for index, upper_bound in enumerate(ACK_LATENCY_BUCKETS)}
+            buckets['+Inf'] = self.ack_latency_buckets[-1]
+            return {'count': self.ack_latency_count,
+                    'min': self.ack_latency_min,
+                    'avg': self.ack_latency_total / self.ack_latency_count if self.ack_latency_count else None,
+                    'max': self.ack_latency_max,
+                    'buckets': buckets}
+
+    def get_number_of_topics(self, stream_id: str = None, state: Optional[str] = None) -> int:
+        """
+        Get the number of topics of a stream or of all streams.
+
+        :param stream_id: id of a stream or `None` for all streams.
+        :type stream_id: str
+        :param state: Count only the topics with this state, `None` counts all subscribed topics (`pending`, `active`
+                      and `stale`).
+        :type state: str
+        :return: int
+        """
+        counts = self.counts.get(stream_id)
+        if counts is None:
+            return 0
+        if state is None:
+            return sum(counts[subscribed_state] for subscribed_state in SUBSCRIBED_TOPIC_STATES)
+        return counts.get(state, 0)
+
+    def get_rejected_topics(self, stream_id: str = None) -> Dict[str, str]:
+        """
+        Get the rejected topics of a stream with the `ret_msg` of the rejection.
+
+        :param stream_id: id of a stream
+        :type stream_id: str
+        :return: dict - `{topic: ret_msg}`
+        """
+        with self.lock:
+            return dict(self.reasons.get(stream_id, {}))
+
+    def get_state(self, topic: str = None, stream_id: str = None) -> Optional[str]:
+        """
+        Get the state of a topic of a stream.
+
+        :param topic: The topic, e.g. `orderbook.50.BTCUSDT`
+        :type topic: str
+        :param stream_id: id of a stream
+        :type stream_id: str
+        :return: "pending", "active", "rejected", "stale" or `None` if the stream does not know the topic
+        """
+        return self.states.get(stream_id, {}).get(topic)
+
+    def get_states(self, stream_id: str = None) -> Dict[str, str]:
+        """
+        Get the states of all topics of a stream.
+
+        :param stream_id: id of a stream
+        :type stream_id: str
+        :return: dict - `{topic: state}`
+        """
+        with self.lock:
+            return dict(self.states.get(stream_id, {}))
+
+    def get_stream_ids(self, topic: str = None) -> Set[str]:
+        """
+        Get the ids of the streams which subscribed a topic.
+
+        :param topic: The topic, e.g. `orderbook.50.BTCUSDT`
+        :type topic: str
+        :return: set
+        """
+        with self.lock:
+            return set(self.stream_ids.get(topic, ()))
+
+    def get_topics(self, stream_id: str = None, state: Optional[str] = None) -> Set[str]:
+        """
+        Get the topics of a stream.
+
+        :param stream_id: id of a stream
+        :type stream_id: str
+        :param state: Get only the topics with this state, `None` returns all subscribed topics (`pending`, `active`
+                      and `stale`).
+        :type state: str
+        :return: set
+        """
+        with self.lock:
+            if state is None:
+                return set(topic for topic, topic_state in self.states.get(stream_id, {}).items()
+                           if topic_state in SUBSCRIBED_TOPIC_STATES)
+            return set(topic for topic, topic_state in self.states.get(stream_id, {}).items() if topic_state == state)
+
+    def has_topic(self, topic: str = None, stream_id: Optional[str] = None) -> bool:
+        """
+        Is the topic subscribed by a stream?
+
+        :param topic: The topic, e.g. `orderbook.50.BTCUSDT`
+        :type topic: str
+        :param stream_id: id of a stream or `None` for any stream.
+        :type stream_id: str
+        :return: bool
+        """
+        if stream_id is None:
+            return topic in self.stream_ids
+        return self.states.get(stream_id, {}).get(topic) in SUBSCRIBED_TOPIC_STATES
+
+    def mark_stale(self, stream_id: str = None) -> int:
+        """
+        Set all `pending` and `active` topics of a stream to `stale`, e.g. because its connection was lost.
+
+        :param stream_id: id of a stream
+        :type stream_id: str
+        :return: int, the number of stale topics
+        """
+        with self.lock:
+            topics = [topic for topic, state in self.states.get(stream_id, {}).items()
+                      if state in (TOPIC_PENDING, TOPIC_ACTIVE)]
+            for topic in topics:
+                self._set_state(stream_id=stream_id, topic=topic, state=TOPIC_STALE)
+        return len(topics)
+
+    def remove(self, stream_id: str = None, topics: Iterable[str] = None) -> List[str]:
+        """
+        Remove topics from a stream.
+
+        :param stream_id: id of a stream
+        :type stream_id: str
+        :param topics: The topics to remove.
+        :type topics: list, set
+        :return: list of the removed topics which were subscribed by the stream, in the given order
+        """
+        with self.lock:
+            stream_states = self.states.get(stream_id)
+            if not stream_states:
+                return []
+            removed = []
+            for topic in topics:
+                if topic not in stream_states:
+                    continue
+                if self._set_state(stream_id=stream_id, topic=topic, state=None) in SUBSCRIBED_TOPIC_STATES:
+                    removed.append(topic)
+        return removed
+
+    def remove_stream(self, stream_id: str = None) -> int:
+        """
+        Remove all topics of a stream.
+
+        :param stream_id: id of a stream
+        :type stream_id: str
+        :return: int, the number of removed subscribed topics
+        """
+        with self.lock:
+            removed = 0
+            for topic in list(self.states.get(stream_id, {})):
+                if self._set_state(stream_id=stream_id, topic=topic, state=None) in SUBSCRIBED_TOPIC_STATES:
+                    removed += 1
+            self.states.pop(stream_id, None)
+            self.reasons.pop(stream_id, None)
+            self.counts.pop(stream_id, None)
+        return removed
+
+    def set_state(self,
+                  stream_id: str = None,
+                  topics: Iterable[str] = None,
+                  state: str = None,
+                  reason: Optional[str] = None,
+                  expected_state: Optional[str] = None) -> List[str]:
+        """
+        Set the state of topics of a stream, topics which are not part of the stream are ignored.
+
+        :param stream_id: id of a stream
+        :type stream_id: str
+        :param topics: The topics.
+        :type topics: list, set
+        :param state: "pending", "active", "rejected" or "stale"
+        :type state: str
+        :param reason: The reason of a rejection, e.g. the `ret_msg` of the response.
+        :type reason: str
+        :param expected_state: Change only the topics which have this state, e.g. `pending`.
+        :type expected_state: str
+        :return: list of the changed topics
+        """
+        if state not in TOPIC_STATES:
+            raise ValueError(f"Parameter `state` must be one of {TOPIC_STATES}, received: {state}")
+        with self.lock:
+            stream_states = self.states.get(stream_id, {})
+            changed = []
+            for topic in topics:
+                previous_state = stream_states.get(topic)
+                if previous_state is None or (expected_state is not None and previous_state != expected_state):
+                    continue
+                self._set_state(stream_id=stream_id, topic=topic, state=state, reason=reason)
+                changed.append(topic)
+        return changed
+
+    def set_states(self,
+                   stream_id: str = None,
+                   states: Dict[str, str] = None,
+                   reasons: Optional[Dict[str, str]] = None) -> None:
+        """
+        Replace the topics of a stream, e.g. with the topics of a stream running in a worker process.
+
+        :param stream_id: id of a stream
+        :type stream_id: str
+        :param states: The topics of the stream with their state.
+        :type states: dict
+        :param reasons: The reasons of the rejected topics.
+        :type reasons: dict
+        :return: None
+        """
+        reasons = reasons or {}
+        with self.lock:
+            for topic in list(self.states.get(stream_id, {})):
+                if topic not in states:
+                    self._set_state(stream_id=stream_id, topic=topic, state=None)
+            for topic, state in states.items():
+                self._set_state(stream_id=stream_id, topic=topic, state=state, reason=reasons.get(topic))
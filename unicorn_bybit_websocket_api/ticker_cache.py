@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# ¯\_(ツ)_/¯
+#
+# File: unicorn_bybit_websocket_api/ticker_cache.py
+#
+# Part of ‘UNICORN Bybit WebSocket API’
+# Project website: https://www.lucit.tech/unicorn-bybit-websocket-api.html
+# Github: https://github.com/LUCIT-Systems-and-Development/unicorn-bybit-websocket-api
+# Documentation: https://unicorn-bybit-websocket-api.docs.lucit.tech
+# PyPI: https://pypi.org/project/unicorn-bybit-websocket-api
+# LUCIT Online Shop: https://shop.lucit.services/software
+#
+# License: LSOSL - LUCIT Synergetic Open Source License
+# https://github.com/LUCIT-Systems-and-Development/unicorn-bybit-websocket-api/blob/master/LICENSE
+#
+# Author: LUCIT Systems and Development
+#
+# Copyright (c) 2024-2024, LUCIT Systems and Development (https://www.lucit.tech)
+# All rights reserved.
+
+
+from .topic_decoders import TICKER_FIELDS
+from .topic_engines import BybitWebSocketApiTopicEngines
+from typing import Dict, Optional
+
+import logging
+import threading
+
+
+__logger__: logging.getLogger = logging.getLogger("unicorn_bybit_websocket_api")
+
+logger = __logger__
+
+
+class BybitWebSocketApiTickerState(object):
+    """
+    The current state of a `tickers.{symbol}` topic with a fixed schema: the attributes of `TICKER_FIELDS`.
+
+    A `snapshot` replaces all fields, a `delta` updates the received fields in place and keeps the others. Fields which
+    Bybit did not send yet are `None`.
+
+    :param symbol: The symbol, e.g. `BTCUSDT`
+    :type symbol: str
+    """
+    __slots__ = ('symbol', 'ts', 'cs', 'lock') + tuple(attribute for attribute, _ in TICKER_FIELDS.values())
+
+    def __init__(self, symbol: str = None):
+        self.symbol: str = symbol
+        self.ts: Optional[int] = None
+        self.cs: Optional[int] = None
+        for attribute, _ in TICKER_FIELDS.values():
+            setattr(self, attribute, None)
+        self.lock = threading.Lock()
+
+    def __repr__(self):
+        return f"BybitWebSocketApiTickerState(symbol={self.symbol!r}, last_price={self.last_price}, " \
+               f"bid1_price={self.bid1_price}, ask1_price={self.ask1_price})"
+
+    def apply(self, message: dict = None) -> bool:
+        """
+        Apply a received `snapshot` or `delta` message.
+
+        :param message: The decoded message.
+        :type message: dict
+        :return: bool - `False` if the message was ignored
+        """
+        fields = [(TICKER_FIELDS[key], value) for key, value in message['data'].items() if key in TICKER_FIELDS]
+        # convert before locking, a message with an invalid value must not be applied partially
+        fields = [(attribute, converter(value)) for (attribute, converter), value in fields]
+        with self.lock:
+            if message.get('type', "snapshot") == "snapshot":
+                for attribute, _ in TICKER_FIELDS.values():
+                    setattr(self, attribute, None)
+            for attribute, value in fields:
+                setattr(self, attribute, value)
+            self.ts = message.get('ts', self.ts)
+            self.cs = message.get('cs', self.cs)
+        return True
+
+    def get(self) -> dict:
+        """
+        Get a copy of the state.
+
+        :return: dict - `{'symbol', 'ts', 'cs', 'last_price', 'bid1_price', ...}`
+        """
+        with self.lock:
+            ticker = {'symbol': self.symbol, 'ts': self.ts, 'cs': self.cs}
+            for attribute, _ in TICKER_FIELDS.values():
+                ticker[attribute] = getattr(self, attribute)
+        return ticker
+
+
+class BybitWebSocketApiTickerCache(BybitWebSocketApiTopicEngines):
+    """
+    The ticker states of the `tickers.*` topics of a stream, one per symbol. The state of a symbol gets created with
+    its first `snapshot`.
+
+    :param is_subscribed: Function which gets called with the topic before a state gets created, see
+                          `BybitWebSocketApiTopicEngines`.
+    :type is_subscribed: function
+    """
+    prefix = "tickers."
+
+    def _apply(self, topic: str = None, engine: BybitWebSocketApiTickerState = None, message: dict = None) -> bool:
+        return engine.apply(message)
+
+    def _create(self, topic: str = None, key: str = None, message: dict = None) -> \
+            Optional[BybitWebSocketApiTickerState]:
+        if message.get('type', "snapshot") != "snapshot":
+            return None
+        return BybitWebSocketApiTickerState(symbol=key)
+
+    def get(self, symbol: str = None) -> Optional[BybitWebSocketApiTickerState]:
+        """
+        Get the state of a symbol.
+
+        :param symbol: The symbol, e.g. `BTCUSDT`
+        :type symbol: str
+        :return: BybitWebSocketApiTickerState or None
+        """
+        return self.engines.get(symbol)
+
+    def get_all(self) -> Dict[str, dict]:
+        """
+        Get a copy of the states of all symbols.
+
+        :return: dict - `{symbol: {'symbol', 'ts', 'cs', 'last_price', ...}, ...}`
+        """
+        return {symbol: ticker.get() for symbol, ticker in self.engines.items()}
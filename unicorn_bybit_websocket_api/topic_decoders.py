@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# ¯\_(ツ)_/¯
+#
+# File: unicorn_bybit_websocket_api/topic_decoders.py
+#
+# Part of ‘UNICORN Bybit WebSocket API’
+# Project website: https://www.lucit.tech/unicorn-bybit-websocket-api.html
+# Github: https://github.com/LUCIT-Systems-and-Development/unicorn-bybit-websocket-api
+# Documentation: https://unicorn-bybit-websocket-api.docs.lucit.tech
+# PyPI: https://pypi.org/project/unicorn-bybit-websocket-api
+# LUCIT Online Shop: https://shop.lucit.services/software
+#
+# License: LSOSL - LUCIT Synergetic Open Source License
+# https://github.com/LUCIT-Systems-and-Development/unicorn-bybit-websocket-api/blob/master/LICENSE
+#
+# Author: LUCIT Systems and Development
+#
+# Copyright (c) 2024-2024, LUCIT Systems and Development (https://www.lucit.tech)
+# All rights reserved.
+
+from typing import Callable, Dict, List, Optional, Tuple, Union
+import logging
+
+
+__logger__: logging.getLogger = logging.getLogger("unicorn_bybit_websocket_api")
+
+logger = __logger__
+
+
+def _to_float(value) -> Optional[float]:
+    """
+    Convert a numeric string of Bybit to float, empty values become `None`.
+    """
+    if value is None or value == "":
+        return None
+    return float(value)
+
+
+def _to_int(value) -> Optional[int]:
+    """
+    Convert a numeric string of Bybit to int, empty values become `None`.
+    """
+    if value is None or value == "":
+        return None
+    return int(value)
+
+
+class BybitWebSocketApiTypedMessage(object):
+    """
+    Envelope of a decoded topic message (`output="typed"`).
+
+    :param topic: The topic, e.g. `kline.1.BTCUSDT`
+    :type topic: str
+    :param type: `snapshot` or `delta`
+    :type type: str
+    :param ts: Timestamp in ms when the data was generated by the system
+    :type ts: int
+    :param cts: Matching engine timestamp in ms (only `orderbook.*`)
+    :type cts: int
+    :param data: The decoded data, a list of objects or a single object depending on the topic
+    """
+    __slots__ = ('topic', 'type', 'ts', 'cts', 'data')
+
+    def __init__(self, topic: str = None, type: str = None, ts: int = None, cts: int = None, data=None):
+        self.topic = topic
+        self.type = type
+        self.ts = ts
+        self.cts = cts
+        self.data = data
+
+    def __repr__(self):
+        return f"BybitWebSocketApiTypedMessage(topic={self.topic!r}, type={self.type!r}, ts={self.ts!r}, " \
+               f"cts={self.cts!r}, data={self.data!r})"
+
+
+class BybitWebSocketApiKline(object):
+    """
+    A candle of `kline.{interval}.{symbol}`.
+    """
+    __slots__ = ('start', 'end', 'interval', 'open', 'close', 'high', 'low', 'volume', 'turnover', 'confirm',
+                 'timestamp')
+
+    def __init__(self, data: dict):
+        self.start: int = int(data['start'])
+        self.end: int = int(data['end'])
+        self.interval: str = data['interval']
+        self.open: float = float(data['open'])
+        self.close: float = float(data['close'])
+        self.high: float = float(data['high'])
+        self.low: float = float(data['low'])
+        self.volume: float = float(data['volume'])
+        self.turnover: float = float(data['turnover'])
+        self.confirm: bool = data['confirm']
+        self.timestamp: int = int(data['timestamp'])
+
+    def __repr__(self):
+        return f"BybitWebSocketApiKline(start={self.start}, interval={self.interval!r}, open={self.open}, " \
+               f"high={self.high}, low={self.low}, close={self.close}, volume={self.volume}, " \
+               f"confirm={self.confirm})"
+
+
+class BybitWebSocketApiTrade(object):
+    """
+    A trade of `publicTrade.{symbol}`.
+    """
+    __slots__ = ('timestamp', 'symbol', 'side', 'size', 'price', 'tick_direction', 'trade_id', 'block_trade')
+
+    def __init__(self, data: dict):
+        self.timestamp: int = int(data['T'])
+        self.symbol: str = data['s']
+        self.side: str = data['S']
+        self.size: float = float(data['v'])
+        self.price: float = float(data['p'])
+        self.tick_direction: Optional[str] = data.get('L')
+        self.trade_id: str = data['i']
+        self.block_trade: bool = data.get('BT', False)
+
+    def __repr__(self):
+        return f"BybitWebSocketApiTrade(symbol={self.symbol!r}, side={self.side!r}, price={self.price}, " \
+               f"size={self.size}, timestamp={self.timestamp})"
+
+
+class BybitWebSocketApiOrderBook(object):
+    """
+    A snapshot or delta of `orderbook.{depth}.{symbol}`.
+
+    `bids` and `asks` are lists of `(price, size)` tuples, a size of `0.0` within a delta removes the price level.
+    """
+    __slots__ = ('symbol', 'bids', 'asks', 'update_id', 'seq')
+
+    def __init__(self, data: dict):
+        self.symbol: str = data['s']
+        self.bids: List[Tuple[float, float]] = [(float(price), float(size)) for price, size in data['b']]
+        self.asks: List[Tuple[float, float]] = [(float(price), float(size)) for price, size in data['a']]
+        self.update_id: int = data['u']
+        self.seq: Optional[int] = data.get('seq')
+
+    def __repr__(self):
+        return f"BybitWebSocketApiOrderBook(symbol={self.symbol!r}, update_id={self.update_id}, seq={self.seq}, " \
+               f"bids={len(self.bids)}, asks={len(self.asks)})"
+
+
+# Bybit field name: (attribute name, converter)
+TICKER_FIELDS: Dict[str, Tuple[str, Callable]] = {
+    'tickDirection': ('tick_direction', str),
+    'price24hPcnt': ('price_24h_pcnt', _to_float),
+    'lastPrice': ('last_price', _to_float),
+    'prevPrice24h': ('prev_price_24h', _to_float),
+    'highPrice24h': ('high_price_24h', _to_float),
+    'lowPrice24h': ('low_price_24h', _to_float),
+    'prevPrice1h': ('prev_price_1h', _to_float),
+    'markPrice': ('mark_price', _to_float),
+    'indexPrice': ('index_price', _to_float),
+    'openInterest': ('open_interest', _to_float),
+    'openInterestValue': ('open_interest_value', _to_float),
+    'turnover24h': ('turnover_24h', _to_float),
+    'volume24h': ('volume_24h', _to_float),
+    'nextFundingTime': ('next_funding_time', _to_int),
+    'fundingRate': ('funding_rate', _to_float),
+    'bid1Price': ('bid1_price', _to_float),
+    'bid1Size': ('bid1_size', _to_float),
+    'ask1Price': ('ask1_price', _to_float),
+    'ask1Size': ('ask1_size', _to_float),
+    'deliveryTime': ('delivery_time', str),
+    'basisRate': ('basis_rate', _to_float),
+    'deliveryFeeRate': ('delivery_fee_rate', _to_float),
+    'predictedDeliveryPrice': ('predicted_delivery_price', _to_float),
+    'usdIndexPrice': ('usd_index_price', _to_float),
+    'bidPrice': ('bid_price', _to_float),
+    'bidSize': ('bid_size', _to_float),
+    'bidIv': ('bid_iv', _to_float),
+    'askPrice': ('ask_price', _to_float),
+    'askSize': ('ask_size', _to_float),
+    'askIv': ('ask_iv', _to_float),
+    'markPriceIv': ('mark_price_iv', _to_float),
+    'underlyingPrice': ('underlying_price', _to_float),
+    'totalVolume': ('total_volume', _to_float),
+    'totalTurnover': ('total_turnover', _to_float),
+    'delta': ('delta', _to_float),
+    'gamma': ('gamma', _to_float),
+    'vega': ('vega', _to_float),
+    'theta': ('theta', _to_float),
+    'change24h': ('change_24h', _to_float),
+}
+
+
+class BybitWebSocketApiTicker(object):
+    """
+    A snapshot or delta of `tickers.{symbol}`.
+
+    Bybit sends only the changed fields within a delta, fields which are not part of the message are `None`.
+    """
+    __slots__ = ('symbol',) + tuple(attribute for attribute, _ in TICKER_FIELDS.values())
+
+    def __init__(self, data: dict):
+        self.symbol: str = data['symbol']
+        for attribute, _ in TICKER_FIELDS.values():
+            setattr(self, attribute, None)
+        for key, value in data.items():
+            try:
+                attribute, converter = TICKER_FIELDS[key]
+            except KeyError:
+                continue
+            setattr(self, attribute, converter(value))
+
+    def __repr__(self):
+        return f"BybitWebSocketApiTicker(symbol={self.symbol!r}, last_price={self.last_price}, " \
+               f"bid1_price={self.bid1_price}, ask1_price={self.ask1_price})"
+
+
+class BybitWebSocketApiLiquidation(object):
+    """
+    A liquidation of `liquidation.{symbol}` or `allLiquidation.{symbol}`.
+    """
+    __slots__ = ('symbol', 'side', 'price', 'size', 'updated_time')
+
+    def __init__(self, data: dict):
+        if 'symbol' in data:
+            self.symbol: str = data['symbol']
+            self.side: str = data['side']
+            self.price: float = float(data['price'])
+            self.size: float = float(data['size'])
+            self.updated_time: int = int(data['updatedTime'])
+        else:
+            self.symbol: str = data['s']
+            self.side: str = data['S']
+            self.price: float = float(data['p'])
+            self.size: float = float(data['v'])
+            self.updated_time: int = int(data['T'])
+
+    def __repr__(self):
+        return f"BybitWebSocketApiLiquidation(symbol={self.symbol!r}, side={self.side!r}, price={self.price}, " \
+               f"size={self.size})"
+
+
+# Topic prefix: (class, data is a list)
+TOPIC_DECODERS: Dict[str, Tuple[type, bool]] = {
+    'kline': (BybitWebSocketApiKline, True),
+    'publicTrade': (BybitWebSocketApiTrade, True),
+    'orderbook': (BybitWebSocketApiOrderBook, False),
+    'tickers': (BybitWebSocketApiTicker, False),
+    'liquidation': (BybitWebSocketApiLiquidation, False),
+    'allLiquidation': (BybitWebSocketApiLiquidation, True),
+}
+
+
+def decode_typed(stream_data: dict) -> Union[BybitWebSocketApiTypedMessage, dict]:
+    """
+    Decode a received and already parsed message into a `BybitWebSocketApiTypedMessage`.
+
+    Messages without a supported topic (e.g. subscription responses) are returned unchanged as dict.
+
+    :param stream_data: The parsed message
+    :type stream_data: dict
+    :return: BybitWebSocketApiTypedMessage or dict
+    """
+    try:
+        topic = stream_data['topic']
+        decoder, is_list = TOPIC_DECODERS[topic[:topic.index(".")]]
+    except (KeyError, ValueError, TypeError):
+        return stream_data
+    data = stream_data['data']
+    if is_list:
+        if type(data) is list:
+            data = [decoder(item) for item in data]
+        else:
+            data = [decoder(data)]
+    else:
+        data = decoder(data)
+    return BybitWebSocketApiTypedMessage(topic=topic,
+                                         type=stream_data.get('type'),
+                                         ts=stream_data.get('ts'),
+                                         cts=stream_data.get('cts'),
+                                         data=data)
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# ¯\_(ツ)_/¯
+#
+# File: unicorn_bybit_websocket_api/topic_engines.py
+#
+# Part of ‘UNICORN Bybit WebSocket API’
+# Project website: https://www.lucit.tech/unicorn-bybit-websocket-api.html
+# Github: https://github.com/LUCIT-Systems-and-Development/unicorn-bybit-websocket-api
+# Documentation: https://unicorn-bybit-websocket-api.docs.lucit.tech
+# PyPI: https://pypi.org/project/unicorn-bybit-websocket-api
+# LUCIT Online Shop: https://shop.lucit.services/software
+#
+# License: LSOSL - LUCIT Synergetic Open Source License
+# https://github.com/LUCIT-Systems-and-Development/unicorn-bybit-websocket-api/blob/master/LICENSE
+#
+# Author: LUCIT Systems and Development
+#
+# Copyright (c) 2024-2024, LUCIT Systems and Development (https://www.lucit.tech)
+# All rights reserved.
+
+
+from typing import Callable, Dict, Hashable, Optional
+
+import logging
+
+
+__logger__: logging.getLogger = logging.getLogger("unicorn_bybit_websocket_api")
+
+logger = __logger__
+
+
+class BybitWebSocketApiTopicEngines(object):
+    """
+    Base class of the containers which keep one engine per key of the topics of a stream with the same `prefix`, e.g.
+    the local order books of the `orderbook.*` topics.
+
+    The dict of the engines is replaced and never modified in place, so other threads can read it without a lock.
+    Subclasses set `prefix`, implement `_apply()` and `_create()` and override `_get_key()` if the symbol of the topic
+    is not the key.
+
+    :param is_subscribed: Function which gets called with the topic before an engine gets created, if it returns
+                          `False` the message is ignored. This keeps messages which are still in flight after
+                          unsubscribing a topic from creating its engine again.
+    :type is_subscribed: function
+    """
+    prefix: str = ""
+
+    def __init__(self, is_subscribed: Optional[Callable] = None):
+        self.engines: Dict[Hashable, object] = {}
+        self.is_subscribed: Optional[Callable] = is_subscribed
+
+    def _add(self, key: Hashable = None, engine: object = None) -> None:
+        """
+        Add the engine of a key.
+
+        :param key: The key returned by `_get_key()`.
+        :type key: Hashable
+        :param engine: The new engine.
+        :type engine: object
+        :return: None
+        """
+        engines = dict(self.engines)
+        engines[key] = engine
+        self.engines = engines
+
+    def _apply(self, topic: str = None, engine: object = None, message: dict = None) -> bool:
+        """
+        Apply a received message to the engine of its topic.
+
+        :param topic: The topic of the message.
+        :type topic: str
+        :param engine: The engine of the topic.
+        :type engine: object
+        :param message: The decoded message.
+        :type message: dict
+        :return: bool - `False` if the message was ignored
+        """
+        raise NotImplementedError
+
+    def _create(self, topic: str = None, key: Hashable = None, message: dict = None) -> Optional[object]:
+        """
+        Create the engine of a topic with its first received message.
+
+        :param topic: The topic of the message.
+        :type topic: str
+        :param key: The key returned by `_get_key()`.
+        :type key: Hashable
+        :param message: The decoded message.
+        :type message: dict
+        :return: The new engine or `None` if the message can not start one, e.g. a `delta` before the `snapshot`.
+        """
+        raise NotImplementedError
+
+    @staticmethod
+    def _get_key(topic: str = None) -> Hashable:
+        """
+        Get the key of the engine of a topic, the symbol by default.
+
+        :param topic: The topic, e.g. `tickers.BTCUSDT`
+        :type topic: str
+        :return: Hashable
+        """
+        return topic.partition(".")[2]
+
+    def _remove(self, key: Hashable = None) -> Optional[object]:
+        """
+        Remove the engine of a key.
+
+        :param key: The key returned by `_get_key()`.
+        :type key: Hashable
+        :return: The removed engine or `None`
+        """
+        if key not in self.engines:
+            return None
+        engines = dict(self.engines)
+        engine = engines.pop(key)
+        self.engines = engines
+        return engine
+
+    def apply(self, topic: str = None, message: dict = None) -> bool:
+        """
+        Apply a received message to the engine of its topic, the engine gets created if it does not exist yet.
+
+        :param topic: The topic of the message.
+        :type topic: str
+        :param message: The decoded message.
+        :type message: dict
+        :return: bool - `False` if the message was ignored
+        """
+        try:
+            key = self._get_key(topic)
+            engine = self.engines.get(key)
+            if engine is None:
+                if self.is_subscribed is not None and self.is_subscribed(topic) is False:
+                    return False
+                engine = self._create(topic=topic, key=key, message=message)
+                if engine is None:
+                    return False
+                self._add(key=key, engine=engine)
+            return self._apply(topic=topic, engine=engine, message=message)
+        except (AttributeError, IndexError, KeyError, TypeError, ValueError) as error_msg:
+            logger.error(f"{self.__class__.__name__}.apply() - Can not apply message of topic '{topic}': {error_msg}")
+            return False
+
+    def remove(self, topic: str = None) -> bool:
+        """
+        Remove the engine of a topic, e.g. after unsubscribing it.
+
+        :param topic: The topic.
+        :type topic: str
+        :return: bool
+        """
+        return self._remove(key=self._get_key(topic)) is not None
@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# ¯\_(ツ)_/¯
+#
+# File: unicorn_bybit_websocket_api/topic_router.py
+#
+# Part of ‘UNICORN Bybit WebSocket API’
+# Project website: https://www.lucit.tech/unicorn-bybit-websocket-api.html
+# Github: https://github.com/LUCIT-Systems-and-Development/unicorn-bybit-websocket-api
+# Documentation: https://unicorn-bybit-websocket-api.docs.lucit.tech
+# PyPI: https://pypi.org/project/unicorn-bybit-websocket-api
+# LUCIT Online Shop: https://shop.lucit.services/software
+#
+# License: LSOSL - LUCIT Synergetic Open Source License
+# https://github.com/LUCIT-Systems-and-Development/unicorn-bybit-websocket-api/blob/master/LICENSE
+#
+# Author: LUCIT Systems and Development
+#
+# Copyright (c) 2024-2024, LUCIT Systems and Development (https://www.lucit.tech)
+# All rights reserved.
+
+from .topic_decoders import decode_typed
+from typing import Callable, Dict, List, Optional
+try:
+    # python <=3.7 support
+    from typing import Literal
+except ImportError:
+    from typing_extensions import Literal
+
+import asyncio
+import fnmatch
+import logging
+import re
+import threading
+import ujson as json
+
+
+__logger__: logging.getLogger = logging.getLogger("unicorn_bybit_websocket_api")
+
+logger = __logger__
+
+HEADER_TOPIC = re.compile(r'"topic"\s*:\s*"([^"]*)"')
+HEADER_OP = re.compile(r'"op"\s*:\s*"([^"]*)"')
+HEADER_TYPE = re.compile(r'"type"\s*:\s*"([^"]*)"')
+
+
+class BybitWebSocketApiFrameHeader(object):
+    """
+    The header fields `topic`, `op` and `type` of a received frame, fields which are not part of the frame are `None`.
+    """
+    __slots__ = ('topic', 'op', 'type')
+
+    def __init__(self, topic: Optional[str] = None, op: Optional[str] = None, type: Optional[str] = None):
+        self.topic = topic
+        self.op = op
+        self.type = type
+
+    def __repr__(self):
+        return f"BybitWebSocketApiFrameHeader(topic={self.topic!r}, op={self.op!r}, type={self.type!r})"
+
+
+def parse_frame_header(raw_data: str) -> BybitWebSocketApiFrameHeader:
+    """
+    Extract `topic`, `op` and `type` of a received frame without decoding the whole JSON string.
+
+    Bybit sends these fields in front of `data`, so only the part before `"data"` gets searched. If there is no topic
+    in front of `data`, the whole frame gets searched.
+
+    :param raw_data: The received frame as string.
+    :type raw_data: str
+    :return: BybitWebSocketApiFrameHeader
+    """
+    end = raw_data.find('"data"')
+    if end == -1:
+        end = len(raw_data)
+    header = BybitWebSocketApiFrameHeader()
+    match = HEADER_TOPIC.search(raw_data, 0, end)
+    if match is None and end != len(raw_data):
+        match = HEADER_TOPIC.search(raw_data)
+    if match is not None:
+        header.topic = match.group(1)
+        match = HEADER_TYPE.search(raw_data, 0, end)
+        if match is not None:
+            header.type = match.group(1)
+    else:
+        match = HEADER_OP.search(raw_data, 0, end)
+        if match is not None:
+            header.op = match.group(1)
+    return header
+
+
+def get_record_topic(stream_data=None) -> Optional[str]:
+    """
+    Get the topic of a record in any `output` format.
+
+    :param stream_data: The record as string, dict or `BybitWebSocketApiTypedMessage`.
+    :return: str or None
+    """
+    if type(stream_data) is str:
+        return parse_frame_header(stream_data).topic
+    elif type(stream_data) is dict:
+        return stream_data.get('topic')
+    return getattr(stream_data, 'topic', None)
+
+
+def get_record_header(stream_data=None) -> BybitWebSocketApiFrameHeader:
+    """
+    Get `topic` and `type` of a record in any `output` format.
+
+    :param stream_data: The record as string, dict or `BybitWebSocketApiTypedMessage`.
+    :return: BybitWebSocketApiFrameHeader
+    """
+    if type(stream_data) is str:
+        return parse_frame_header(stream_data)
+    elif type(stream_data) is dict:
+        return BybitWebSocketApiFrameHeader(topic=stream_data.get('topic'), type=stream_data.get('type'))
+    return BybitWebSocketApiFrameHeader(topic=getattr(stream_data, 'topic', None),
+                                        type=getattr(stream_data, 'type', None))
+
+
+class BybitWebSocketApiTopicHandler(object):
+    """
+    A registered topic handler.
+
+    :param pattern: A topic or a topic pattern with `*` wildcards, e.g. `orderbook.50.*`
+    :type pattern: str
+    :param callback: Function or coroutine function which gets called with the received record.
+    :type callback: function
+    :param output: Format of the record: "raw_data", "dict" or "typed"
+    :type output: str
+    """
+    __slots__ = ('pattern', 'regex', 'callback', 'output', 'is_async')
+
+    def __init__(self,
+                 pattern: str = None,
+                 callback: Callable = None,
+                 output: Literal['dict', 'raw_data', 'typed'] = "dict"):
+        self.pattern = pattern
+        self.regex = re.compile(fnmatch.translate(pattern)) if "*" in pattern else None
+        self.callback = callback
+        self.output = output
+        self.is_async: bool = asyncio.iscoroutinefunction(callback)
+
+    def match(self, topic: str = None) -> bool:
+        """
+        Does the topic match the pattern of this handler?
+
+        :param topic: The topic of a received frame.
+        :type topic: str
+        :return: bool
+        """
+        if self.regex is None:
+            return topic == self.pattern
+        return self.regex.match(topic) is not None
+
+
+class BybitWebSocketApiTopicRouter(object):
+    """
+    Route received frames by their topic to registered handlers.
+
+    Handlers get registered for a topic or a topic pattern with `*` wildcards (`orderbook.50.*`, `kline.*.BTCUSDT`),
+    for a single stream or globally (`stream_id=None`) for all streams. The patterns are compiled once during the
+    registration. The matching handlers of a topic get resolved once per stream and are cached, so the dispatch of a
+    frame is a single dict lookup. The registrations and the cache are replaced and never modified in place by
+    `register()` and `unregister()`, so the receiving event loops can read them without a lock.
+    """
+    def __init__(self):
+        self.cache: Dict[Optional[str], Dict[str, List[BybitWebSocketApiTopicHandler]]] = {}
+        self.handlers: Dict[Optional[str], List[BybitWebSocketApiTopicHandler]] = {}
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def decode(raw_data: str, output: Literal['dict', 'raw_data', 'typed'] = "dict"):
+        """
+        Decode a received frame into the `output` format of a handler.
+
+        :param raw_data: The received frame as string.
+        :type raw_data: str
+        :param output: "raw_data", "dict" or "typed"
+        :type output: str
+        :return: str, dict or BybitWebSocketApiTypedMessage
+        """
+        if output == "dict":
+            return json.loads(raw_data)
+        elif output == "typed":
+            return decode_typed(json.loads(raw_data))
+        return raw_data
+
+    def _replace(self, handlers: Dict[Optional[str], List[BybitWebSocketApiTopicHandler]] = None) -> None:
+        """
+        Activate new registrations and drop the cache. Must be called with `self.lock`.
+
+        :param handlers: The new registrations.
+        :type handlers: dict
+        :return: None
+        """
+        self.handlers = handlers
+        self.cache = {}
+
+    def get_handlers(self, stream_id: str = None, topic: str = None) -> List[BybitWebSocketApiTopicHandler]:
+        """
+        Get the handlers of a stream and the global handlers for a topic.
+
+        :param stream_id: id of a stream
+        :type stream_id: str
+        :param topic: The topic of the received frame.
+        :type topic: str
+        :return: list
+        """
+        cache = self.cache
+        try:
+            return cache[stream_id][topic]
+        except KeyError:
+            pass
+        handlers = self.handlers
+        result = [handler for handler in handlers.get(stream_id, []) if handler.match(topic)]
+        if stream_id is not None:
+            result += [handler for handler in handlers.get(None, []) if handler.match(topic)]
+        cache.setdefault(stream_id, {})[topic] = result
+        return result
+
+    def has_handlers(self, stream_id: str = None) -> bool:
+        """
+        Are there handlers for this stream or global handlers?
+
+        :param stream_id: id of a stream
+        :type stream_id: str
+        :return: bool
+        """
+        return stream_id in self.handlers or None in self.handlers
+
+    def register(self,
+                 topic: str = None,
+                 callback: Callable = None,
+                 stream_id: str = None,
+                 output: Literal['dict', 'raw_data', 'typed'] = "dict") -> bool:
+        """
+        Register a handler for a topic or a topic pattern.
+
+        :param topic: The topic, e.g. `orderbook.50.BTCUSDT`, or a pattern with `*` wildcards, e.g. `orderbook.50.*`
+        :type topic: str
+        :param callback: Function or coroutine function which gets called with the received record.
+        :type callback: function
+        :param stream_id: id of a stream or `None` for all streams.
+        :type stream_id: str
+        :param output: Format of the record: "raw_data", "dict" or "typed"
+        :type output: str
+        :return: bool
+        """
+        if topic is None or callback is None:
+            return False
+        if output not in ("dict", "raw_data", "typed"):
+            raise ValueError(f"Parameter `output` must be 'dict', 'raw_data' or 'typed', received: {output}")
+        topic_handler = BybitWebSocketApiTopicHandler(pattern=topic, callback=callback, output=output)
+        with self.lock:
+            handlers = dict(self.handlers)
+            handlers[stream_id] = handlers.get(stream_id, []) + [topic_handler]
+            self._replace(handlers)
+        logger.debug(f"BybitWebSocketApiTopicRouter.register() - Registered handler for topic '{topic}' of "
+                     f"stream_id={stream_id}.")
+        return True
+
+    def remove_stream(self, stream_id: str = None) -> bool:
+        """
+        Remove all handlers of a stream.
+
+        :param stream_id: id of a stream
+        :type stream_id: str
+        :return: bool
+        """
+        with self.lock:
+            if stream_id not in self.handlers:
+                self.cache.pop(stream_id, None)
+                return False
+            handlers = dict(self.handlers)
+            del handlers[stream_id]
+            self._replace(handlers)
+        return True
+
+    def unregister(self, topic: str = None, callback: Callable = None, stream_id: str = None) -> bool:
+        """
+        Remove the handlers of a topic or topic pattern.
+
+        :param topic: The topic or pattern used with `register()`.
+        :type topic: str
+        :param callback: Remove only this callback, if `None` all handlers of the topic get removed.
+        :type callback: function
+        :param stream_id: id of a stream or `None` for the global handlers.
+        :type stream_id: str
+        :return: bool
+        """
+        with self.lock:
+            try:
+                stream_handlers = self.handlers[stream_id]
+            except KeyError:
+                return False
+            remaining = [handler for handler in stream_handlers
+                         if handler.pattern != topic or (callback is not None and handler.callback != callback)]
+            if len(remaining) == len(stream_handlers):
+                return False
+            handlers = dict(self.handlers)
+            if remaining:
+                handlers[stream_id] = remaining
+            else:
+                del handlers[stream_id]
+            self._replace(handlers)
+        return True
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# ¯\_(ツ)_/¯
+#
+# File: unicorn_bybit_websocket_api/trade_tape.py
+#
+# Part of ‘UNICORN Bybit WebSocket API’
+# Project website: https://www.lucit.tech/unicorn-bybit-websocket-api.html
+# Github: https://github.com/LUCIT-Systems-and-Development/unicorn-bybit-websocket-api
+# Documentation: https://unicorn-bybit-websocket-api.docs.lucit.tech
+# PyPI: https://pypi.org/project/unicorn-bybit-websocket-api
+# LUCIT Online Shop: https://shop.lucit.services/software
+#
+# License: LSOSL - LUCIT Synergetic Open Source License
+# https://github.com/LUCIT-Systems-and-Development/unicorn-bybit-websocket-api/blob/master/LICENSE
+#
+# Author: LUCIT Systems and Development
+#
+# Copyright (c) 2024-2024, LUCIT Systems and Development (https://www.lucit.tech)
+# All rights reserved.
+
+
+from .topic_engines import BybitWebSocketApiTopicEngines
+from array import array
+from typing import Callable, Dict, Iterable, Optional
+
+import logging
+import threading
+import time
+
+
+__logger__: logging.getLogger = logging.getLogger("unicorn_bybit_websocket_api")
+
+logger = __logger__
+
+TRADE_TAPE_MAXLEN = 10000
+TRADE_TAPE_WINDOWS = (1000, 10000, 60000)
+
+
+class BybitWebSocketApiTradeTape(object):
+    """
+    The last `maxlen` trades of a `publicTrade.{symbol}` topic in a columnar ring buffer with rolling aggregates.
+
+    The columns `timestamp`, `price`, `size` and `side` (`1` buy, `-1` sell) are preallocated `array` objects, the
+    trade ids are kept in a preallocated list. The VWAP, volume and number of trades of each window are maintained
+    incrementally: a trade gets added to the sums of all windows and subtracted as soon as it is older than the window
+    or gets overwritten by a new trade, so reading the aggregates does not scan the tape. A window can not cover more
+    than the last `maxlen` trades.
+
+    :param symbol: The symbol, e.g. `BTCUSDT`
+    :type symbol: str
+    :param maxlen: Number of trades to keep.
+    :type maxlen: int
+    :param windows: The windows of the aggregates in milliseconds.
+    :type windows: list
+    """
+    __slots__ = ('symbol', 'maxlen', 'windows', 'timestamps', 'prices', 'sizes', 'sides', 'trade_ids', 'total',
+                 'tails', 'volumes', 'turnovers', 'counts', 'lock')
+
+    def __init__(self,
+                 symbol: str = None,
+                 maxlen: int = TRADE_TAPE_MAXLEN,
+                 windows: Iterable[int] = TRADE_TAPE_WINDOWS):
+        if maxlen < 1:
+            raise ValueError(f"Parameter `maxlen` must be greater than 0, received: {maxlen}")
+        self.symbol: str = symbol
+        self.maxlen: int = maxlen
+        self.windows: tuple = tuple(int(window) for window in windows)
+        self.timestamps: array = array('q', [0]) * maxlen
+        self.prices: array = array('d', [0.0]) * maxlen
+        self.sizes: array = array('d', [0.0]) * maxlen
+        self.sides: array = array('b', [0]) * maxlen
+        self.trade_ids: list = [None] * maxlen
+        # number of trades added so far, the slot of a trade is its sequence number modulo `maxlen`
+        self.total: int = 0
+        # per window: sequence number of the oldest trade within the window and the sums of the trades in the window
+        self.tails: list = [0] * len(self.windows)
+        self.volumes: list = [0.0] * len(self.windows)
+        self.turnovers: list = [0.0] * len(self.windows)
+        self.counts: list = [0] * len(self.windows)
+        self.lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return min(self.total, self.maxlen)
+
+    def __repr__(self):
+        return f"BybitWebSocketApiTradeTape(symbol={self.symbol!r}, trades={len(self)}, maxlen={self.maxlen}, " \
+               f"windows={self.windows!r})"
+
+    def _evict(self, index: int = None) -> None:
+        """
+        Subtract the oldest trade of a window from its sums. Must be called with `self.lock`.
+
+        :param index: The index of the window.
+        :type index: int
+        """
+        slot = self.tails[index] % self.maxlen
+        self.tails[index] += 1
+        self.counts[index] -= 1
+        if self.counts[index] == 0:
+            # drop the rounding errors of the running sums
+            self.volumes[index] = 0.0
+            self.turnovers[index] = 0.0
+        else:
+            self.volumes[index] -= self.sizes[slot]
+            self.turnovers[index] -= self.prices[slot] * self.sizes[slot]
+
+    def _expire(self, timestamp: int = None) -> None:
+        """
+        Subtract the trades which are older than their window at `timestamp`. Must be called with `self.lock`.
+
+        :param timestamp: Time in milliseconds.
+        :type timestamp: int
+        """
+        for index, window in enumerate(self.windows):
+            limit = timestamp - window
+            while self.tails[index] < self.total and self.timestamps[self.tails[index] % self.maxlen] <= limit:
+                self._evict(index)
+
+    def add(self, timestamp: int = None, price: float = None, size: float = None, side: int = None,
+            trade_id: str = None) -> None:
+        """
+        Add a trade.
+
+        :param timestamp: Time of the trade in milliseconds.
+        :type timestamp: int
+        :param price: The price.
+        :type price: float
+        :param size: The size.
+        :type size: float
+        :param side: `1` for buy, `-1` for sell
+        :type side: int
+        :param trade_id: The trade id.
+        :type trade_id: str
+        :return: None
+        """
+        with self.lock:
+            slot = self.total % self.maxlen
+            if self.total >= self.maxlen:
+                # the oldest trade gets overwritten -> remove it from the windows which still contain it
+                for index in range(len(self.windows)):
+                    if self.tails[index] <= self.total - self.maxlen:
+                        self._evict(index)
+            self.timestamps[slot] = timestamp
+            self.prices[slot] = price
+            self.sizes[slot] = size
+            self.sides[slot] = side
+            self.trade_ids[slot] = trade_id
+            self.total += 1
+            for index in range(len(self.windows)):
+                self.volumes[index] += size
+                self.turnovers[index] += price * size
+                self.counts[index] += 1
+            self._expire(timestamp)
+
+    def get_stats(self, timestamp: Optional[int] = None) -> Dict[int, dict]:
+        """
+        Get the VWAP, volume and number of trades of each window.
+
+        :param timestamp: The end of the windows in milliseconds, default is now.
+        :type timestamp: int
+        :return: dict - `{window: {'vwap': float or None, 'volume': float, 'count': int}, ...}`
+        """
+        if timestamp is None:
+            timestamp = int(time.time() * 1000)
+        with self.lock:
+            self._expire(timestamp)
+            return {window: {'vwap': self.turnovers[index] / self.volumes[index] if self.volumes[index] > 0 else None,
+                             'volume': self.volumes[index],
+                             'count': self.counts[index]}
+                    for index, window in enumerate(self.windows)}
+
+    def get_trades(self, limit: Optional[int] = None) -> dict:
+        """
+        Get the latest trades as one column per field in chronological order.
+
+        :param limit: Number of trades, `None` for all.
+        :type limit: int
+        :return: dict - `{'timestamp': array, 'price': array, 'size': array, 'side': array, 'trade_id': list}`
+        """
+        with self.lock:
+            length = len(self)
+            if limit is not None:
+                length = min(max(limit, 0), length)
+            start = (self.total - length) % self.maxlen
+            end = start + length
+            if end <= self.maxlen:
+                return {'timestamp': self.timestamps[start:end],
+                        'price': self.prices[start:end],
+                        'size': self.sizes[start:end],
+                        'side': self.sides[start:end],
+                        'trade_id': self.trade_ids[start:end]}
+            end -= self.maxlen
+            return {'timestamp': self.timestamps[start:] + self.timestamps[:end],
+                    'price': self.prices[start:] + self.prices[:end],
+                    'size': self.sizes[start:] + self.sizes[:end],
+                    'side': self.sides[start:] + self.sides[:end],
+                    'trade_id': self.trade_ids[start:] + self.trade_ids[:end]}
+
+
+class BybitWebSocketApiTradeTapes(BybitWebSocketApiTopicEngines):
+    """
+    The trade tapes of the `publicTrade.*` topics of a stream, one per symbol.
+
+    :param maxlen: Number of trades to keep per symbol.
+    :type maxlen: int
+    :param windows: The windows of the aggregates in milliseconds.
+    :type windows: list
+    :param is_subscribed: Function which gets called with the topic before a tape gets created, see
+                          `BybitWebSocketApiTopicEngines`.
+    :type is_subscribed: function
+    """
+    prefix = "publicTrade."
+
+    def __init__(self, maxlen: Optional[int] = None, windows: Optional[Iterable[int]] = None,
+                 is_subscribed: Optional[Callable] = None):
+        super().__init__(is_subscribed=is_subscribed)
+        self.maxlen: int = maxlen or TRADE_TAPE_MAXLEN
+        self.windows: tuple = tuple(windows or TRADE_TAPE_WINDOWS)
+
+    def _apply(self, topic: str = None, engine: BybitWebSocketApiTradeTape = None, message: dict = None) -> bool:
+        for trade in message['data']:
+            engine.add(timestamp=int(trade['T']),
+                       price=float(trade['p']),
+                       size=float(trade['v']),
+                       side=1 if trade['S'] == "Buy" else -1,
+                       trade_id=trade.get('i'))
+        return True
+
+    def _create(self, topic: str = None, key: str = None, message: dict = None) -> BybitWebSocketApiTradeTape:
+        return BybitWebSocketApiTradeTape(symbol=key, maxlen=self.maxlen, windows=self.windows)
+
+    def get(self, symbol: str = None) -> Optional[BybitWebSocketApiTradeTape]:
+        """
+        Get the tape of a symbol.
+
+        :param symbol: The symbol, e.g. `BTCUSDT`
+        :type symbol: str
+        :return: BybitWebSocketApiTradeTape or None
+        """
+        return self.engines.get(symbol)
@@ -19,16 +19,36 @@
 # All rights reserved.
 
 from unicorn_bybit_websocket_api.manager import BybitWebSocketApiManager
+from unicorn_bybit_websocket_api.asyncio_queue import BybitWebSocketApiAsyncioQueue
+from unicorn_bybit_websocket_api.conflation_buffer import BybitWebSocketApiConflationBuffer
+from unicorn_bybit_websocket_api.control_messages import BybitWebSocketApiControlMessage, decode_control_message
+from unicorn_bybit_websocket_api.event_loop_pool import BybitWebSocketApiEventLoopPool
 from unicorn_bybit_websocket_api.exceptions import *
+from unicorn_bybit_websocket_api.kline_store import *
+from unicorn_bybit_websocket_api.order_book import BybitWebSocketApiLocalOrderBook, BybitWebSocketApiLocalOrderBooks
+from unicorn_bybit_websocket_api.process_pool import BybitWebSocketApiProcessPool, BybitWebSocketApiProcessPoolWorker
+from unicorn_bybit_websocket_api.request_index import BybitWebSocketApiRequestIndex
 from unicorn_bybit_websocket_api.restclient import BybitWebSocketApiRestclient
+from unicorn_bybit_websocket_api.send_scheduler import BybitWebSocketApiSendScheduler, is_priority_payload
+from unicorn_bybit_websocket_api.sockets import BybitWebSocketApiSocket
+from unicorn_bybit_websocket_api.stream_statistics import BybitWebSocketApiStreamStatistics
+from unicorn_bybit_websocket_api.subscription_index import *
+from unicorn_bybit_websocket_api.ticker_cache import BybitWebSocketApiTickerCache, BybitWebSocketApiTickerState
+from unicorn_bybit_websocket_api.topic_decoders import *
+from unicorn_bybit_websocket_api.topic_router import *
+from unicorn_bybit_websocket_api.trade_tape import BybitWebSocketApiTradeTape, BybitWebSocketApiTradeTapes
 from unicorn_bybit_websocket_api.licensing_manager import LucitLicensingManager, NoValidatedLucitLicense
 import asyncio
+import collections
+import json
 import logging
 import unittest
 import os
 import platform
+import queue
 import time
 import threading
+import types
 
 import tracemalloc
 tracemalloc.start(25)
@@ -261,6 +281,1138 @@ class TestApiLive(unittest.TestCase):
         self.__class__.ubwa.pop_stream_signal_from_stream_signal_buffer()
 
 
+class TestStreamStatistics(unittest.TestCase):
+    def test_add_receive(self):
+        statistics = BybitWebSocketApiStreamStatistics(keep_max_entries=5)
+        self.assertIsNone(statistics.last_heartbeat)
+        for _ in range(3):
+            statistics.add_receive(100)
+        statistics.add_transmit()
+        self.assertIsNotNone(statistics.last_heartbeat)
+        self.assertEqual(statistics.processed_receives_total, 3)
+        self.assertEqual(statistics.processed_transmitted_total, 1)
+        self.assertEqual(statistics.received_bytes_total, 300)
+        self.assertEqual(sum(statistics.get_receives_per_second().values()), 3)
+        self.assertEqual(sum(statistics.get_bytes_per_second().values()), 300)
+
+    def test_rollover_drops_old_entries(self):
+        statistics = BybitWebSocketApiStreamStatistics(keep_max_entries=2)
+        statistics.receives_per_second = {1: 10, 2: 20, 100: 5}
+        statistics.bytes_per_second = {1: 1000, 2: 2000, 100: 500}
+        statistics._rollover(101)
+        self.assertEqual(statistics.get_receives_per_second(), {100: 5, 101: 0})
+        self.assertEqual(statistics.get_bytes_per_second(), {100: 500, 101: 0})
+
+
+class TestEventLoopPool(unittest.TestCase):
+    def test_assign_by_load(self):
+        pool = BybitWebSocketApiEventLoopPool(size=2)
+        loop_a = pool.assign(stream_id="a")
+        loop_b = pool.assign(stream_id="b")
+        self.assertIsNot(loop_a, loop_b)
+        self.assertEqual(pool.get_load(), [1, 1])
+        self.assertIs(pool.assign(stream_id="a"), loop_a)
+        pool.release(stream_id="a")
+        self.assertIs(pool.assign(stream_id="c"), loop_a)
+        future = asyncio.run_coroutine_threadsafe(asyncio.sleep(0.01, result="done"), loop_b)
+        self.assertEqual(future.result(timeout=5), "done")
+        pool.release(stream_id="b")
+        pool.release(stream_id="c")
+        self.assertTrue(pool.stop(timeout=5))
+        for thread in pool.threads:
+            self.assertFalse(thread.is_alive())
+
+    def test_invalid_size(self):
+        with self.assertRaises(ValueError):
+            BybitWebSocketApiEventLoopPool(size=0)
+
+
+class TestProcessPool(unittest.TestCase):
+    def test_invalid_size(self):
+        with self.assertRaises(ValueError):
+            BybitWebSocketApiProcessPool(size=0)
+
+    def test_worker_flush_batch(self):
+        data_queue = queue.Queue()
+        worker = BybitWebSocketApiProcessPoolWorker(worker_index=0, data_queue=data_queue, batch_max_size=2)
+        statistics = BybitWebSocketApiStreamStatistics()
+        statistics.add_receive(10)
+        statistics.add_receive(20)
+        worker.manager = types.SimpleNamespace(stream_statistics={"worker_stream": statistics})
+        worker.worker_stream_ids = {"parent_stream": "worker_stream"}
+        worker.parent_stream_ids = {"worker_stream": "parent_stream"}
+        worker.process_stream_data("parent_stream", {"topic": "a"})
+        worker.process_stream_signals(signal_type="CONNECT", stream_id="worker_stream")
+        worker.process_stream_data("parent_stream", {"topic": "b"})
+        self.assertTrue(worker._flush())
+        self.assertEqual(data_queue.get_nowait(),
+                         ("batch", 0, [("parent_stream", {"topic": "a"}), ("parent_stream", "CONNECT", (None, None))],
+                          {"parent_stream": 30}))
+        self.assertTrue(worker._flush())
+        self.assertEqual(data_queue.get_nowait(), ("batch", 0, [("parent_stream", {"topic": "b"})],
+                                                   {"parent_stream": 0}))
+        self.assertFalse(worker._flush())
+
+    def test_parent_delivers_batches(self):
+        batches = []
+        records = []
+        statistics = BybitWebSocketApiStreamStatistics()
+        manager = types.SimpleNamespace(
+            conflation_buffers={},
+            topic_router=BybitWebSocketApiTopicRouter(),
+            stream_list={"a": {'stream_buffer_name': False, 'last_received_data_record': None},
+                         "b": {'stream_buffer_name': False, 'last_received_data_record': None}},
+            stream_statistics={"a": statistics},
+            specific_process_stream_data={"b": records.append},
+            _get_process_stream_data_batch=lambda stream_id: (batches.append, False) if stream_id == "a" else None
+        )
+        pool = BybitWebSocketApiProcessPool.__new__(BybitWebSocketApiProcessPool)
+        pool.manager = manager
+        pool._process_batch(batch=[("a", 1), ("b", 2), ("a", 3)], received_bytes={"a": 10})
+        self.assertEqual(batches, [[1, 3]])
+        self.assertEqual(records, [2])
+        self.assertEqual(statistics.processed_receives_total, 2)
+        self.assertEqual(manager.stream_list["a"]['last_received_data_record'], 3)
+
+    def test_pooled_record_to_named_stream_buffer(self):
+        manager = BybitWebSocketApiManager.__new__(BybitWebSocketApiManager)
+        created_streams = []
+        manager.process_pool = types.SimpleNamespace(create_stream=lambda **kwargs: created_streams.append(kwargs))
+        manager.args_limit = 21000
+        manager.exchange = "bybit.com"
+        manager.output_default = "dict"
+        manager.close_timeout_default = manager.ping_interval_default = manager.ping_timeout_default = 1
+        manager.asyncio_queue_maxsize = 0
+        manager.asyncio_queue_overflow_policy = "block"
+        manager.keep_max_received_last_second_entries = 5
+        manager.listen_key_refresh_interval = 60
+        manager.debug = False
+        manager.high_performance = True
+        manager.stop_manager_request = False
+        manager.stream_list_lock = threading.Lock()
+        for name in ("stream_list", "stream_shards", "stream_buffers", "stream_buffer_locks", "stream_statistics",
+                     "socket_is_ready", "event_loops", "conflation_buffers", "order_books", "kline_stores",
+                     "trade_tapes", "ticker_caches", "specific_process_asyncio_queue", "specific_process_stream_data",
+                     "specific_process_stream_data_async", "specific_process_stream_data_batch",
+                     "specific_process_stream_data_batch_async"):
+            setattr(manager, name, {})
+        manager.topic_router = BybitWebSocketApiTopicRouter()
+        stream_id = manager.create_stream(endpoint="public/linear", channels="kline.1", markets="btcusdt",
+                                          stream_buffer_name="pool")
+        self.assertEqual(len(created_streams), 1)
+        pool = BybitWebSocketApiProcessPool.__new__(BybitWebSocketApiProcessPool)
+        pool.manager = manager
+        pool._process_batch(batch=[(stream_id, {"topic": "kline.1.BTCUSDT"})], received_bytes={})
+        self.assertEqual(manager.pop_stream_data_from_stream_buffer("pool"), {"topic": "kline.1.BTCUSDT"})
+
+
+class TestRequestIndex(unittest.TestCase):
+    def test_wait(self):
+        request_index = BybitWebSocketApiRequestIndex(max_size=2)
+        self.assertIsNone(request_index.wait(req_id=1, timeout=0.01))
+        control_message = decode_control_message('{"success":true,"req_id":"1","op":"subscribe"}')
+        threading.Timer(0.05, request_index.add, args=(control_message,)).start()
+        self.assertIs(request_index.wait(req_id=1, timeout=5), control_message)
+        self.assertEqual(request_index.waiters, {})
+        request_index.add(decode_control_message('{"success":true,"req_id":"2","op":"subscribe"}'))
+        request_index.add(decode_control_message('{"success":true,"req_id":"3","op":"subscribe"}'))
+        self.assertIsNone(request_index.get(req_id=1))
+        self.assertFalse(request_index.add(decode_control_message('{"success":true,"op":"ping"}')))
+
+    def test_wait_async(self):
+        request_index = BybitWebSocketApiRequestIndex()
+        control_message = decode_control_message('{"success":false,"req_id":"7","op":"subscribe"}')
+
+        async def wait():
+            self.assertIsNone(await request_index.wait_async(req_id=7, timeout=0.01))
+            threading.Timer(0.05, request_index.add, args=(control_message,)).start()
+            return await request_index.wait_async(req_id=7, timeout=5)
+        self.assertIs(asyncio.run(wait()), control_message)
+        self.assertEqual(request_index.waiters, {})
+
+    def test_send_and_wait_within_the_loop_of_the_stream(self):
+        manager = TestSubscriptionPayload.new_manager()
+        loop = asyncio.new_event_loop()
+        manager.event_loops = {"stream_id": loop}
+        results = []
+
+        def process_stream_data(stream_data):
+            # a sync callback runs within the event loop of the stream
+            results.append(manager.send_and_wait("stream_id", {"op": "ping"}, timeout=5))
+
+        async def receive():
+            process_stream_data('{"topic":"tickers.BTCUSDT"}')
+
+        start_time = time.time()
+        try:
+            loop.run_until_complete(receive())
+        finally:
+            loop.close()
+        self.assertEqual(results, [None])
+        self.assertLess(time.time() - start_time, 1)
+
+    def test_round_trip_times(self):
+        request_index = BybitWebSocketApiRequestIndex()
+        self.assertTrue(request_index.register(req_id=5, op="subscribe"))
+        self.assertFalse(request_index.register(req_id=None, op="ping"))
+        control_message = decode_control_message('{"success":true,"req_id":"5","op":"subscribe"}')
+        request_index.add(control_message)
+        self.assertGreaterEqual(control_message.round_trip_time, 0.0)
+        self.assertEqual(request_index.get_round_trip_times()['subscribe']['count'], 1)
+        self.assertEqual(request_index.sent, {})
+
+
+class TestSendScheduler(unittest.TestCase):
+    def test_is_priority_payload(self):
+        self.assertTrue(is_priority_payload({"op": "ping"}))
+        self.assertTrue(is_priority_payload('{"reqId":"1","op":"order.create","args":[]}'))
+        self.assertFalse(is_priority_payload({"op": "subscribe", "args": ["kline.1.BTCUSDT"]}))
+        self.assertFalse(is_priority_payload('{"args":[]}'))
+
+    def test_token_bucket(self):
+        send_scheduler = BybitWebSocketApiSendScheduler(rate=10, burst=4, reserve=2)
+        self.assertIsNone(send_scheduler.get_delay())
+        for index in range(3):
+            send_scheduler.put({"op": "subscribe", "req_id": str(index)})
+        self.assertEqual(send_scheduler.pop()['req_id'], "0")
+        self.assertEqual(send_scheduler.pop()['req_id'], "1")
+        # the bulk lane leaves the reserve for the priority lane
+        self.assertIsNone(send_scheduler.pop())
+        self.assertGreater(send_scheduler.get_delay(), 0.0)
+        send_scheduler.put({"op": "ping"})
+        self.assertEqual(send_scheduler.pop(), {"op": "ping"})
+        self.assertEqual(len(send_scheduler), 1)
+        time.sleep(send_scheduler.get_delay())
+        self.assertEqual(send_scheduler.pop()['req_id'], "2")
+        self.assertEqual(len(send_scheduler), 0)
+
+    @staticmethod
+    def new_socket(websocket):
+        manager = TestSubscriptionPayload.new_manager()
+        manager.request_index = BybitWebSocketApiRequestIndex()
+        manager._handle_task_result = BybitWebSocketApiManager._handle_task_result
+        socket = BybitWebSocketApiSocket.__new__(BybitWebSocketApiSocket)
+        socket.manager = manager
+        socket.stream_id = "stream_id"
+        socket.channels = ["kline.1"]
+        socket.markets = ["btcusdt"]
+        socket.send_scheduler = BybitWebSocketApiSendScheduler(rate=1000, burst=100, reserve=0)
+        socket.sender_error = None
+        socket.websocket = websocket
+        return socket
+
+    def test_run_sender_skips_bad_payloads(self):
+        class FakeWebsocket:
+            def __init__(self):
+                self.sent = []
+
+            async def send(self, payload):
+                self.sent.append(payload)
+
+        async def run():
+            socket.send_event = asyncio.Event()
+            sender_task = asyncio.create_task(socket.run_sender())
+            sender_task.add_done_callback(socket.handle_sender_result)
+            socket.send_request({"op": "subscribe", "req_id": "1", "args": [object()]})
+            socket.send_request({"op": "subscribe", "req_id": "2", "args": ["kline.1.BTCUSDT"]})
+            await asyncio.sleep(0.1)
+            sender_task.cancel()
+
+        websocket = FakeWebsocket()
+        socket = self.new_socket(websocket)
+        asyncio.run(run())
+        self.assertEqual([json.loads(payload)['req_id'] for payload in websocket.sent], ["2"])
+        self.assertIsNone(socket.sender_error)
+
+    def test_run_sender_crash_closes_the_connection(self):
+        class FakeWebsocket:
+            def __init__(self):
+                self.closed = False
+
+            async def send(self, payload):
+                raise RuntimeError("send failed")
+
+            async def close(self):
+                self.closed = True
+
+        async def run():
+            socket.send_event = asyncio.Event()
+            sender_task = asyncio.create_task(socket.run_sender())
+            sender_task.add_done_callback(socket.handle_sender_result)
+            socket.send_request({"op": "subscribe", "req_id": "1", "args": ["kline.1.BTCUSDT"]})
+            await asyncio.sleep(0.1)
+
+        websocket = FakeWebsocket()
+        socket = self.new_socket(websocket)
+        asyncio.run(run())
+        self.assertIsInstance(socket.sender_error, RuntimeError)
+        self.assertTrue(websocket.closed)
+
+
+class TestSubscriptionPayload(unittest.TestCase):
+    @staticmethod
+    def new_manager(endpoint="public/linear"):
+        manager = BybitWebSocketApiManager.__new__(BybitWebSocketApiManager)
+        manager.args_limit = 21000
+        manager.max_subscriptions_per_stream_spot = 10
+        manager.max_subscriptions_per_stream_linear = 2000
+        manager.max_subscriptions_per_stream_inverse = 0
+        manager.max_subscriptions_per_stream_option = 0
+        manager.request_id = 0
+        manager.request_id_lock = threading.Lock()
+        manager.debug = False
+        manager.event_loops = {}
+        manager.process_pool = None
+        manager.stream_list_lock = threading.Lock()
+        manager.stream_shards = {}
+        manager.subscription_index = BybitWebSocketApiSubscriptionIndex()
+        manager.order_books = {}
+        manager.kline_stores = {}
+        manager.trade_tapes = {}
+        manager.ticker_caches = {}
+        manager.topic_engines = {}
+        manager.enable_stream_signal_buffer = True
+        manager.process_stream_signals = manager.add_to_stream_signal_buffer
+        manager.stream_signal_buffer = collections.deque()
+        manager.stream_signal_buffer_lock = threading.Lock()
+        manager.stream_list = {"stream_id": {"endpoint": endpoint, "channels": ["kline.1"], "markets": ["btcusdt"],
+                                             "subscription_requests": {}, "subscriptions": 0, "payload": [],
+                                             "shard_of": None, "last_stream_signal": None}}
+        return manager
+
+    @staticmethod
+    def stub_create_stream(manager):
+        created = []
+
+        def create_stream(**kwargs):
+            shard_id = f"new_shard_id_{len(created)}"
+            created.append(kwargs)
+            manager.stream_list[shard_id] = {"endpoint": kwargs['endpoint'], "channels": kwargs['channels'],
+                                             "markets": kwargs['markets'], "subscription_requests": {},
+                                             "subscriptions": 0, "payload": [], "shard_of": None}
+            return shard_id
+
+        manager.create_stream = create_stream
+        for name in ("specific_process_stream_data", "specific_process_stream_data_async",
+                     "specific_process_asyncio_queue", "specific_process_stream_data_batch",
+                     "specific_process_stream_data_batch_async"):
+            setattr(manager, name, {})
+        manager.stream_list["stream_id"].update(dict.fromkeys(
+            ("stream_label", "stream_buffer_name", "api_key", "api_secret", "output", "ping_interval", "ping_timeout",
+             "close_timeout", "stream_buffer_maxlen", "asyncio_queue_maxsize", "asyncio_queue_overflow_policy",
+             "conflate", "conflate_throttle_ms", "order_book", "kline_store", "kline_store_maxlen", "trade_tape",
+             "trade_tape_maxlen", "trade_tape_windows", "ticker_cache")))
+        return created
+
+    def test_split_payload(self):
+        manager = self.new_manager()
+        payload = manager.split_payload(["a", "bb", "a", "ccc"], "subscribe", max_items_per_request=2)
+        self.assertEqual([item['args'] for item in payload], [["a", "bb"], ["ccc"]])
+        self.assertEqual([item['req_id'] for item in payload], ["1", "2"])
+        payload = manager.split_payload(["aaaa", "bbbb", "cccc"], "subscribe", max_chars_per_request=15)
+        self.assertEqual([item['args'] for item in payload], [["aaaa", "bbbb"], ["cccc"]])
+        self.assertEqual(len(json.dumps(payload[0]['args'], separators=(',', ':'))), 15)
+        self.assertIsNone(manager.split_payload([], "subscribe"))
+
+    def test_create_payload_within_args_limits(self):
+        manager = self.new_manager()
+        markets = [f"SYM{index}USDT" for index in range(2000)]
+        payload = manager.create_payload("stream_id", "subscribe", channels=["kline.1", "publicTrade"], markets=markets)
+        self.assertLessEqual(len(payload), 5)
+        self.assertEqual(sum(len(item['args']) for item in payload), 4000)
+        for item in payload:
+            self.assertLessEqual(len(json.dumps(item['args'], separators=(',', ':'))), manager.args_limit)
+        manager = self.new_manager(endpoint="public/spot")
+        payload = manager.create_payload("stream_id", "subscribe", channels="kline.1", markets=["btcusdt", "BTCUSDT"])
+        self.assertEqual(payload[0]['args'], ["kline.1.BTCUSDT"])
+        payload = manager.create_payload("stream_id", "subscribe", channels="publicTrade", markets=markets[:25])
+        self.assertEqual([len(item['args']) for item in payload], [10, 10, 5])
+
+    def test_subscribe_to_stream_sends_only_new_topics(self):
+        manager = self.new_manager()
+        stream = manager.stream_list["stream_id"]
+        self.assertTrue(manager.subscribe_to_stream("stream_id", channels="kline.1", markets=["btcusdt"]))
+        self.assertEqual(stream['payload'][0]['args'], ["kline.1.BTCUSDT"])
+        self.assertTrue(manager.subscribe_to_stream("stream_id", markets=["BTCUSDT", "ethusdt"]))
+        self.assertEqual(stream['payload'][1]['args'], ["kline.1.ETHUSDT"])
+        self.assertEqual(sorted(stream['markets']), ["BTCUSDT", "ETHUSDT"])
+        self.assertTrue(manager.subscribe_to_stream("stream_id", markets="ETHUSDT"))
+        self.assertEqual(len(stream['payload']), 2)
+        stream['payload'].append({"op": "ping"})
+        self.assertTrue(manager._reset_subscribed_topics("stream_id"))
+        self.assertEqual(stream['payload'], [{"op": "ping"}])
+        self.assertEqual(manager.get_topic_states("stream_id"),
+                         {"kline.1.BTCUSDT": "stale", "kline.1.ETHUSDT": "stale"})
+        self.assertTrue(manager.subscribe_to_stream("stream_id",
+                                                    channels=stream['channels'],
+                                                    markets=stream['markets']))
+        self.assertEqual(sorted(stream['payload'][1]['args']), ["kline.1.BTCUSDT", "kline.1.ETHUSDT"])
+
+    def test_unsubscribe_from_stream_sends_only_removed_topics(self):
+        manager = self.new_manager()
+        stream = manager.stream_list["stream_id"]
+        manager.subscribe_to_stream("stream_id", channels=["kline.1", "publicTrade"], markets=["btcusdt", "ethusdt"])
+        request = stream['payload'][0]
+        manager._process_subscription_response(decode_control_message(
+            '{"success":true,"req_id":"' + request['req_id'] + '","op":"subscribe"}', stream_id="stream_id"))
+        self.assertEqual(stream['subscriptions'], 4)
+        self.assertTrue(manager.unsubscribe_from_stream("stream_id", markets="btcusdt"))
+        request = stream['payload'][1]
+        self.assertEqual(request['op'], "unsubscribe")
+        self.assertEqual(request['args'], ["kline.1.BTCUSDT", "publicTrade.BTCUSDT"])
+        self.assertEqual(stream['markets'], ["ETHUSDT"])
+        self.assertEqual(stream['subscriptions'], 4)
+        manager._process_subscription_response(decode_control_message(
+            '{"success":true,"req_id":"' + request['req_id'] + '","op":"unsubscribe"}', stream_id="stream_id"))
+        self.assertEqual(stream['subscriptions'], 2)
+        self.assertEqual(stream['subscription_requests'], {})
+        self.assertTrue(manager.unsubscribe_from_stream("stream_id", markets="BTCUSDT"))
+        self.assertEqual(len(stream['payload']), 2)
+
+    def test_unsubscribe_removes_the_engine_of_the_topic(self):
+        manager = self.new_manager()
+        ticker_cache = BybitWebSocketApiTickerCache(
+            is_subscribed=lambda topic: manager.subscription_index.has_topic(topic=topic, stream_id="stream_id")
+        )
+        manager.topic_engines = {"stream_id": {ticker_cache.prefix: ticker_cache}}
+        manager.subscribe_to_stream("stream_id", channels="tickers", markets="btcusdt")
+        ticker_cache.apply("tickers.BTCUSDT", {"topic": "tickers.BTCUSDT", "type": "snapshot",
+                                               "data": {"symbol": "BTCUSDT", "lastPrice": "1"}})
+        self.assertIsNotNone(ticker_cache.get("BTCUSDT"))
+        self.assertTrue(manager.unsubscribe_from_stream("stream_id", channels="tickers"))
+        self.assertIsNone(ticker_cache.get("BTCUSDT"))
+        self.assertFalse(ticker_cache.apply("tickers.BTCUSDT", {"topic": "tickers.BTCUSDT", "type": "snapshot",
+                                                                "data": {"symbol": "BTCUSDT", "lastPrice": "2"}}))
+        self.assertIsNone(ticker_cache.get("BTCUSDT"))
+
+    def test_split_markets_into_shards(self):
+        manager = self.new_manager()
+        manager.args_limit = 40
+        # "kline.1.AUSDT" needs 16 chars
+        self.assertEqual(manager._split_markets_into_shards(["kline.1"], ["AUSDT", "BUSDT", "busdt", "CUSDT"]),
+                         [["AUSDT", "BUSDT"], ["busdt", "CUSDT"]])
+        self.assertEqual(manager._split_markets_into_shards(["kline.1", "tickers"], ["AUSDT", "BUSDT"]),
+                         [["AUSDT"], ["BUSDT"]])
+        self.assertEqual(manager._split_markets_into_shards([], []), [[]])
+
+    def test_subscribe_to_stream_shards(self):
+        manager = self.new_manager()
+        manager.args_limit = 40
+        manager.stream_list["shard_id"] = {"endpoint": "public/linear", "channels": ["kline.1"],
+                                           "markets": ["AUSDT", "BUSDT"], "subscription_requests": {},
+                                           "subscriptions": 0, "payload": [], "shard_of": "stream_id"}
+        manager.subscription_index.add("shard_id", ["kline.1.AUSDT", "kline.1.BUSDT"])
+        manager.subscription_index.add("stream_id", ["kline.1.BTCUSDT"])
+        manager.stream_shards["stream_id"] = ["stream_id", "shard_id"]
+        self.assertEqual(manager.get_stream_shards("stream_id"), ["stream_id", "shard_id"])
+        self.assertEqual(manager.get_stream_shards("shard_id"), ["shard_id"])
+        self.assertTrue(manager.subscribe_to_stream("stream_id", markets=["busdt", "CUSDT"]))
+        self.assertEqual(manager.stream_list["stream_id"]['payload'][0]['args'], ["kline.1.CUSDT"])
+        self.assertEqual(manager.stream_list["shard_id"]['payload'], [])
+        # no shard has enough space left, a new shard gets opened
+        created = self.stub_create_stream(manager)
+        self.assertTrue(manager.subscribe_to_stream("stream_id", markets="DUSDT"))
+        self.assertEqual((created[0]['channels'], created[0]['markets']), (["kline.1"], ["DUSDT"]))
+        self.assertEqual(manager.get_stream_shards("stream_id"), ["stream_id", "shard_id", "new_shard_id_0"])
+        self.assertEqual(manager.stream_list["new_shard_id_0"]['shard_of'], "stream_id")
+        self.assertEqual(manager.stream_list["shard_id"]['payload'], [])
+        self.assertTrue(manager.unsubscribe_from_stream("stream_id", markets="AUSDT"))
+        self.assertEqual(manager.stream_list["shard_id"]['payload'][0]['args'], ["kline.1.AUSDT"])
+        self.assertEqual(len(manager.stream_list["stream_id"]['payload']), 1)
+        self.assertEqual(manager.get_number_of_subscriptions("stream_id"), 3)
+        self.assertEqual(manager.get_stream_ids_by_topic("kline.1.cusdt"), ["stream_id"])
+        self.assertTrue(manager.is_topic_subscribed("kline.1.BUSDT", stream_id="stream_id"))
+        self.assertFalse(manager.is_topic_subscribed("kline.1.AUSDT"))
+
+    def test_subscribe_to_stream_moves_markets_beyond_args_limit(self):
+        manager = self.new_manager()
+        manager.args_limit = 40
+        stream = manager.stream_list["stream_id"]
+        stream['markets'] = ["AUSDT", "BUSDT"]
+        manager.subscription_index.add("stream_id", ["kline.1.AUSDT", "kline.1.BUSDT"])
+        created = self.stub_create_stream(manager)
+        # "kline.1.AUSDT" and "tickers.AUSDT" need 32 chars, only one market fits into 40 chars
+        self.assertTrue(manager.subscribe_to_stream("stream_id", channels="tickers"))
+        self.assertEqual((stream['payload'][0]['op'], stream['payload'][0]['args']),
+                         ("unsubscribe", ["kline.1.BUSDT"]))
+        self.assertEqual(stream['payload'][1]['args'], ["tickers.AUSDT"])
+        self.assertEqual(stream['markets'], ["AUSDT"])
+        self.assertEqual((created[0]['channels'], created[0]['markets']), (["kline.1", "tickers"], ["BUSDT"]))
+        self.assertEqual(manager.get_stream_shards("stream_id"), ["stream_id", "new_shard_id_0"])
+
+    def test_rejected_subscribe_can_be_sent_again(self):
+        manager = self.new_manager()
+        stream = manager.stream_list["stream_id"]
+        manager.subscribe_to_stream("stream_id", channels="kline.1", markets="btcusdt")
+        request = stream['payload'][0]
+        manager._process_subscription_response(decode_control_message(
+            '{"success":false,"req_id":"' + request['req_id'] + '","op":"subscribe"}', stream_id="stream_id"))
+        self.assertEqual(stream['subscriptions'], 0)
+        self.assertEqual(manager.get_subscribed_topics("stream_id"), set())
+        self.assertEqual(manager.get_topic_state("kline.1.btcusdt", stream_id="stream_id"), "rejected")
+        manager.subscribe_to_stream("stream_id", markets="btcusdt")
+        self.assertEqual(stream['payload'][1]['args'], ["kline.1.BTCUSDT"])
+        self.assertEqual(manager.get_topic_state("kline.1.BTCUSDT", stream_id="stream_id"), "pending")
+        self.assertEqual(manager.get_rejected_topics("stream_id"), {})
+
+    def test_rejected_topics_are_reported_individually(self):
+        manager = self.new_manager()
+        stream = manager.stream_list["stream_id"]
+        manager.subscribe_to_stream("stream_id", channels="kline.1", markets=["btcusdt", "foousdt", "ethusdt"])
+        request = stream['payload'][0]
+        self.assertEqual(set(manager.get_topic_states("stream_id").values()), {"pending"})
+        manager._process_subscription_response(decode_control_message(
+            '{"success":false,"ret_msg":"Invalid symbol :[kline.1.FOOUSDT]","req_id":"' + request['req_id'] +
+            '","op":"subscribe"}', stream_id="stream_id"))
+        self.assertEqual(manager.get_topic_states("stream_id"), {"kline.1.BTCUSDT": "active",
+                                                                 "kline.1.FOOUSDT": "rejected",
+                                                                 "kline.1.ETHUSDT": "active"})
+        self.assertEqual(manager.get_rejected_topics("stream_id"),
+                         {"kline.1.FOOUSDT": "Invalid symbol :[kline.1.FOOUSDT]"})
+        self.assertEqual(stream['subscriptions'], 2)
+        self.assertEqual(manager.get_number_of_subscriptions("stream_id"), 2)
+        signal = manager.stream_signal_buffer.popleft()
+        self.assertEqual((signal['type'], signal['topic']), ("TOPIC_REJECTED", "kline.1.FOOUSDT"))
+        self.assertEqual(manager.get_subscribe_ack_latency_histogram()['count'], 1)
+
+
+class TestSubscriptionIndex(unittest.TestCase):
+    def test_add_and_remove(self):
+        index = BybitWebSocketApiSubscriptionIndex()
+        self.assertEqual(index.add("a", ["kline.1.BTCUSDT", "tickers.BTCUSDT", "kline.1.BTCUSDT"]),
+                         ["kline.1.BTCUSDT", "tickers.BTCUSDT"])
+        self.assertEqual(index.add("b", ["tickers.BTCUSDT"]), ["tickers.BTCUSDT"])
+        self.assertEqual(index.add("a", ["tickers.BTCUSDT"]), [])
+        self.assertEqual(len(index), 3)
+        self.assertEqual(index.get_number_of_topics("a"), 2)
+        self.assertEqual(index.get_stream_ids("tickers.BTCUSDT"), {"a", "b"})
+        self.assertTrue(index.has_topic("kline.1.BTCUSDT", stream_id="a"))
+        self.assertFalse(index.has_topic("kline.1.BTCUSDT", stream_id="b"))
+        self.assertEqual(index.remove("a", ["tickers.BTCUSDT", "tickers.ETHUSDT"]), ["tickers.BTCUSDT"])
+        self.assertEqual(index.get_stream_ids("tickers.BTCUSDT"), {"b"})
+        self.assertEqual(index.remove_stream("b"), 1)
+        self.assertNotIn("tickers.BTCUSDT", index)
+        self.assertEqual(index.remove("b", ["tickers.BTCUSDT"]), [])
+        self.assertEqual(len(index), 1)
+
+    def test_set_states(self):
+        index = BybitWebSocketApiSubscriptionIndex()
+        index.add("a", ["kline.1.BTCUSDT", "tickers.BTCUSDT"])
+        index.set_states("a", {"tickers.BTCUSDT": "active", "tickers.ETHUSDT": "rejected"},
+                         reasons={"tickers.ETHUSDT": "error"})
+        self.assertEqual(index.get_topics("a"), {"tickers.BTCUSDT"})
+        self.assertNotIn("kline.1.BTCUSDT", index)
+        self.assertNotIn("tickers.ETHUSDT", index)
+        self.assertEqual(index.get_rejected_topics("a"), {"tickers.ETHUSDT": "error"})
+        self.assertEqual(len(index), 1)
+
+    def test_topic_states(self):
+        index = BybitWebSocketApiSubscriptionIndex()
+        index.add("a", ["kline.1.BTCUSDT", "kline.1.ETHUSDT"])
+        self.assertEqual(index.get_number_of_topics("a", state=TOPIC_PENDING), 2)
+        self.assertEqual(index.set_state("a", ["kline.1.BTCUSDT", "kline.1.XRPUSDT"], TOPIC_ACTIVE),
+                         ["kline.1.BTCUSDT"])
+        self.assertEqual(index.set_state("a", ["kline.1.BTCUSDT", "kline.1.ETHUSDT"], TOPIC_REJECTED, reason="error",
+                                         expected_state=TOPIC_PENDING), ["kline.1.ETHUSDT"])
+        self.assertEqual(index.get_state("kline.1.ETHUSDT", stream_id="a"), TOPIC_REJECTED)
+        self.assertEqual(index.get_topics("a"), {"kline.1.BTCUSDT"})
+        self.assertEqual(index.get_topics("a", state=TOPIC_REJECTED), {"kline.1.ETHUSDT"})
+        self.assertEqual(index.mark_stale("a"), 1)
+        self.assertEqual(index.get_state("kline.1.BTCUSDT", stream_id="a"), TOPIC_STALE)
+        self.assertEqual(index.add("a", ["kline.1.BTCUSDT", "kline.1.ETHUSDT"]), ["kline.1.BTCUSDT", "kline.1.ETHUSDT"])
+        self.assertEqual(index.get_number_of_topics(state=TOPIC_PENDING), 2)
+        self.assertEqual(index.get_rejected_topics("a"), {})
+        self.assertRaises(ValueError, index.set_state, "a", ["kline.1.BTCUSDT"], "unknown")
+        self.assertEqual(index.remove_stream("a"), 2)
+        self.assertEqual(index.get_number_of_topics(state=TOPIC_PENDING), 0)
+
+    def test_get_rejected_topics(self):
+        topics = ["orderbook.50.BTCUSDT", "orderbook.50.FOOUSDT"]
+        self.assertEqual(get_rejected_topics(topics, "Invalid symbol :[orderbook.50.FOOUSDT]"),
+                         ["orderbook.50.FOOUSDT"])
+        self.assertEqual(get_rejected_topics(topics, "error:handler not found,topic:orderbook.50.FOOUSDT"),
+                         ["orderbook.50.FOOUSDT"])
+        self.assertEqual(get_rejected_topics(topics, "args size >10"), topics)
+        self.assertEqual(get_rejected_topics(topics, None), topics)
+
+    def test_ack_latency_histogram(self):
+        index = BybitWebSocketApiSubscriptionIndex()
+        self.assertIsNone(index.get_ack_latency_histogram()['avg'])
+        index.add_ack_latency(0.0005)
+        index.add_ack_latency(0.003)
+        index.add_ack_latency(10.0)
+        histogram = index.get_ack_latency_histogram()
+        self.assertEqual(histogram['count'], 3)
+        self.assertEqual((histogram['buckets']['1'], histogram['buckets']['5'], histogram['buckets']['+Inf']),
+                         (1, 1, 1))
+        self.assertEqual(histogram['max'], 10000.0)
+
+
+@unittest.skipIf(numpy is None, "NumPy is not installed")
+class TestKlineStore(unittest.TestCase):
+    @staticmethod
+    def candle(start, close, confirm=False):
+        return {"start": start, "end": start + 59999, "interval": "1", "open": "100", "close": str(close),
+                "high": "110", "low": "90", "volume": "2", "turnover": "200", "confirm": confirm, "timestamp": start}
+
+    def test_ring_buffer(self):
+        kline_store = BybitWebSocketApiKlineStore(interval="1", symbol="BTCUSDT", maxlen=3)
+        self.assertEqual(len(kline_store.get_column("close")), 0)
+        self.assertTrue(kline_store.update(self.candle(60000, 101)))
+        self.assertTrue(kline_store.update(self.candle(60000, 102, confirm=True)))
+        self.assertEqual(kline_store.get_column("close").tolist(), [102.0])
+        self.assertTrue(kline_store.update(self.candle(120000, 103)))
+        self.assertEqual(kline_store.get_column("close", include_open=False).tolist(), [102.0])
+        self.assertFalse(kline_store.update(self.candle(60000, 99)))
+        for start in (180000, 240000):
+            kline_store.update(self.candle(start, start / 1000))
+        self.assertEqual(len(kline_store), 3)
+        candles = kline_store.get()
+        self.assertEqual(candles['start'].tolist(), [120000.0, 180000.0, 240000.0])
+        self.assertEqual(candles['close'].tolist(), [103.0, 180.0, 240.0])
+        self.assertEqual(kline_store.get_array(limit=2).shape, (2, len(KLINE_COLUMNS)))
+        self.assertEqual(kline_store.get_column("close", limit=1, include_open=False).tolist(), [180.0])
+
+    def test_kline_stores_of_a_stream(self):
+        kline_stores = BybitWebSocketApiKlineStores(maxlen=10)
+        self.assertTrue(kline_stores.apply("kline.1.BTCUSDT", {"topic": "kline.1.BTCUSDT", "type": "snapshot",
+                                                              "data": [self.candle(60000, 101, confirm=True),
+                                                                       self.candle(120000, 102)]}))
+        self.assertFalse(kline_stores.apply("kline.1.BTCUSDT", {"topic": "kline.1.BTCUSDT"}))
+        manager = BybitWebSocketApiManager.__new__(BybitWebSocketApiManager)
+        manager.stream_shards = {}
+        manager.kline_stores = {"stream_id": kline_stores}
+        self.assertEqual(manager.get_klines("btcusdt", 1)['close'].tolist(), [101.0, 102.0])
+        self.assertEqual(manager.get_klines("BTCUSDT", "1", limit=1, stream_id="stream_id")['start'].tolist(),
+                         [120000.0])
+        self.assertIsNone(manager.get_klines("BTCUSDT", "5"))
+        self.assertTrue(kline_stores.remove("kline.1.BTCUSDT"))
+        self.assertIsNone(manager.get_klines("BTCUSDT", "1"))
+        # a message still in flight after unsubscribing the topic does not create the store again
+        subscribed_topics = set()
+        kline_stores = BybitWebSocketApiKlineStores(maxlen=10, is_subscribed=subscribed_topics.__contains__)
+        self.assertFalse(kline_stores.apply("kline.1.BTCUSDT", {"topic": "kline.1.BTCUSDT", "type": "snapshot",
+                                                               "data": [self.candle(60000, 101)]}))
+        self.assertIsNone(kline_stores.get(1, "BTCUSDT"))
+        subscribed_topics.add("kline.1.BTCUSDT")
+        self.assertTrue(kline_stores.apply("kline.1.BTCUSDT", {"topic": "kline.1.BTCUSDT", "type": "snapshot",
+                                                              "data": [self.candle(60000, 101)]}))
+
+
+class TestTickerCache(unittest.TestCase):
+    def test_snapshot_and_delta(self):
+        ticker_cache = BybitWebSocketApiTickerCache()
+        self.assertFalse(ticker_cache.apply("tickers.BTCUSDT", {"topic": "tickers.BTCUSDT", "type": "delta",
+                                                               "data": {"symbol": "BTCUSDT", "lastPrice": "1"}}))
+        self.assertTrue(ticker_cache.apply("tickers.BTCUSDT", {
+            "topic": "tickers.BTCUSDT", "type": "snapshot", "ts": 1673272861686, "cs": 24987956059,
+            "data": {"symbol": "BTCUSDT", "tickDirection": "PlusTick", "lastPrice": "17216.00", "bid1Price": "17215.50",
+                     "ask1Price": "17216.00", "fundingRate": "-0.000212", "nextFundingTime": "1673280000000"}}))
+        self.assertTrue(ticker_cache.apply("tickers.BTCUSDT", {
+            "topic": "tickers.BTCUSDT", "type": "delta", "ts": 1673272861700, "cs": 24987956060,
+            "data": {"symbol": "BTCUSDT", "bid1Price": "17215.00", "fundingRate": ""}}))
+        self.assertFalse(ticker_cache.apply("tickers.BTCUSDT", {"topic": "tickers.BTCUSDT", "type": "delta",
+                                                               "data": {"symbol": "BTCUSDT", "lastPrice": "x"}}))
+        ticker = ticker_cache.get("BTCUSDT").get()
+        self.assertEqual((ticker['last_price'], ticker['bid1_price'], ticker['ask1_price']),
+                         (17216.0, 17215.0, 17216.0))
+        self.assertEqual((ticker['tick_direction'], ticker['next_funding_time']), ("PlusTick", 1673280000000))
+        self.assertIsNone(ticker['funding_rate'])
+        self.assertIsNone(ticker['mark_price'])
+        self.assertEqual((ticker['ts'], ticker['cs']), (1673272861700, 24987956060))
+        ticker_cache.apply("tickers.BTCUSDT", {"topic": "tickers.BTCUSDT", "type": "snapshot",
+                                               "data": {"symbol": "BTCUSDT", "lastPrice": "17300"}})
+        self.assertIsNone(ticker_cache.get("BTCUSDT").bid1_price)
+        manager = BybitWebSocketApiManager.__new__(BybitWebSocketApiManager)
+        manager.stream_shards = {}
+        manager.ticker_caches = {"stream_id": ticker_cache}
+        self.assertEqual(manager.get_ticker("btcusdt")['last_price'], 17300.0)
+        self.assertEqual(list(manager.get_tickers(stream_id="stream_id")), ["BTCUSDT"])
+        self.assertIsNone(manager.get_ticker("ETHUSDT"))
+        self.assertTrue(ticker_cache.remove("tickers.BTCUSDT"))
+        self.assertEqual(manager.get_tickers(), {})
+
+
+class TestTradeTape(unittest.TestCase):
+    def test_ring_buffer_and_windows(self):
+        trade_tape = BybitWebSocketApiTradeTape(symbol="BTCUSDT", maxlen=4, windows=(1000, 10000))
+        self.assertEqual(trade_tape.get_stats(timestamp=0)[1000], {'vwap': None, 'volume': 0.0, 'count': 0})
+        trade_tape.add(timestamp=1000, price=100.0, size=1.0, side=1, trade_id="a")
+        trade_tape.add(timestamp=1500, price=102.0, size=3.0, side=-1, trade_id="b")
+        stats = trade_tape.get_stats(timestamp=1500)
+        self.assertEqual(stats[1000], {'vwap': 101.5, 'volume': 4.0, 'count': 2})
+        trade_tape.add(timestamp=2200, price=104.0, size=1.0, side=1, trade_id="c")
+        stats = trade_tape.get_stats(timestamp=2200)
+        self.assertEqual((stats[1000]['vwap'], stats[1000]['count']), (102.5, 2))
+        self.assertEqual(stats[10000]['count'], 3)
+        self.assertEqual(trade_tape.get_stats(timestamp=5000)[1000]['count'], 0)
+        for timestamp in (5100, 5200):
+            trade_tape.add(timestamp=timestamp, price=100.0, size=2.0, side=1, trade_id=str(timestamp))
+        # the tape keeps 4 trades, the overwritten trade leaves the 10 second window
+        stats = trade_tape.get_stats(timestamp=5200)
+        self.assertEqual((stats[10000]['count'], stats[10000]['volume']), (4, 8.0))
+        self.assertEqual(stats[1000], {'vwap': 100.0, 'volume': 4.0, 'count': 2})
+        trades = trade_tape.get_trades()
+        self.assertEqual(list(trades['timestamp']), [1500, 2200, 5100, 5200])
+        self.assertEqual(list(trades['side']), [-1, 1, 1, 1])
+        self.assertEqual(trades['trade_id'], ["b", "c", "5100", "5200"])
+        self.assertEqual(list(trade_tape.get_trades(limit=1)['price']), [100.0])
+
+    def test_trade_tapes_of_a_stream(self):
+        trade_tapes = BybitWebSocketApiTradeTapes(windows=(60000,))
+        self.assertTrue(trade_tapes.apply("publicTrade.BTCUSDT", {
+            "topic": "publicTrade.BTCUSDT", "type": "snapshot", "ts": 1672304486868,
+            "data": [{"T": 1672304486865, "s": "BTCUSDT", "S": "Buy", "v": "0.001", "p": "16578.50", "L": "PlusTick",
+                      "i": "20f43950-d8dd-5b31-9112-a178eb6023af", "BT": False}]}))
+        self.assertFalse(trade_tapes.apply("publicTrade.BTCUSDT", {"topic": "publicTrade.BTCUSDT"}))
+        manager = BybitWebSocketApiManager.__new__(BybitWebSocketApiManager)
+        manager.stream_shards = {}
+        manager.trade_tapes = {"stream_id": trade_tapes}
+        self.assertEqual(manager.get_trades("btcusdt")['trade_id'], ["20f43950-d8dd-5b31-9112-a178eb6023af"])
+        self.assertEqual(list(manager.get_trade_stats("BTCUSDT", stream_id="stream_id")), [60000])
+        self.assertIsNone(manager.get_trades("ETHUSDT"))
+        self.assertTrue(trade_tapes.remove("publicTrade.BTCUSDT"))
+        self.assertIsNone(manager.get_trade_stats("BTCUSDT"))
+        # a message still in flight after unsubscribing the topic does not create the tape again
+        trade_tapes = BybitWebSocketApiTradeTapes(is_subscribed=lambda topic: False)
+        self.assertFalse(trade_tapes.apply("publicTrade.BTCUSDT", {
+            "topic": "publicTrade.BTCUSDT", "type": "snapshot", "ts": 1672304486868,
+            "data": [{"T": 1672304486865, "s": "BTCUSDT", "S": "Buy", "v": "0.001", "p": "16578.50"}]}))
+        self.assertIsNone(trade_tapes.get("BTCUSDT"))
+
+
+class TestLocalOrderBook(unittest.TestCase):
+    @staticmethod
+    def message(type, u, bids, asks, topic="orderbook.50.BTCUSDT"):
+        return {"topic": topic, "type": type, "ts": 1672304484978,
+                "data": {"s": topic.split(".")[-1], "b": bids, "a": asks, "u": u, "seq": u * 10}}
+
+    def test_snapshot_and_delta(self):
+        order_book = BybitWebSocketApiLocalOrderBook(topic="orderbook.50.BTCUSDT")
+        self.assertEqual((order_book.symbol, order_book.depth), ("BTCUSDT", 50))
+        self.assertIsNone(order_book.get_best_bid())
+        self.assertFalse(order_book.apply(self.message("delta", 1, [["100", "1"]], [])))
+        self.assertTrue(order_book.apply(self.message("snapshot", 10,
+                                                      [["100", "1"], ["99", "2"], ["98", "3"]],
+                                                      [["101", "1"], ["102", "2"]])))
+        self.assertEqual(order_book.get_best_bid(), (100.0, 1.0))
+        self.assertEqual(order_book.get_best_ask(), (101.0, 1.0))
+        self.assertTrue(order_book.apply(self.message("delta", 11,
+                                                      [["100", "0"], ["99.5", "4"], ["98", "5"]],
+                                                      [["100.5", "1"], ["102", "0"]])))
+        self.assertEqual(order_book.get_bids(), [[99.5, 4.0], [99.0, 2.0], [98.0, 5.0]])
+        self.assertEqual(order_book.get_bids(2), [[99.5, 4.0], [99.0, 2.0]])
+        self.assertEqual(order_book.get_asks(), [[100.5, 1.0], [101.0, 1.0]])
+        book = order_book.get(depth=1)
+        self.assertEqual((book['u'], book['seq'], book['bids'], book['asks']), (11, 110, [[99.5, 4.0]], [[100.5, 1.0]]))
+
+    def test_update_id_validation(self):
+        order_book = BybitWebSocketApiLocalOrderBook(topic="orderbook.1.BTCUSDT")
+        order_book.apply(self.message("snapshot", 10, [["100", "1"]], [["101", "1"]], topic="orderbook.1.BTCUSDT"))
+        self.assertFalse(order_book.apply(self.message("delta", 10, [["100", "0"]], [], topic="orderbook.1.BTCUSDT")))
+        self.assertEqual(order_book.get_best_bid(), (100.0, 1.0))
+        self.assertFalse(order_book.apply(self.message("delta", 12, [["100", "5"]], [], topic="orderbook.1.BTCUSDT")))
+        self.assertFalse(order_book.is_synced)
+        self.assertEqual(order_book.gaps, 1)
+        self.assertFalse(order_book.apply(self.message("delta", 13, [["100", "5"]], [], topic="orderbook.1.BTCUSDT")))
+        self.assertTrue(order_book.apply(self.message("snapshot", 20, [["99", "1"]], [["102", "1"]],
+                                                      topic="orderbook.1.BTCUSDT")))
+        self.assertTrue(order_book.is_synced)
+        # levels pushed out of the depth get removed
+        self.assertTrue(order_book.apply(self.message("delta", 21, [["99.5", "1"]], [["101", "1"]],
+                                                      topic="orderbook.1.BTCUSDT")))
+        self.assertEqual((order_book.get_bids(), order_book.get_asks()), ([[99.5, 1.0]], [[101.0, 1.0]]))
+
+    def test_order_books_of_a_stream(self):
+        order_books = BybitWebSocketApiLocalOrderBooks()
+        order_books.apply("orderbook.1.BTCUSDT", self.message("snapshot", 1, [["100", "1"]], [["101", "1"]],
+                                                              topic="orderbook.1.BTCUSDT"))
+        self.assertEqual(order_books.get("BTCUSDT").depth, 1)
+        order_books.apply("orderbook.50.BTCUSDT", self.message("snapshot", 1, [["100", "1"]], [["101", "1"]]))
+        self.assertEqual(order_books.get("BTCUSDT").depth, 50)
+        self.assertFalse(order_books.apply("orderbook.50.BTCUSDT", {"topic": "orderbook.50.BTCUSDT"}))
+        self.assertTrue(order_books.remove("orderbook.50.BTCUSDT"))
+        self.assertEqual(order_books.get("BTCUSDT").depth, 1)
+        self.assertFalse(order_books.remove("orderbook.50.BTCUSDT"))
+        self.assertFalse(BybitWebSocketApiLocalOrderBooks(is_subscribed=lambda topic: False).apply(
+            "orderbook.50.BTCUSDT", self.message("snapshot", 1, [["100", "1"]], [["101", "1"]])))
+        manager = BybitWebSocketApiManager.__new__(BybitWebSocketApiManager)
+        manager.stream_shards = {}
+        manager.order_books = {"stream_id": order_books}
+        self.assertEqual(manager.get_order_book("btcusdt")['bids'], [[100.0, 1.0]])
+        self.assertEqual(manager.get_order_book_best_bid_ask("BTCUSDT", stream_id="stream_id"),
+                         {'bid': (100.0, 1.0), 'ask': (101.0, 1.0), 'is_synced': True})
+        self.assertIsNone(manager.get_order_book("ETHUSDT"))
+
+    def test_gap_triggers_resync(self):
+        gaps = []
+        order_books = BybitWebSocketApiLocalOrderBooks(on_gap=gaps.append)
+        order_books.apply("orderbook.1.BTCUSDT", self.message("snapshot", 1, [["100", "1"]], [["101", "1"]],
+                                                              topic="orderbook.1.BTCUSDT"))
+        self.assertTrue(order_books.apply("orderbook.1.BTCUSDT", self.message("delta", 2, [["100", "2"]], [],
+                                                                              topic="orderbook.1.BTCUSDT")))
+        self.assertFalse(order_books.apply("orderbook.1.BTCUSDT", self.message("delta", 4, [["100", "3"]], [],
+                                                                               topic="orderbook.1.BTCUSDT")))
+        self.assertFalse(order_books.apply("orderbook.1.BTCUSDT", self.message("delta", 5, [["100", "3"]], [],
+                                                                               topic="orderbook.1.BTCUSDT")))
+        self.assertEqual(gaps, ["orderbook.1.BTCUSDT"])
+        order_books.apply("orderbook.1.BTCUSDT", self.message("snapshot", 1, [["99", "1"]], [["101", "1"]],
+                                                              topic="orderbook.1.BTCUSDT"))
+        self.assertTrue(order_books.get("BTCUSDT").is_synced)
+        self.assertEqual(order_books.invalidate(), 1)
+        self.assertFalse(order_books.get("BTCUSDT").is_synced)
+        manager = TestSubscriptionPayload.new_manager()
+        stream = manager.stream_list["stream_id"]
+        stream['channels'], stream['markets'] = [], []
+        manager.subscribe_to_stream("stream_id", channels="orderbook.50", markets=["btcusdt", "ethusdt"])
+        manager._process_subscription_response(decode_control_message(
+            '{"success":true,"req_id":"' + stream['payload'][0]['req_id'] + '","op":"subscribe"}',
+            stream_id="stream_id"))
+        self.assertFalse(manager.resync_topic("stream_id", "orderbook.50.SOLUSDT"))
+        self.assertTrue(manager.resync_topic("stream_id", "orderbook.50.btcusdt", reason="Gap in the updates"))
+        self.assertEqual([(request['op'], request['args']) for request in stream['payload'][1:]],
+                         [("unsubscribe", ["orderbook.50.BTCUSDT"]), ("subscribe", ["orderbook.50.BTCUSDT"])])
+        self.assertEqual(manager.get_topic_states("stream_id"), {"orderbook.50.BTCUSDT": "pending",
+                                                                 "orderbook.50.ETHUSDT": "active"})
+        for request in stream['payload'][1:]:
+            manager._process_subscription_response(decode_control_message(
+                '{"success":true,"req_id":"' + request['req_id'] + '","op":"' + request['op'] + '"}',
+                stream_id="stream_id"))
+        self.assertEqual(manager.get_topic_state("orderbook.50.BTCUSDT", stream_id="stream_id"), "active")
+        self.assertEqual(stream['subscriptions'], 2)
+        signal = manager.stream_signal_buffer.popleft()
+        self.assertEqual((signal['type'], signal['topic'], signal['reason']),
+                         ("TOPIC_RESYNC", "orderbook.50.BTCUSDT", "Gap in the updates"))
+        # a gap detected by the socket only schedules the resynchronization in the event loop of the stream
+        loop = asyncio.new_event_loop()
+        try:
+            manager.event_loops = {"stream_id": loop}
+            self.assertTrue(manager._schedule_resync_topic("stream_id", "orderbook.50.ETHUSDT", "Gap in the updates"))
+            self.assertEqual(manager.get_topic_state("orderbook.50.ETHUSDT", stream_id="stream_id"), "active")
+            self.assertEqual(len(stream['payload']), 3)
+            # sending falls back to the payload queue of the stream without a socket
+            manager.event_loops = {}
+            loop.run_until_complete(asyncio.sleep(0))
+        finally:
+            loop.close()
+        self.assertEqual(manager.get_topic_state("orderbook.50.ETHUSDT", stream_id="stream_id"), "pending")
+        self.assertEqual([request['args'] for request in stream['payload'][3:]],
+                         [["orderbook.50.ETHUSDT"], ["orderbook.50.ETHUSDT"]])
+        self.assertFalse(manager._schedule_resync_topic("stream_id", "orderbook.50.ETHUSDT", "Gap in the updates"))
+
+
+class TestStreamBuffer(unittest.TestCase):
+    @staticmethod
+    def new_manager():
+        manager = BybitWebSocketApiManager.__new__(BybitWebSocketApiManager)
+        manager.stream_buffer = collections.deque()
+        manager.stream_buffer_lock = threading.Condition()
+        manager.stream_buffers = {}
+        manager.stream_buffer_locks = {}
+        return manager
+
+    def test_pop_waits_for_data(self):
+        manager = self.new_manager()
+        self.assertIsNone(manager.pop_stream_data_from_stream_buffer())
+        self.assertIsNone(manager.pop_stream_data_from_stream_buffer(timeout=0.01))
+        threading.Timer(0.05, manager.add_to_stream_buffer, args=("data",)).start()
+        start_time = time.time()
+        self.assertEqual(manager.pop_stream_data_from_stream_buffer(timeout=5), "data")
+        self.assertLess(time.time() - start_time, 1)
+
+    def test_pop_many_and_shared_buffer(self):
+        manager = self.new_manager()
+        manager._init_stream_buffer(stream_buffer_name="shared")
+        stream_buffer_lock = manager.stream_buffer_locks["shared"]
+        for stream_data in range(5):
+            manager.add_to_stream_buffer(stream_data, stream_buffer_name="shared")
+        manager._init_stream_buffer(stream_buffer_name="shared")
+        self.assertIs(manager.stream_buffer_locks["shared"], stream_buffer_lock)
+        self.assertEqual(manager.pop_many_stream_data_from_stream_buffer("shared", max_items=3), [0, 1, 2])
+        self.assertEqual(manager.pop_many_stream_data_from_stream_buffer("shared", mode="LIFO"), [4, 3])
+        self.assertEqual(manager.pop_many_stream_data_from_stream_buffer("shared"), [])
+
+
+class TestTopicDecoders(unittest.TestCase):
+    def test_kline(self):
+        message = decode_typed({"topic": "kline.1.BTCUSDT", "type": "snapshot", "ts": 1672324988882,
+                                "data": [{"start": 1672324800000, "end": 1672324859999, "interval": "1",
+                                          "open": "16649.5", "close": "16677", "high": "16677", "low": "16608",
+                                          "volume": "2.081", "turnover": "34666.4005", "confirm": False,
+                                          "timestamp": 1672324988882}]})
+        self.assertIsInstance(message, BybitWebSocketApiTypedMessage)
+        self.assertEqual(message.topic, "kline.1.BTCUSDT")
+        self.assertIsInstance(message.data[0], BybitWebSocketApiKline)
+        self.assertEqual(message.data[0].close, 16677.0)
+        self.assertEqual(message.data[0].volume, 2.081)
+        self.assertFalse(hasattr(message.data[0], "__dict__"))
+
+    def test_orderbook_and_ticker(self):
+        message = decode_typed({"topic": "orderbook.50.BTCUSDT", "type": "delta", "ts": 1687940967466,
+                                "data": {"s": "BTCUSDT", "b": [["30247.20", "30.028"], ["30245.40", "0"]],
+                                         "a": [["30248.70", "0"]], "u": 177400507, "seq": 66544703342},
+                                "cts": 1687940967464})
+        self.assertIsInstance(message.data, BybitWebSocketApiOrderBook)
+        self.assertEqual(message.data.bids, [(30247.2, 30.028), (30245.4, 0.0)])
+        self.assertEqual(message.data.update_id, 177400507)
+        self.assertEqual(message.cts, 1687940967464)
+        message = decode_typed({"topic": "tickers.BTCUSDT", "type": "delta", "ts": 1673853746003,
+                                "data": {"symbol": "BTCUSDT", "bid1Price": "21109.77", "fundingRate": ""}})
+        self.assertIsInstance(message.data, BybitWebSocketApiTicker)
+        self.assertEqual(message.data.bid1_price, 21109.77)
+        self.assertIsNone(message.data.funding_rate)
+        self.assertIsNone(message.data.last_price)
+
+    def test_trade_and_liquidation(self):
+        message = decode_typed({"topic": "publicTrade.BTCUSDT", "type": "snapshot", "ts": 1672304486868,
+                                "data": [{"T": 1672304486865, "s": "BTCUSDT", "S": "Buy", "v": "0.001",
+                                          "p": "16578.50", "L": "PlusTick", "i": "20f43950", "BT": False}]})
+        self.assertEqual(message.data[0].price, 16578.5)
+        self.assertEqual(message.data[0].side, "Buy")
+        message = decode_typed({"topic": "liquidation.BTCUSDT", "type": "snapshot", "ts": 1703485237953,
+                                "data": {"updatedTime": 1703485237953, "symbol": "BTCUSDT", "side": "Sell",
+                                         "size": "0.003", "price": "43511.70"}})
+        self.assertIsInstance(message.data, BybitWebSocketApiLiquidation)
+        self.assertEqual(message.data.size, 0.003)
+
+    def test_unknown_messages_stay_dict(self):
+        response = {"success": True, "ret_msg": "subscribe", "op": "subscribe"}
+        self.assertIs(decode_typed(response), response)
+        unknown = {"topic": "unknown.BTCUSDT", "data": {}}
+        self.assertIs(decode_typed(unknown), unknown)
+
+
+class TestTopicRouter(unittest.TestCase):
+    def test_parse_frame_header(self):
+        header = parse_frame_header('{"topic":"orderbook.50.BTCUSDT","type":"delta","ts":1687940967466,'
+                                    '"data":{"s":"BTCUSDT","b":[],"a":[],"u":1,"seq":2,"type":"x"},"cts":1}')
+        self.assertEqual(header.topic, "orderbook.50.BTCUSDT")
+        self.assertEqual(header.type, "delta")
+        self.assertIsNone(header.op)
+        header = parse_frame_header('{"success": true, "ret_msg": "", "conn_id": "abc", "op": "subscribe"}')
+        self.assertIsNone(header.topic)
+        self.assertEqual(header.op, "subscribe")
+
+    def test_register_and_get_handlers(self):
+        router = BybitWebSocketApiTopicRouter()
+        self.assertFalse(router.has_handlers("stream"))
+        self.assertTrue(router.register(topic="publicTrade.BTCUSDT", callback=print, stream_id="stream"))
+        self.assertTrue(router.register(topic="publicTrade.BTCUSDT", callback=len, output="raw_data"))
+        self.assertTrue(router.has_handlers("other_stream"))
+        handlers = router.get_handlers("stream", "publicTrade.BTCUSDT")
+        self.assertEqual([handler.callback for handler in handlers], [print, len])
+        self.assertEqual([handler.callback for handler in router.get_handlers("other_stream", "publicTrade.BTCUSDT")],
+                         [len])
+        self.assertEqual(router.get_handlers("stream", "kline.1.BTCUSDT"), [])
+        self.assertEqual(router.decode('{"topic": "a"}', output="dict"), {"topic": "a"})
+        self.assertTrue(router.unregister(topic="publicTrade.BTCUSDT", callback=len))
+        self.assertFalse(router.unregister(topic="publicTrade.BTCUSDT", callback=len))
+        self.assertTrue(router.remove_stream("stream"))
+        self.assertFalse(router.has_handlers("stream"))
+        with self.assertRaises(ValueError):
+            router.register(topic="publicTrade.BTCUSDT", callback=print, output="xml")
+
+    def test_wildcard_patterns(self):
+        router = BybitWebSocketApiTopicRouter()
+        router.register(topic="orderbook.50.*", callback=print, stream_id="stream")
+        router.register(topic="kline.*.BTCUSDT", callback=len)
+        router.register(topic="kline.1.BTCUSDT", callback=str)
+        self.assertEqual([handler.callback for handler in router.get_handlers("stream", "orderbook.50.ETHUSDT")],
+                         [print])
+        self.assertEqual(router.get_handlers("stream", "orderbook.200.ETHUSDT"), [])
+        self.assertEqual([handler.callback for handler in router.get_handlers("stream", "kline.1.BTCUSDT")], [len, str])
+        self.assertEqual([handler.callback for handler in router.get_handlers("stream", "kline.5.BTCUSDT")], [len])
+        self.assertIn("kline.5.BTCUSDT", router.cache["stream"])
+        self.assertTrue(router.unregister(topic="kline.*.BTCUSDT"))
+        self.assertEqual(router.cache, {})
+        self.assertEqual(router.get_handlers("stream", "kline.5.BTCUSDT"), [])
+
+
+class TestConflationBuffer(unittest.TestCase):
+    def test_last_value_per_topic(self):
+        conflation_buffer = BybitWebSocketApiConflationBuffer(output="dict")
+        for price in range(3):
+            conflation_buffer.put("tickers.BTCUSDT",
+                                  '{"topic":"tickers.BTCUSDT","type":"snapshot","data":{"lastPrice":"%s"}}' % price,
+                                  type="snapshot")
+        conflation_buffer.put("tickers.ETHUSDT", '{"topic":"tickers.ETHUSDT","type":"snapshot","data":{}}',
+                              type="snapshot")
+        self.assertEqual(len(conflation_buffer), 2)
+        records = conflation_buffer.pop_all()
+        self.assertEqual([record['topic'] for record in records], ["tickers.BTCUSDT", "tickers.ETHUSDT"])
+        self.assertEqual(records[0]['data']['lastPrice'], "2")
+        self.assertIsNone(conflation_buffer.pop())
+
+    def test_delta_merge_and_typed(self):
+        conflation_buffer = BybitWebSocketApiConflationBuffer(output="typed")
+        conflation_buffer.put("tickers.BTCUSDT", '{"topic":"tickers.BTCUSDT","type":"snapshot","ts":1,"data":'
+                                                 '{"symbol":"BTCUSDT","lastPrice":"100","bid1Price":"99"}}',
+                              type="snapshot")
+        conflation_buffer.put("tickers.BTCUSDT", '{"topic":"tickers.BTCUSDT","type":"delta","ts":2,"data":'
+                                                 '{"symbol":"BTCUSDT","bid1Price":"99.5"}}', type="delta")
+        record = conflation_buffer.pop()
+        self.assertEqual(record.ts, 2)
+        self.assertEqual(record.data.last_price, 100.0)
+        self.assertEqual(record.data.bid1_price, 99.5)
+
+    def test_orderbook_deltas(self):
+        conflation_buffer = BybitWebSocketApiConflationBuffer(output="dict")
+        conflation_buffer.put("orderbook.50.BTCUSDT", '{"topic":"orderbook.50.BTCUSDT","type":"snapshot","ts":1,'
+                                                      '"data":{"s":"BTCUSDT","b":[["100","1"],["99","2"]],'
+                                                      '"a":[["101","1"],["102","2"]],"u":1,"seq":1}}',
+                              type="snapshot")
+        conflation_buffer.put("orderbook.50.BTCUSDT", '{"topic":"orderbook.50.BTCUSDT","type":"delta","ts":2,'
+                                                      '"data":{"s":"BTCUSDT","b":[["100","0"]],"a":[["103","3"]],'
+                                                      '"u":2,"seq":2}}', type="delta")
+        conflation_buffer.put("orderbook.50.BTCUSDT", '{"topic":"orderbook.50.BTCUSDT","type":"delta","ts":3,'
+                                                      '"data":{"s":"BTCUSDT","b":[["98","4"]],"a":[],"u":3,"seq":3}}',
+                              type="delta")
+        self.assertEqual(len(conflation_buffer), 1)
+        record = conflation_buffer.pop()
+        self.assertEqual(record['type'], "snapshot")
+        self.assertEqual(record['ts'], 3)
+        self.assertEqual(record['data']['b'], [["99.0", "2.0"], ["98.0", "4.0"]])
+        self.assertEqual(record['data']['a'], [["101.0", "1.0"], ["102.0", "2.0"], ["103.0", "3.0"]])
+        self.assertEqual(record['data']['u'], 3)
+        conflation_buffer.put("orderbook.50.BTCUSDT", '{"topic":"orderbook.50.BTCUSDT","type":"delta","ts":4,'
+                                                      '"data":{"s":"BTCUSDT","b":[],"a":[],"u":5,"seq":5}}',
+                              type="delta")
+        self.assertIsNone(conflation_buffer.pop())
+
+    def test_orderbook_gap_triggers_resync(self):
+        manager = TestSubscriptionPayload.new_manager()
+        stream = manager.stream_list["stream_id"]
+        stream['channels'], stream['markets'] = [], []
+        manager.subscribe_to_stream("stream_id", channels="orderbook.50", markets=["btcusdt"])
+        manager._process_subscription_response(decode_control_message(
+            '{"success":true,"req_id":"' + stream['payload'][0]['req_id'] + '","op":"subscribe"}',
+            stream_id="stream_id"))
+        gaps = []
+
+        def on_gap(topic):
+            gaps.append(topic)
+            manager._schedule_resync_topic(stream_id="stream_id", topic=topic, reason="Gap in the updates")
+
+        conflation_buffer = BybitWebSocketApiConflationBuffer(output="dict", on_gap=on_gap)
+        loop = asyncio.new_event_loop()
+        try:
+            manager.event_loops = {"stream_id": loop}
+            conflation_buffer.put("orderbook.50.BTCUSDT", '{"topic":"orderbook.50.BTCUSDT","type":"snapshot","ts":1,'
+                                                          '"data":{"s":"BTCUSDT","b":[["100","1"]],"a":[["101","1"]],'
+                                                          '"u":1,"seq":1}}', type="snapshot")
+            for update_id in (3, 4):
+                conflation_buffer.put("orderbook.50.BTCUSDT", '{"topic":"orderbook.50.BTCUSDT","type":"delta",'
+                                                              '"ts":2,"data":{"s":"BTCUSDT","b":[],"a":[],'
+                                                              '"u":' + str(update_id) + ',"seq":2}}', type="delta")
+            # only the delta which detects the gap requests a new snapshot
+            self.assertEqual(gaps, ["orderbook.50.BTCUSDT"])
+            self.assertIsNone(conflation_buffer.pop())
+            manager.event_loops = {}
+            loop.run_until_complete(asyncio.sleep(0))
+        finally:
+            loop.close()
+        self.assertEqual([(request['op'], request['args']) for request in stream['payload'][1:]],
+                         [("unsubscribe", ["orderbook.50.BTCUSDT"]), ("subscribe", ["orderbook.50.BTCUSDT"])])
+        conflation_buffer.put("orderbook.50.BTCUSDT", '{"topic":"orderbook.50.BTCUSDT","type":"snapshot","ts":3,'
+                                                      '"data":{"s":"BTCUSDT","b":[["99","1"]],"a":[["101","1"]],'
+                                                      '"u":10,"seq":3}}', type="snapshot")
+        self.assertEqual(conflation_buffer.pop()['data']['b'], [["99.0", "1.0"]])
+
+    def test_throttle(self):
+        conflation_buffer = BybitWebSocketApiConflationBuffer(output="raw_data", throttle_ms=50)
+        conflation_buffer.put("tickers.BTCUSDT", '{"topic":"tickers.BTCUSDT","data":1}', type="snapshot")
+        self.assertIsNotNone(conflation_buffer.pop())
+        conflation_buffer.put("tickers.BTCUSDT", '{"topic":"tickers.BTCUSDT","data":2}', type="snapshot")
+        self.assertIsNone(conflation_buffer.pop())
+        time.sleep(0.06)
+        self.assertEqual(conflation_buffer.pop(), '{"topic":"tickers.BTCUSDT","data":2}')
+
+
+class TestControlMessages(unittest.TestCase):
+    def test_decode_control_message(self):
+        control_message = decode_control_message('{"success":true,"ret_msg":"","conn_id":"a1","req_id":"7",'
+                                                 '"op":"subscribe"}', stream_id="stream")
+        self.assertEqual(control_message.op, "subscribe")
+        self.assertEqual(control_message.req_id, "7")
+        self.assertEqual(control_message.stream_id, "stream")
+        self.assertFalse(control_message.is_error())
+        control_message = decode_control_message('{"success":false,"ret_msg":"error:handler not found",'
+                                                 '"conn_id":"a1","op":"subscribe"}')
+        self.assertTrue(control_message.is_error())
+        control_message = decode_control_message('{"reqId":"9","retCode":10001,"retMsg":"invalid","op":"order.create"}')
+        self.assertTrue(control_message.is_error())
+        self.assertEqual(control_message.req_id, "9")
+
+    def test_data_frames_are_no_control_messages(self):
+        header = parse_frame_header('{"topic":"publicTrade.BTCUSDT","type":"snapshot","ts":1,"data":'
+                                    '[{"i":"error result","s":"BTCUSDT"}]}')
+        self.assertEqual(header.topic, "publicTrade.BTCUSDT")
+        self.assertIsNone(parse_frame_header('{"success":true,"op":"ping"}').topic)
+
+
+class TestAsyncioQueue(unittest.TestCase):
+    @staticmethod
+    def fill(asyncio_queue, records):
+        async def put_all():
+            for record in records:
+                await asyncio_queue.put(record)
+        asyncio.run(put_all())
+        return [asyncio_queue.get_nowait() for _ in range(asyncio_queue.qsize())]
+
+    def test_drop_policies(self):
+        asyncio_queue = BybitWebSocketApiAsyncioQueue(maxsize=2, overflow_policy="drop_oldest")
+        self.assertEqual(self.fill(asyncio_queue, [1, 2, 3, 4]), [3, 4])
+        self.assertEqual(asyncio_queue.dropped, 2)
+        self.assertEqual(asyncio_queue.high_water_mark, 2)
+        asyncio_queue = BybitWebSocketApiAsyncioQueue(maxsize=2, overflow_policy="drop_newest")
+        self.assertEqual(self.fill(asyncio_queue, [1, 2, 3, 4]), [1, 2])
+        self.assertEqual(asyncio_queue.dropped, 2)
+        with self.assertRaises(ValueError):
+            BybitWebSocketApiAsyncioQueue(maxsize=2, overflow_policy="unknown")
+
+    def test_coalesce_by_topic(self):
+        asyncio_queue = BybitWebSocketApiAsyncioQueue(maxsize=2, overflow_policy="coalesce_by_topic")
+        records = ['{"topic":"tickers.BTCUSDT","data":{"lastPrice":"1"}}',
+                   {'topic': 'tickers.ETHUSDT', 'data': {'lastPrice': '2'}},
+                   '{"topic":"tickers.BTCUSDT","data":{"lastPrice":"3"}}',
+                   '{"topic":"tickers.SOLUSDT","data":{"lastPrice":"4"}}']
+        self.assertEqual(self.fill(asyncio_queue, records[:3]), [records[2], records[1]])
+        self.assertEqual(asyncio_queue.coalesced, 1)
+        self.assertEqual(self.fill(asyncio_queue, records), [records[1], records[3]])
+        self.assertEqual(asyncio_queue.coalesced, 2)
+        self.assertEqual(asyncio_queue.dropped, 1)
+        self.assertEqual(asyncio_queue.latest_by_topic, {})
+
+    def test_coalesce_by_topic_keeps_deltas(self):
+        asyncio_queue = BybitWebSocketApiAsyncioQueue(maxsize=2, overflow_policy="coalesce_by_topic")
+        records = ['{"topic":"orderbook.50.BTCUSDT","type":"snapshot","data":{"u":1}}',
+                   '{"topic":"orderbook.50.BTCUSDT","type":"delta","data":{"u":2}}',
+                   {'topic': 'orderbook.50.BTCUSDT', 'type': 'delta', 'data': {'u': 3}},
+                   '{"topic":"orderbook.50.BTCUSDT","type":"snapshot","data":{"u":4}}']
+        # a delta never replaces a queued record, the oldest record gets dropped instead
+        self.assertEqual(self.fill(asyncio_queue, records[:3]), [records[1], records[2]])
+        self.assertEqual(asyncio_queue.coalesced, 0)
+        self.assertEqual(asyncio_queue.dropped, 1)
+        # a snapshot replaces the newest queued record of its topic
+        self.assertEqual(self.fill(asyncio_queue, records), [records[1], records[3]])
+        self.assertEqual(asyncio_queue.coalesced, 1)
+        self.assertEqual(asyncio_queue.dropped, 2)
+        self.assertEqual(asyncio_queue.latest_by_topic, {})
+
+    def test_block(self):
+        async def produce_and_consume():
+            asyncio_queue = BybitWebSocketApiAsyncioQueue(maxsize=1, overflow_policy="block")
+            await asyncio_queue.put(1)
+            producer = asyncio.ensure_future(asyncio_queue.put(2))
+            await asyncio.sleep(0.01)
+            self.assertFalse(producer.done())
+            self.assertEqual(await asyncio_queue.get(), 1)
+            await producer
+            self.assertEqual(await asyncio_queue.get(), 2)
+            self.assertEqual(asyncio_queue.dropped, 0)
+        asyncio.run(produce_and_consume())
+
+
 if __name__ == '__main__':
     try:
         unittest.main()